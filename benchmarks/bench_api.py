@@ -0,0 +1,199 @@
+"""HTTP load test for the API: requests per second and latency percentiles.
+
+Run from the project root:
+
+    python benchmarks/bench_api.py [--concurrency 32] [--seconds 5] [--recipes 500]
+    python benchmarks/bench_api.py --url http://127.0.0.1:8000 [--scenarios get_recipe,list_recipes]
+
+Without ``--url`` the API is started with uvicorn in a subprocess against
+a fresh database file. The database is seeded through the API, then each
+scenario runs for a fixed wall-clock window with ``--concurrency`` clients
+sending requests back to back. Latency is measured per request on the
+client, so it includes connection handling and JSON decoding on the
+client side but no think time.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+
+
+def _recipe(n: int) -> dict:
+    return {
+        "title": f"Benchmark Stew {n}",
+        "description": "A hearty stew",
+        "ingredients": [{"name": f"ingredient {i}", "quantity": i, "unit": "g"} for i in range(8)],
+        "instructions": [f"Step {i}" for i in range(6)],
+        "prep_time_minutes": 10,
+        "cook_time_minutes": 40,
+    }
+
+
+class Scenarios:
+    """One request per call; ``ids`` are the seeded recipe ids."""
+
+    def __init__(self, ids: list[int]):
+        self.ids = ids
+        self.created = 0
+        self.etag = None
+
+    async def get_recipe(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/recipes/{random.choice(self.ids)}")
+
+    async def list_recipes(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/recipes", params={"limit": 50})
+
+    async def list_recipes_304(self, client: httpx.AsyncClient) -> httpx.Response:
+        """Conditional GET of an unchanged listing."""
+        if self.etag is None:
+            self.etag = (await client.get("/recipes", params={"limit": 50})).headers["etag"]
+        return await client.get("/recipes", params={"limit": 50}, headers={"If-None-Match": self.etag})
+
+    async def preferences(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/preferences")
+
+    async def create_recipe(self, client: httpx.AsyncClient) -> httpx.Response:
+        self.created += 1
+        return await client.post("/recipes", json=_recipe(1_000_000 + self.created + random.randrange(10**9)))
+
+
+SCENARIOS = ("get_recipe", "list_recipes", "list_recipes_304", "preferences", "create_recipe")
+
+
+async def run_scenario(
+    base_url: str,
+    request: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]],
+    concurrency: int,
+    seconds: float,
+) -> dict:
+    """Send requests from ``concurrency`` clients for ``seconds``; return throughput and latencies."""
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await request(client)  # Warm up the connection and any caches
+        stop = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    response = await request(client)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "mean": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+async def seed(base_url: str, recipes: int) -> list[int]:
+    """Create recipes through the API and return their ids."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        ids = []
+        for start in range(0, recipes, 50):
+            responses = await asyncio.gather(
+                *(client.post("/recipes", json=_recipe(n)) for n in range(start, min(start + 50, recipes)))
+            )
+            ids.extend(r.json()["id"] for r in responses)
+        return ids
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database: Path) -> tuple[subprocess.Popen, str]:
+    """Start uvicorn on a free port and wait until it answers."""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "chefwise.api:create_app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--recipes", type=int, default=500, help="recipes to seed")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    args = parser.parse_args()
+
+    names = args.scenarios.split(",")
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        base_url = args.url
+        if base_url is None:
+            server, base_url = start_server(Path(tmp) / "bench.db")
+        try:
+            scenarios = Scenarios(asyncio.run(seed(base_url, args.recipes)))
+            print(f"{args.recipes} recipes, {args.concurrency} concurrent clients, {args.seconds:.0f} s per scenario")
+            print(f"{'scenario':<18}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>9}{'p99 ms':>9}")
+            for name in names:
+                result = asyncio.run(run_scenario(base_url, getattr(scenarios, name), args.concurrency, args.seconds))
+                print(
+                    f"{name:<18}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.0f}"
+                    f"{result['p50']:>9.1f}{result['p99']:>9.1f}"
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
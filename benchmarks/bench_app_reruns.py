@@ -0,0 +1,136 @@
+"""Streamlit rerun cost per page with and without the app caches.
+
+Run from the project root:
+
+    python benchmarks/bench_app_reruns.py [--recipes 1000] [--reruns 10] [--pages "Meal Planner" ...]
+
+Each page is rendered headlessly with streamlit.testing's AppTest and then
+re-run as a widget interaction would. "cold" clears st.cache_data and
+st.cache_resource before every rerun, which is what every rerun cost before
+the caching layer; "warm" keeps them. SQL statements per rerun are counted
+on the app engine.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+APP = str(Path(__file__).parent.parent / "chefwise" / "app" / "main.py")
+PAGES = ["Recipe Finder", "Meal Planner", "Recipe Modifier", "My Recipes", "Settings"]
+
+
+def seed_app_database(recipes: int) -> None:
+    """Fill the app database with recipes and a month of overlapping plans."""
+    from bench_lazy_recipes import seed
+    from chefwise.database import MealPlanRepository, SessionLocal, engine, init_db
+    from chefwise.models import MealPlanCreate, MealSlot
+
+    init_db(engine)
+    seed(engine, recipes)
+    with SessionLocal() as db:
+        start = date.today()
+        for week in range(4):
+            first = start + timedelta(days=week * 7)
+            MealPlanRepository(db).create(
+                MealPlanCreate(
+                    name=f"Week {week}",
+                    start_date=first,
+                    end_date=first + timedelta(days=9),
+                    meals=[
+                        MealSlot(date=first + timedelta(days=day), meal_type=meal_type, recipe_title="Recipe 1")
+                        for day in range(10)
+                        for meal_type in ("breakfast", "lunch", "dinner")
+                    ],
+                )
+            )
+
+
+def measure(page: str, reruns: int, cold: bool) -> tuple[float, float]:
+    """Return (mean ms, SQL statements) per rerun of one page."""
+    import streamlit as st
+    from sqlalchemy import event
+    from streamlit.testing.v1 import AppTest
+
+    from chefwise.database import engine
+
+    app = AppTest.from_file(APP, default_timeout=120)
+    app.run()
+    app.sidebar.radio[0].set_value(page)
+    app.run()
+    assert not app.exception, app.exception
+
+    statements = []
+    count = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", count)
+    elapsed = 0.0
+    try:
+        for _ in range(reruns):
+            if cold:
+                st.cache_data.clear()
+                st.cache_resource.clear()
+            start = time.perf_counter()
+            app.run()
+            elapsed += time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return elapsed / reruns * 1000, len(statements) / reruns
+
+
+def measure_services(repeat: int = 20) -> tuple[float, float]:
+    """Return (ms to build all three services, ms to fetch the cached ones)."""
+    from chefwise.ai import MealPlanService, RecipeModificationService, RecipeSuggestionService
+    from chefwise.app import cache
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        RecipeSuggestionService(), MealPlanService(), RecipeModificationService()
+    built = (time.perf_counter() - start) / repeat * 1000
+
+    cache.get_suggestion_service(), cache.get_meal_plan_service(), cache.get_modification_service()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cache.get_suggestion_service(), cache.get_meal_plan_service(), cache.get_modification_service()
+    cached = (time.perf_counter() - start) / repeat * 1000
+    return built, cached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=PAGES, metavar="PAGE")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before chefwise.config is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'app.db'}"
+        os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-not-used")
+        seed_app_database(args.recipes)
+
+        from streamlit.logger import set_log_level
+
+        set_log_level("error")
+
+        print(f"{args.recipes} recipes, {args.reruns} reruns per page")
+        print(f"{'page':<17}{'cold ms':>9}{'warm ms':>9}{'cold SQL':>10}{'warm SQL':>10}")
+        for page in args.pages:
+            cold_ms, cold_sql = measure(page, args.reruns, cold=True)
+            warm_ms, warm_sql = measure(page, args.reruns, cold=False)
+            print(f"{page:<17}{cold_ms:>9.1f}{warm_ms:>9.1f}{cold_sql:>10.1f}{warm_sql:>10.1f}")
+
+        built, cached = measure_services()
+        print(f"AI services per click: {built:.2f} ms to build, {cached:.3f} ms cached")
+
+        from chefwise.database import engine
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
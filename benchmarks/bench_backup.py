@@ -0,0 +1,93 @@
+"""Writer latency during a backup: single-step copy vs page-stepped online backup.
+
+Run from the project root:
+
+    python benchmarks/bench_backup.py [--recipes 20000] [--pages-per-step 256]
+
+A writer thread keeps inserting recipes while a backup runs. A single-step
+backup (pages=-1) holds the read lock for the whole copy; the stepped backup
+releases it between steps, so the writer's worst-case latency should drop.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import sessionmaker
+
+from bench_lazy_recipes import seed
+from chefwise.config.settings import Settings
+from chefwise.database import RecipeRepository, create_db_engine, init_db
+from chefwise.database.backup import backup_database
+from chefwise.models import Ingredient, RecipeCreate
+
+
+def measure(engine, config: Settings, directory: Path) -> dict:
+    """Back up while a writer inserts; return backup metrics and writer latencies."""
+    Session = sessionmaker(bind=engine)
+    latencies: list[float] = []
+    done = threading.Event()
+
+    def writer():
+        n = 0
+        while not done.is_set():
+            recipe = RecipeCreate(
+                title=f"Writer {id(config)} {n}",
+                ingredients=[Ingredient(name="salt", quantity=n, unit="g")],
+                instructions=["Stir"],
+            )
+            start = time.perf_counter()
+            with Session() as db:
+                RecipeRepository(db).create(recipe)
+            latencies.append(time.perf_counter() - start)
+            n += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    result = backup_database(engine, directory=directory, config=config)
+    done.set()
+    thread.join()
+
+    latencies.sort()
+    return {
+        "seconds": result.seconds,
+        "mib_s": result.throughput_mib_s,
+        "steps": result.steps,
+        "max_hold_ms": result.max_lock_hold_ms,
+        "writes": len(latencies),
+        "write_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "write_max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--pages-per-step", type=int, default=256)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'live.db'}")
+        init_db(engine)
+        seed(engine, args.recipes)
+        for name, pages, pause in (("single step", -1, 0.0), ("stepped", args.pages_per_step, 5.0)):
+            config = Settings(backup_pages_per_step=pages, backup_step_pause_ms=pause, backup_keep=1)
+            results[name] = measure(engine, config, Path(tmp) / "backups")
+        engine.dispose()
+
+    print(f"{'mode':<13}{'seconds':>9}{'MiB/s':>8}{'steps':>7}{'max hold ms':>13}{'writes':>8}{'p99 ms':>8}{'max ms':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<13}{r['seconds']:>9.2f}{r['mib_s']:>8.1f}{r['steps']:>7}{r['max_hold_ms']:>13.1f}"
+            f"{r['writes']:>8}{r['write_p99_ms']:>8.1f}{r['write_max_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmarks for each installed JSON codec backend.
+
+Run from the project root:
+
+    python benchmarks/bench_json_codec.py [--number 2000]
+
+Payloads are shaped like the real ones: a stored recipe's ingredients column
+and a five-recipe AI suggestion response.
+"""
+
+import argparse
+import importlib.util
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from chefwise import codec
+from chefwise.models import Ingredient
+
+
+def ingredients(n: int = 12) -> list[dict]:
+    return [
+        {"name": f"ingredient {i}", "quantity": i + 0.25, "unit": "tbsp", "notes": "finely chopped" if i % 3 else None}
+        for i in range(n)
+    ]
+
+
+def suggestion_response(recipes: int = 5) -> dict:
+    return {
+        "recipes": [
+            {
+                "title": f"Roasted Vegetable Tray Bake {r}",
+                "description": "Sheet-pan vegetables with herbs and a lemon-tahini drizzle.",
+                "ingredients": ingredients(),
+                "instructions": [f"Step {s}: roast until golden, turning halfway through." for s in range(8)],
+                "prep_time_minutes": 15,
+                "cook_time_minutes": 40,
+                "servings": 4,
+                "dietary_tags": ["vegetarian", "gluten_free"],
+                "cuisine": "Mediterranean",
+                "difficulty": "easy",
+                "tips": "Cut vegetables to an even size so they cook at the same rate.",
+                "why_this_recipe": "Uses every vegetable you listed in one pan.",
+            }
+            for r in range(recipes)
+        ]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    column = ingredients()
+    response = suggestion_response()
+    column_bytes = codec.load_backend("stdlib").dumpb(column)
+    response_bytes = codec.load_backend("stdlib").dumpb(response)
+
+    cases = {
+        "encode column": lambda: codec.dumps(column),
+        "decode column": lambda: codec.loads(column_bytes),
+        "decode column typed": lambda: codec.decode(column_bytes, list[Ingredient]),
+        "decode column + models": lambda: [Ingredient(**i) for i in codec.loads(column_bytes)],
+        "encode AI response": lambda: codec.dumpb(response),
+        "decode AI response": lambda: codec.loads(response_bytes),
+    }
+
+    backends = [name for name in codec.BACKENDS if name == "stdlib" or importlib.util.find_spec(name)]
+    results = {}
+    for name in backends:
+        codec.set_backend(name)
+        results[name] = {
+            case: min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number * 1e6
+            for case, fn in cases.items()
+        }
+
+    print(f"microseconds per call (best of 5 x {args.number})")
+    print(f"{'case':<26}" + "".join(f"{name:>12}" for name in backends))
+    for case in cases:
+        print(f"{case:<26}" + "".join(f"{results[name][case]:>12.1f}" for name in backends))
+
+
+if __name__ == "__main__":
+    main()
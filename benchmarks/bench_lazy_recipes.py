@@ -0,0 +1,95 @@
+"""Listing recipes eagerly (get_all) vs lazily (get_all_lazy).
+
+Run from the project root:
+
+    python benchmarks/bench_lazy_recipes.py [--recipes 50000]
+
+Both paths list the whole library and read only the titles, which is what a
+recipe picker or a title search needs. Peak memory is measured with
+tracemalloc, so absolute numbers are inflated but comparable.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import RecipeRepository, RecipeTable, create_db_engine, init_db
+
+
+def seed(engine, count: int) -> None:
+    """Bulk insert realistic recipe rows."""
+    ingredients = json.dumps(
+        [{"name": f"ingredient {i}", "quantity": i + 0.5, "unit": "g", "notes": None} for i in range(10)]
+    )
+    instructions = json.dumps([f"Step {i}: stir and season to taste" for i in range(8)])
+    now = datetime.utcnow()
+    rows = [
+        {
+            "title": f"Recipe {n}",
+            "description": "A weeknight favourite",
+            "ingredients_json": ingredients,
+            "instructions_json": instructions,
+            "prep_time_minutes": 15,
+            "cook_time_minutes": 30,
+            "servings": 4,
+            "dietary_tags_json": json.dumps(["vegetarian"]),
+            "cuisine": "Italian",
+            "difficulty": "easy",
+            "created_at": now - timedelta(seconds=n),
+        }
+        for n in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(RecipeTable), rows)
+
+
+def measure(Session, method: str) -> tuple[float, float]:
+    """Return (seconds, peak MiB) for listing recipes and reading titles."""
+    with Session() as db:
+        repo = RecipeRepository(db)
+        tracemalloc.start()
+        start = time.perf_counter()
+        recipes = getattr(repo, method)()
+        titles = [r.title for r in recipes]
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    assert len(titles) == len(recipes)
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'lazy.db'}")
+        init_db(engine)
+        seed(engine, args.recipes)
+        Session = sessionmaker(bind=engine)
+
+        results = {method: measure(Session, method) for method in ("get_all", "get_all_lazy")}
+        engine.dispose()
+
+    print(f"{args.recipes} recipes, titles only")
+    print(f"{'method':<14}{'seconds':>10}{'peak MiB':>12}")
+    for method, (seconds, peak) in results.items():
+        print(f"{method:<14}{seconds:>10.2f}{peak:>12.1f}")
+
+    eager, lazy = results["get_all"], results["get_all_lazy"]
+    print(f"\nlazy is x{eager[0] / lazy[0]:.1f} faster and uses x{eager[1] / lazy[1]:.1f} less memory")
+
+
+if __name__ == "__main__":
+    main()
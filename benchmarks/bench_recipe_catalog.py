@@ -0,0 +1,115 @@
+"""Searching and sorting the library: Python lists vs SQL vs the columnar catalog.
+
+Run from the project root:
+
+    python benchmarks/bench_recipe_catalog.py [--recipes 50000] [--repeat 20]
+
+Each path answers the same My Recipes queries (substring search, cuisine
+filter, sort) over a seeded library. The Python path filters and sorts the
+objects from get_all_lazy, as the page used to; SQL goes through
+RecipeRepository.filter; the catalog answers from NumPy columns that stay
+resident between queries.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from bench_lazy_recipes import seed
+from chefwise.database import RecipeRepository, RecipeTable, create_db_engine, init_db
+from chefwise.database.catalog import RecipeCatalog
+
+QUERIES = [
+    {"query": "recipe 12", "sort": "title"},
+    {"cuisine": "Thai", "sort": "newest"},
+    {"max_total_time": 40, "sort": "total_time"},
+    {"sort": "oldest"},
+]
+
+
+def python_query(recipes, query=None, cuisine=None, max_total_time=None, sort="newest", limit=None):
+    """Filter and sort lazily loaded recipes in Python, as My Recipes used to."""
+    matches = recipes
+    if query:
+        needle = query.lower()
+        matches = [
+            r for r in matches if needle in r.title.lower() or (r.description and needle in r.description.lower())
+        ]
+    if cuisine:
+        matches = [r for r in matches if r.cuisine == cuisine]
+    if max_total_time is not None:
+        matches = [
+            r
+            for r in matches
+            if r.prep_time_minutes is not None
+            and r.cook_time_minutes is not None
+            and r.prep_time_minutes + r.cook_time_minutes <= max_total_time
+        ]
+    keys = {
+        "newest": lambda r: r.created_at,
+        "oldest": lambda r: r.created_at,
+        "title": lambda r: r.title.lower(),
+        "total_time": lambda r: r.prep_time_minutes + r.cook_time_minutes,
+    }
+    matches = sorted(matches, key=keys[sort], reverse=sort == "newest")
+    return [r.id for r in matches[:limit]]
+
+
+def timed(fn, repeat: int) -> float:
+    """Best of ``repeat`` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        init_db(engine)
+        seed(engine, args.recipes)
+        with engine.begin() as conn:
+            # Spread cuisines and times so filters select a realistic fraction
+            conn.execute(update(RecipeTable).where(RecipeTable.id % 5 == 0).values(cuisine="Thai"))
+            conn.execute(
+                update(RecipeTable).values(cook_time_minutes=RecipeTable.id % 60, title="Recipe " + RecipeTable.id)
+            )
+        Session = sessionmaker(bind=engine)
+
+        with Session() as db:
+            start = time.perf_counter()
+            catalog = RecipeCatalog.build(db)
+            build_ms = (time.perf_counter() - start) * 1000
+            recipes = list(RecipeRepository(db).get_all_lazy())
+            repo = RecipeRepository(db)
+
+            print(f"{args.recipes} recipes, catalog built in {build_ms:.1f} ms, {catalog.nbytes / 2**20:.1f} MiB")
+            print(f"{'query':<40}{'python ms':>11}{'sql ms':>9}{'catalog ms':>12}{'top-20 ms':>11}")
+            for q in QUERIES:
+                expected = python_query(recipes, **q)
+                assert catalog.query(**q).ids.tolist() == expected, q
+                python_ms = timed(lambda: python_query(recipes, **q), args.repeat)
+                sql_ms = timed(lambda: repo.filter(**q, limit=20), args.repeat)
+                catalog_ms = timed(lambda: catalog.query(**q), args.repeat)
+                top_ms = timed(lambda: catalog.top_k(20, **q), args.repeat)
+                label = ", ".join(f"{k}={v}" for k, v in q.items())
+                print(f"{label:<40}{python_ms:>11.2f}{sql_ms:>9.2f}{catalog_ms:>12.2f}{top_ms:>11.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Concurrent read/write throughput: default SQLite engine vs tuned engine.
+
+Run from the project root:
+
+    python benchmarks/bench_sqlite_concurrency.py [--readers 8] [--writers 4] [--seconds 5]
+
+Each configuration gets a fresh database file. Readers list recent recipes and
+writers insert recipes, each in its own session, for a fixed wall-clock window.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config.settings import Settings
+from chefwise.database import RecipeRepository, create_db_engine, init_db
+from chefwise.models import Ingredient, RecipeCreate
+
+
+def _recipe(n: int) -> RecipeCreate:
+    return RecipeCreate(
+        title=f"Benchmark Stew {n}",
+        description="A hearty stew",
+        ingredients=[Ingredient(name=f"ingredient {i}", quantity=i, unit="g") for i in range(8)],
+        instructions=[f"Step {i}" for i in range(6)],
+        prep_time_minutes=10,
+        cook_time_minutes=40,
+    )
+
+
+def run(engine, readers: int, writers: int, seconds: float) -> dict:
+    """Hammer the engine from reader and writer threads and count operations."""
+    init_db(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        repo = RecipeRepository(db)
+        for n in range(200):
+            repo.create(_recipe(n))
+
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def reader():
+        done = 0
+        while time.perf_counter() < stop:
+            with Session() as db:
+                db.connection().exec_driver_sql(
+                    "SELECT id, title FROM recipes ORDER BY created_at DESC LIMIT 50"
+                ).fetchall()
+            done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer(offset: int):
+        done = locked = 0
+        n = offset * 1_000_000
+        while time.perf_counter() < stop:
+            try:
+                with Session() as db:
+                    RecipeRepository(db).create(_recipe(n))
+                done += 1
+            except OperationalError:
+                locked += 1
+            n += 1
+        with lock:
+            counts["writes"] += done
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    counts["reads_per_s"] = counts["reads"] / seconds
+    counts["writes_per_s"] = counts["writes"] / seconds
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_url = f"sqlite:///{Path(tmp) / 'baseline.db'}"
+        tuned_url = f"sqlite:///{Path(tmp) / 'tuned.db'}"
+
+        # What connection.py used to do: library defaults, no PRAGMAs
+        baseline = create_engine(baseline_url, connect_args={"check_same_thread": False})
+        tuned = create_db_engine(tuned_url, config=Settings(db_pool_size=args.readers + args.writers))
+
+        results = {
+            "baseline": run(baseline, args.readers, args.writers, args.seconds),
+            "tuned": run(tuned, args.readers, args.writers, args.seconds),
+        }
+
+    print(f"{'config':<10}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['reads_per_s']:>12.0f}{r['writes_per_s']:>12.0f}{r['locked']:>10}")
+
+    base, tuned_r = results["baseline"], results["tuned"]
+    if base["reads_per_s"] and base["writes_per_s"]:
+        print(
+            f"\nspeedup: reads x{tuned_r['reads_per_s'] / base['reads_per_s']:.1f}, "
+            f"writes x{tuned_r['writes_per_s'] / base['writes_per_s']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cold-start import time of the app modules, with a regression budget.
+
+Run from the project root:
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 8] [--check]
+
+Each target is imported in a fresh interpreter under ``python -X importtime``
+and the median cumulative import time is compared with its budget. The
+modules in DEFERRED must not be imported by any target at all: they are
+loaded on first use (PEP 562 ``__getattr__`` in the package ``__init__``s
+and function-level imports), and pulling one back into the import graph is
+a regression however fast the machine is. With ``--check`` the script exits
+with status 1 when a budget is exceeded, so it can run in CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Target module -> budget for its cumulative import time in milliseconds
+TARGETS = {
+    "chefwise.config": 300,
+    "chefwise.models": 300,
+    "chefwise.database": 20,
+    "chefwise.app.cache": 1000,
+}
+
+# Heavy dependencies no target may import eagerly
+DEFERRED = ("openai", "httpx", "numpy", "sqlalchemy.ext.asyncio", "aiosqlite")
+
+
+def import_times(module: str, env: dict) -> dict[str, tuple[int, int]]:
+    """Import a module in a new interpreter; return {module: (self us, cumulative us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per target (0 for none)")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget is exceeded")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(tmp) / 'startup.db'}")
+        print(f"median of {args.runs} cold imports")
+        print(f"{'module':<22}{'ms':>9}{'budget':>9}  status")
+        for module, budget in TARGETS.items():
+            runs = [import_times(module, env) for _ in range(args.runs)]
+            median = statistics.median(run[module][1] for run in runs) / 1000
+            eager = sorted({name for run in runs for name in run if name in DEFERRED})
+
+            status = "ok"
+            if median > budget:
+                status = "over budget"
+            if eager:
+                status = f"imports {', '.join(eager)}"
+            if status != "ok":
+                failures.append(module)
+            print(f"{module:<22}{median:>9.1f}{budget:>9}  {status}")
+
+            if args.top:
+                slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+                for name, (own, _cumulative) in slowest:
+                    print(f"    {own / 1000:>7.1f} ms  {name}")
+
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Write throughput with many concurrent writers: direct commits vs the write queue.
+
+Run from the project root:
+
+    python benchmarks/bench_write_queue.py [--writers 32] [--readers 4] [--seconds 5]
+
+Each mode gets a fresh database file. Writer threads save recipes in a
+loop: in "direct" mode each write is its own session and transaction, and
+in "queue" mode each one is submitted to a shared ``WriteQueue`` and
+awaited. Reader threads list recent recipes the whole time, to show that
+reads keep up while the writer holds its batches.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config.settings import Settings
+from chefwise.database import RecipeRepository, WriteQueue, create_db_engine, init_db
+from chefwise.models import Ingredient, RecipeCreate
+
+
+def _recipe(n: int) -> RecipeCreate:
+    return RecipeCreate(
+        title=f"Benchmark Stew {n}",
+        description="A hearty stew",
+        ingredients=[Ingredient(name=f"ingredient {i}", quantity=i, unit="g") for i in range(8)],
+        instructions=[f"Step {i}" for i in range(6)],
+        prep_time_minutes=10,
+        cook_time_minutes=40,
+    )
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def run(url: str, mode: str, writers: int, readers: int, seconds: float) -> dict:
+    """Run writer and reader threads for ``seconds`` and collect throughput and latency."""
+    engine = create_db_engine(url, config=Settings(db_pool_size=writers + readers + 2))
+    init_db(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    queue = WriteQueue(engine) if mode == "queue" else None
+
+    latencies: list[float] = []
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def write(recipe: RecipeCreate) -> None:
+        if queue is not None:
+            queue.write(lambda db: RecipeRepository(db).create(recipe))
+        else:
+            with Session() as db:
+                RecipeRepository(db).create(recipe)
+
+    def writer(offset: int):
+        done = errors = 0
+        mine = []
+        n = offset * 1_000_000
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                write(_recipe(n))
+                done += 1
+                mine.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+            n += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+            latencies.extend(mine)
+
+    def reader():
+        done = 0
+        while time.perf_counter() < stop:
+            with Session() as db:
+                db.connection().exec_driver_sql(
+                    "SELECT id, title FROM recipes ORDER BY created_at DESC LIMIT 50"
+                ).fetchall()
+            done += 1
+        with lock:
+            counts["reads"] += done
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if queue is not None:
+        queue.close()
+        counts["mean_batch"] = queue.stats()["mean_batch"]
+    engine.dispose()
+
+    counts["writes_per_s"] = counts["writes"] / seconds
+    counts["reads_per_s"] = counts["reads"] / seconds
+    counts["p50_ms"] = _percentile(latencies, 0.50) * 1000
+    counts["p99_ms"] = _percentile(latencies, 0.99) * 1000
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("direct", "queue"):
+            url = f"sqlite:///{Path(tmp) / f'{mode}.db'}"
+            results[mode] = run(url, mode, args.writers, args.readers, args.seconds)
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s\n")
+    print(f"{'mode':<8}{'writes/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'reads/s':>10}{'batch':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<8}{r['writes_per_s']:>10.0f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+            f"{r['errors']:>8}{r['reads_per_s']:>10.0f}{r.get('mean_batch', 1):>8.1f}"
+        )
+
+    direct, queued = results["direct"], results["queue"]
+    if direct["writes_per_s"]:
+        print(f"\nwrite throughput x{queued['writes_per_s'] / direct['writes_per_s']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
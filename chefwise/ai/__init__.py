@@ -1,11 +1,36 @@
-"""AI module for ChefWise."""
+"""AI module for ChefWise.
 
-from .openai_client import OpenAIClient
-from .services import RecipeSuggestionService, MealPlanService, RecipeModificationService
+The services are loaded on first access (PEP 562): the ``openai`` SDK and
+its HTTP stack take longer to import than the rest of the app, and most
+page views never call the model.
+"""
 
-__all__ = [
-    "OpenAIClient",
-    "RecipeSuggestionService",
-    "MealPlanService",
-    "RecipeModificationService",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .openai_client import OpenAIClient
+    from .services import RecipeSuggestionService, MealPlanService, RecipeModificationService
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "OpenAIClient": "openai_client",
+    "RecipeSuggestionService": "services",
+    "MealPlanService": "services",
+    "RecipeModificationService": "services",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,10 @@
 """OpenAI API client wrapper."""
 
-import json
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from chefwise import codec
 from chefwise.config import settings
 
 
@@ -17,6 +17,7 @@ class OpenAIClient:
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY in .env file.")
         self.client = OpenAI(api_key=self.api_key)
+        self._async_client: Optional[AsyncOpenAI] = None
         self.default_model = settings.openai_model
         self.complex_model = settings.openai_model_complex
 
@@ -64,9 +65,49 @@ class OpenAIClient:
         content = response.choices[0].message.content
 
         if json_mode:
-            return json.loads(content)
+            return codec.loads(content)
         return {"content": content}
 
+    async def stream_chat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        json_mode: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding the response text as it is generated.
+
+        Takes the same arguments as ``chat_completion``. Closing the iterator
+        (or cancelling the task consuming it) closes the HTTP response, which
+        stops the generation upstream.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+
+        kwargs = {
+            "model": model or self.default_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        stream = await self._async_client.chat.completions.create(**kwargs)
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
     def chat_completion_complex(
         self,
         system_prompt: str,
@@ -1,18 +1,20 @@
 """AI-powered services for recipe suggestion, meal planning, and modification."""
 
 from datetime import date, timedelta
-from typing import Optional
+from typing import AsyncIterator, Optional, Union
 
 from chefwise.models import (
     RecipeSuggestion,
     Ingredient,
     MealPlanCreate,
+    MealPlanDay,
     MealSlot,
     MealType,
     UserPreferences,
     ShoppingListItem,
 )
 from .openai_client import OpenAIClient
+from .streaming import ArrayItemParser
 from .prompts import (
     RECIPE_SUGGESTION_SYSTEM,
     RECIPE_SUGGESTION_USER,
@@ -51,8 +53,47 @@ class RecipeSuggestionService:
         Returns:
             List of RecipeSuggestion objects
         """
+        response = self.client.chat_completion(
+            system_prompt=RECIPE_SUGGESTION_SYSTEM,
+            user_prompt=self._prompt(ingredients, num_recipes, dietary_restrictions, max_cook_time, preferences),
+        )
+        return [self._parse_recipe(recipe_data) for recipe_data in response.get("recipes", [])]
+
+    async def stream_recipes(
+        self,
+        ingredients: list[str],
+        num_recipes: int = 3,
+        dietary_restrictions: Optional[list[str]] = None,
+        max_cook_time: Optional[int] = None,
+        preferences: Optional[UserPreferences] = None,
+    ) -> AsyncIterator[RecipeSuggestion]:
+        """
+        Like ``suggest_recipes``, but yield each recipe as soon as the model has finished writing it.
+
+        Closing the iterator stops the generation upstream.
+        """
+        parser = ArrayItemParser(["recipes"])
+        chunks = self.client.stream_chat_completion(
+            system_prompt=RECIPE_SUGGESTION_SYSTEM,
+            user_prompt=self._prompt(ingredients, num_recipes, dietary_restrictions, max_cook_time, preferences),
+        )
+        try:
+            async for chunk in chunks:
+                for _key, recipe_data in parser.feed(chunk):
+                    yield self._parse_recipe(recipe_data)
+        finally:
+            await chunks.aclose()
+
+    def _prompt(
+        self,
+        ingredients: list[str],
+        num_recipes: int,
+        dietary_restrictions: Optional[list[str]],
+        max_cook_time: Optional[int],
+        preferences: Optional[UserPreferences],
+    ) -> str:
         # Build restriction text
-        restrictions = dietary_restrictions or []
+        restrictions = list(dietary_restrictions or [])
         if preferences:
             restrictions.extend(preferences.dietary_restrictions)
             restrictions.extend([f"allergic to {a}" for a in preferences.allergies])
@@ -72,48 +113,38 @@ class RecipeSuggestionService:
             if preferences.prefer_quick_meals:
                 preferences_text += "Prefer quick and easy meals\n"
 
-        user_prompt = RECIPE_SUGGESTION_USER.format(
+        return RECIPE_SUGGESTION_USER.format(
             num_recipes=num_recipes,
             ingredients=", ".join(ingredients),
             restrictions_text=restrictions_text,
             preferences_text=preferences_text,
         )
 
-        response = self.client.chat_completion(
-            system_prompt=RECIPE_SUGGESTION_SYSTEM,
-            user_prompt=user_prompt,
-        )
-
-        # Parse response into RecipeSuggestion objects
-        recipes = []
-        for recipe_data in response.get("recipes", []):
-            ingredients_list = [
-                Ingredient(
-                    name=ing.get("name", ""),
-                    quantity=float(ing.get("quantity", 1)),
-                    unit=ing.get("unit", ""),
-                    notes=ing.get("notes"),
-                )
-                for ing in recipe_data.get("ingredients", [])
-            ]
-
-            recipe = RecipeSuggestion(
-                title=recipe_data.get("title", "Untitled Recipe"),
-                description=recipe_data.get("description", ""),
-                ingredients=ingredients_list,
-                instructions=recipe_data.get("instructions", []),
-                prep_time_minutes=recipe_data.get("prep_time_minutes"),
-                cook_time_minutes=recipe_data.get("cook_time_minutes"),
-                servings=recipe_data.get("servings", 4),
-                dietary_tags=recipe_data.get("dietary_tags", []),
-                cuisine=recipe_data.get("cuisine"),
-                difficulty=recipe_data.get("difficulty"),
-                tips=recipe_data.get("tips"),
-                why_this_recipe=recipe_data.get("why_this_recipe"),
+    def _parse_recipe(self, recipe_data: dict) -> RecipeSuggestion:
+        ingredients_list = [
+            Ingredient(
+                name=ing.get("name", ""),
+                quantity=float(ing.get("quantity", 1)),
+                unit=ing.get("unit", ""),
+                notes=ing.get("notes"),
             )
-            recipes.append(recipe)
+            for ing in recipe_data.get("ingredients", [])
+        ]
 
-        return recipes
+        return RecipeSuggestion(
+            title=recipe_data.get("title", "Untitled Recipe"),
+            description=recipe_data.get("description", ""),
+            ingredients=ingredients_list,
+            instructions=recipe_data.get("instructions", []),
+            prep_time_minutes=recipe_data.get("prep_time_minutes"),
+            cook_time_minutes=recipe_data.get("cook_time_minutes"),
+            servings=recipe_data.get("servings", 4),
+            dietary_tags=recipe_data.get("dietary_tags", []),
+            cuisine=recipe_data.get("cuisine"),
+            difficulty=recipe_data.get("difficulty"),
+            tips=recipe_data.get("tips"),
+            why_this_recipe=recipe_data.get("why_this_recipe"),
+        )
 
 
 class MealPlanService:
@@ -144,6 +175,59 @@ class MealPlanService:
             Tuple of (MealPlanCreate, shopping_list)
         """
         start_date = start_date or date.today()
+        response = self.client.chat_completion(
+            system_prompt=MEAL_PLAN_SYSTEM,
+            user_prompt=self._prompt(num_days, start_date, meal_types, preferences, favorite_cuisines),
+        )
+        return self._parse_plan(response, num_days, start_date)
+
+    async def stream_meal_plan(
+        self,
+        num_days: int = 7,
+        start_date: Optional[date] = None,
+        meal_types: Optional[list[MealType]] = None,
+        preferences: Optional[UserPreferences] = None,
+        favorite_cuisines: Optional[list[str]] = None,
+    ) -> AsyncIterator[Union[MealPlanDay, tuple[MealPlanCreate, list[ShoppingListItem]]]]:
+        """
+        Like ``generate_meal_plan``, but yield each day's meals as soon as the model moves past that day.
+
+        Yields ``MealPlanDay`` objects while the meals arrive, then the
+        complete ``(MealPlanCreate, shopping_list)`` tuple as the last item;
+        the complete plan is authoritative if the model revisits a day.
+        Closing the iterator stops the generation upstream.
+        """
+        start_date = start_date or date.today()
+        parser = ArrayItemParser(["meals"])
+        day: Optional[MealPlanDay] = None
+        chunks = self.client.stream_chat_completion(
+            system_prompt=MEAL_PLAN_SYSTEM,
+            user_prompt=self._prompt(num_days, start_date, meal_types, preferences, favorite_cuisines),
+        )
+        try:
+            async for chunk in chunks:
+                for _key, meal_data in parser.feed(chunk):
+                    meal = self._parse_meal(meal_data, start_date)
+                    if day is not None and day.date != meal.date:
+                        yield day
+                        day = None
+                    if day is None:
+                        day = MealPlanDay(date=meal.date)
+                    day.meals.append(meal)
+        finally:
+            await chunks.aclose()
+        if day is not None:
+            yield day
+        yield self._parse_plan(parser.result(), num_days, start_date)
+
+    def _prompt(
+        self,
+        num_days: int,
+        start_date: date,
+        meal_types: Optional[list[MealType]],
+        preferences: Optional[UserPreferences],
+        favorite_cuisines: Optional[list[str]],
+    ) -> str:
         meal_types = meal_types or [MealType.BREAKFAST, MealType.LUNCH, MealType.DINNER]
 
         # Build restrictions text
@@ -172,7 +256,7 @@ class MealPlanService:
         if cuisines:
             cuisine_text = f"Preferred cuisines: {', '.join(cuisines)}"
 
-        user_prompt = MEAL_PLAN_USER.format(
+        return MEAL_PLAN_USER.format(
             num_days=num_days,
             start_date=start_date.isoformat(),
             meal_types=", ".join(mt.value for mt in meal_types),
@@ -181,21 +265,19 @@ class MealPlanService:
             cuisine_text=cuisine_text,
         )
 
-        response = self.client.chat_completion(
-            system_prompt=MEAL_PLAN_SYSTEM,
-            user_prompt=user_prompt,
+    def _parse_meal(self, meal_data: dict, start_date: date) -> MealSlot:
+        return MealSlot(
+            date=date.fromisoformat(meal_data.get("date", start_date.isoformat())),
+            meal_type=meal_data.get("meal_type", "dinner"),
+            recipe_title=meal_data.get("recipe_title", "Untitled"),
+            notes=meal_data.get("notes"),
         )
 
+    def _parse_plan(
+        self, response: dict, num_days: int, start_date: date
+    ) -> tuple[MealPlanCreate, list[ShoppingListItem]]:
         # Parse meals
-        meals = []
-        for meal_data in response.get("meals", []):
-            meal = MealSlot(
-                date=date.fromisoformat(meal_data.get("date", start_date.isoformat())),
-                meal_type=meal_data.get("meal_type", "dinner"),
-                recipe_title=meal_data.get("recipe_title", "Untitled"),
-                notes=meal_data.get("notes"),
-            )
-            meals.append(meal)
+        meals = [self._parse_meal(meal_data, start_date) for meal_data in response.get("meals", [])]
 
         # Create meal plan
         end_date = start_date + timedelta(days=num_days - 1)
@@ -0,0 +1,92 @@
+"""Incremental parsing of streamed JSON completions.
+
+The model answers with one JSON object such as ``{"recipes": [{...}, ...]}``
+or ``{"plan_name": ..., "meals": [{...}, ...], "shopping_list": [...]}``,
+delivered a few characters at a time. ``ArrayItemParser`` watches the
+text as it arrives and hands back each element of the chosen top-level
+arrays as soon as its closing brace is seen, so a recipe can be shown
+while the next one is still being generated. The complete document is
+still available at the end for the remaining fields.
+"""
+
+from typing import Any, Iterable
+
+from chefwise import codec
+
+
+class ArrayItemParser:
+    """
+    Emit the object elements of top-level arrays from a streamed JSON object.
+
+    Args:
+        keys: Names of the top-level arrays whose elements are wanted
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = frozenset(keys)
+        self._text: list[str] = []
+        self._length = 0
+        # Scanner state
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key = None  # Span of the last string seen directly inside the top-level object
+        self._array_key = None  # Key of the top-level array being scanned
+        self._item_start = None  # Offset where the current wanted element starts
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume a chunk of text; return ``(array key, element)`` for each element completed by it."""
+        offset = self._length
+        self._text.append(chunk)
+        self._length += len(chunk)
+        completed = []
+        for i, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._stack == ["{"]:
+                        self._last_key = (self._string_start + 1, i)
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                if char == "[" and self._stack == ["{"]:
+                    self._array_key = self._key()
+                elif char == "{" and self._stack == ["{", "["] and self._array_key in self.keys:
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._item_start is not None and self._stack == ["{", "["]:
+                    completed.append((self._array_key, self._item_start, i + 1))
+                    self._item_start = None
+                elif char == "]" and self._stack == ["{"]:
+                    self._array_key = None
+        if not completed:
+            return []
+        text = self.text
+        return [(key, codec.loads(text[start:end])) for key, start, end in completed]
+
+    def _key(self):
+        if self._last_key is None:
+            return None
+        start, end = self._last_key
+        return self.text[start:end]
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._text) > 1:
+            self._text = ["".join(self._text)]
+        return self._text[0] if self._text else ""
+
+    def result(self) -> dict[str, Any]:
+        """Decode the complete document (call after the last chunk)."""
+        return codec.loads(self.text)
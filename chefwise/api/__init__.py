@@ -1 +1,21 @@
-"""FastAPI API module (optional API layer)."""
+"""FastAPI API module (optional API layer).
+
+An HTTP interface to the same database and AI services as the Streamlit
+app, for non-browser clients:
+
+- ``/recipes``, ``/meal-plans``, ``/preferences``: CRUD on the repositories
+- ``/ai/suggest``, ``/ai/meal-plan``, ``/ai/modify``, ``/ai/substitute``
+- ``/ai/suggest/stream``, ``/ai/meal-plan/stream``: the same generations as
+  server-sent events, resumable through ``/ai/streams/{id}`` (see ``streaming``)
+
+AI calls pass an admission scheduler (``admission``): priority classes,
+per-user fair share and a bounded pool, with 429 when the queue is full.
+
+Reads carry an ETag and answer ``If-None-Match`` with 304; bodies are
+encoded with orjson (via ``chefwise.codec``) and gzip-compressed.
+"""
+
+from .app import create_app
+from .dependencies import AIServices
+
+__all__ = ["AIServices", "create_app"]
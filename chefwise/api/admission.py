@@ -0,0 +1,330 @@
+"""Admission control for AI calls.
+
+Every AI endpoint asks the process-wide ``AdmissionScheduler`` for a slot
+before it calls the model, so that a burst of long meal-plan generations
+cannot make a substitution wait behind them, and overload is answered at
+once instead of with timeouts:
+
+* at most ``ai_max_concurrent`` calls run at once; ``ai_reserved_interactive``
+  of those slots are kept for interactive calls;
+* waiting calls are started by priority class (``Priority``), and within a
+  class round-robin over users, so one user's batch does not hold everyone
+  else up. The user is the client address; ``X-User-ID`` is only believed
+  from the ``ai_trusted_proxies`` that set it, since any other client could
+  rotate it to get a fresh share;
+* a call that would have to wait while ``ai_queue_max`` calls (or
+  ``ai_queue_max_per_user`` of the user's own) are already waiting is
+  rejected with 429 and a ``Retry-After``;
+* every call has a deadline (``ai_deadline_seconds``, or a shorter
+  ``X-Request-Timeout`` from the client). A call is dropped with 504 when
+  its deadline passes in the queue, or when it is about to start but the
+  recent run time of its class says it cannot finish in time.
+
+Queue wait per class is kept for ``/ai/scheduler`` (``stats()``).
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+
+# Waits kept per class for the queue-wait percentiles
+WAIT_SAMPLES = 1000
+# Weight of the latest run in the run-time estimate of a class
+ESTIMATE_WEIGHT = 0.2
+
+
+class Priority(IntEnum):
+    """Scheduling class of an AI call; lower values start first."""
+
+    INTERACTIVE = 0  # Substitutions, modifications, small suggestion sets
+    STANDARD = 1
+    BULK = 2  # Multi-day meal plans
+
+
+def suggestion_priority(num_recipes: int) -> Priority:
+    """Class of a recipe suggestion call."""
+    return Priority.INTERACTIVE if num_recipes <= 3 else Priority.STANDARD
+
+
+def meal_plan_priority(num_days: int) -> Priority:
+    """Class of a meal plan generation."""
+    return Priority.STANDARD if num_days <= 3 else Priority.BULK
+
+
+class Busy(Exception):
+    """The queue is full; try again after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """The call cannot finish before its deadline."""
+
+
+class Ticket:
+    """
+    One admitted call: ``async with ticket`` waits for its slot and frees it.
+
+    Raises ``DeadlineExceeded`` on entry if the call was dropped.
+    """
+
+    def __init__(self, scheduler: "AdmissionScheduler", priority: Priority, user: str, deadline: Optional[float]):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.user = user
+        self.deadline = deadline
+        self.enqueued_at = scheduler.clock()
+        self.started_at: Optional[float] = None
+        self.wait: Optional[float] = None  # Seconds spent queued
+        self._granted = asyncio.get_running_loop().create_future()
+
+    async def __aenter__(self) -> "Ticket":
+        await self.scheduler._acquire(self)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.scheduler._release(self)
+
+    def close(self) -> None:
+        """Give the ticket back if it was never entered (or leave it be if it was exited)."""
+        self.scheduler._withdraw(self)
+
+
+class AdmissionScheduler:
+    """Priority, fair-share admission of AI calls into a bounded pool."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        reserved_interactive: int = 0,
+        max_queue: int = 32,
+        max_queue_per_user: Optional[int] = None,
+        default_timeout: Optional[float] = None,
+        trusted_proxies: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max_concurrent
+        self.reserved_interactive = reserved_interactive
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self.default_timeout = default_timeout  # Deadline of calls whose client sets none
+        self.trusted_proxies = frozenset(trusted_proxies)  # Clients whose X-User-ID is believed
+        self.clock = clock
+        self.running = 0
+        # Waiting tickets: per class, per user (in round-robin order), in arrival order
+        self._queues: dict[Priority, OrderedDict[str, deque[Ticket]]] = {p: OrderedDict() for p in Priority}
+        self._queued = 0
+        self._queued_by_user: dict[str, int] = {}
+        self._estimates: dict[Priority, float] = {}
+        self._waits: dict[Priority, deque[float]] = {p: deque(maxlen=WAIT_SAMPLES) for p in Priority}
+        self._counts = {"admitted": 0, "rejected": 0, "dropped": 0, "completed": 0}
+
+    @classmethod
+    def from_settings(cls, config: Optional[Settings] = None) -> "AdmissionScheduler":
+        config = config or settings
+        return cls(
+            max_concurrent=config.ai_max_concurrent,
+            reserved_interactive=config.ai_reserved_interactive,
+            max_queue=config.ai_queue_max,
+            max_queue_per_user=config.ai_queue_max_per_user,
+            default_timeout=config.ai_deadline_seconds or None,
+            trusted_proxies=(address.strip() for address in config.ai_trusted_proxies.split(",") if address.strip()),
+        )
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def submit(self, priority: Priority, user: str, timeout: Optional[float] = None) -> Ticket:
+        """
+        Admit a call into the queue (must be called on the event loop).
+
+        Args:
+            priority: Scheduling class
+            user: Who the call is for (fair share is per user)
+            timeout: Seconds the call may take from now, queueing included (None for no deadline)
+
+        Returns:
+            The ticket to enter around the call
+
+        Raises:
+            Busy: If the queue (or the user's share of it) is full and no slot is free
+            DeadlineExceeded: If the call would not finish in time even if started now
+        """
+        now = self.clock()
+        deadline = now + timeout if timeout is not None else None
+        if deadline is not None and now + self._estimates.get(priority, 0.0) > deadline:
+            self._counts["dropped"] += 1
+            raise DeadlineExceeded("Deadline too short for this request")
+        # A call that can start now has nothing of its class or above ahead of it
+        if not self._can_start(priority):
+            if self._queued >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise Busy("AI service busy, too many queued requests", self._retry_after(priority))
+            if self.max_queue_per_user is not None and self._queued_by_user.get(user, 0) >= self.max_queue_per_user:
+                self._counts["rejected"] += 1
+                raise Busy("Too many queued AI requests for this user", self._retry_after(priority))
+
+        ticket = Ticket(self, priority, user, deadline)
+        self._queues[priority].setdefault(user, deque()).append(ticket)
+        self._queued += 1
+        self._queued_by_user[user] = self._queued_by_user.get(user, 0) + 1
+        self._counts["admitted"] += 1
+        self._dispatch()
+        return ticket
+
+    def _retry_after(self, priority: Priority) -> int:
+        return max(1, math.ceil(self._estimates.get(priority, 1.0)))
+
+    def _can_start(self, priority: Priority) -> bool:
+        free = self.max_concurrent - self.running
+        return free > (0 if priority is Priority.INTERACTIVE else self.reserved_interactive)
+
+    def _dispatch(self) -> None:
+        """Start waiting tickets while slots are free."""
+        for priority in Priority:
+            users = self._queues[priority]
+            while users and self._can_start(priority):
+                user, tickets = next(iter(users.items()))
+                ticket = tickets.popleft()
+                # Served users go to the back of the round
+                if tickets:
+                    users.move_to_end(user)
+                else:
+                    del users[user]
+                self._dequeued(ticket)
+
+                now = self.clock()
+                if ticket.deadline is not None and now + self._estimates.get(priority, 0.0) > ticket.deadline:
+                    self._counts["dropped"] += 1
+                    ticket._granted.set_exception(DeadlineExceeded("Request cannot finish before its deadline"))
+                    continue
+                self.running += 1
+                ticket.started_at = now
+                ticket.wait = now - ticket.enqueued_at
+                self._waits[priority].append(ticket.wait)
+                ticket._granted.set_result(None)
+
+    def _dequeued(self, ticket: Ticket) -> None:
+        self._queued -= 1
+        left = self._queued_by_user[ticket.user] - 1
+        if left:
+            self._queued_by_user[ticket.user] = left
+        else:
+            del self._queued_by_user[ticket.user]
+
+    async def _acquire(self, ticket: Ticket) -> None:
+        timeout = None if ticket.deadline is None else max(ticket.deadline - self.clock(), 0.0)
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket._granted), timeout)
+        except asyncio.TimeoutError:
+            self._withdraw(ticket)
+            self._counts["dropped"] += 1
+            raise DeadlineExceeded("Request deadline passed while queued")
+        except asyncio.CancelledError:
+            self._withdraw(ticket)
+            raise
+
+    def _withdraw(self, ticket: Ticket) -> None:
+        """Take back a ticket whose caller gave up waiting."""
+        if ticket._granted.done():
+            # Started (or dropped) just as the caller stopped waiting
+            if ticket.started_at is not None:
+                self._release(ticket)
+            return
+        ticket._granted.cancel()
+        tickets = self._queues[ticket.priority].get(ticket.user)
+        if tickets is not None and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._queues[ticket.priority][ticket.user]
+            self._dequeued(ticket)
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.started_at is None:
+            return
+        duration = self.clock() - ticket.started_at
+        ticket.started_at = None
+        self.running -= 1
+        self._counts["completed"] += 1
+        previous = self._estimates.get(ticket.priority)
+        self._estimates[ticket.priority] = (
+            duration if previous is None else previous + ESTIMATE_WEIGHT * (duration - previous)
+        )
+        self._dispatch()
+
+    def stats(self) -> dict[str, Any]:
+        """Counters, queue depth, queue-wait percentiles and run-time estimates per class."""
+        classes = {}
+        for priority in Priority:
+            waits = sorted(self._waits[priority])
+            classes[priority.name.lower()] = {
+                "queued": sum(len(t) for t in self._queues[priority].values()),
+                "wait_ms": {
+                    "count": len(waits),
+                    "p50": _percentile(waits, 0.50) * 1000,
+                    "p95": _percentile(waits, 0.95) * 1000,
+                    "max": (waits[-1] if waits else 0.0) * 1000,
+                },
+                "estimated_run_ms": self._estimates.get(priority, 0.0) * 1000,
+            }
+        return {
+            "running": self.running,
+            "queued": self._queued,
+            "max_concurrent": self.max_concurrent,
+            **self._counts,
+            "classes": classes,
+        }
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def client_identity(connection: HTTPConnection, trusted_proxies: Iterable[str] = ()) -> str:
+    """The user a request is for: ``X-User-ID`` from a trusted proxy, else the client address."""
+    host = connection.client.host if connection.client else None
+    if host is not None and host in trusted_proxies:
+        user = connection.headers.get("x-user-id")
+        if user:
+            return f"user:{user}"
+    return host or "anonymous"
+
+
+def admit(connection: HTTPConnection, priority: Priority) -> Ticket:
+    """
+    Admit an AI call for a request into the app's scheduler.
+
+    Raises:
+        HTTPException: 429 (with ``Retry-After``) if busy, 504 if the deadline
+            cannot be met, 400 for a malformed ``X-Request-Timeout``
+    """
+    scheduler: AdmissionScheduler = connection.app.state.scheduler
+    user = client_identity(connection, scheduler.trusted_proxies)
+    timeout = scheduler.default_timeout
+    requested = connection.headers.get("x-request-timeout")
+    if requested is not None:
+        try:
+            requested_timeout = float(requested)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Request-Timeout must be a number of seconds")
+        timeout = requested_timeout if timeout is None else min(timeout, requested_timeout)
+    try:
+        return scheduler.submit(priority, user, timeout=timeout)
+    except Busy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
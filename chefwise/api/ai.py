@@ -0,0 +1,120 @@
+"""AI endpoints: suggestions, meal plans, modifications and substitutions.
+
+The services make blocking OpenAI calls, so each one runs in the worker
+thread pool and the event loop keeps serving other requests meanwhile.
+Calls are admitted by the ``AdmissionScheduler`` first (see ``admission``),
+which may answer 429 or 504 instead. With an ``Idempotency-Key`` a retried
+call gets the first call's response back (see ``idempotency``).
+Results are returned, not saved; clients save what they keep through the
+CRUD endpoints.
+"""
+
+from typing import Any, Callable
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chefwise.models import RecipeSuggestion
+
+from .admission import (
+    DeadlineExceeded,
+    Priority,
+    Ticket,
+    admit,
+    meal_plan_priority,
+    suggestion_priority,
+)
+from .dependencies import (
+    ai_preferences,
+    get_db,
+    get_meal_plan_service,
+    get_modification_service,
+    get_suggestion_service,
+)
+from .idempotency import idempotent
+from .responses import JSONBytesResponse
+from .schemas import MealPlanRequest, MealPlanResult, ModifyRequest, SubstituteRequest, SuggestRequest
+
+router = APIRouter(prefix="/ai", tags=["ai"])
+
+
+async def _call(ticket: Ticket, function: Callable, **kwargs) -> Any:
+    """Run a blocking service call off the event loop once admitted; upstream failures become 502."""
+    try:
+        async with ticket:
+            return await run_in_threadpool(function, **kwargs)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"AI service error: {e}")
+
+
+@router.post("/suggest", response_model=list[RecipeSuggestion])
+async def suggest_recipes(
+    body: SuggestRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_suggestion_service),
+):
+    async def generate():
+        preferences = await ai_preferences(db, body.use_preferences)
+        suggestions = await _call(
+            admit(request, suggestion_priority(body.num_recipes)),
+            service.suggest_recipes,
+            ingredients=body.ingredients,
+            num_recipes=body.num_recipes,
+            dietary_restrictions=body.dietary_restrictions,
+            max_cook_time=body.max_cook_time,
+            preferences=preferences,
+        )
+        return JSONBytesResponse(suggestions)
+
+    return await idempotent(request, generate)
+
+
+@router.post("/meal-plan", response_model=MealPlanResult)
+async def generate_meal_plan(
+    body: MealPlanRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_meal_plan_service),
+):
+    async def generate():
+        preferences = await ai_preferences(db, body.use_preferences)
+        meal_plan, shopping_list = await _call(
+            admit(request, meal_plan_priority(body.num_days)),
+            service.generate_meal_plan,
+            num_days=body.num_days,
+            start_date=body.start_date,
+            meal_types=body.meal_types,
+            preferences=preferences,
+            favorite_cuisines=body.favorite_cuisines,
+        )
+        return JSONBytesResponse(MealPlanResult(meal_plan=meal_plan, shopping_list=shopping_list))
+
+    return await idempotent(request, generate)
+
+
+@router.post("/modify", response_model=RecipeSuggestion)
+async def modify_recipe(body: ModifyRequest, request: Request, service=Depends(get_modification_service)):
+    async def generate():
+        modified = await _call(admit(request, Priority.INTERACTIVE), service.modify_recipe, **dict(body))
+        return JSONBytesResponse(modified)
+
+    return await idempotent(request, generate)
+
+
+@router.post("/substitute", response_model=dict[str, Any])
+async def suggest_substitution(body: SubstituteRequest, request: Request, service=Depends(get_modification_service)):
+    async def generate():
+        substitution = await _call(admit(request, Priority.INTERACTIVE), service.suggest_substitution, **dict(body))
+        return JSONBytesResponse(substitution)
+
+    return await idempotent(request, generate)
+
+
+@router.get("/scheduler", response_model=dict[str, Any])
+async def scheduler_stats(request: Request):
+    """Admission counters, queue depth and queue-wait percentiles per priority class."""
+    return JSONBytesResponse(request.app.state.scheduler.stats())
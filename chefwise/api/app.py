@@ -0,0 +1,89 @@
+"""The FastAPI application.
+
+Run it with ``chefwise serve`` or any ASGI server::
+
+    uvicorn --factory chefwise.api:create_app
+"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+from chefwise.database import WriteQueue, async_init_db, create_async_db_engine, create_db_engine
+
+from . import ai, routes, streaming
+from .admission import AdmissionScheduler
+from .dependencies import AIServices
+from .idempotency import IdempotencyKeys
+from .responses import JSONBytesResponse, NotModified, not_modified_response
+from .streaming import StreamHub
+
+
+def create_app(
+    database_url: Optional[str] = None,
+    config: Optional[Settings] = None,
+    services: Optional[AIServices] = None,
+) -> FastAPI:
+    """
+    Build the API application.
+
+    Args:
+        database_url: Database to serve (defaults to the configured one)
+        config: Settings for the engine and middleware
+        services: AI services (defaults to ones built on the OpenAI client)
+
+    Returns:
+        The FastAPI app; its engine is created and migrated on startup
+    """
+    config = config or settings
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        engine = create_async_db_engine(database_url, config)
+        await async_init_db(engine)
+        app.state.sessionmaker = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+        if config.db_write_queue:
+            # Writes go to one thread group-committing them on a sync engine
+            app.state.writer = WriteQueue(create_db_engine(database_url, config), config)
+        try:
+            yield
+        finally:
+            await app.state.streams.close()
+            if app.state.writer is not None:
+                await run_in_threadpool(app.state.writer.close)
+                app.state.writer.bind.dispose()
+            await engine.dispose()
+
+    app = FastAPI(
+        title="ChefWise API",
+        description="Recipes, meal plans and AI cooking assistance",
+        version="0.1.0",
+        default_response_class=JSONBytesResponse,
+        lifespan=lifespan,
+    )
+    app.state.ai = services or AIServices()
+    app.state.streams = StreamHub(config)
+    app.state.scheduler = AdmissionScheduler.from_settings(config)
+    app.state.writer = None
+    app.state.idempotency = IdempotencyKeys(config)
+    app.add_middleware(GZipMiddleware, minimum_size=config.api_gzip_min_bytes, compresslevel=config.api_gzip_level)
+    app.add_exception_handler(NotModified, not_modified_response)
+
+    app.include_router(routes.recipes)
+    app.include_router(routes.meal_plans)
+    app.include_router(routes.preferences)
+    app.include_router(ai.router)
+    app.include_router(streaming.router)
+
+    @app.get("/health", include_in_schema=False)
+    async def health():
+        return JSONBytesResponse({"status": "ok"})
+
+    return app
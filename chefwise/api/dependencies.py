@@ -0,0 +1,128 @@
+"""Request dependencies: database sessions and the AI services."""
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+from starlette.requests import HTTPConnection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from chefwise.database import AsyncPreferencesRepository
+from chefwise.models import UserPreferences
+
+if TYPE_CHECKING:
+    from chefwise.ai import MealPlanService, RecipeModificationService, RecipeSuggestionService
+
+T = TypeVar("T")
+
+
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """An async session for one request."""
+    async with request.app.state.sessionmaker() as db:
+        yield db
+
+
+async def ai_preferences(db: AsyncSession, wanted: bool) -> Optional[UserPreferences]:
+    """The saved preferences for an AI call (None if not wanted), releasing the connection afterwards."""
+    if not wanted:
+        return None
+    preferences = await AsyncPreferencesRepository(db).get()
+    # Give the connection back to the pool before the long AI call
+    await db.close()
+    return preferences
+
+
+async def write(
+    request: Request,
+    db: AsyncSession,
+    mutation: Callable[[Session], T],
+    direct: Callable[[AsyncSession], Awaitable[T]],
+) -> T:
+    """
+    Run a write through the app's write queue when it has one, else directly.
+
+    Args:
+        request: The current request
+        db: The request's async session
+        mutation: The write with a sync repository, for the write queue
+        direct: The same write with an async repository
+
+    Returns:
+        The write's result, once committed
+    """
+    writer = request.app.state.writer
+    if writer is None:
+        return await direct(db)
+    await db.close()
+    return await asyncio.wrap_future(writer.submit(mutation))
+
+
+class AIServices:
+    """
+    The AI services shared by all requests, built on first use.
+
+    Services passed in are used as they are (tests pass fakes); the others
+    share one ``OpenAIClient`` created when the first AI endpoint is called,
+    so the API starts without an API key and only the AI endpoints fail.
+    """
+
+    def __init__(
+        self,
+        suggestions: Optional["RecipeSuggestionService"] = None,
+        meal_plans: Optional["MealPlanService"] = None,
+        modifications: Optional["RecipeModificationService"] = None,
+    ):
+        self._services = {"suggestions": suggestions, "meal_plans": meal_plans, "modifications": modifications}
+        self._lock = threading.Lock()
+        self._client = None
+
+    def _get(self, name: str, build: Callable):
+        with self._lock:
+            if self._services[name] is None:
+                from chefwise.ai import OpenAIClient
+
+                if self._client is None:
+                    self._client = OpenAIClient()
+                self._services[name] = build(self._client)
+            return self._services[name]
+
+    def suggestions(self) -> "RecipeSuggestionService":
+        from chefwise.ai import RecipeSuggestionService
+
+        return self._get("suggestions", RecipeSuggestionService)
+
+    def meal_plans(self) -> "MealPlanService":
+        from chefwise.ai import MealPlanService
+
+        return self._get("meal_plans", MealPlanService)
+
+    def modifications(self) -> "RecipeModificationService":
+        from chefwise.ai import RecipeModificationService
+
+        return self._get("modifications", RecipeModificationService)
+
+
+def ai_service(connection: HTTPConnection, name: str):
+    """One of the ``AIServices`` by method name (503 if AI is not configured)."""
+    try:
+        return getattr(connection.app.state.ai, name)()
+    except ValueError as e:
+        # Missing API key
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def get_suggestion_service(request: Request) -> "RecipeSuggestionService":
+    """The recipe suggestion service (503 if AI is not configured)."""
+    return ai_service(request, "suggestions")
+
+
+def get_meal_plan_service(request: Request) -> "MealPlanService":
+    """The meal plan service (503 if AI is not configured)."""
+    return ai_service(request, "meal_plans")
+
+
+def get_modification_service(request: Request) -> "RecipeModificationService":
+    """The recipe modification service (503 if AI is not configured)."""
+    return ai_service(request, "modifications")
@@ -0,0 +1,186 @@
+"""Idempotency keys for the create and generation endpoints.
+
+A client that may retry a POST (a flaky mobile connection, a timeout)
+sends an ``Idempotency-Key`` header, unique per logical request. The
+first request with a key runs normally and its response (status, body
+bytes and content headers) is stored in the ``idempotency_keys`` table
+for ``idempotency_ttl_hours``. A retry with the same key and body gets
+the stored bytes back with ``Idempotent-Replayed: true``, without calling
+the model or inserting another row. Keys are scoped to the method and
+path.
+
+* A retry that arrives while the first request is still running waits for
+  it (up to ``idempotency_wait_seconds``, then 409 with ``Retry-After``).
+  Waiters in the same process are woken as soon as the response is
+  stored; others poll the table.
+* The same key with a different body is rejected with 422.
+* Only responses the endpoint returns are stored. When it raises (502
+  from the model, 429 from admission control, ...) the key is released,
+  so the retry runs the request again.
+* A claim left behind by a worker that died is taken over after
+  ``idempotency_lock_seconds``.
+
+Streaming generations are keyed in memory instead (see ``streaming``): a
+retry re-attaches to the stream started under the key and replays its
+events.
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+from chefwise.database import AsyncIdempotencyRepository
+from chefwise.models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Response headers stored with the body and replayed
+STORED_HEADERS = ("content-type", "location")
+# How often a duplicate re-reads the record of a request running in another process
+POLL_SECONDS = 0.25
+# Expired records are deleted at most this often
+PURGE_INTERVAL_SECONDS = 3600.0
+
+
+class IdempotencyKeys:
+    """Idempotency settings and the keys this process is answering right now."""
+
+    def __init__(self, config: Optional[Settings] = None):
+        config = config or settings
+        self.ttl_seconds = config.idempotency_ttl_hours * 3600
+        self.wait_seconds = config.idempotency_wait_seconds
+        self.lock_seconds = config.idempotency_lock_seconds
+        self._in_flight: dict[tuple[str, str], asyncio.Event] = {}
+        self._purged_at: Optional[float] = None
+
+    async def wait(self, scope: str, key: str, timeout: float) -> None:
+        """Wait until the local request holding a key finishes, or ``timeout`` seconds."""
+        event = self._in_flight.get((scope, key))
+        if event is None:
+            await asyncio.sleep(min(timeout, POLL_SECONDS))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _start(self, scope: str, key: str) -> None:
+        self._in_flight[(scope, key)] = asyncio.Event()
+
+    def _finish(self, scope: str, key: str) -> None:
+        event = self._in_flight.pop((scope, key), None)
+        if event is not None:
+            event.set()
+
+    def _purge_due(self) -> bool:
+        now = time.monotonic()
+        if self._purged_at is not None and now - self._purged_at < PURGE_INTERVAL_SECONDS:
+            return False
+        self._purged_at = now
+        return True
+
+
+def idempotency_key(request: Request) -> Optional[str]:
+    """The request's ``Idempotency-Key`` (400 if it is empty or too long)."""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+    return key
+
+
+def replay(record: IdempotencyRecord) -> Response:
+    """The stored response of a record, byte for byte."""
+    return Response(
+        content=record.body,
+        status_code=record.status_code,
+        headers={**record.headers, REPLAYED_HEADER: "true"},
+    )
+
+
+async def idempotent(request: Request, produce: Callable[[], Awaitable[Response]]) -> Response:
+    """
+    Answer a request once per idempotency key.
+
+    Without an ``Idempotency-Key`` header this just awaits ``produce()``.
+
+    Args:
+        request: The current request
+        produce: Runs the endpoint's work and returns its response
+
+    Returns:
+        The new response, or the one stored for the key
+
+    Raises:
+        HTTPException: 422 if the key was used with a different body, 409 if
+            the first request with the key is still running after the wait
+    """
+    key = idempotency_key(request)
+    if key is None:
+        return await produce()
+
+    keys: IdempotencyKeys = request.app.state.idempotency
+    sessions = request.app.state.sessionmaker
+    scope = f"{request.method} {request.url.path}"
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+    give_up = time.monotonic() + keys.wait_seconds
+
+    while True:
+        async with sessions() as db:
+            repo = AsyncIdempotencyRepository(db)
+            if keys._purge_due():
+                await repo.delete_expired()
+            record, claimed = await repo.claim(scope, key, fingerprint, keys.ttl_seconds)
+            if not claimed and not record.completed:
+                stale_before = datetime.utcnow() - timedelta(seconds=keys.lock_seconds)
+                # Only a retry of the same request may take over; another body gets the 422 below
+                claimed = (
+                    record.fingerprint == fingerprint
+                    and record.created_at < stale_before
+                    and await repo.take_over(scope, key, fingerprint, stale_before)
+                )
+        if claimed:
+            break
+        if record.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used with a different request"
+            )
+        if record.completed:
+            return replay(record)
+        remaining = give_up - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=409,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        await keys.wait(scope, key, remaining)
+
+    keys._start(scope, key)
+    try:
+        try:
+            response = await produce()
+        except BaseException:
+            async with sessions() as db:
+                await AsyncIdempotencyRepository(db).release(scope, key)
+            raise
+        async with sessions() as db:
+            repo = AsyncIdempotencyRepository(db)
+            body = getattr(response, "body", None)
+            if body is None:
+                # Streamed bodies cannot be stored
+                await repo.release(scope, key)
+            else:
+                headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+                await repo.complete(scope, key, response.status_code, headers, bytes(body))
+        return response
+    finally:
+        keys._finish(scope, key)
@@ -0,0 +1,94 @@
+"""JSON responses and conditional GETs for the API.
+
+Responses are encoded with ``chefwise.codec`` (orjson when installed) and
+handlers return them directly, so FastAPI skips its own validation and
+``jsonable_encoder`` pass; ``response_model`` on the routes only documents
+the schema.
+
+Read endpoints are tagged with the data generation: the newest sequence
+number of the trigger-maintained change feed, which moves on every
+committed write to recipes, meal plans or preferences. It is read before
+the response data, so a write landing in between can only make the tag
+older than the body: that costs the client one extra download, never a
+stale 304. A request whose ``If-None-Match`` still names the current generation gets
+``304 Not Modified`` after that one primary-key lookup, without loading or
+encoding anything. ``If-None-Match: *`` only matches a representation that
+exists, so it is checked after the lookup (see ``tagged``): a missing item
+still gets its 404 and an empty collection its ``[]``. The tag is weak
+because the gzip middleware may change the bytes on the wire.
+"""
+
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chefwise import codec
+from chefwise.database import AsyncChangeFeedRepository
+
+
+class JSONBytesResponse(Response):
+    """``application/json`` response encoded with the configured JSON backend."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return codec.dumpb(content)
+
+
+class NotModified(Exception):
+    """Raised by ``check_etag`` when the client's copy is current."""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    """Headers of a tagged response; clients must revalidate before reusing it."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified_response(request: Request, exc: NotModified) -> Response:
+    """Exception handler turning ``NotModified`` into an empty 304."""
+    return Response(status_code=304, headers=etag_headers(exc.etag))
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    # "*" is left to ``tagged``, which knows whether there is a representation
+    if not if_none_match or if_none_match.strip() == "*":
+        return False
+    # Weak comparison: W/"7" and "7" name the same generation
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+async def check_etag(request: Request, db: AsyncSession) -> str:
+    """
+    Get the ETag of the current data generation.
+
+    Call it before reading the response data.
+
+    Raises:
+        NotModified: If the request's ``If-None-Match`` matches it
+    """
+    etag = f'W/"{await AsyncChangeFeedRepository(db).current_token()}"'
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag)
+    return etag
+
+
+def tagged(content: Any, etag: str, request: Optional[Request] = None) -> JSONBytesResponse:
+    """
+    A JSON response carrying an ETag.
+
+    Raises:
+        NotModified: If the request sent ``If-None-Match: *`` and there is
+            content (not None, not an empty collection)
+    """
+    if request is not None and request.headers.get("if-none-match", "").strip() == "*":
+        if content is not None and content != []:
+            raise NotModified(etag)
+    return JSONBytesResponse(content, headers=etag_headers(etag))
@@ -0,0 +1,180 @@
+"""CRUD endpoints for recipes, meal plans and preferences."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chefwise.database import (
+    AsyncMealPlanRepository,
+    AsyncPreferencesRepository,
+    AsyncRecipeRepository,
+    MealPlanRepository,
+    PreferencesRepository,
+    RecipeRepository,
+)
+from chefwise.models import MealPlan, MealPlanCreate, MealPlanWithRecipes, Recipe, RecipeCreate, UserPreferences
+
+from .dependencies import get_db, write
+from .idempotency import idempotent
+from .responses import JSONBytesResponse, check_etag, tagged
+
+recipes = APIRouter(prefix="/recipes", tags=["recipes"])
+meal_plans = APIRouter(prefix="/meal-plans", tags=["meal plans"])
+preferences = APIRouter(prefix="/preferences", tags=["preferences"])
+
+
+# Recipes (saved recipes are deduplicated by content, so they are created or deleted, never edited)
+
+
+@recipes.get("", response_model=list[Recipe])
+async def list_recipes(
+    request: Request,
+    q: Optional[str] = Query(default=None, description="Search titles and descriptions"),
+    limit: int = Query(default=50, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """One page of recipes, newest first."""
+    etag = await check_etag(request, db)
+    repo = AsyncRecipeRepository(db)
+    if q:
+        found = await repo.search(q, limit=limit, offset=offset)
+    else:
+        found = await repo.get_all(limit=limit, offset=offset)
+    return tagged(found, etag, request)
+
+
+@recipes.post("", response_model=Recipe, status_code=201)
+async def create_recipe(recipe: RecipeCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    """Save a recipe; an identical saved recipe is returned with 200 instead."""
+
+    async def save():
+        saved, created = await write(
+            request,
+            db,
+            lambda session: RecipeRepository(session).create_or_get(recipe),
+            lambda session: AsyncRecipeRepository(session).create_or_get(recipe),
+        )
+        return JSONBytesResponse(
+            saved, status_code=201 if created else 200, headers={"Location": f"/recipes/{saved.id}"}
+        )
+
+    return await idempotent(request, save)
+
+
+@recipes.get("/{recipe_id}", response_model=Recipe)
+async def get_recipe(recipe_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    etag = await check_etag(request, db)
+    recipe = await AsyncRecipeRepository(db).get(recipe_id)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return tagged(recipe, etag, request)
+
+
+@recipes.delete("/{recipe_id}", status_code=204)
+async def delete_recipe(recipe_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    deleted = await write(
+        request,
+        db,
+        lambda session: RecipeRepository(session).delete(recipe_id),
+        lambda session: AsyncRecipeRepository(session).delete(recipe_id),
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return Response(status_code=204)
+
+
+# Meal plans
+
+
+@meal_plans.get("", response_model=list[MealPlan])
+async def list_meal_plans(request: Request, db: AsyncSession = Depends(get_db)):
+    etag = await check_etag(request, db)
+    return tagged(await AsyncMealPlanRepository(db).get_all(), etag, request)
+
+
+@meal_plans.post("", response_model=MealPlan, status_code=201)
+async def create_meal_plan(meal_plan: MealPlanCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    async def save():
+        saved = await write(
+            request,
+            db,
+            lambda session: MealPlanRepository(session).create(meal_plan),
+            lambda session: AsyncMealPlanRepository(session).create(meal_plan),
+        )
+        return JSONBytesResponse(saved, status_code=201, headers={"Location": f"/meal-plans/{saved.id}"})
+
+    return await idempotent(request, save)
+
+
+@meal_plans.get("/{plan_id}", response_model=MealPlanWithRecipes)
+async def get_meal_plan(
+    plan_id: int,
+    request: Request,
+    with_recipes: bool = Query(default=False, description="Include the recipes the slots refer to"),
+    db: AsyncSession = Depends(get_db),
+):
+    etag = await check_etag(request, db)
+    repo = AsyncMealPlanRepository(db)
+    plan = await (repo.get_with_recipes(plan_id) if with_recipes else repo.get(plan_id))
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Meal plan not found")
+    return tagged(plan, etag, request)
+
+
+@meal_plans.put("/{plan_id}", response_model=MealPlan)
+async def update_meal_plan(
+    plan_id: int, meal_plan: MealPlanCreate, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Replace a plan's fields and meals.
+
+    Meals carrying the id of one of the plan's slots update that slot, meals
+    without an id are added and slots left out are removed; only the slots
+    that actually changed are written.
+    """
+    edited = MealPlan(id=plan_id, **dict(meal_plan))
+    try:
+        await write(
+            request,
+            db,
+            lambda session: MealPlanRepository(session).save(edited),
+            lambda session: AsyncMealPlanRepository(session).save(edited),
+        )
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Meal plan not found")
+    return JSONBytesResponse(await AsyncMealPlanRepository(db).get(plan_id))
+
+
+@meal_plans.delete("/{plan_id}", status_code=204)
+async def delete_meal_plan(plan_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    deleted = await write(
+        request,
+        db,
+        lambda session: MealPlanRepository(session).delete(plan_id),
+        lambda session: AsyncMealPlanRepository(session).delete(plan_id),
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Meal plan not found")
+    return Response(status_code=204)
+
+
+# Preferences (a single row, created with defaults on first read)
+
+
+@preferences.get("", response_model=UserPreferences)
+async def get_preferences(request: Request, db: AsyncSession = Depends(get_db)):
+    etag = await check_etag(request, db)
+    return tagged(await AsyncPreferencesRepository(db).get(), etag, request)
+
+
+@preferences.put("", response_model=UserPreferences)
+async def update_preferences(new_preferences: UserPreferences, request: Request, db: AsyncSession = Depends(get_db)):
+    saved = await write(
+        request,
+        db,
+        lambda session: PreferencesRepository(session).update(new_preferences),
+        lambda session: AsyncPreferencesRepository(session).update(new_preferences),
+    )
+    return JSONBytesResponse(saved)
@@ -0,0 +1,54 @@
+"""Request and response bodies specific to the API."""
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from chefwise.models import Ingredient, MealPlanCreate, MealType, ShoppingListItem
+
+
+class SuggestRequest(BaseModel):
+    """Recipe suggestions from available ingredients."""
+
+    ingredients: list[str] = Field(min_length=1)
+    num_recipes: int = Field(default=3, ge=1, le=5)
+    dietary_restrictions: list[str] = Field(default_factory=list)
+    max_cook_time: Optional[int] = Field(default=None, gt=0)
+    use_preferences: bool = True  # Apply the saved user preferences
+
+
+class MealPlanRequest(BaseModel):
+    """A generated meal plan."""
+
+    num_days: int = Field(default=7, ge=1, le=14)
+    start_date: Optional[date] = None
+    meal_types: Optional[list[MealType]] = None
+    favorite_cuisines: list[str] = Field(default_factory=list)
+    use_preferences: bool = True
+
+
+class MealPlanResult(BaseModel):
+    """A generated (unsaved) meal plan with its shopping list."""
+
+    meal_plan: MealPlanCreate
+    shopping_list: list[ShoppingListItem]
+
+
+class ModifyRequest(BaseModel):
+    """A recipe adapted to a requirement."""
+
+    title: str
+    ingredients: list[Ingredient]
+    instructions: list[str]
+    servings: int = Field(default=4, ge=1)
+    modification_type: str  # dietary, scaling, substitution, ...
+    modification_details: str
+
+
+class SubstituteRequest(BaseModel):
+    """Substitutes for one ingredient."""
+
+    ingredient: str
+    recipe_context: str
+    reason: str = "preference"
@@ -0,0 +1,417 @@
+"""Streaming AI generations over server-sent events (and WebSocket).
+
+``POST /ai/suggest/stream`` and ``POST /ai/meal-plan/stream`` start a
+generation and answer with ``text/event-stream``. Each recipe (``recipe``)
+or planned day (``day``) is sent as soon as it has been parsed from the
+model's token stream, followed by the complete plan (``plan``, meal plans
+only) and ``done``; failures end the stream with ``error``.
+
+Generations outlive the connection that started them, for a while:
+
+* every event has an id (its position in the stream). A client that lost
+  the connection re-attaches with ``GET /ai/streams/{stream_id}`` and a
+  ``Last-Event-ID`` header, as ``EventSource`` does by itself, and gets
+  the events it missed, then the live ones;
+* when the last client is gone, the upstream call is cancelled after
+  ``api_stream_resume_seconds``, which closes the OpenAI response and so
+  stops the generation (and its token billing);
+* finished streams can be replayed for ``api_stream_retention_seconds``.
+
+A POST with an ``Idempotency-Key`` that was already used for a stream of
+this process re-attaches to that stream (after ``Last-Event-ID``, if sent)
+instead of starting another generation.
+
+A comment line is sent every ``api_stream_heartbeat_seconds`` while no
+event is due, so proxies keep the connection open and a vanished client
+is noticed on the next write at the latest.
+
+``/ai/ws`` offers the same streams over a WebSocket: send
+``{"action": "suggest" | "meal_plan", "params": {...}}`` or
+``{"action": "resume", "stream_id": ..., "last_event_id": n}`` and receive
+``{"id", "event", "data"}`` messages.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from contextlib import aclosing, nullcontext
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chefwise import codec
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+from chefwise.models import MealPlanDay
+
+from .admission import Ticket, admit, meal_plan_priority, suggestion_priority
+from .dependencies import ai_preferences, ai_service, get_db, get_meal_plan_service, get_suggestion_service
+from .idempotency import IDEMPOTENCY_HEADER, idempotency_key
+from .schemas import MealPlanRequest, MealPlanResult, SuggestRequest
+
+router = APIRouter(prefix="/ai", tags=["ai streaming"])
+
+# (id, event name, JSON data)
+Event = tuple[int, str, bytes]
+
+
+class GenerationStream:
+    """
+    One running or finished generation and the events it has produced.
+
+    The producer task drains ``source`` into ``events`` while holding
+    ``ticket`` (its admission slot), if given; any number of listeners
+    replay them from a position and then follow the live tail.
+    """
+
+    def __init__(
+        self,
+        stream_id: str,
+        source: AsyncIterator[tuple[str, Any]],
+        resume_seconds: float,
+        fingerprint: Optional[str] = None,
+        ticket: Optional[Ticket] = None,
+    ):
+        self.id = stream_id
+        self.fingerprint = fingerprint  # Of the request that started it, when it has an idempotency key
+        self.events: list[Event] = []
+        self.finished = False
+        self.finished_at: Optional[float] = None
+        self.resume_seconds = resume_seconds
+        self._listeners = 0
+        self._changed = asyncio.Event()
+        self._abandon: Optional[asyncio.TimerHandle] = None
+        self._ticket = ticket
+        self._task = asyncio.create_task(self._produce(source))
+        self._task.add_done_callback(self._finish)
+
+    async def _produce(self, source: AsyncIterator[tuple[str, Any]]) -> None:
+        try:
+            async with self._ticket or nullcontext(), aclosing(source):
+                async for event, data in source:
+                    self._append(event, data)
+            self._append("done", {})
+        except asyncio.CancelledError:
+            self._append("error", {"detail": "Generation cancelled"})
+        except Exception as e:
+            self._append("error", {"detail": f"AI service error: {e}"})
+        finally:
+            self.finished = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _finish(self, task: asyncio.Task) -> None:
+        # A task cancelled before its first step never runs _produce, so neither
+        # the ticket nor the terminal event has been dealt with
+        if self._ticket is not None:
+            self._ticket.close()
+        if not self.finished:
+            self._append("error", {"detail": "Generation cancelled"})
+            self.finished = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _append(self, event: str, data: Any) -> None:
+        self.events.append((len(self.events) + 1, event, codec.dumpb(data)))
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake every listener waiting on the current event and start a new one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def listen(self, after: int = 0, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Event]]:
+        """
+        Yield the events after id ``after``, then new ones until the stream ends.
+
+        Yields ``None`` when ``heartbeat`` seconds pass without an event.
+        """
+        self._attach()
+        try:
+            position = max(after, 0)
+            while True:
+                while position < len(self.events):
+                    yield self.events[position]
+                    position += 1
+                if self.finished:
+                    return
+                try:
+                    await asyncio.wait_for(self._changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._detach()
+
+    def cancel(self) -> None:
+        """Stop the generation; the upstream response is closed."""
+        self._task.cancel()
+
+    def _attach(self) -> None:
+        self._listeners += 1
+        if self._abandon is not None:
+            self._abandon.cancel()
+            self._abandon = None
+
+    def _detach(self) -> None:
+        self._listeners -= 1
+        if self._listeners or self.finished:
+            return
+        if self.resume_seconds <= 0:
+            self.cancel()
+        else:
+            self._abandon = asyncio.get_running_loop().call_later(self.resume_seconds, self._cancel_if_abandoned)
+
+    def _cancel_if_abandoned(self) -> None:
+        self._abandon = None
+        if not self._listeners:
+            self.cancel()
+
+
+class StreamHub:
+    """The generation streams of one API process."""
+
+    def __init__(self, config: Optional[Settings] = None):
+        config = config or settings
+        self.heartbeat = config.api_stream_heartbeat_seconds
+        self.resume_seconds = config.api_stream_resume_seconds
+        self.retention_seconds = config.api_stream_retention_seconds
+        self._streams: dict[str, GenerationStream] = {}
+        self._keys: dict[str, GenerationStream] = {}
+
+    def start(
+        self,
+        source: AsyncIterator[tuple[str, Any]],
+        key: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        ticket: Optional[Ticket] = None,
+    ) -> GenerationStream:
+        """
+        Start draining ``(event, data)`` pairs from ``source`` into a new stream, optionally under a key.
+
+        ``ticket`` is entered around the generation and given back however the stream ends.
+        """
+        self._purge()
+        stream = GenerationStream(uuid.uuid4().hex, source, self.resume_seconds, fingerprint, ticket)
+        self._streams[stream.id] = stream
+        if key is not None:
+            self._keys[key] = stream
+        return stream
+
+    def find(self, key: str) -> Optional[GenerationStream]:
+        """The stream started under an idempotency key, while it is retained."""
+        self._purge()
+        return self._keys.get(key)
+
+    def get(self, stream_id: str) -> Optional[GenerationStream]:
+        """A stream that is running or still retained."""
+        self._purge()
+        return self._streams.get(stream_id)
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def _purge(self) -> None:
+        cutoff = time.monotonic() - self.retention_seconds
+        for stream_id in [s.id for s in self._streams.values() if s.finished and s.finished_at < cutoff]:
+            del self._streams[stream_id]
+        for key in [k for k, s in self._keys.items() if s.id not in self._streams]:
+            del self._keys[key]
+
+    async def close(self) -> None:
+        """Cancel every running generation (on shutdown)."""
+        tasks = [s._task for s in self._streams.values() if not s.finished]
+        for stream in self._streams.values():
+            stream.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._streams.clear()
+        self._keys.clear()
+
+
+# Sources: service output as (event, data) pairs
+
+
+async def _recipe_events(service, body: SuggestRequest, preferences) -> AsyncIterator[tuple[str, Any]]:
+    recipes = service.stream_recipes(
+        ingredients=body.ingredients,
+        num_recipes=body.num_recipes,
+        dietary_restrictions=body.dietary_restrictions,
+        max_cook_time=body.max_cook_time,
+        preferences=preferences,
+    )
+    async with aclosing(recipes):
+        async for recipe in recipes:
+            yield "recipe", recipe
+
+
+async def _meal_plan_events(service, body: MealPlanRequest, preferences) -> AsyncIterator[tuple[str, Any]]:
+    items = service.stream_meal_plan(
+        num_days=body.num_days,
+        start_date=body.start_date,
+        meal_types=body.meal_types,
+        preferences=preferences,
+        favorite_cuisines=body.favorite_cuisines,
+    )
+    async with aclosing(items):
+        async for item in items:
+            if isinstance(item, MealPlanDay):
+                yield "day", item
+            else:
+                meal_plan, shopping_list = item
+                yield "plan", MealPlanResult(meal_plan=meal_plan, shopping_list=shopping_list)
+
+
+# Server-sent events
+
+
+def _format(event: Optional[Event]) -> bytes:
+    if event is None:
+        return b": keep-alive\n\n"
+    event_id, name, data = event
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, name.encode(), data)
+
+
+async def _sse(stream: GenerationStream, after: int, heartbeat: float) -> AsyncIterator[bytes]:
+    # Reconnect delay for EventSource, then the stream id for clients that resume by hand
+    yield b"retry: 2000\nevent: stream\ndata: %s\n\n" % codec.dumpb({"stream_id": stream.id})
+    async with aclosing(stream.listen(after, heartbeat)) as events:
+        async for event in events:
+            yield _format(event)
+
+
+def _event_stream(request: Request, stream: GenerationStream, after: int = 0) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(stream, after, request.app.state.streams.heartbeat),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+            "Content-Location": f"/ai/streams/{stream.id}",
+        },
+    )
+
+
+async def _stream_key(request: Request) -> tuple[Optional[str], Optional[str]]:
+    """The hub key and body fingerprint of a request with an ``Idempotency-Key`` (else None)."""
+    key = idempotency_key(request)
+    if key is None:
+        return None, None
+    return f"{request.url.path} {key}", hashlib.sha256(await request.body()).hexdigest()
+
+
+def _keyed_stream(request: Request, key: Optional[str], fingerprint: Optional[str]) -> Optional[GenerationStream]:
+    """The stream already started under the request's idempotency key."""
+    stream = request.app.state.streams.find(key) if key is not None else None
+    if stream is not None and stream.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used with a different request")
+    return stream
+
+
+@router.post("/suggest/stream")
+async def stream_suggestions(
+    body: SuggestRequest,
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_suggestion_service),
+):
+    key, fingerprint = await _stream_key(request)
+    stream = _keyed_stream(request, key, fingerprint)
+    if stream is not None:
+        return _event_stream(request, stream, last_event_id or 0)
+    preferences = await ai_preferences(db, body.use_preferences)
+    ticket = admit(request, suggestion_priority(body.num_recipes))
+    stream = request.app.state.streams.start(_recipe_events(service, body, preferences), key, fingerprint, ticket)
+    return _event_stream(request, stream)
+
+
+@router.post("/meal-plan/stream")
+async def stream_meal_plan(
+    body: MealPlanRequest,
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+    service=Depends(get_meal_plan_service),
+):
+    key, fingerprint = await _stream_key(request)
+    stream = _keyed_stream(request, key, fingerprint)
+    if stream is not None:
+        return _event_stream(request, stream, last_event_id or 0)
+    preferences = await ai_preferences(db, body.use_preferences)
+    ticket = admit(request, meal_plan_priority(body.num_days))
+    stream = request.app.state.streams.start(_meal_plan_events(service, body, preferences), key, fingerprint, ticket)
+    return _event_stream(request, stream)
+
+
+@router.get("/streams/{stream_id}")
+async def resume_stream(
+    stream_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None),
+    after: Optional[int] = Query(default=None, description="Resume after this event id (instead of Last-Event-ID)"),
+):
+    """Re-attach to a generation, replaying the events after ``Last-Event-ID``."""
+    stream = request.app.state.streams.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+    return _event_stream(request, stream, after if after is not None else last_event_id or 0)
+
+
+# WebSocket
+
+
+@router.websocket("/ws")
+async def stream_websocket(websocket: WebSocket):
+    await websocket.accept()
+    hub: StreamHub = websocket.app.state.streams
+    try:
+        message = await websocket.receive_json()
+        action = message.get("action")
+        after = 0
+        if action == "resume":
+            stream = hub.get(str(message.get("stream_id")))
+            after = int(message.get("last_event_id") or 0)
+            if stream is None:
+                await websocket.close(code=4404, reason="Stream not found or expired")
+                return
+        elif action in ("suggest", "meal_plan"):
+            stream = await _start_from_message(websocket, action, message.get("params") or {})
+        else:
+            await websocket.close(code=4400, reason="Unknown action")
+            return
+
+        await websocket.send_json({"event": "stream", "data": {"stream_id": stream.id}})
+        async with aclosing(stream.listen(after, hub.heartbeat)) as events:
+            async for event in events:
+                if event is None:
+                    await websocket.send_json({"event": "ping"})
+                    continue
+                event_id, name, data = event
+                await websocket.send_text(f'{{"id":{event_id},"event":"{name}","data":{data.decode()}}}')
+        await websocket.close()
+    except ValidationError as e:
+        await websocket.close(code=4422, reason=str(e.errors()[0]["msg"]))
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code, reason=str(e.detail)[:120])
+    except WebSocketDisconnect:
+        pass
+
+
+async def _start_from_message(websocket: WebSocket, action: str, params: dict) -> GenerationStream:
+    hub: StreamHub = websocket.app.state.streams
+    if action == "suggest":
+        body = SuggestRequest.model_validate(params)
+        service = ai_service(websocket, "suggestions")
+        source = _recipe_events
+        priority = suggestion_priority(body.num_recipes)
+    else:
+        body = MealPlanRequest.model_validate(params)
+        service = ai_service(websocket, "meal_plans")
+        source = _meal_plan_events
+        priority = meal_plan_priority(body.num_days)
+    async with websocket.app.state.sessionmaker() as db:
+        preferences = await ai_preferences(db, body.use_preferences)
+    return hub.start(source(service, body, preferences), ticket=admit(websocket, priority))
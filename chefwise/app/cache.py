@@ -0,0 +1,189 @@
+"""Caching across Streamlit reruns.
+
+Streamlit re-executes the page script on every widget interaction. Two kinds
+of cache keep that cheap:
+
+* ``st.cache_resource`` holds process-wide singletons: the initialized
+  engine, the OpenAI client, the AI services built on it, the
+  background job runner, the session store and the optional write queue.
+* ``st.cache_data`` holds repository reads. Each loader takes the current
+  data generation as a cache key; the generation is the newest sequence
+  number of the trigger-maintained change feed, so any committed write to
+  recipes, meal plans or preferences moves it and the next read gets fresh
+  rows. The generation itself is cached for ``GENERATION_TTL_SECONDS``, so
+  reruns and the loaders within one rerun share a single ``MAX(seq)``
+  lookup; ``write`` drops it, so this process sees its own writes at once
+  and other processes' writes within the TTL.
+* Preferences come from ``PreferencesRepository``'s own TTL cache, which
+  answers without touching the database while it is fresh.
+
+Pages call the ``load_*`` and ``get_*`` functions here instead of opening
+sessions or constructing services themselves, and save through ``write``.
+"""
+
+from datetime import date
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, TypeVar
+
+import streamlit as st
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from chefwise.app.session_store import SessionStore, create_session_store
+from chefwise.database import (
+    Calendar,
+    CalendarRepository,
+    ChangeFeedRepository,
+    PreferencesRepository,
+    RecipeRepository,
+    WriteQueue,
+    engine,
+    get_db_context,
+    init_db,
+)
+from chefwise.config import settings
+from chefwise.jobs import GENERATE_MEAL_PLAN, SUGGEST_RECIPES, JobRunner, meal_plan_job, suggest_recipes_job
+from chefwise.models import LazyRecipe, UserPreferences
+
+if TYPE_CHECKING:
+    from chefwise.ai import MealPlanService, OpenAIClient, RecipeModificationService, RecipeSuggestionService
+
+T = TypeVar("T")
+
+# How long a data generation is reused before the change feed is checked again
+GENERATION_TTL_SECONDS = 1.0
+
+
+# Shared resources (one per process)
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine() -> Engine:
+    """The app database engine, with tables and migrations applied once per process."""
+    init_db(engine)
+    return engine
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client() -> "OpenAIClient":
+    """The shared OpenAI client (raises ValueError without an API key; failures are not cached)."""
+    # The openai SDK is imported on the first AI call, not at app start
+    from chefwise.ai import OpenAIClient
+
+    return OpenAIClient()
+
+
+@st.cache_resource(show_spinner=False)
+def get_suggestion_service() -> "RecipeSuggestionService":
+    """The shared recipe suggestion service."""
+    from chefwise.ai import RecipeSuggestionService
+
+    return RecipeSuggestionService(get_openai_client())
+
+
+@st.cache_resource(show_spinner=False)
+def get_meal_plan_service() -> "MealPlanService":
+    """The shared meal plan service."""
+    from chefwise.ai import MealPlanService
+
+    return MealPlanService(get_openai_client())
+
+
+@st.cache_resource(show_spinner=False)
+def get_modification_service() -> "RecipeModificationService":
+    """The shared recipe modification service."""
+    from chefwise.ai import RecipeModificationService
+
+    return RecipeModificationService(get_openai_client())
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner() -> JobRunner:
+    """The background job runner, with the AI generation jobs registered and leftovers recovered."""
+    runner = JobRunner(get_engine())
+    runner.register(SUGGEST_RECIPES, suggest_recipes_job(get_suggestion_service))
+    runner.register(GENERATE_MEAL_PLAN, meal_plan_job(get_meal_plan_service))
+    runner.recover()
+    return runner
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_store() -> SessionStore:
+    """The server-side store for large per-session values (see chefwise.app.state)."""
+    return create_session_store()
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_queue() -> Optional[WriteQueue]:
+    """The process's single-writer queue, if ``db_write_queue`` is enabled."""
+    return WriteQueue(get_engine()) if settings.db_write_queue else None
+
+
+def write(mutation: Callable[[Session], T]) -> T:
+    """
+    Run a repository write and wait for it.
+
+    With the write queue enabled the mutation is group-committed by the
+    writer thread; otherwise it runs in its own session and transaction.
+    """
+    queue = get_write_queue()
+    try:
+        if queue is not None:
+            return queue.write(mutation)
+        with get_db_context() as db:
+            return mutation(db)
+    finally:
+        _generation.clear()
+
+
+# Repository reads (cached per data generation)
+
+
+def data_generation() -> int:
+    """The current write generation: the newest change-feed sequence number."""
+    with get_db_context() as db:
+        return int(ChangeFeedRepository(db).current_token())
+
+
+@st.cache_data(show_spinner=False, ttl=GENERATION_TTL_SECONDS)
+def _generation() -> int:
+    return data_generation()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _recipe_titles(generation: int) -> list[tuple[int, str]]:
+    # Only ids and titles: cache_data unpickles its value on every rerun, so full recipes stay out
+    with get_db_context() as db:
+        return RecipeRepository(db).get_titles()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _recipes_by_id(generation: int, recipe_ids: tuple[int, ...]) -> list[LazyRecipe]:
+    with get_db_context() as db:
+        return RecipeRepository(db).get_many_lazy(recipe_ids)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _calendar(generation: int, start: date, end: date) -> Calendar:
+    with get_db_context() as db:
+        return CalendarRepository(db).range(start, end)
+
+
+def load_preferences() -> UserPreferences:
+    """The user preferences (no query while the preferences cache is fresh)."""
+    with get_db_context() as db:
+        return PreferencesRepository(db).get()
+
+
+def load_recipe_titles() -> list[tuple[int, str]]:
+    """The (id, title) of every saved recipe, newest first; load the chosen ones with ``load_recipes_by_id``."""
+    return _recipe_titles(_generation())
+
+
+def load_recipes_by_id(recipe_ids: Iterable[int]) -> list[LazyRecipe]:
+    """Saved recipes in the given order (one page of a listing)."""
+    return _recipes_by_id(_generation(), tuple(recipe_ids))
+
+
+def load_calendar(start: date, end: date) -> Calendar:
+    """The planned meals between two dates."""
+    return _calendar(_generation(), start, end)
@@ -0,0 +1,115 @@
+"""Background generations on the pages: submit, poll and open results.
+
+Pages submit AI generations with ``submit_job`` instead of calling the
+services under a spinner, then show ``render_jobs``. While a job is queued
+or running the list polls the runner every ``POLL_SECONDS``; on Streamlit
+versions with ``st.fragment`` only the list re-runs, otherwise the user
+refreshes it. The job a session submitted last is opened as soon as it
+succeeds; older results stay available from the list. Each session only
+sees the jobs it submitted.
+"""
+
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+from chefwise.app.cache import get_job_runner
+from chefwise.app.state import session_id
+from chefwise.models import Job, JobStatus
+
+POLL_SECONDS = 2.0
+
+STATUS_LABELS = {
+    JobStatus.QUEUED: "⏳ Queued",
+    JobStatus.RUNNING: "🔄 Running",
+    JobStatus.SUCCEEDED: "✅ Done",
+    JobStatus.FAILED: "❌ Failed",
+    JobStatus.CANCELLED: "🚫 Cancelled",
+    JobStatus.EXPIRED: "⌛ Timed out",
+}
+
+
+def _follow_key(kind: str) -> str:
+    return f"following_job_{kind}"
+
+
+def submit_job(kind: str, params: dict[str, Any]) -> Job:
+    """Queue a job and open its result on this page once it succeeds."""
+    job = get_job_runner().submit(kind, params, owner=session_id())
+    st.session_state[_follow_key(kind)] = job.id
+    return job
+
+
+def render_jobs(
+    kind: str,
+    describe: Callable[[Job], str],
+    on_open: Callable[[Job], None],
+    limit: int = 5,
+):
+    """
+    Render the newest jobs of one kind with their status and actions.
+
+    Args:
+        kind: Job kind to list
+        describe: One-line summary of a job's parameters
+        on_open: Called with a succeeded job to show its result on the page
+        limit: Number of jobs to list
+    """
+    jobs = get_job_runner().recent(kind, limit, owner=session_id())
+    if not jobs:
+        return
+
+    active = any(not job.finished for job in jobs)
+    with st.expander("Background generations", expanded=active):
+        fragment = getattr(st, "fragment", None)
+        if active and fragment is not None:
+            fragment(run_every=POLL_SECONDS)(_job_list)(kind, describe, on_open, limit)
+        else:
+            _job_list(kind, describe, on_open, limit, jobs)
+
+
+def _job_list(
+    kind: str,
+    describe: Callable[[Job], str],
+    on_open: Callable[[Job], None],
+    limit: int,
+    jobs: Optional[list[Job]] = None,
+):
+    runner = get_job_runner()
+    polling = jobs is None
+    if polling:
+        jobs = runner.recent(kind, limit, owner=session_id())
+
+    # Open the job this session is waiting for as soon as it is done
+    following = st.session_state.get(_follow_key(kind))
+    for job in jobs:
+        if job.id == following and job.finished:
+            del st.session_state[_follow_key(kind)]
+            if job.status is JobStatus.SUCCEEDED:
+                on_open(job)
+            st.rerun()
+
+    for job in jobs:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"{STATUS_LABELS[job.status]} · {describe(job)}")
+            detail = job.progress if job.status is JobStatus.RUNNING else job.error
+            started = job.created_at.strftime("%b %d, %H:%M")
+            st.caption(f"{started} UTC · {detail}" if detail else f"{started} UTC")
+        with col2:
+            if not job.finished:
+                if st.button("Cancel", key=f"cancel_job_{job.id}", use_container_width=True):
+                    runner.cancel(job.id)
+                    st.rerun()
+            elif job.status is JobStatus.SUCCEEDED:
+                if st.button("Open", key=f"open_job_{job.id}", use_container_width=True):
+                    on_open(job)
+                    st.rerun()
+
+    if polling:
+        if all(job.finished for job in jobs):
+            # Everything finished: re-run the page once to stop polling
+            st.rerun()
+    elif any(not job.finished for job in jobs):
+        if st.button("Refresh", key=f"refresh_jobs_{kind}"):
+            st.rerun()
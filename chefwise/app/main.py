@@ -17,25 +17,16 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from chefwise.database import init_db
+from chefwise.app.cache import get_engine
 
 
 def init_session_state():
     """Initialize session state variables."""
     if "initialized" not in st.session_state:
-        # Initialize database
-        init_db()
+        # Initialize the database (runs once per process, not per session)
+        get_engine()
         st.session_state.initialized = True
 
-    if "current_suggestions" not in st.session_state:
-        st.session_state.current_suggestions = []
-
-    if "current_meal_plan" not in st.session_state:
-        st.session_state.current_meal_plan = None
-
-    if "shopping_list" not in st.session_state:
-        st.session_state.shopping_list = []
-
 
 def main():
     """Main application entry point."""
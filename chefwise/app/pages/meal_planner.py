@@ -1,13 +1,20 @@
 """Meal Planner page - Generate AI-powered weekly meal plans."""
 
+import uuid
 from datetime import date, timedelta
 
 import streamlit as st
 
-from chefwise.ai import MealPlanService
-from chefwise.database import get_db_context, MealPlanRepository, PreferencesRepository
+from chefwise.app.cache import get_meal_plan_service, load_calendar, load_preferences, write
+from chefwise.app.jobs import render_jobs, submit_job
+from chefwise.app.state import delete_value, get_value, set_value
+from chefwise.database import MealPlanRepository
+from chefwise.jobs import GENERATE_MEAL_PLAN, meal_plan_from_result, meal_plan_params
 from chefwise.models import MealType
 
+# st.session_state key of the current draft's token, which prefixes its widget keys
+_DRAFT = "meal_plan_draft"
+
 
 def render():
     """Render the Meal Planner page."""
@@ -15,9 +22,9 @@ def render():
     st.markdown("Generate personalized meal plans with AI assistance!")
 
     # Load user preferences
-    with get_db_context() as db:
-        prefs_repo = PreferencesRepository(db)
-        preferences = prefs_repo.get()
+    preferences = load_preferences()
+
+    render_upcoming_meals()
 
     # Plan configuration
     col1, col2 = st.columns(2)
@@ -69,29 +76,31 @@ def render():
             st.warning("Please select at least one meal type.")
             return
 
-        with st.spinner("Creating your personalized meal plan..."):
-            try:
-                service = MealPlanService()
-                meal_plan, shopping_list = service.generate_meal_plan(
-                    num_days=num_days,
-                    start_date=start_date,
-                    meal_types=meal_types,
-                    preferences=preferences,
-                    favorite_cuisines=selected_cuisines,
-                )
-                st.session_state.current_meal_plan = meal_plan
-                st.session_state.shopping_list = shopping_list
-            except ValueError as e:
-                st.error(f"Configuration error: {e}")
-                st.info("Make sure you've set your OPENAI_API_KEY in the .env file.")
-                return
-            except Exception as e:
-                st.error(f"Error generating meal plan: {e}")
-                return
+        try:
+            get_meal_plan_service()  # Fails fast without an API key
+        except ValueError as e:
+            st.error(f"Configuration error: {e}")
+            st.info("Make sure you've set your OPENAI_API_KEY in the .env file.")
+            return
+
+        # Generated in the background; the plan opens below when it is ready
+        submit_job(
+            GENERATE_MEAL_PLAN,
+            meal_plan_params(
+                num_days=num_days,
+                start_date=start_date,
+                meal_types=meal_types,
+                preferences=preferences,
+                favorite_cuisines=selected_cuisines,
+            ),
+        )
+
+    render_jobs(GENERATE_MEAL_PLAN, describe=describe_job, on_open=open_meal_plan)
 
     # Display meal plan
-    if st.session_state.current_meal_plan:
-        plan = st.session_state.current_meal_plan
+    # Read once per run: edits below apply to this copy and Save writes it
+    plan = get_value("current_meal_plan")
+    if plan:
 
         st.markdown("---")
         st.subheader(f"📅 {plan.name}")
@@ -99,6 +108,11 @@ def render():
         if plan.notes:
             st.info(f"**Weekly Tips:** {plan.notes}")
 
+        editing = st.toggle("Edit meals", key="edit_meal_plan")
+        draft = st.session_state.setdefault(_DRAFT, uuid.uuid4().hex)
+        # Unsaved meals have no ids, so widgets are keyed by the meal's position in this draft
+        positions = {id(meal): n for n, meal in enumerate(plan.meals)}
+
         # Group meals by date
         meals_by_date = {}
         for meal in plan.meals:
@@ -122,6 +136,19 @@ def render():
                         "snack": "🍎",
                     }.get(meal.meal_type, "🍽️")
 
+                    if editing:
+                        # Edits go into the plan read above; Save writes the diff
+                        key = f"{draft}_{positions[id(meal)]}"
+                        meal.recipe_title = st.text_input(
+                            f"{meal_emoji} {meal.meal_type.capitalize()}",
+                            value=meal.recipe_title,
+                            key=f"meal_title_{key}",
+                        )
+                        meal.notes = st.text_input(
+                            "Notes", value=meal.notes or "", key=f"meal_notes_{key}"
+                        ) or None
+                        continue
+
                     st.markdown(f"**{meal_emoji} {meal.meal_type.capitalize()}:** {meal.recipe_title}")
                     if meal.notes:
                         st.caption(meal.notes)
@@ -130,10 +157,11 @@ def render():
         st.markdown("---")
         st.subheader("🛒 Shopping List")
 
-        if st.session_state.shopping_list:
+        shopping_list = get_value("shopping_list", [])
+        if shopping_list:
             # Group by category
             by_category = {}
-            for item in st.session_state.shopping_list:
+            for item in shopping_list:
                 category = item.category or "Other"
                 if category not in by_category:
                     by_category[category] = []
@@ -147,7 +175,7 @@ def render():
                     for item in items:
                         st.checkbox(
                             f"{item.quantity} {item.unit} {item.name}",
-                            key=f"shop_{category}_{item.name}",
+                            key=f"shop_{draft}_{category}_{item.name}",
                         )
         else:
             st.info("Shopping list will appear here after generating a meal plan.")
@@ -162,19 +190,74 @@ def render():
 
         with col2:
             if st.button("Clear Plan", use_container_width=True):
-                st.session_state.current_meal_plan = None
-                st.session_state.shopping_list = []
+                delete_value("current_meal_plan")
+                delete_value("shopping_list")
+                st.session_state.pop(_DRAFT, None)
                 st.rerun()
 
 
+def describe_job(job):
+    """Summarize a meal plan job by its dates and meals."""
+    params = job.params
+    meals = ", ".join(params.get("meal_types") or ["all meals"])
+    return f"{params['num_days']} days from {params['start_date'] or 'today'} ({meals})"
+
+
+def open_meal_plan(job):
+    """Show the plan and shopping list of a finished job."""
+    plan, shopping_list = meal_plan_from_result(job.result)
+    set_value("current_meal_plan", plan)
+    set_value("shopping_list", shopping_list)
+    start_draft()
+
+
+def start_draft():
+    """Give the current plan a new draft token, so its widgets start from its own values."""
+    st.session_state[_DRAFT] = uuid.uuid4().hex
+
+
+def render_upcoming_meals(days: int = 30):
+    """Show the saved meals of the coming days across all plans."""
+    today = date.today()
+    calendar = load_calendar(today, today + timedelta(days=days - 1))
+
+    if not len(calendar):
+        return
+
+    with st.expander(f"Upcoming meals ({len(calendar)} in the next {days} days)"):
+        for day in calendar.days.values():
+            meals = ", ".join(f"{m.meal_type.capitalize()}: {m.recipe_title}" for m in day.meals)
+            st.markdown(f"**{day.date.strftime('%a %m/%d')}** — {meals}")
+
+
 def save_meal_plan(meal_plan):
-    """Save the meal plan to the database."""
-    try:
-        with get_db_context() as db:
-            repo = MealPlanRepository(db)
+    """Save the meal plan to the database.
+
+    A new plan is inserted with all its slots. A plan that was saved before
+    is diffed against the stored copy, so only edited slots are written.
+    """
+    def save(db):
+        repo = MealPlanRepository(db)
+        if getattr(meal_plan, "id", None) is None:
             saved_plan = repo.create(meal_plan)
+            return saved_plan, f"Meal plan '{saved_plan.name}' saved successfully!"
+        changes = repo.save(meal_plan)
+        saved_plan = repo.get(meal_plan.id)
+        message = (
+            f"Meal plan '{saved_plan.name}' updated: {changes.updated} changed, "
+            f"{changes.inserted} added, {changes.deleted} removed."
+            if changes.changed
+            else "No changes to save."
+        )
+        return saved_plan, message
+
+    try:
+        saved_plan, message = write(save)
 
-        st.success(f"Meal plan '{saved_plan.name}' saved successfully!")
+        # Keep the stored ids so the next save can diff against them
+        set_value("current_meal_plan", saved_plan)
+        start_draft()  # The stored copy may order its meals differently
+        st.success(message)
 
     except Exception as e:
         st.error(f"Error saving meal plan: {e}")
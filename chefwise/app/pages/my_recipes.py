@@ -2,7 +2,19 @@
 
 import streamlit as st
 
+from chefwise.app.cache import load_recipes_by_id, write
+from chefwise.app.state import delete_value, get_value, set_value
 from chefwise.database import get_db_context, RecipeRepository
+from chefwise.database.catalog import recipe_catalog
+from chefwise.models import LazyRecipe
+
+SORT_OPTIONS = {
+    "Newest first": "newest",
+    "Oldest first": "oldest",
+    "A-Z": "title",
+    "Z-A": "title_desc",
+}
+PAGE_SIZES = [10, 25, 50]
 
 
 def render():
@@ -10,18 +22,16 @@ def render():
     st.title("My Recipes")
     st.markdown("View and manage your saved recipe collection.")
 
-    # Load recipes
     with get_db_context() as db:
-        repo = RecipeRepository(db)
-        recipes = repo.get_all()
+        catalog = recipe_catalog(db)
 
-    if not recipes:
+    if not len(catalog):
         st.info("No saved recipes yet!")
         st.markdown("Go to **Recipe Finder** to discover and save delicious recipes.")
         return
 
     # Search and filter
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([3, 2, 1])
 
     with col1:
         search_query = st.text_input(
@@ -33,131 +43,158 @@ def render():
     with col2:
         sort_option = st.selectbox(
             "Sort by",
-            ["Newest first", "Oldest first", "A-Z", "Z-A"],
+            list(SORT_OPTIONS),
             key="recipe_sort",
         )
 
-    # Filter recipes
-    filtered_recipes = recipes
-    if search_query:
-        query_lower = search_query.lower()
-        filtered_recipes = [
-            r for r in recipes
-            if query_lower in r.title.lower()
-            or (r.description and query_lower in r.description.lower())
-        ]
-
-    # Sort recipes
-    if sort_option == "Newest first":
-        filtered_recipes.sort(key=lambda r: r.created_at, reverse=True)
-    elif sort_option == "Oldest first":
-        filtered_recipes.sort(key=lambda r: r.created_at)
-    elif sort_option == "A-Z":
-        filtered_recipes.sort(key=lambda r: r.title.lower())
-    elif sort_option == "Z-A":
-        filtered_recipes.sort(key=lambda r: r.title.lower(), reverse=True)
+    with col3:
+        page_size = st.selectbox("Per page", PAGE_SIZES, key="recipe_page_size")
+
+    # A new search, sort or page size starts again from the first page
+    listing = (search_query, sort_option, page_size)
+    if st.session_state.get("recipe_listing") != listing:
+        st.session_state.recipe_listing = listing
+        st.session_state.recipe_limit = page_size
+    limit = st.session_state.recipe_limit
+
+    # Filter and sort in the columnar catalog, then load only the visible page
+    result = catalog.query(query=search_query or None, sort=SORT_OPTIONS[sort_option], limit=limit)
+    recipes = load_recipes_by_id(result.ids.tolist())
 
     # Display count
-    st.markdown(f"**{len(filtered_recipes)}** recipes found")
+    if len(recipes) < result.total:
+        st.markdown(f"Showing **{len(recipes)}** of **{result.total}** recipes")
+    else:
+        st.markdown(f"**{result.total}** recipes found")
     st.markdown("---")
 
-    # Display recipes in a grid
-    for recipe in filtered_recipes:
-        with st.expander(f"**{recipe.title}**"):
-            # Recipe header
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                if recipe.prep_time_minutes:
-                    st.metric("Prep", f"{recipe.prep_time_minutes}m")
-                else:
-                    st.metric("Prep", "-")
-
-            with col2:
-                if recipe.cook_time_minutes:
-                    st.metric("Cook", f"{recipe.cook_time_minutes}m")
-                else:
-                    st.metric("Cook", "-")
-
-            with col3:
-                st.metric("Servings", recipe.servings)
-
-            with col4:
-                if recipe.difficulty:
-                    st.metric("Difficulty", recipe.difficulty.capitalize())
-                else:
-                    st.metric("Difficulty", "-")
-
-            # Description
-            if recipe.description:
-                st.markdown(f"*{recipe.description}*")
-
-            # Tags
-            tags = []
-            if recipe.cuisine:
-                tags.append(f"🌍 {recipe.cuisine}")
-            if recipe.dietary_tags:
-                for tag in recipe.dietary_tags:
-                    tag_display = tag.value if hasattr(tag, 'value') else tag
-                    tag_display = tag_display.replace("_", " ").title()
-                    tags.append(f"🏷️ {tag_display}")
-
-            if tags:
-                st.markdown(" | ".join(tags))
-
-            # Ingredients
-            st.markdown("### Ingredients")
-            cols = st.columns(2)
-            half = len(recipe.ingredients) // 2 + len(recipe.ingredients) % 2
-
-            for i, ing in enumerate(recipe.ingredients):
-                col = cols[0] if i < half else cols[1]
-                with col:
-                    notes = f" ({ing.notes})" if ing.notes else ""
-                    st.markdown(f"- {ing.quantity} {ing.unit} {ing.name}{notes}")
-
-            # Instructions
-            st.markdown("### Instructions")
-            for i, step in enumerate(recipe.instructions, 1):
-                st.markdown(f"{i}. {step}")
-
-            # Metadata
-            st.markdown("---")
-            st.caption(f"Saved on {recipe.created_at.strftime('%B %d, %Y at %I:%M %p')}")
-
-            # Actions
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if st.button("Edit in Modifier", key=f"edit_{recipe.id}", use_container_width=True):
-                    st.session_state.recipe_to_modify = recipe
-                    st.info("Go to Recipe Modifier to edit this recipe.")
-
-            with col2:
-                if st.button("Delete", key=f"delete_{recipe.id}", type="secondary", use_container_width=True):
-                    st.session_state[f"confirm_delete_{recipe.id}"] = True
-
-            # Confirmation dialog
-            if st.session_state.get(f"confirm_delete_{recipe.id}"):
-                st.warning(f"Are you sure you want to delete '{recipe.title}'?")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Yes, delete", key=f"confirm_yes_{recipe.id}", type="primary"):
-                        delete_recipe(recipe.id, recipe.title)
-                        st.session_state[f"confirm_delete_{recipe.id}"] = False
-                        st.rerun()
-                with col2:
-                    if st.button("Cancel", key=f"confirm_no_{recipe.id}"):
-                        st.session_state[f"confirm_delete_{recipe.id}"] = False
-                        st.rerun()
+    for recipe in recipes:
+        render_recipe_row(recipe)
+
+    if limit < result.total:
+        if st.button("Load more", key="recipe_load_more", use_container_width=True):
+            st.session_state.recipe_limit = limit + page_size
+            st.rerun()
+
+
+def render_recipe_row(recipe: LazyRecipe):
+    """Render the summary line of a recipe, and its details when opened."""
+    col1, col2 = st.columns([5, 1])
+
+    with col1:
+        st.markdown(f"**{recipe.title}**")
+        summary = [f"{recipe.servings} servings"]
+        if recipe.total_time_minutes:
+            summary.append(f"{recipe.total_time_minutes} min")
+        if recipe.cuisine:
+            summary.append(recipe.cuisine)
+        if recipe.difficulty:
+            summary.append(recipe.difficulty.capitalize())
+        st.caption(" · ".join(summary))
+
+    with col2:
+        # Only opened recipes decode their JSON and render widgets
+        show_details = st.toggle("Details", key=f"details_{recipe.id}")
+
+    if show_details:
+        with st.container(border=True):
+            render_recipe_details(recipe)
+
+
+def render_recipe_details(recipe: LazyRecipe):
+    """Render the full recipe with its actions."""
+    # Recipe header
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        if recipe.prep_time_minutes:
+            st.metric("Prep", f"{recipe.prep_time_minutes}m")
+        else:
+            st.metric("Prep", "-")
+
+    with col2:
+        if recipe.cook_time_minutes:
+            st.metric("Cook", f"{recipe.cook_time_minutes}m")
+        else:
+            st.metric("Cook", "-")
+
+    with col3:
+        st.metric("Servings", recipe.servings)
+
+    with col4:
+        if recipe.difficulty:
+            st.metric("Difficulty", recipe.difficulty.capitalize())
+        else:
+            st.metric("Difficulty", "-")
+
+    # Description
+    if recipe.description:
+        st.markdown(f"*{recipe.description}*")
+
+    # Tags
+    tags = []
+    if recipe.cuisine:
+        tags.append(f"🌍 {recipe.cuisine}")
+    if recipe.dietary_tags:
+        for tag in recipe.dietary_tags:
+            tag_display = tag.value if hasattr(tag, 'value') else tag
+            tag_display = tag_display.replace("_", " ").title()
+            tags.append(f"🏷️ {tag_display}")
+
+    if tags:
+        st.markdown(" | ".join(tags))
+
+    # Ingredients
+    st.markdown("### Ingredients")
+    cols = st.columns(2)
+    half = len(recipe.ingredients) // 2 + len(recipe.ingredients) % 2
+
+    for i, ing in enumerate(recipe.ingredients):
+        col = cols[0] if i < half else cols[1]
+        with col:
+            notes = f" ({ing.notes})" if ing.notes else ""
+            st.markdown(f"- {ing.quantity} {ing.unit} {ing.name}{notes}")
+
+    # Instructions
+    st.markdown("### Instructions")
+    for i, step in enumerate(recipe.instructions, 1):
+        st.markdown(f"{i}. {step}")
+
+    # Metadata
+    st.markdown("---")
+    st.caption(f"Saved on {recipe.created_at.strftime('%B %d, %Y at %I:%M %p')}")
+
+    # Actions
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button("Edit in Modifier", key=f"edit_{recipe.id}", use_container_width=True):
+            set_value("recipe_to_modify", recipe.id)
+            st.info("Go to Recipe Modifier to edit this recipe.")
+
+    with col2:
+        if st.button("Delete", key=f"delete_{recipe.id}", type="secondary", use_container_width=True):
+            set_value("confirm_delete", recipe.id)
+
+    # Confirmation dialog (one pending confirmation per session)
+    if get_value("confirm_delete") == recipe.id:
+        st.warning(f"Are you sure you want to delete '{recipe.title}'?")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Yes, delete", key=f"confirm_yes_{recipe.id}", type="primary"):
+                delete_recipe(recipe.id, recipe.title)
+                delete_value("confirm_delete")
+                st.rerun()
+        with col2:
+            if st.button("Cancel", key=f"confirm_no_{recipe.id}"):
+                delete_value("confirm_delete")
+                st.rerun()
 
 
 def delete_recipe(recipe_id: int, title: str):
     """Delete a recipe from the database."""
     try:
-        with get_db_context() as db:
-            repo = RecipeRepository(db)
-            repo.delete(recipe_id)
+        write(lambda db: RecipeRepository(db).delete(recipe_id))
         st.success(f"Recipe '{title}' deleted.")
     except Exception as e:
         st.error(f"Error deleting recipe: {e}")
@@ -2,8 +2,11 @@
 
 import streamlit as st
 
-from chefwise.ai import RecipeSuggestionService
-from chefwise.database import get_db_context, RecipeRepository, PreferencesRepository
+from chefwise.app.cache import get_suggestion_service, load_preferences, write
+from chefwise.app.jobs import render_jobs, submit_job
+from chefwise.app.state import get_value, set_value
+from chefwise.database import RecipeRepository
+from chefwise.jobs import SUGGEST_RECIPES, suggest_recipes_params, suggestions_from_result
 from chefwise.models import RecipeCreate, Ingredient, DietaryRestriction
 
 
@@ -13,9 +16,7 @@ def render():
     st.markdown("Enter your available ingredients and get AI-powered recipe suggestions!")
 
     # Load user preferences
-    with get_db_context() as db:
-        prefs_repo = PreferencesRepository(db)
-        preferences = prefs_repo.get()
+    preferences = load_preferences()
 
     # Input section
     col1, col2 = st.columns([2, 1])
@@ -75,31 +76,34 @@ def render():
             st.warning("Please enter at least one ingredient.")
             return
 
-        with st.spinner("Finding delicious recipes for you..."):
-            try:
-                service = RecipeSuggestionService()
-                suggestions = service.suggest_recipes(
-                    ingredients=ingredients,
-                    num_recipes=num_recipes,
-                    dietary_restrictions=dietary_restrictions,
-                    max_cook_time=max_cook_time,
-                    preferences=preferences,
-                )
-                st.session_state.current_suggestions = suggestions
-            except ValueError as e:
-                st.error(f"Configuration error: {e}")
-                st.info("Make sure you've set your OPENAI_API_KEY in the .env file.")
-                return
-            except Exception as e:
-                st.error(f"Error generating recipes: {e}")
-                return
+        try:
+            get_suggestion_service()  # Fails fast without an API key
+        except ValueError as e:
+            st.error(f"Configuration error: {e}")
+            st.info("Make sure you've set your OPENAI_API_KEY in the .env file.")
+            return
+
+        # Generated in the background; the result opens below when it is ready
+        submit_job(
+            SUGGEST_RECIPES,
+            suggest_recipes_params(
+                ingredients=ingredients,
+                num_recipes=num_recipes,
+                dietary_restrictions=dietary_restrictions,
+                max_cook_time=max_cook_time,
+                preferences=preferences,
+            ),
+        )
+
+    render_jobs(SUGGEST_RECIPES, describe=describe_job, on_open=open_suggestions)
 
     # Display suggestions
-    if st.session_state.current_suggestions:
+    suggestions = get_value("current_suggestions", [])
+    if suggestions:
         st.markdown("---")
         st.subheader("Recipe Suggestions")
 
-        for i, recipe in enumerate(st.session_state.current_suggestions):
+        for i, recipe in enumerate(suggestions):
             with st.expander(f"**{recipe.title}**", expanded=(i == 0)):
                 # Recipe header
                 col1, col2, col3 = st.columns(3)
@@ -150,6 +154,19 @@ def render():
                     save_recipe(recipe)
 
 
+def describe_job(job):
+    """Summarize a suggestion job by its ingredients."""
+    ingredients = ", ".join(job.params.get("ingredients", []))
+    if len(ingredients) > 60:
+        ingredients = ingredients[:57] + "..."
+    return f"{job.params.get('num_recipes', 3)} recipes with {ingredients}"
+
+
+def open_suggestions(job):
+    """Show the suggestions of a finished job."""
+    set_value("current_suggestions", suggestions_from_result(job.result))
+
+
 def save_recipe(recipe):
     """Save a recipe suggestion to the database."""
     try:
@@ -176,11 +193,12 @@ def save_recipe(recipe):
             difficulty=recipe.difficulty,
         )
 
-        with get_db_context() as db:
-            repo = RecipeRepository(db)
-            saved_recipe = repo.create(recipe_create)
+        saved_recipe, created = write(lambda db: RecipeRepository(db).create_or_get(recipe_create))
 
-        st.success(f"Recipe '{saved_recipe.title}' saved successfully!")
+        if created:
+            st.success(f"Recipe '{saved_recipe.title}' saved successfully!")
+        else:
+            st.info(f"Recipe '{saved_recipe.title}' is already in your library.")
 
     except Exception as e:
         st.error(f"Error saving recipe: {e}")
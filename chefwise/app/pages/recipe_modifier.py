@@ -1,10 +1,13 @@
 """Recipe Modifier page - Adapt recipes for dietary needs, scale servings, substitute ingredients."""
 
+from typing import Optional
+
 import streamlit as st
 
-from chefwise.ai import RecipeModificationService
-from chefwise.database import get_db_context, RecipeRepository
-from chefwise.models import Ingredient, RecipeCreate, DietaryRestriction
+from chefwise.app.cache import get_modification_service, load_recipe_titles, load_recipes_by_id, write
+from chefwise.app.state import get_value, set_value
+from chefwise.database import RecipeRepository
+from chefwise.models import Ingredient, LazyRecipe, RecipeCreate, DietaryRestriction
 
 
 def render():
@@ -12,10 +15,8 @@ def render():
     st.title("Recipe Modifier")
     st.markdown("Adapt recipes for dietary needs, scale servings, or find ingredient substitutions!")
 
-    # Load saved recipes for selection
-    with get_db_context() as db:
-        repo = RecipeRepository(db)
-        saved_recipes = repo.get_all()
+    # Load saved recipe titles for selection; the chosen recipe is loaded on its own
+    saved_recipes = load_recipe_titles()
 
     # Tabs for different modification types
     tab1, tab2, tab3 = st.tabs(["Modify Recipe", "Scale Servings", "Ingredient Substitution"])
@@ -30,6 +31,17 @@ def render():
         render_substitution_tab()
 
 
+def select_recipe(saved_recipes: list[tuple[int, str]], label: str, key: str) -> Optional[LazyRecipe]:
+    """Pick a saved recipe by title and load it (None if it was deleted meanwhile)."""
+    titles = dict(saved_recipes)
+    recipe_id = st.selectbox(label, options=list(titles), format_func=titles.get, key=key)
+    found = load_recipes_by_id([recipe_id])
+    if not found:
+        st.warning("That recipe was deleted. Pick another one.")
+        return None
+    return found[0]
+
+
 def render_modify_tab(saved_recipes):
     """Render the recipe modification tab."""
     st.subheader("Adapt a Recipe")
@@ -47,13 +59,9 @@ def render_modify_tab(saved_recipes):
             st.info("No saved recipes yet. Go to Recipe Finder to discover and save recipes!")
             return
 
-        recipe_options = {r.title: r for r in saved_recipes}
-        selected_title = st.selectbox(
-            "Select a recipe",
-            options=list(recipe_options.keys()),
-            key="modify_recipe_select",
-        )
-        selected_recipe = recipe_options[selected_title]
+        selected_recipe = select_recipe(saved_recipes, "Select a recipe", key="modify_recipe_select")
+        if selected_recipe is None:
+            return
 
         title = selected_recipe.title
         ingredients = selected_recipe.ingredients
@@ -122,7 +130,7 @@ def render_modify_tab(saved_recipes):
 
         with st.spinner("Modifying your recipe..."):
             try:
-                service = RecipeModificationService()
+                service = get_modification_service()
                 modified = service.modify_recipe(
                     title=title,
                     ingredients=ingredients,
@@ -132,7 +140,7 @@ def render_modify_tab(saved_recipes):
                     modification_details=modification_details,
                 )
 
-                st.session_state.modified_recipe = modified
+                set_value("modified_recipe", modified)
             except ValueError as e:
                 st.error(f"Configuration error: {e}")
                 st.info("Make sure you've set your OPENAI_API_KEY in the .env file.")
@@ -142,8 +150,9 @@ def render_modify_tab(saved_recipes):
                 return
 
     # Display modified recipe
-    if "modified_recipe" in st.session_state and st.session_state.modified_recipe:
-        display_modified_recipe(st.session_state.modified_recipe, "modified")
+    modified_recipe = get_value("modified_recipe")
+    if modified_recipe:
+        display_modified_recipe(modified_recipe, "modified")
 
 
 def render_scale_tab(saved_recipes):
@@ -154,13 +163,9 @@ def render_scale_tab(saved_recipes):
         st.info("No saved recipes yet. Go to Recipe Finder to discover and save recipes!")
         return
 
-    recipe_options = {r.title: r for r in saved_recipes}
-    selected_title = st.selectbox(
-        "Select a recipe to scale",
-        options=list(recipe_options.keys()),
-        key="scale_recipe_select",
-    )
-    selected_recipe = recipe_options[selected_title]
+    selected_recipe = select_recipe(saved_recipes, "Select a recipe to scale", key="scale_recipe_select")
+    if selected_recipe is None:
+        return
 
     col1, col2 = st.columns(2)
     with col1:
@@ -177,7 +182,7 @@ def render_scale_tab(saved_recipes):
     if st.button("Scale Recipe", type="primary", key="scale_btn"):
         with st.spinner("Scaling your recipe..."):
             try:
-                service = RecipeModificationService()
+                service = get_modification_service()
                 scaled = service.scale_recipe(
                     title=selected_recipe.title,
                     ingredients=selected_recipe.ingredients,
@@ -186,7 +191,7 @@ def render_scale_tab(saved_recipes):
                     new_servings=new_servings,
                 )
 
-                st.session_state.scaled_recipe = scaled
+                set_value("scaled_recipe", scaled)
             except ValueError as e:
                 st.error(f"Configuration error: {e}")
                 return
@@ -194,8 +199,9 @@ def render_scale_tab(saved_recipes):
                 st.error(f"Error scaling recipe: {e}")
                 return
 
-    if "scaled_recipe" in st.session_state and st.session_state.scaled_recipe:
-        display_modified_recipe(st.session_state.scaled_recipe, "scaled")
+    scaled_recipe = get_value("scaled_recipe")
+    if scaled_recipe:
+        display_modified_recipe(scaled_recipe, "scaled")
 
 
 def render_substitution_tab():
@@ -227,14 +233,14 @@ def render_substitution_tab():
 
         with st.spinner("Finding substitutions..."):
             try:
-                service = RecipeModificationService()
+                service = get_modification_service()
                 result = service.suggest_substitution(
                     ingredient=ingredient,
                     recipe_context=recipe_context,
                     reason=reason,
                 )
 
-                st.session_state.substitution_result = result
+                set_value("substitution_result", result)
             except ValueError as e:
                 st.error(f"Configuration error: {e}")
                 return
@@ -242,8 +248,8 @@ def render_substitution_tab():
                 st.error(f"Error finding substitutions: {e}")
                 return
 
-    if "substitution_result" in st.session_state and st.session_state.substitution_result:
-        result = st.session_state.substitution_result
+    result = get_value("substitution_result")
+    if result:
 
         st.markdown("---")
         st.subheader(f"Substitutions for {result.get('original_ingredient', ingredient)}")
@@ -324,11 +330,12 @@ def save_modified_recipe(recipe):
             difficulty=recipe.difficulty,
         )
 
-        with get_db_context() as db:
-            repo = RecipeRepository(db)
-            saved = repo.create(recipe_create)
+        saved, created = write(lambda db: RecipeRepository(db).create_or_get(recipe_create))
 
-        st.success(f"Recipe '{saved.title}' saved!")
+        if created:
+            st.success(f"Recipe '{saved.title}' saved!")
+        else:
+            st.info(f"Recipe '{saved.title}' is already in your library.")
 
     except Exception as e:
         st.error(f"Error saving recipe: {e}")
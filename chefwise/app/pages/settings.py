@@ -2,7 +2,8 @@
 
 import streamlit as st
 
-from chefwise.database import get_db_context, PreferencesRepository
+from chefwise.app.cache import load_preferences, write
+from chefwise.database import PreferencesRepository
 from chefwise.models import UserPreferences
 from chefwise.config import settings
 
@@ -13,9 +14,7 @@ def render():
     st.markdown("Configure your preferences for personalized recipe suggestions.")
 
     # Load current preferences
-    with get_db_context() as db:
-        repo = PreferencesRepository(db)
-        current_prefs = repo.get()
+    current_prefs = load_preferences()
 
     # Create tabs for different settings sections
     tab1, tab2, tab3 = st.tabs(["Dietary Preferences", "Cooking Preferences", "About"])
@@ -221,9 +220,7 @@ def render_about():
 def save_preferences(preferences: UserPreferences):
     """Save preferences to database."""
     try:
-        with get_db_context() as db:
-            repo = PreferencesRepository(db)
-            repo.update(preferences)
+        write(lambda db: PreferencesRepository(db).update(preferences))
         st.success("Preferences saved successfully!")
     except Exception as e:
         st.error(f"Error saving preferences: {e}")
@@ -0,0 +1,348 @@
+"""Server-side storage for large per-session values.
+
+``st.session_state`` lives in the server's memory for as long as the
+browser session does, so generated recipes, meal plans and shopping lists
+would otherwise accumulate without bound. Pages keep them in a
+``SessionStore`` instead, keyed by a small session id that is the only
+thing left in ``st.session_state`` (see ``chefwise.app.state``).
+
+Both backends enforce the same limits:
+
+* values larger than ``max_value_bytes`` are rejected;
+* sessions idle for longer than ``idle_ttl`` seconds are dropped;
+* when the store holds more than ``max_bytes``, the least recently used
+  sessions are dropped until it fits again.
+
+Values are pickled and zlib-compressed when that pays off. Only this
+process writes the store, so unpickling what it reads back is safe.
+
+``MemorySessionStore`` is an LRU in the server process. ``SQLiteSessionStore``
+keeps values in a separate SQLite file (not the app database, so session
+churn never contends with recipe writes) and holds nothing in memory.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+
+# Serialized values at least this large are compressed
+COMPRESS_ABOVE = 512
+
+_PICKLED = b"p"
+_COMPRESSED = b"z"
+
+
+def serialize(value: Any) -> bytes:
+    """Pickle a value, compressing it when that makes it smaller."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) >= COMPRESS_ABOVE:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data):
+            return _COMPRESSED + compressed
+    return _PICKLED + data
+
+
+def deserialize(data: bytes) -> Any:
+    """Inverse of ``serialize``."""
+    if data[:1] == _COMPRESSED:
+        return pickle.loads(zlib.decompress(data[1:]))
+    return pickle.loads(data[1:])
+
+
+class SessionStore(ABC):
+    """Per-session key/value storage with size limits and idle expiry."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_value_bytes: int,
+        idle_ttl: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_bytes = max_bytes
+        self.max_value_bytes = max_value_bytes
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        """Get a value, or ``default`` if it was never set, deleted or evicted."""
+        with self._lock:
+            data = self._get(session_id, key, self.clock())
+        return default if data is None else deserialize(data)
+
+    def set(self, session_id: str, key: str, value: Any) -> None:
+        """
+        Store a value (``None`` deletes it).
+
+        Raises:
+            ValueError: If the serialized value is larger than ``max_value_bytes``
+        """
+        if value is None:
+            self.delete(session_id, key)
+            return
+        data = serialize(value)
+        if len(data) > self.max_value_bytes:
+            raise ValueError(
+                f"Session value '{key}' is {len(data)} bytes, over the {self.max_value_bytes} byte limit"
+            )
+        with self._lock:
+            now = self.clock()
+            self._set(session_id, key, data, now)
+            self._evict(now)
+
+    def delete(self, session_id: str, key: str) -> None:
+        """Delete a value if present."""
+        with self._lock:
+            self._delete(session_id, key)
+
+    def clear(self, session_id: str) -> None:
+        """Delete every value of a session."""
+        with self._lock:
+            self._clear(session_id)
+
+    def evict(self) -> int:
+        """Drop idle sessions and, if still over ``max_bytes``, the least recently used; returns how many."""
+        with self._lock:
+            return self._evict(self.clock())
+
+    @property
+    @abstractmethod
+    def size(self) -> int:
+        """Total bytes of the stored values."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of sessions with stored values."""
+
+    # Backend operations, called with the lock held
+
+    @abstractmethod
+    def _get(self, session_id: str, key: str, now: float) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def _set(self, session_id: str, key: str, data: bytes, now: float) -> None: ...
+
+    @abstractmethod
+    def _delete(self, session_id: str, key: str) -> None: ...
+
+    @abstractmethod
+    def _clear(self, session_id: str) -> None: ...
+
+    @abstractmethod
+    def _evict(self, now: float) -> int: ...
+
+
+@dataclass
+class _Session:
+    touched: float
+    size: int = 0
+    values: dict[str, bytes] = field(default_factory=dict)
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in an in-process LRU, least recently used first."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _get(self, session_id: str, key: str, now: float) -> Optional[bytes]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if now - session.touched > self.idle_ttl:
+            self._clear(session_id)
+            return None
+        session.touched = now
+        self._sessions.move_to_end(session_id)
+        return session.values.get(key)
+
+    def _set(self, session_id: str, key: str, data: bytes, now: float) -> None:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session(now)
+        old = session.values.get(key)
+        delta = len(data) - (len(old) if old is not None else 0)
+        session.values[key] = data
+        session.size += delta
+        session.touched = now
+        self._size += delta
+        self._sessions.move_to_end(session_id)
+
+    def _delete(self, session_id: str, key: str) -> None:
+        session = self._sessions.get(session_id)
+        if session is None or key not in session.values:
+            return
+        size = len(session.values.pop(key))
+        session.size -= size
+        self._size -= size
+        if not session.values:
+            del self._sessions[session_id]
+
+    def _clear(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._size -= session.size
+
+    def _evict(self, now: float) -> int:
+        evicted = 0
+        # Oldest first: stop at the first session that is neither idle nor needed for space
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.touched <= self.idle_ttl and self._size <= self.max_bytes:
+                break
+            self._clear(session_id)
+            evicted += 1
+        return evicted
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a separate SQLite file, with least-recently-used eviction."""
+
+    def __init__(self, path: Union[str, Path], *args, touch_interval: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = str(path)
+        # Reads refresh a session's timestamp at most this often (a write per rerun is wasteful)
+        self.touch_interval = self.idle_ttl / 20 if touch_interval is None else touch_interval
+        self._touched: dict[str, float] = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            # Session data is disposable: no fsync, and a crash may lose the last writes
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=OFF; "
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, touched_at REAL NOT NULL, size INTEGER NOT NULL DEFAULT 0); "
+            "CREATE INDEX IF NOT EXISTS ix_sessions_touched ON sessions (touched_at); "
+            "CREATE TABLE IF NOT EXISTS session_values ("
+            "session_id TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+            "PRIMARY KEY (session_id, key)) WITHOUT ROWID;"
+        )
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM sessions").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _get(self, session_id: str, key: str, now: float) -> Optional[bytes]:
+        row = self._conn.execute(
+            "SELECT touched_at, value FROM sessions LEFT JOIN session_values "
+            "ON session_values.session_id = sessions.id AND session_values.key = ? WHERE sessions.id = ?",
+            (key, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        touched_at, value = row
+        if now - touched_at > self.idle_ttl:
+            self._clear(session_id)
+            return None
+        if now - self._touched.get(session_id, touched_at) >= self.touch_interval:
+            self._conn.execute("UPDATE sessions SET touched_at = ? WHERE id = ?", (now, session_id))
+            self._touched[session_id] = now
+        return value
+
+    def _set(self, session_id: str, key: str, data: bytes, now: float) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            old = self._conn.execute(
+                "SELECT length(value) FROM session_values WHERE session_id = ? AND key = ?", (session_id, key)
+            ).fetchone()
+            delta = len(data) - (old[0] if old else 0)
+            self._conn.execute(
+                "INSERT INTO sessions (id, touched_at, size) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET touched_at = excluded.touched_at, size = size + ?",
+                (session_id, now, delta, delta),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_values (session_id, key, value) VALUES (?, ?, ?)",
+                (session_id, key, data),
+            )
+        self._touched[session_id] = now
+
+    def _delete(self, session_id: str, key: str) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            old = self._conn.execute(
+                "SELECT length(value) FROM session_values WHERE session_id = ? AND key = ?", (session_id, key)
+            ).fetchone()
+            if old is None:
+                return
+            self._conn.execute("DELETE FROM session_values WHERE session_id = ? AND key = ?", (session_id, key))
+            self._conn.execute("UPDATE sessions SET size = size - ? WHERE id = ?", (old[0], session_id))
+
+    def _clear(self, session_id: str) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM session_values WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self._touched.pop(session_id, None)
+
+    def _evict(self, now: float) -> int:
+        idle = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT id FROM sessions WHERE touched_at < ? ORDER BY touched_at", (now - self.idle_ttl,)
+            )
+        ]
+        excess = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM sessions").fetchone()[0] - self.max_bytes
+        if excess > 0:
+            # Least recently used sessions until enough bytes are freed
+            for session_id, size in self._conn.execute(
+                "SELECT id, size FROM sessions WHERE touched_at >= ? ORDER BY touched_at", (now - self.idle_ttl,)
+            ).fetchall():
+                if excess <= 0:
+                    break
+                idle.append(session_id)
+                excess -= size
+        for session_id in idle:
+            self._clear(session_id)
+        return len(idle)
+
+
+def create_session_store(config: Optional[Settings] = None) -> SessionStore:
+    """
+    Build the session store selected by ``session_store`` in the settings.
+
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    config = config or settings
+    limits = {
+        "max_bytes": int(config.session_store_max_mb * 2**20),
+        "max_value_bytes": int(config.session_value_max_kb * 2**10),
+        "idle_ttl": config.session_idle_ttl_minutes * 60,
+    }
+    if config.session_store == "memory":
+        return MemorySessionStore(**limits)
+    if config.session_store == "sqlite":
+        path = Path(config.session_store_path)
+        if not path.is_absolute():
+            path = config.project_root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return SQLiteSessionStore(path, **limits)
+    raise ValueError(f"Unknown session store '{config.session_store}' (expected memory or sqlite)")
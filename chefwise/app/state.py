@@ -0,0 +1,44 @@
+"""Per-session page state kept in the server-side session store.
+
+``st.session_state`` only holds a session id; the values themselves
+(suggestions, meal plans, shopping lists, modification results) live in
+``get_session_store()``, which bounds their size and drops idle sessions.
+A value that was evicted reads back as its default, as if the page had
+just been opened.
+"""
+
+import uuid
+from typing import Any
+
+import streamlit as st
+
+from chefwise.app.cache import get_session_store
+
+_SESSION_ID = "session_id"
+
+
+def session_id() -> str:
+    """This browser session's key in the session store."""
+    if _SESSION_ID not in st.session_state:
+        st.session_state[_SESSION_ID] = uuid.uuid4().hex
+    return st.session_state[_SESSION_ID]
+
+
+def get_value(key: str, default: Any = None) -> Any:
+    """Get a stored value, or ``default`` if it is unset or was evicted."""
+    return get_session_store().get(session_id(), key, default)
+
+
+def set_value(key: str, value: Any) -> None:
+    """
+    Store a value for this session (``None`` deletes it).
+
+    Raises:
+        ValueError: If the value is larger than the store accepts
+    """
+    get_session_store().set(session_id(), key, value)
+
+
+def delete_value(key: str) -> None:
+    """Delete a stored value."""
+    get_session_store().delete(session_id(), key)
@@ -0,0 +1,174 @@
+"""ChefWise command line tools.
+
+Usage:
+
+    chefwise export library.ndjson.gz [--resume]
+    chefwise import library.ndjson.gz [--restart]
+    chefwise backup [--vacuum | --schedule]
+    chefwise restore data/backups/chefwise-20240101-120000-000000-backup.db
+    chefwise dedupe [--no-backup]
+    chefwise serve [--host 127.0.0.1] [--port 8000] [--workers 1]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def _export(args: argparse.Namespace) -> int:
+    from chefwise.database import export_library
+
+    result = export_library(
+        args.path,
+        compression=args.compression,
+        batch_size=args.batch_size,
+        resume=args.resume,
+    )
+    counts = ", ".join(f"{count} {section.replace('_', ' ')}" for section, count in result.counts.items())
+    print(f"{'Resumed and finished' if result.resumed else 'Exported'} {result.path}: {counts}")
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    from chefwise.database import import_library
+
+    result = import_library(
+        args.path,
+        compression=args.compression,
+        batch_size=args.batch_size,
+        resume=not args.restart,
+    )
+    if result.already_completed:
+        print(f"{args.path} was already imported (use --restart to import it again)")
+        return 0
+    if result.resumed_after_line:
+        print(f"Resumed after line {result.resumed_after_line}")
+    print(
+        f"Imported {result.recipes} recipes ({result.duplicate_recipes} already saved), "
+        f"{result.meal_plans} meal plans, {result.preferences} preferences"
+    )
+    return 0
+
+
+def _print_snapshot(result) -> None:
+    print(
+        f"{result.kind} {result.path} ({result.bytes / 2**20:.1f} MiB, {result.throughput_mib_s:.1f} MiB/s, "
+        f"{result.steps} steps, max lock hold {result.max_lock_hold_ms:.1f} ms, integrity {result.integrity})"
+    )
+    for path in result.pruned:
+        print(f"pruned {path}")
+
+
+def _backup(args: argparse.Namespace) -> int:
+    from chefwise.database.backup import BackupScheduler, backup_database, compact_database
+
+    if args.schedule:
+        scheduler = BackupScheduler()
+        print("Running scheduled backups, press Ctrl+C to stop")
+        try:
+            while True:
+                for result in scheduler.run_pending():
+                    _print_snapshot(result)
+                time.sleep(60)
+        except KeyboardInterrupt:
+            return 0
+
+    _print_snapshot(compact_database() if args.vacuum else backup_database())
+    return 0
+
+
+def _restore(args: argparse.Namespace) -> int:
+    from chefwise.database.backup import restore_database
+
+    restore_database(args.snapshot)
+    print(f"Restored {args.snapshot}")
+    return 0
+
+
+def _dedupe(args: argparse.Namespace) -> int:
+    from chefwise.database import RecipeRepository, get_db_context
+    from chefwise.database.backup import backup_database
+
+    if not args.no_backup:
+        _print_snapshot(backup_database())
+    with get_db_context() as db:
+        result = RecipeRepository(db).deduplicate()
+    for duplicate, keeper in result.merges:
+        print(f"merged recipe {duplicate} into {keeper}")
+    print(f"Scanned {result.scanned} recipes: {result.merged} merged, {result.fingerprinted} fingerprinted")
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    import uvicorn
+
+    uvicorn.run(
+        "chefwise.api:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all subcommands."""
+    from chefwise.config import settings
+    from chefwise.database.transfer import COMPRESSIONS, DEFAULT_BATCH_SIZE
+
+    parser = argparse.ArgumentParser(prog="chefwise", description="ChefWise command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export the library as NDJSON")
+    export.add_argument("path", type=Path)
+    export.add_argument("--compression", choices=COMPRESSIONS, help="Default: from the suffix (.gz, .zst)")
+    export.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    export.add_argument("--resume", action="store_true", help="Continue an interrupted export of the same file")
+    export.set_defaults(handler=_export)
+
+    import_ = commands.add_parser("import", help="Import an NDJSON export")
+    import_.add_argument("path", type=Path)
+    import_.add_argument("--compression", choices=COMPRESSIONS, help="Default: from the suffix (.gz, .zst)")
+    import_.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    import_.add_argument("--restart", action="store_true", help="Ignore the checkpoint of an earlier import")
+    import_.set_defaults(handler=_import)
+
+    backup = commands.add_parser("backup", help="Take an online backup of the database")
+    mode = backup.add_mutually_exclusive_group()
+    mode.add_argument("--vacuum", action="store_true", help="Write a compacted snapshot with VACUUM INTO")
+    mode.add_argument("--schedule", action="store_true", help="Keep running backups on the configured schedule")
+    backup.set_defaults(handler=_backup)
+
+    restore = commands.add_parser("restore", help="Replace the database with a snapshot")
+    restore.add_argument("snapshot", type=Path)
+    restore.set_defaults(handler=_restore)
+
+    dedupe = commands.add_parser("dedupe", help="Merge duplicate saved recipes into the oldest copy")
+    dedupe.add_argument("--no-backup", action="store_true", help="Skip the backup taken before deleting duplicates")
+    dedupe.set_defaults(handler=_dedupe)
+
+    serve = commands.add_parser("serve", help="Run the HTTP API")
+    serve.add_argument("--host", default=settings.api_host)
+    serve.add_argument("--port", type=int, default=settings.api_port)
+    serve.add_argument("--workers", type=int, default=1)
+    serve.set_defaults(handler=_serve)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the command line tools."""
+    args = build_parser().parse_args(argv)
+
+    from chefwise.database import init_db
+
+    init_db()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""JSON encoding and decoding with a swappable backend.
+
+Every ``*_json`` column, repository converter and AI response goes through
+this module. The backend is picked from ``settings.json_backend``:
+
+- ``auto``: orjson if installed, then msgspec, then the standard library
+- ``orjson``, ``msgspec`` or ``stdlib``: force a specific backend
+
+``decode()`` validates bytes or text straight into a typed structure (a
+pydantic model, ``list[Ingredient]``, ...) without building an intermediate
+dict first.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+T = TypeVar("T")
+
+BACKENDS = ("orjson", "msgspec", "stdlib")
+
+
+@dataclass(frozen=True)
+class JSONBackend:
+    """Encode/decode functions of one JSON library."""
+
+    name: str
+    dumpb: Callable[[Any], bytes]
+    loads: Callable[[Union[str, bytes]], Any]
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types the JSON libraries do not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_backend() -> JSONBackend:
+    def dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    return JSONBackend("stdlib", dumpb, json.loads)
+
+
+def _orjson_backend() -> JSONBackend:
+    import orjson
+
+    def dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    return JSONBackend("orjson", dumpb, orjson.loads)
+
+
+def _msgspec_backend() -> JSONBackend:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[str, bytes]) -> Any:
+        return decoder.decode(data)
+
+    return JSONBackend("msgspec", encoder.encode, loads)
+
+
+_FACTORIES = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "stdlib": _stdlib_backend,
+}
+
+
+def load_backend(name: str = "auto") -> JSONBackend:
+    """
+    Build a backend by name.
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If a specific backend was requested but is not installed
+    """
+    if name == "auto":
+        for candidate in BACKENDS:
+            try:
+                return _FACTORIES[candidate]()
+            except ImportError:
+                continue
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend '{name}'. Choose from: auto, {', '.join(BACKENDS)}")
+    return _FACTORIES[name]()
+
+
+_backend: Optional[JSONBackend] = None
+
+
+def get_backend() -> JSONBackend:
+    """Get the active backend, selecting it from settings on first use."""
+    global _backend
+    if _backend is None:
+        from chefwise.config import settings
+
+        _backend = load_backend(settings.json_backend)
+    return _backend
+
+
+def set_backend(name: str) -> JSONBackend:
+    """Switch the active backend (mainly for benchmarks and tests)."""
+    global _backend
+    _backend = load_backend(name)
+    return _backend
+
+
+def dumpb(obj: Any) -> bytes:
+    """Encode an object to UTF-8 JSON bytes."""
+    return get_backend().dumpb(obj)
+
+
+def dumps(obj: Any) -> str:
+    """Encode an object to a JSON string (for Text columns)."""
+    return get_backend().dumpb(obj).decode()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes into Python objects."""
+    return get_backend().loads(data)
+
+
+@lru_cache(maxsize=64)
+def _adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def decode(data: Union[str, bytes], type_: type[T]) -> T:
+    """
+    Decode JSON text or bytes directly into a typed structure.
+
+    Uses pydantic-core's JSON parser, which validates while parsing, so no
+    intermediate dicts are built.
+
+    Args:
+        data: JSON document
+        type_: Target type, e.g. ``list[Ingredient]`` or ``RecipeSuggestion``
+
+    Returns:
+        Validated instance of ``type_``
+    """
+    return _adapter(type_).validate_json(data)
@@ -1,6 +1,6 @@
 """Application settings using pydantic-settings."""
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,6 +23,70 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./data/chefwise.db"
 
+    # SQLite engine tuning (applied as PRAGMAs on every new connection)
+    sqlite_journal_mode: str = "wal"  # wal, delete, truncate, memory
+    sqlite_synchronous: str = "normal"  # off, normal, full, extra
+    sqlite_cache_size: int = -64000  # negative = KiB, positive = pages
+    sqlite_mmap_size: int = 268435456  # bytes, 0 disables memory-mapped I/O
+    sqlite_temp_store: str = "memory"  # default, file, memory
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+
+    # Single-writer queue (see chefwise.database.writer): app writes are group-committed by one thread
+    db_write_queue: bool = False
+    db_write_batch_max: int = 256  # Mutations per transaction
+    db_write_batch_wait_ms: float = 0.0  # Extra wait for more mutations before committing a batch
+
+    # Seconds a cached preferences row is trusted before re-checking its version
+    preferences_cache_ttl_seconds: float = 5.0
+
+    # Backups (see chefwise.database.backup); relative paths are under the project root
+    backup_dir: str = "./data/backups"
+    backup_keep: int = 7  # Snapshots kept by the retention policy
+    backup_pages_per_step: int = 256  # Pages copied per locked backup step
+    backup_step_pause_ms: float = 5.0  # Pause between steps so writers can get in
+    backup_interval_hours: float = 24.0
+    vacuum_interval_hours: float = 168.0  # VACUUM INTO compaction
+
+    # Background jobs (see chefwise.jobs)
+    job_workers: int = 4  # Jobs running at once; the rest wait queued
+    job_timeout_seconds: float = 300.0  # Default deadline after submission
+    job_retention_hours: float = 168.0  # Finished jobs older than this are deleted on startup
+
+    # Per-session page state (see chefwise.app.session_store)
+    session_store: str = "memory"  # memory or sqlite
+    session_store_path: str = "./data/sessions.db"  # sqlite backend; relative to the project root
+    session_store_max_mb: float = 64.0  # Least recently used sessions are dropped above this
+    session_value_max_kb: float = 1024.0  # Larger values are rejected
+    session_idle_ttl_minutes: float = 120.0
+
+    # HTTP API (see chefwise.api)
+    api_host: str = "127.0.0.1"
+    api_port: int = 8000
+    api_gzip_min_bytes: int = 1000  # Smaller responses are sent uncompressed
+    api_gzip_level: int = 5
+    api_stream_heartbeat_seconds: float = 15.0  # Keep-alive comment interval on idle event streams
+    api_stream_resume_seconds: float = 30.0  # Upstream call is cancelled this long after the last client left
+    api_stream_retention_seconds: float = 300.0  # Finished streams can be replayed this long
+    idempotency_ttl_hours: float = 24.0  # Responses to Idempotency-Key requests are replayed this long
+    idempotency_wait_seconds: float = 120.0  # A duplicate waits this long for the first request, then gets 409
+    idempotency_lock_seconds: float = 600.0  # An unfinished first request older than this is taken over
+
+    # AI admission control (see chefwise.api.admission)
+    ai_max_concurrent: int = 4  # AI calls running at once; the rest wait queued by priority
+    ai_reserved_interactive: int = 1  # Slots only interactive calls may take
+    ai_queue_max: int = 32  # Calls that would wait beyond this many are rejected with 429
+    ai_queue_max_per_user: int = 8
+    ai_deadline_seconds: float = 120.0  # Default call deadline, queueing included (0 for none)
+    ai_trusted_proxies: str = ""  # Comma-separated addresses whose X-User-ID header names the user
+
+    # JSON codec backend: auto, orjson, msgspec or stdlib
+    json_backend: str = "auto"
+
     # App Settings
     debug: bool = False
     log_level: str = "INFO"
@@ -33,9 +97,9 @@ class Settings(BaseSettings):
         """Get the project root directory."""
         return Path(__file__).parent.parent.parent
 
-    @property
+    @cached_property
     def data_dir(self) -> Path:
-        """Get the data directory."""
+        """Get the data directory (created on first access)."""
         data_path = self.project_root / "data"
         data_path.mkdir(exist_ok=True)
         return data_path
@@ -45,6 +109,29 @@ class Settings(BaseSettings):
         """Get the database file path."""
         return self.data_dir / "chefwise.db"
 
+    @property
+    def resolved_database_url(self) -> str:
+        """
+        Get the database URL with relative SQLite paths anchored at the project root.
+
+        ``sqlite:///./data/chefwise.db`` would otherwise depend on the working
+        directory the app was launched from. In-memory and absolute URLs are
+        returned unchanged; the parent directory of a file database is created.
+        """
+        from sqlalchemy.engine import make_url
+
+        url = make_url(self.database_url)
+        if not url.drivername.startswith("sqlite"):
+            return self.database_url
+        if url.database in (None, "", ":memory:") or url.database.startswith("file:"):
+            return self.database_url
+
+        path = Path(url.database)
+        if not path.is_absolute():
+            path = (self.project_root / path).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return url.set(database=str(path)).render_as_string(hide_password=False)
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,20 +1,130 @@
-"""Database module."""
-
-from .connection import get_db, init_db, engine, SessionLocal
-from .tables import Base, RecipeTable, MealPlanTable, MealSlotTable, UserPreferencesTable
-from .repositories import RecipeRepository, MealPlanRepository, PreferencesRepository
-
-__all__ = [
-    "get_db",
-    "init_db",
-    "engine",
-    "SessionLocal",
-    "Base",
-    "RecipeTable",
-    "MealPlanTable",
-    "MealSlotTable",
-    "UserPreferencesTable",
-    "RecipeRepository",
-    "MealPlanRepository",
-    "PreferencesRepository",
-]
+"""Database module.
+
+Public names are loaded on first access (PEP 562), so importing this
+package imports only the submodules that are actually used; the Streamlit
+app, for example, never loads the async engine or the import/export code.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .connection import (
+        get_db,
+        get_db_context,
+        init_db,
+        create_db_engine,
+        engine,
+        SessionLocal,
+        async_get_db,
+        async_init_db,
+        create_async_db_engine,
+    )
+    from .tables import (
+        Base,
+        RecipeTable,
+        RecipeTagTable,
+        MealPlanTable,
+        MealSlotTable,
+        UserPreferencesTable,
+        ImportCheckpointTable,
+        ChangeTable,
+        JobTable,
+        IdempotencyKeyTable,
+    )
+    from .repositories import (
+        RecipeRepository,
+        MealPlanRepository,
+        PreferencesRepository,
+        ChangeFeedRepository,
+        CalendarRepository,
+        JobRepository,
+    )
+    from .calendar import (
+        Calendar,
+        CalendarDay,
+        CalendarEntry,
+    )
+    from .cache import RecipeIdentityMap
+    from .writer import WriteQueue
+    from .slots import SlotChanges
+    from .dedup import (
+        DedupResult,
+        deduplicate_recipes,
+        recipe_fingerprint,
+    )
+    from .transfer import (
+        ExportResult,
+        ImportResult,
+        export_library,
+        import_library,
+    )
+    from .async_repositories import (
+        AsyncRecipeRepository,
+        AsyncMealPlanRepository,
+        AsyncPreferencesRepository,
+        AsyncChangeFeedRepository,
+        AsyncIdempotencyRepository,
+    )
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "get_db": "connection",
+    "get_db_context": "connection",
+    "init_db": "connection",
+    "create_db_engine": "connection",
+    "engine": "connection",
+    "SessionLocal": "connection",
+    "async_get_db": "connection",
+    "async_init_db": "connection",
+    "create_async_db_engine": "connection",
+    "Base": "tables",
+    "RecipeTable": "tables",
+    "RecipeTagTable": "tables",
+    "MealPlanTable": "tables",
+    "MealSlotTable": "tables",
+    "UserPreferencesTable": "tables",
+    "ImportCheckpointTable": "tables",
+    "ChangeTable": "tables",
+    "JobTable": "tables",
+    "IdempotencyKeyTable": "tables",
+    "RecipeRepository": "repositories",
+    "MealPlanRepository": "repositories",
+    "PreferencesRepository": "repositories",
+    "ChangeFeedRepository": "repositories",
+    "CalendarRepository": "repositories",
+    "JobRepository": "repositories",
+    "Calendar": "calendar",
+    "CalendarDay": "calendar",
+    "CalendarEntry": "calendar",
+    "RecipeIdentityMap": "cache",
+    "WriteQueue": "writer",
+    "SlotChanges": "slots",
+    "DedupResult": "dedup",
+    "deduplicate_recipes": "dedup",
+    "recipe_fingerprint": "dedup",
+    "ExportResult": "transfer",
+    "ImportResult": "transfer",
+    "export_library": "transfer",
+    "import_library": "transfer",
+    "AsyncRecipeRepository": "async_repositories",
+    "AsyncMealPlanRepository": "async_repositories",
+    "AsyncPreferencesRepository": "async_repositories",
+    "AsyncChangeFeedRepository": "async_repositories",
+    "AsyncIdempotencyRepository": "async_repositories",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,450 @@
+"""Async database repositories for CRUD operations.
+
+Counterparts of the repositories in ``repositories.py`` for ``AsyncSession``.
+They share the tables, converters and preferences cache, so both variants
+read and write identical rows. Relationships are always eager-loaded because
+lazy loading is not available under asyncio.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from chefwise import codec
+from chefwise.config import settings
+from chefwise.models import (
+    IdempotencyRecord,
+    Recipe,
+    RecipeCreate,
+    MealPlan,
+    MealPlanCreate,
+    MealPlanWithRecipes,
+    MealSlot,
+    MealType,
+    UserPreferences,
+)
+from . import slots
+from .cache import RecipeIdentityMap, preferences_cache
+from .converters import (
+    apply_preferences,
+    idempotency_to_model,
+    meal_plan_to_model,
+    meal_plan_to_row,
+    preferences_to_model,
+    recipe_to_model,
+    recipe_values,
+)
+from .dedup import insert_unless_saved
+from .repositories import ID_BATCH_SIZE, RECIPE_SORTS, text_matches
+from .tables import ChangeTable, IdempotencyKeyTable, RecipeTable, MealPlanTable, UserPreferencesTable
+
+
+class AsyncRecipeRepository:
+    """Async repository for recipe CRUD operations."""
+
+    def __init__(self, db: AsyncSession, identity_map: Optional[RecipeIdentityMap] = None):
+        self.db = db
+        self.identity_map = identity_map
+
+    async def create(self, recipe: RecipeCreate) -> Recipe:
+        """Create a new recipe, or return the saved copy of identical content."""
+        return (await self.create_or_get(recipe))[0]
+
+    async def create_or_get(self, recipe: RecipeCreate) -> tuple[Recipe, bool]:
+        """Save a recipe unless one with the same content fingerprint exists."""
+        values = {**recipe_values(recipe), "created_at": datetime.utcnow()}
+        existing = await self._get_by_hash(values["content_hash"])
+        if existing:
+            return recipe_to_model(existing), False
+
+        try:
+            inserted = await self.db.execute(insert_unless_saved(list(values)), values)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        if inserted.rowcount == 0:
+            # Another writer saved the same content since the lookup
+            return recipe_to_model(await self._get_by_hash(values["content_hash"])), False
+        return recipe_to_model(await self.db.get(RecipeTable, inserted.lastrowid)), True
+
+    async def get_by_fingerprint(self, content_hash: str) -> Optional[Recipe]:
+        """Get a recipe by its content fingerprint."""
+        db_recipe = await self._get_by_hash(content_hash)
+        return recipe_to_model(db_recipe) if db_recipe else None
+
+    async def _get_by_hash(self, content_hash: str) -> Optional[RecipeTable]:
+        return await self.db.scalar(select(RecipeTable).where(RecipeTable.content_hash == content_hash))
+
+    async def get(self, recipe_id: int) -> Optional[Recipe]:
+        """Get a recipe by ID."""
+        if self.identity_map is not None and recipe_id in self.identity_map:
+            return self.identity_map.get(recipe_id)
+        db_recipe = await self.db.get(RecipeTable, recipe_id)
+        return self._remember(recipe_to_model(db_recipe)) if db_recipe else None
+
+    async def get_many(self, recipe_ids: Iterable[int]) -> list[Recipe]:
+        """Get several recipes in input order, each once; unknown ids are skipped."""
+        ids = list(dict.fromkeys(recipe_ids))
+        found, missing = self.identity_map.split(ids) if self.identity_map is not None else ({}, ids)
+        for start in range(0, len(missing), ID_BATCH_SIZE):
+            batch = missing[start:start + ID_BATCH_SIZE]
+            for db_recipe in await self.db.scalars(select(RecipeTable).where(RecipeTable.id.in_(batch))):
+                found[db_recipe.id] = self._remember(recipe_to_model(db_recipe))
+        return [found[i] for i in ids if i in found]
+
+    async def get_all(self, limit: Optional[int] = None, offset: int = 0) -> list[Recipe]:
+        """Get all recipes, newest first, optionally one page of them."""
+        result = await self.db.scalars(
+            select(RecipeTable).order_by(*RECIPE_SORTS["newest"]).limit(limit).offset(offset)
+        )
+        return [recipe_to_model(r) for r in result]
+
+    async def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> list[Recipe]:
+        """Search recipes by title or description, newest first, optionally one page of them."""
+        result = await self.db.scalars(
+            select(RecipeTable)
+            .where(text_matches(query))
+            .order_by(*RECIPE_SORTS["newest"])
+            .limit(limit)
+            .offset(offset)
+        )
+        return [recipe_to_model(r) for r in result]
+
+    async def delete(self, recipe_id: int) -> bool:
+        """Delete a recipe by ID."""
+        db_recipe = await self.db.scalar(
+            select(RecipeTable)
+            .where(RecipeTable.id == recipe_id)
+            .options(selectinload(RecipeTable.meal_slots))
+        )
+        if self.identity_map is not None:
+            self.identity_map.discard(recipe_id)
+        if db_recipe:
+            await self.db.delete(db_recipe)
+            await self.db.commit()
+            return True
+        return False
+
+    def _remember(self, recipe: Recipe) -> Recipe:
+        if self.identity_map is not None:
+            self.identity_map.put(recipe)
+        return recipe
+
+
+class AsyncMealPlanRepository:
+    """Async repository for meal plan CRUD operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _select(self):
+        return select(MealPlanTable).options(selectinload(MealPlanTable.meals))
+
+    async def create(self, meal_plan: MealPlanCreate) -> MealPlan:
+        """Create a new meal plan with meals."""
+        db_plan = meal_plan_to_row(meal_plan)
+        self.db.add(db_plan)
+        await self.db.commit()
+        return await self.get(db_plan.id)
+
+    async def get(self, plan_id: int) -> Optional[MealPlan]:
+        """Get a meal plan by ID."""
+        db_plan = await self.db.scalar(
+            self._select().where(MealPlanTable.id == plan_id).execution_options(populate_existing=True)
+        )
+        return meal_plan_to_model(db_plan) if db_plan else None
+
+    async def get_with_recipes(
+        self, plan_id: int, identity_map: Optional[RecipeIdentityMap] = None
+    ) -> Optional[MealPlanWithRecipes]:
+        """Get a meal plan with every recipe its slots refer to, in three queries."""
+        plan = await self.get(plan_id)
+        if plan is None:
+            return None
+        recipes = await AsyncRecipeRepository(self.db, identity_map).get_many(
+            meal.recipe_id for meal in plan.meals if meal.recipe_id is not None
+        )
+        return MealPlanWithRecipes(**dict(plan), recipes={recipe.id: recipe for recipe in recipes})
+
+    async def get_all(self) -> list[MealPlan]:
+        """Get all meal plans."""
+        result = await self.db.scalars(self._select().order_by(MealPlanTable.created_at.desc()))
+        return [meal_plan_to_model(p) for p in result]
+
+    async def get_current(self) -> Optional[MealPlan]:
+        """Get the current active meal plan."""
+        today = date.today()
+        db_plan = await self.db.scalar(
+            self._select()
+            .where(MealPlanTable.start_date <= today, MealPlanTable.end_date >= today)
+            .limit(1)
+        )
+        return meal_plan_to_model(db_plan) if db_plan else None
+
+    async def delete(self, plan_id: int) -> bool:
+        """Delete a meal plan by ID."""
+        db_plan = await self.db.scalar(self._select().where(MealPlanTable.id == plan_id))
+        if db_plan:
+            await self.db.delete(db_plan)
+            await self.db.commit()
+            return True
+        return False
+
+    async def add_slot(self, plan_id: int, meal: MealSlot) -> Optional[MealSlot]:
+        """Add a meal to a plan; returns it with its new id, or None if the plan does not exist."""
+        slot_id = await self._write(slots.insert_slot(plan_id, meal), scalar=True)
+        return meal.model_copy(update={"id": slot_id}) if slot_id is not None else None
+
+    async def update_slot(self, slot_id: int, meal: MealSlot) -> bool:
+        """Overwrite one slot with ``meal`` (its ``id`` is ignored)."""
+        return await self._write(slots.update_slot(slot_id, meal)) == 1
+
+    async def move_slot(self, slot_id: int, new_date: date, meal_type: Optional[MealType] = None) -> bool:
+        """Move a slot to another date and, optionally, another meal of the day."""
+        return await self._write(slots.move_slot(slot_id, new_date, meal_type)) == 1
+
+    async def swap_slots(self, first_id: int, second_id: int) -> bool:
+        """Exchange the meals of two slots, keeping their dates and meal types."""
+        return await self._write(slots.swap_slots(first_id, second_id)) == 2
+
+    async def delete_slot(self, slot_id: int) -> bool:
+        """Delete one slot."""
+        return await self._write(slots.delete_slot(slot_id)) == 1
+
+    async def reschedule(self, plan_id: int, days: int) -> int:
+        """Shift a plan and all its slots by ``days``; returns the number of slots moved."""
+        conn = await self.db.connection()
+        try:
+            moved = (await conn.execute(slots.reschedule_slots(plan_id, days))).rowcount
+            await conn.execute(slots.reschedule_plan(plan_id, days))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return moved
+
+    async def save(self, meal_plan: MealPlan) -> slots.SlotChanges:
+        """Write only what changed in an edited, previously saved plan (see ``MealPlanRepository.save``)."""
+        conn = await self.db.connection()
+        stored_plan = (await conn.execute(slots.stored_plan(meal_plan.id))).first()
+        if stored_plan is None:
+            await self.db.rollback()
+            raise ValueError(f"Meal plan {meal_plan.id} does not exist")
+        diff = slots.diff_slots(meal_plan, stored_plan, await conn.execute(slots.stored_slots(meal_plan.id)))
+        changes = diff.changes()
+        try:
+            for statement, parameters in diff.statements(meal_plan.id):
+                result = await conn.execute(statement, parameters)
+            if diff.inserts:
+                changes.new_slot_ids = list(result.scalars())
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return changes
+
+    async def _write(self, statement, scalar: bool = False):
+        """Run one statement in its own transaction; returns its rowcount (or scalar)."""
+        try:
+            result = await (await self.db.connection()).execute(statement)
+            value = result.scalar() if scalar else result.rowcount
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return value
+
+
+class AsyncPreferencesRepository:
+    """Async repository for user preferences (shares the process-local cache)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self) -> UserPreferences:
+        """Get user preferences (creates default if none exists)."""
+        bind = self.db.get_bind()
+        cached, stamp = preferences_cache.get(bind, settings.preferences_cache_ttl_seconds)
+        if cached is not None:
+            return cached
+        if stamp is not None and await self._probe() == stamp:
+            revalidated = preferences_cache.revalidate(bind)
+            if revalidated is not None:
+                return revalidated
+
+        db_prefs = await self._first()
+        if not db_prefs:
+            db_prefs = UserPreferencesTable()
+            self.db.add(db_prefs)
+            await self.db.commit()
+            await self.db.refresh(db_prefs)
+        return self._cache(db_prefs)
+
+    async def update(self, preferences: UserPreferences) -> UserPreferences:
+        """Update user preferences."""
+        db_prefs = await self._first()
+        if not db_prefs:
+            db_prefs = UserPreferencesTable()
+            self.db.add(db_prefs)
+
+        apply_preferences(db_prefs, preferences)
+        db_prefs.updated_at = datetime.utcnow()
+
+        try:
+            await self.db.commit()
+        except Exception:
+            preferences_cache.invalidate(self.db.get_bind())
+            raise
+        await self.db.refresh(db_prefs)
+        return self._cache(db_prefs)
+
+    async def _first(self) -> Optional[UserPreferencesTable]:
+        return await self.db.scalar(select(UserPreferencesTable).order_by(UserPreferencesTable.id).limit(1))
+
+    async def _probe(self) -> Optional[tuple]:
+        """Read the version stamp of the preferences row."""
+        row = (
+            await self.db.execute(
+                select(UserPreferencesTable.id, UserPreferencesTable.updated_at)
+                .order_by(UserPreferencesTable.id)
+                .limit(1)
+            )
+        ).first()
+        return tuple(row) if row else None
+
+    def _cache(self, db_prefs: UserPreferencesTable) -> UserPreferences:
+        """Convert a row and store it in the cache."""
+        preferences = preferences_to_model(db_prefs)
+        preferences_cache.put(self.db.get_bind(), preferences, (db_prefs.id, db_prefs.updated_at))
+        return preferences
+
+
+class AsyncChangeFeedRepository:
+    """Async access to the change log (see ``ChangeFeedRepository``)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def current_token(self) -> str:
+        """Get a token pointing after the newest change (to start syncing from now)."""
+        return str(await self.db.scalar(select(func.coalesce(func.max(ChangeTable.seq), 0))))
+
+
+class AsyncIdempotencyRepository:
+    """
+    Async access to responses stored under idempotency keys.
+
+    The first request with a key claims it by inserting a pending row; the
+    unique (scope, key) index makes concurrent claims race safely, so
+    exactly one of them wins and the others read the winner's row.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim(
+        self, scope: str, key: str, fingerprint: str, ttl_seconds: float, now: Optional[datetime] = None
+    ) -> tuple[IdempotencyRecord, bool]:
+        """
+        Claim a key for a new request, unless it is already taken.
+
+        An expired row for the key is replaced.
+
+        Returns:
+            The key's record and whether this call claimed it (False: the
+            record belongs to an earlier request, finished or in flight)
+        """
+        now = now or datetime.utcnow()
+        existing = await self._get(scope, key)
+        if existing is not None:
+            if existing.expires_at > now:
+                return idempotency_to_model(existing), False
+            await self.db.execute(delete(IdempotencyKeyTable).where(IdempotencyKeyTable.id == existing.id))
+
+        db_record = IdempotencyKeyTable(
+            scope=scope,
+            key=key,
+            fingerprint=fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds),
+        )
+        self.db.add(db_record)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another request claimed the key since the lookup
+            await self.db.rollback()
+            existing = await self._get(scope, key)
+            if existing is None:
+                raise
+            return idempotency_to_model(existing), False
+        return idempotency_to_model(db_record), True
+
+    async def get(self, scope: str, key: str) -> Optional[IdempotencyRecord]:
+        """Get the record of a key (expired ones included)."""
+        db_record = await self._get(scope, key)
+        return idempotency_to_model(db_record) if db_record else None
+
+    async def complete(self, scope: str, key: str, status_code: int, headers: dict[str, str], body: bytes) -> bool:
+        """Store the response of the request holding a key."""
+        return await self._write(
+            update(IdempotencyKeyTable)
+            .where(
+                IdempotencyKeyTable.scope == scope,
+                IdempotencyKeyTable.key == key,
+                IdempotencyKeyTable.status_code.is_(None),
+            )
+            .values(status_code=status_code, headers_json=codec.dumps(headers), body=body)
+        ) == 1
+
+    async def release(self, scope: str, key: str) -> bool:
+        """Give up an unfinished claim, so that a retry runs the request again."""
+        return await self._write(
+            delete(IdempotencyKeyTable).where(
+                IdempotencyKeyTable.scope == scope,
+                IdempotencyKeyTable.key == key,
+                IdempotencyKeyTable.status_code.is_(None),
+            )
+        ) == 1
+
+    async def take_over(self, scope: str, key: str, fingerprint: str, started_before: datetime) -> bool:
+        """
+        Claim a key whose first request, with the same ``fingerprint``,
+        started before ``started_before`` and never finished (its worker died).
+        """
+        return await self._write(
+            update(IdempotencyKeyTable)
+            .where(
+                IdempotencyKeyTable.scope == scope,
+                IdempotencyKeyTable.key == key,
+                IdempotencyKeyTable.fingerprint == fingerprint,
+                IdempotencyKeyTable.status_code.is_(None),
+                IdempotencyKeyTable.created_at < started_before,
+            )
+            .values(created_at=datetime.utcnow())
+        ) == 1
+
+    async def delete_expired(self, now: Optional[datetime] = None) -> int:
+        """Delete records past their expiry; returns how many."""
+        return await self._write(
+            delete(IdempotencyKeyTable).where(IdempotencyKeyTable.expires_at <= (now or datetime.utcnow()))
+        )
+
+    async def _get(self, scope: str, key: str) -> Optional[IdempotencyKeyTable]:
+        return await self.db.scalar(
+            select(IdempotencyKeyTable).where(IdempotencyKeyTable.scope == scope, IdempotencyKeyTable.key == key)
+        )
+
+    async def _write(self, statement) -> int:
+        try:
+            rowcount = (await self.db.execute(statement)).rowcount
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return rowcount
@@ -0,0 +1,330 @@
+"""Online backups, compaction snapshots and restore.
+
+Backups use SQLite's online backup API in page-stepped increments: each step
+copies ``backup_pages_per_step`` pages under a short read lock, then pauses
+so writers can commit. A file copy taken mid-write can be torn; a backup
+always reflects a committed state.
+
+Every snapshot is written to a ``.partial`` file, checked with
+``PRAGMA quick_check`` and only then renamed into place, so the backup
+directory never holds an unchecked file. ``compact_database`` writes a
+defragmented snapshot with ``VACUUM INTO``. The retention policy keeps the
+newest ``backup_keep`` snapshots. Each run appends its metrics (throughput,
+lock-hold times) to ``metrics.ndjson`` in the backup directory.
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
+
+from sqlalchemy.engine import Engine
+
+from chefwise import codec
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+from .cache import preferences_cache
+from .connection import engine as default_engine
+
+SNAPSHOT_PREFIX = "chefwise-"
+METRICS_FILE = "metrics.ndjson"
+
+
+class BackupError(Exception):
+    """A snapshot failed its integrity check or could not be written."""
+
+
+@dataclass
+class BackupResult:
+    """Outcome and metrics of one snapshot."""
+
+    path: Path
+    kind: str  # backup or vacuum
+    started_at: datetime
+    seconds: float
+    pages: int
+    bytes: int
+    steps: int
+    max_lock_hold_ms: float
+    mean_lock_hold_ms: float
+    integrity: str
+    pruned: list[Path] = field(default_factory=list)
+
+    @property
+    def throughput_mib_s(self) -> float:
+        """Megabytes copied per second."""
+        return self.bytes / 2**20 / self.seconds if self.seconds else 0.0
+
+
+def backup_directory(config: Optional[Settings] = None, directory: Optional[Path] = None) -> Path:
+    """Get the backup directory (``directory`` or the configured one), created on first use."""
+    config = config or settings
+    path = Path(directory or config.backup_dir)
+    if not path.is_absolute():
+        path = (config.project_root / path).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _snapshot_path(directory: Path, kind: str) -> Path:
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+    return directory / f"{SNAPSHOT_PREFIX}{stamp}-{kind}.db"
+
+
+def list_snapshots(directory: Optional[Path] = None) -> list[Path]:
+    """List finished snapshots, oldest first."""
+    directory = backup_directory(directory=directory)
+    return sorted(directory.glob(f"{SNAPSHOT_PREFIX}*.db"))
+
+
+def _read_only_uri(path: Union[str, Path]) -> str:
+    return f"{Path(path).resolve().as_uri()}?mode=ro"
+
+
+def quick_check(path: Union[str, Path]) -> str:
+    """Run ``PRAGMA quick_check`` on a database file; returns ``ok`` or the problems found."""
+    conn = sqlite3.connect(_read_only_uri(path), uri=True)
+    try:
+        rows = conn.execute("PRAGMA quick_check").fetchall()
+    finally:
+        conn.close()
+    return "\n".join(row[0] for row in rows)
+
+
+def prune_snapshots(keep: int, directory: Optional[Path] = None) -> list[Path]:
+    """Delete all but the newest ``keep`` snapshots; returns the deleted paths."""
+    snapshots = list_snapshots(directory)
+    doomed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in doomed:
+        path.unlink()
+    return doomed
+
+
+def _finish(partial: Path, result: BackupResult, directory: Path, keep: int) -> BackupResult:
+    """Check a written snapshot, move it into place, apply retention and record metrics."""
+    # Make the snapshot a self-contained single file
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+    result.integrity = quick_check(partial)
+    if result.integrity != "ok":
+        partial.unlink()
+        raise BackupError(f"Snapshot failed quick_check: {result.integrity}")
+    partial.rename(result.path)
+    result.bytes = result.path.stat().st_size
+    result.pruned = prune_snapshots(keep, directory)
+
+    record = asdict(result)
+    record.update(path=result.path.name, pruned=[p.name for p in result.pruned])
+    record["throughput_mib_s"] = round(result.throughput_mib_s, 3)
+    with open(directory / METRICS_FILE, "ab") as f:
+        f.write(codec.dumpb(record) + b"\n")
+    return result
+
+
+def backup_database(
+    bind: Optional[Engine] = None,
+    directory: Optional[Path] = None,
+    config: Optional[Settings] = None,
+) -> BackupResult:
+    """
+    Take an online backup without blocking writers for more than one step.
+
+    Under WAL the copy reads from one pinned snapshot, so writers are never
+    blocked. With a rollback journal, steps release the read lock and pause
+    so writers can commit; a commit from another connection makes SQLite
+    restart the copy.
+
+    Args:
+        bind: Engine of the database to back up (defaults to the app database)
+        directory: Backup directory (defaults to ``settings.backup_dir``)
+        config: Settings for step size, pause and retention
+
+    Returns:
+        The snapshot path and its metrics
+
+    Raises:
+        BackupError: If the snapshot fails its integrity check
+    """
+    bind = bind or default_engine
+    config = config or settings
+    directory = backup_directory(config, directory)
+    path = _snapshot_path(directory, "backup")
+    partial = path.with_name(path.name + ".partial")
+
+    pause = config.backup_step_pause_ms / 1000
+    holds: list[float] = []
+    pages = 0
+    started_at = datetime.utcnow()
+    start = step_start = time.perf_counter()
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal pages, step_start
+        holds.append(time.perf_counter() - step_start)
+        pages = total
+        if remaining:
+            time.sleep(pause)
+        step_start = time.perf_counter()
+
+    source = bind.raw_connection()
+    target = sqlite3.connect(partial)
+    try:
+        driver = source.driver_connection
+        # Under WAL an open read transaction pins a snapshot: writers carry on,
+        # and their commits no longer make the backup restart from page one
+        wal = driver.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        if wal:
+            driver.execute("BEGIN")
+            driver.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        try:
+            driver.backup(target, pages=config.backup_pages_per_step, progress=progress)
+        finally:
+            if wal:
+                driver.rollback()
+    finally:
+        target.close()
+        source.close()
+
+    result = BackupResult(
+        path=path,
+        kind="backup",
+        started_at=started_at,
+        seconds=time.perf_counter() - start,
+        pages=pages,
+        bytes=0,
+        steps=len(holds),
+        max_lock_hold_ms=max(holds, default=0.0) * 1000,
+        mean_lock_hold_ms=sum(holds) / len(holds) * 1000 if holds else 0.0,
+        integrity="",
+    )
+    return _finish(partial, result, directory, config.backup_keep)
+
+
+def compact_database(
+    bind: Optional[Engine] = None,
+    directory: Optional[Path] = None,
+    config: Optional[Settings] = None,
+) -> BackupResult:
+    """
+    Write a compacted snapshot with ``VACUUM INTO``.
+
+    The copy runs inside one read transaction: under WAL writers continue,
+    but the read lock is held for the whole run (reported as one step).
+    """
+    bind = bind or default_engine
+    config = config or settings
+    directory = backup_directory(config, directory)
+    path = _snapshot_path(directory, "vacuum")
+    partial = path.with_name(path.name + ".partial")
+
+    started_at = datetime.utcnow()
+    start = time.perf_counter()
+    source = bind.raw_connection()
+    try:
+        source.driver_connection.execute("VACUUM INTO ?", (str(partial),))
+        pages = source.driver_connection.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        source.close()
+    seconds = time.perf_counter() - start
+
+    result = BackupResult(
+        path=path,
+        kind="vacuum",
+        started_at=started_at,
+        seconds=seconds,
+        pages=pages,
+        bytes=0,
+        steps=1,
+        max_lock_hold_ms=seconds * 1000,
+        mean_lock_hold_ms=seconds * 1000,
+        integrity="",
+    )
+    return _finish(partial, result, directory, config.backup_keep)
+
+
+def restore_database(snapshot: Union[str, Path], bind: Optional[Engine] = None) -> None:
+    """
+    Replace the live database with a snapshot.
+
+    The snapshot is integrity-checked first and copied with the backup API,
+    so open connections see either the old or the restored database. The
+    schema is migrated afterwards in case the snapshot predates it.
+
+    Raises:
+        BackupError: If the snapshot fails its integrity check
+    """
+    from .connection import init_db
+
+    bind = bind or default_engine
+    integrity = quick_check(snapshot)
+    if integrity != "ok":
+        raise BackupError(f"Refusing to restore {snapshot}: {integrity}")
+
+    source = sqlite3.connect(_read_only_uri(snapshot), uri=True)
+    target = bind.raw_connection()
+    try:
+        source.backup(target.driver_connection)
+    finally:
+        target.close()
+        source.close()
+
+    preferences_cache.invalidate(bind)
+    init_db(bind)
+
+
+class BackupScheduler:
+    """Run backups and compactions on a fixed schedule in a daemon thread."""
+
+    def __init__(self, bind: Optional[Engine] = None, config: Optional[Settings] = None):
+        self.bind = bind or default_engine
+        self.config = config or settings
+        self.last_results: dict[str, BackupResult] = {}
+        self.last_error: Optional[Exception] = None
+        self._due = {"backup": 0.0, "vacuum": 0.0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_pending(self, now: Optional[float] = None) -> list[BackupResult]:
+        """Run whatever is due at ``now`` (monotonic seconds) and reschedule it."""
+        now = time.monotonic() if now is None else now
+        intervals = {
+            "backup": self.config.backup_interval_hours * 3600,
+            "vacuum": self.config.vacuum_interval_hours * 3600,
+        }
+        jobs = {"backup": backup_database, "vacuum": compact_database}
+        results = []
+        for kind, due in self._due.items():
+            if now >= due:
+                # Rescheduled first so a failing job is retried next interval, not in a loop
+                self._due[kind] = now + intervals[kind]
+                result = jobs[kind](self.bind, config=self.config)
+                self.last_results[kind] = result
+                results.append(result)
+        return results
+
+    def start(self) -> None:
+        """Start the scheduler thread (first backup and compaction run immediately)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chefwise-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the scheduler thread after the current job."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except (BackupError, sqlite3.Error) as e:
+                self.last_error = e
+            self._stop.wait(max(min(self._due.values()) - time.monotonic(), 1.0))
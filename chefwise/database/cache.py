@@ -0,0 +1,113 @@
+"""Process-local caches for rarely changing rows."""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy.engine import Engine
+
+from chefwise.models import Recipe, UserPreferences
+
+
+@dataclass
+class _Entry:
+    preferences: UserPreferences
+    stamp: Any
+    checked_at: float
+
+
+class PreferencesCache:
+    """
+    Cache of the user preferences row, one entry per engine.
+
+    Each entry carries a version stamp (the row's id and ``updated_at``).
+    Within ``ttl_seconds`` of the last check an entry is served without
+    touching the database; after that, callers compare the stamp against a
+    one-column probe query to pick up changes made by other processes.
+    """
+
+    def __init__(self):
+        self._entries: "WeakKeyDictionary[Engine, _Entry]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, engine: Engine, ttl_seconds: float) -> tuple[Optional[UserPreferences], Any]:
+        """
+        Look up the cached preferences for an engine.
+
+        Returns:
+            ``(preferences, None)`` if the entry is fresh,
+            ``(None, stamp)`` if it must be revalidated against ``stamp``,
+            ``(None, None)`` if nothing is cached
+        """
+        with self._lock:
+            entry = self._entries.get(engine)
+            if entry is None:
+                return None, None
+            if time.monotonic() - entry.checked_at < ttl_seconds:
+                return entry.preferences.model_copy(deep=True), None
+            return None, entry.stamp
+
+    def revalidate(self, engine: Engine) -> Optional[UserPreferences]:
+        """Mark the entry as checked now and return it."""
+        with self._lock:
+            entry = self._entries.get(engine)
+            if entry is None:
+                return None
+            entry.checked_at = time.monotonic()
+            return entry.preferences.model_copy(deep=True)
+
+    def put(self, engine: Engine, preferences: UserPreferences, stamp: Any) -> None:
+        """Store preferences read from or written to the database."""
+        with self._lock:
+            self._entries[engine] = _Entry(preferences.model_copy(deep=True), stamp, time.monotonic())
+
+    def invalidate(self, engine: Optional[Engine] = None) -> None:
+        """Drop the entry for one engine, or all entries."""
+        with self._lock:
+            if engine is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(engine, None)
+
+
+preferences_cache = PreferencesCache()
+
+
+class RecipeIdentityMap:
+    """
+    Request-scoped map of recipe id to the ``Recipe`` already loaded.
+
+    Pass one to ``RecipeRepository`` (or ``get_with_recipes``) for the
+    lifetime of a request or a page render: every recipe is then loaded at
+    most once, however many slots or lookups refer to it. There is no
+    invalidation beyond the repository's own deletes, so do not keep one
+    across requests. Not thread-safe.
+    """
+
+    def __init__(self):
+        self._recipes: dict[int, Recipe] = {}
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._recipes
+
+    def get(self, recipe_id: int) -> Optional[Recipe]:
+        """The loaded recipe, or None if it has not been loaded yet."""
+        return self._recipes.get(recipe_id)
+
+    def put(self, recipe: Recipe) -> None:
+        """Remember a loaded recipe."""
+        self._recipes[recipe.id] = recipe
+
+    def discard(self, recipe_id: int) -> None:
+        """Forget a recipe (after it was deleted)."""
+        self._recipes.pop(recipe_id, None)
+
+    def split(self, recipe_ids: list[int]) -> tuple[dict[int, Recipe], list[int]]:
+        """Split ids into the recipes already loaded and the ids still to fetch."""
+        found = {i: self._recipes[i] for i in recipe_ids if i in self._recipes}
+        return found, [i for i in recipe_ids if i not in found]
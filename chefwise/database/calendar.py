@@ -0,0 +1,123 @@
+"""Calendar views over meal slots across all plans.
+
+Plans may overlap, so "what am I eating on these days" is a question about
+slots, not plans. The queries here read ``meal_slots`` by date range through
+the covering ``ix_meal_slots_calendar`` index and return lightweight tuples
+instead of hydrated ``MealPlan`` objects.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import func, select
+
+from chefwise.models import MealType
+from .tables import MealSlotTable
+
+# Order of meals within a day (meal types sort alphabetically in the index)
+MEAL_ORDER = {meal_type.value: n for n, meal_type in enumerate(MealType)}
+
+
+class CalendarEntry(NamedTuple):
+    """One planned meal."""
+
+    slot_id: int
+    plan_id: int
+    date: date
+    meal_type: str
+    recipe_id: Optional[int]
+    recipe_title: str
+
+
+@dataclass
+class CalendarDay:
+    """The meals planned for one day, in meal order."""
+
+    date: date
+    meals: list[CalendarEntry] = field(default_factory=list)
+
+    def by_meal_type(self) -> dict[str, list[CalendarEntry]]:
+        """Meals grouped by meal type."""
+        grouped: dict[str, list[CalendarEntry]] = {}
+        for meal in self.meals:
+            grouped.setdefault(meal.meal_type, []).append(meal)
+        return grouped
+
+
+@dataclass
+class Calendar:
+    """Planned meals between two dates (inclusive); only days with meals are stored."""
+
+    start: date
+    end: date
+    days: dict[date, CalendarDay] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return sum(len(day.meals) for day in self.days.values())
+
+    def day(self, day: date) -> CalendarDay:
+        """The meals on one day (empty if nothing is planned)."""
+        return self.days.get(day) or CalendarDay(day)
+
+    def each_day(self) -> Iterator[CalendarDay]:
+        """Every day of the range, including days without meals."""
+        for offset in range((self.end - self.start).days + 1):
+            yield self.day(self.start + timedelta(days=offset))
+
+
+def _meal_types(meal_types: Optional[Iterable]) -> Optional[list[str]]:
+    if meal_types is None:
+        return None
+    return [m.value if isinstance(m, MealType) else m for m in meal_types]
+
+
+def _in_range(statement, start: date, end: date, meal_types: Optional[Iterable]):
+    statement = statement.where(MealSlotTable.date >= start, MealSlotTable.date <= end)
+    types = _meal_types(meal_types)
+    if types is not None:
+        statement = statement.where(MealSlotTable.meal_type.in_(types))
+    return statement
+
+
+def entries_query(start: date, end: date, meal_types: Optional[Iterable] = None):
+    """Select ``CalendarEntry`` rows in date order."""
+    statement = select(
+        MealSlotTable.id,
+        MealSlotTable.meal_plan_id,
+        MealSlotTable.date,
+        MealSlotTable.meal_type,
+        MealSlotTable.recipe_id,
+        MealSlotTable.recipe_title,
+    )
+    return _in_range(statement, start, end, meal_types).order_by(MealSlotTable.date)
+
+
+def day_counts_query(start: date, end: date, meal_types: Optional[Iterable] = None):
+    """Select ``(date, meal_type, count)`` for every day and meal type with meals."""
+    statement = select(MealSlotTable.date, MealSlotTable.meal_type, func.count())
+    return (
+        _in_range(statement, start, end, meal_types)
+        .group_by(MealSlotTable.date, MealSlotTable.meal_type)
+        .order_by(MealSlotTable.date, MealSlotTable.meal_type)
+    )
+
+
+def group_days(rows: Iterable) -> Iterator[CalendarDay]:
+    """Group date-ordered entry rows into days, sorting each day by meal order."""
+    day: Optional[CalendarDay] = None
+    for row in rows:
+        entry = CalendarEntry(*row)
+        if day is None or entry.date != day.date:
+            if day is not None:
+                day.meals.sort(key=_meal_sort_key)
+                yield day
+            day = CalendarDay(entry.date)
+        day.meals.append(entry)
+    if day is not None:
+        day.meals.sort(key=_meal_sort_key)
+        yield day
+
+
+def _meal_sort_key(entry: CalendarEntry) -> tuple:
+    return MEAL_ORDER.get(entry.meal_type, len(MEAL_ORDER)), entry.slot_id
@@ -0,0 +1,373 @@
+"""Columnar in-memory recipe catalog for fast filtering and sorting.
+
+The catalog keeps one NumPy array per sortable/filterable column (ids,
+created_at, prep/cook/total time, servings, interned cuisine and difficulty
+codes) plus case-folded title and description buffers, all built from a
+single projection query. Queries are vectorized: a filter is a boolean mask, a sort
+is ``lexsort`` and top-k uses ``argpartition``, so listing thousands of
+recipes takes microseconds instead of building pydantic objects on every
+rerun. Results match ``RecipeRepository.filter``: text matches fold ASCII
+case only, like SQLite's ``LIKE``, and titles sort by code point, like its
+BINARY collation.
+
+Catalogs are process-local, one per engine (see ``recipe_catalog``). They
+follow the change feed: every lookup compares the newest change sequence
+with the one the catalog has applied and replays only the recipe rows that
+were created, updated or deleted since, including writes from other
+processes.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .tables import ChangeTable, RecipeTable
+
+# Stored for NULL times, codes and dates; sorts first like NULL in SQLite
+MISSING = -1
+
+CATALOG_SORTS = ("newest", "oldest", "title", "title_desc", "total_time")
+
+# Separates rows in the text buffers so a match cannot span two recipes
+_SEPARATOR = "\x00"
+
+# SQLite's LIKE folds ASCII letters only ("É" does not match "é"); the text buffers fold the same way
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ" + _SEPARATOR, "abcdefghijklmnopqrstuvwxyz ")
+
+_PROJECTION = (
+    RecipeTable.id,
+    RecipeTable.created_at,
+    RecipeTable.prep_time_minutes,
+    RecipeTable.cook_time_minutes,
+    RecipeTable.servings,
+    RecipeTable.cuisine,
+    RecipeTable.difficulty,
+    RecipeTable.title,
+    RecipeTable.description,
+)
+
+
+@dataclass
+class CatalogResult:
+    """Ids of the matching recipes in sort order, and the total match count."""
+
+    ids: np.ndarray
+    total: int
+
+
+class _Interner:
+    """Map strings to small integer codes and back."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+    def array(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        """Codes of ``values`` in the narrowest integer type that holds every code so far."""
+        codes = [self.code(value) for value in values]
+        # A signed type holding -(size + 1) holds MISSING and the largest code
+        return np.array(codes, dtype=np.min_scalar_type(-len(self.values) - 1))
+
+
+def _fold(text: Optional[str]) -> str:
+    """Lowercase ASCII letters only, as SQLite's ``LIKE`` compares them."""
+    return (text or "").translate(_ASCII_LOWER)
+
+
+class _TextColumn:
+    """ASCII-lowercased strings stored as one buffer with row offsets."""
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts = [_fold(text) for text in texts]
+        self._buffer: Optional[str] = None
+        self._starts: Optional[np.ndarray] = None
+
+    def append(self, texts: Iterable[str]) -> None:
+        self.texts.extend(_fold(text) for text in texts)
+        self._buffer = None
+
+    def take(self, positions: np.ndarray) -> None:
+        self.texts = [self.texts[i] for i in positions]
+        self._buffer = None
+
+    def _build(self) -> None:
+        self._buffer = _SEPARATOR.join(self.texts) + _SEPARATOR
+        lengths = np.fromiter((len(t) + 1 for t in self.texts), dtype=np.int64, count=len(self.texts))
+        self._starts = np.concatenate(([0], np.cumsum(lengths)))
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Boolean mask of rows containing ``needle`` (already folded)."""
+        if self._buffer is None:
+            self._build()
+        mask = np.zeros(len(self.texts), dtype=bool)
+        starts, find = self._starts, self._buffer.find
+        position = find(needle)
+        while position != -1:
+            row = int(np.searchsorted(starts, position, side="right")) - 1
+            mask[row] = True
+            # Skip the rest of this row: one hit per recipe is enough
+            position = find(needle, int(starts[row + 1]))
+        return mask
+
+
+class RecipeCatalog:
+    """Columnar snapshot of the recipe table with vectorized queries."""
+
+    def __init__(self, rows: Iterable[Sequence] = (), token: int = 0):
+        self.cuisines = _Interner()
+        self.difficulties = _Interner()
+        self.token = token
+        self._lock = threading.RLock()
+        self._title_order: Optional[np.ndarray] = None
+        self._set_rows(list(rows))
+
+    @classmethod
+    def build(cls, db: Session) -> "RecipeCatalog":
+        """Build a catalog from one projection query."""
+        token = db.query(func.coalesce(func.max(ChangeTable.seq), 0)).scalar()
+        return cls(db.query(*_PROJECTION).all(), token=token)
+
+    def _columns(self, rows: list[Sequence]) -> dict[str, np.ndarray]:
+        count = len(rows)
+
+        def ints(index: int, dtype) -> np.ndarray:
+            return np.fromiter(
+                (MISSING if row[index] is None else row[index] for row in rows), dtype=dtype, count=count
+            )
+
+        created = np.array(
+            [MISSING if row[1] is None else np.datetime64(row[1], "us").astype(np.int64) for row in rows],
+            dtype=np.int64,
+        )
+        prep, cook = ints(2, np.int32), ints(3, np.int32)
+        total = np.where((prep == MISSING) & (cook == MISSING), MISSING, np.maximum(prep, 0) + np.maximum(cook, 0))
+        return {
+            "ids": ints(0, np.int64),
+            "created_at": created,
+            "prep": prep,
+            "cook": cook,
+            "total": total.astype(np.int32),
+            "servings": ints(4, np.int32),
+            # Sized to the vocabulary; concatenating in a wider batch widens the whole column
+            "cuisine": self.cuisines.array(row[5] for row in rows),
+            "difficulty": self.difficulties.array(row[6] for row in rows),
+        }
+
+    def _set_rows(self, rows: list[Sequence]) -> None:
+        self._data = self._columns(rows)
+        self.titles = [row[7] for row in rows]
+        self._title_text = _TextColumn(self.titles)
+        self._description_text = _TextColumn([row[8] for row in rows])
+        self._positions = {int(i): n for n, i in enumerate(self._data["ids"])}
+        self._title_order = None
+
+    def __len__(self) -> int:
+        return len(self._data["ids"])
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the numeric columns (the text buffers are not counted)."""
+        return sum(column.nbytes for column in self._data.values())
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Read-only access to the columns: catalog.ids, catalog.total, ...
+        try:
+            return self.__dict__["_data"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    # Incremental maintenance
+
+    def upsert(self, rows: Iterable[Sequence]) -> None:
+        """Add projection rows, replacing rows with the same id."""
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            self.remove(row[0] for row in rows)
+            new = self._columns(rows)
+            self._data = {name: np.concatenate((column, new[name])) for name, column in self._data.items()}
+            start = len(self.titles)
+            self.titles.extend(row[7] for row in rows)
+            self._title_text.append(row[7] for row in rows)
+            self._description_text.append(row[8] for row in rows)
+            self._positions.update((int(row[0]), start + n) for n, row in enumerate(rows))
+            self._title_order = None
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Drop rows by id (unknown ids are ignored)."""
+        with self._lock:
+            doomed = [self._positions[i] for i in ids if i in self._positions]
+            if not doomed:
+                return
+            keep = np.ones(len(self), dtype=bool)
+            keep[doomed] = False
+            positions = np.flatnonzero(keep)
+            self._data = {name: column[keep] for name, column in self._data.items()}
+            self.titles = [self.titles[i] for i in positions]
+            self._title_text.take(positions)
+            self._description_text.take(positions)
+            self._positions = {int(i): n for n, i in enumerate(self._data["ids"])}
+            self._title_order = None
+
+    def sync(self, db: Session) -> bool:
+        """
+        Apply recipe changes recorded after this catalog's token.
+
+        Returns:
+            Whether anything changed
+        """
+        with self._lock:
+            latest = db.query(func.coalesce(func.max(ChangeTable.seq), 0)).scalar()
+            if latest <= self.token:
+                return False
+            changes = (
+                db.query(ChangeTable.entity_id, ChangeTable.op)
+                .filter(ChangeTable.seq > self.token, ChangeTable.seq <= latest, ChangeTable.entity == "recipe")
+                .all()
+            )
+            upserts = [entity_id for entity_id, op in changes if op == "upsert"]
+            self.remove(entity_id for entity_id, op in changes if op == "delete")
+            if upserts:
+                self.upsert(db.query(*_PROJECTION).filter(RecipeTable.id.in_(upserts)).all())
+            self.token = latest
+        return bool(changes)
+
+    # Queries
+
+    def mask(
+        self,
+        query: Optional[str] = None,
+        cuisine: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        max_total_time: Optional[int] = None,
+    ) -> np.ndarray:
+        """Boolean mask of rows matching every given filter."""
+        data = self._data
+        mask = np.ones(len(self), dtype=bool)
+        if cuisine is not None:
+            code = self.cuisines.lookup(cuisine)
+            mask &= (data["cuisine"] == code) if code is not None else False
+        if difficulty is not None:
+            code = self.difficulties.lookup(difficulty)
+            mask &= (data["difficulty"] == code) if code is not None else False
+        if max_total_time is not None:
+            mask &= (data["total"] != MISSING) & (data["total"] <= max_total_time)
+        if query:
+            needle = _fold(query)
+            mask &= self._title_text.contains(needle) | self._description_text.contains(needle)
+        return mask
+
+    def _sort_keys(self, sort: str, rows: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Keys for ``np.lexsort`` (last key is primary; id breaks ties)."""
+        data = self._data
+        ids = data["ids"][rows]
+        if sort == "newest":
+            return -ids, -data["created_at"][rows]
+        if sort == "oldest":
+            return ids, data["created_at"][rows]
+        if sort in ("title", "title_desc"):
+            if self._title_order is None:
+                # Raw titles: code point order is SQLite's BINARY collation ("Zebra" < "apple")
+                titles, all_ids = self.titles, data["ids"]
+                order = sorted(range(len(titles)), key=lambda n: (titles[n], all_ids[n]))
+                self._title_order = np.empty(len(order), dtype=np.int64)
+                self._title_order[order] = np.arange(len(order))
+            rank = self._title_order[rows]
+            return (rank,) if sort == "title" else (-rank,)
+        if sort == "total_time":
+            return ids, data["total"][rows]
+        raise ValueError(f"Unknown sort '{sort}'. Choose from: {', '.join(CATALOG_SORTS)}")
+
+    def query(
+        self,
+        query: Optional[str] = None,
+        cuisine: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        max_total_time: Optional[int] = None,
+        sort: str = "newest",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> CatalogResult:
+        """
+        Filter and sort the catalog.
+
+        Args:
+            query: Substring of the title or description (ASCII case-insensitive)
+            cuisine: Exact cuisine
+            difficulty: Exact difficulty
+            max_total_time: Maximum prep + cook minutes (recipes without times are excluded)
+            sort: One of ``CATALOG_SORTS``
+            limit: Maximum ids to return (None for all); small limits use a partial sort
+            offset: Ids to skip, for paging
+
+        Returns:
+            Matching ids in order and the number of matches
+        """
+        with self._lock:
+            rows = np.flatnonzero(self.mask(query, cuisine, difficulty, max_total_time))
+            total = len(rows)
+            keys = self._sort_keys(sort, rows)
+            end = None if limit is None else offset + limit
+            if end is not None and 0 < end < total // 2:
+                rows, keys = self._top_candidates(rows, keys, end)
+            order = rows[np.lexsort(keys)]
+            return CatalogResult(ids=self._data["ids"][order[offset:end]], total=total)
+
+    def top_k(self, k: int, sort: str = "newest", **filters) -> np.ndarray:
+        """Ids of the first ``k`` matches in sort order."""
+        return self.query(sort=sort, limit=k, **filters).ids
+
+    @staticmethod
+    def _top_candidates(rows: np.ndarray, keys: tuple, k: int) -> tuple[np.ndarray, tuple]:
+        """Keep rows whose primary key can be among the first ``k`` (ties included)."""
+        primary = keys[-1]
+        threshold = np.partition(primary, k - 1)[k - 1]
+        keep = primary <= threshold
+        return rows[keep], tuple(key[keep] for key in keys)
+
+    def counts(self, column: str) -> dict[str, int]:
+        """Recipes per cuisine or difficulty."""
+        interner = {"cuisine": self.cuisines, "difficulty": self.difficulties}[column]
+        codes = self._data[column]
+        bins = np.bincount(codes[codes != MISSING].astype(np.int64), minlength=len(interner.values))
+        return {value: int(count) for value, count in zip(interner.values, bins) if count}
+
+
+_catalogs: "WeakKeyDictionary[Engine, RecipeCatalog]" = WeakKeyDictionary()
+_catalogs_lock = threading.Lock()
+
+
+def recipe_catalog(db: Session) -> RecipeCatalog:
+    """
+    Get the up-to-date catalog for the session's engine.
+
+    The first call builds it; later calls cost one ``MAX(seq)`` lookup plus
+    the changed rows, if any.
+    """
+    bind = db.get_bind()
+    with _catalogs_lock:
+        catalog = _catalogs.get(bind)
+        if catalog is None:
+            catalog = _catalogs[bind] = RecipeCatalog.build(db)
+            return catalog
+    catalog.sync(db)
+    return catalog
@@ -1,20 +1,154 @@
 """Database connection and session management."""
 
 from contextlib import contextmanager
-from typing import Generator
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, Optional, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from chefwise.config import settings
+from chefwise.config.settings import Settings
 
+if TYPE_CHECKING:
+    # Imported where used: the asyncio extension is only needed by the async API
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
-# Create engine with SQLite-specific settings
-engine = create_engine(
-    f"sqlite:///{settings.db_path}",
-    connect_args={"check_same_thread": False},  # Needed for SQLite with threads
-    echo=settings.debug,
-)
+
+def is_memory_url(url: str) -> bool:
+    """Return True if the URL points at an in-memory SQLite database."""
+    parsed = make_url(url)
+    database = parsed.database or ""
+    return parsed.drivername.startswith("sqlite") and (
+        database in ("", ":memory:") or "mode=memory" in database
+    )
+
+
+def sqlite_pragmas(config: Settings, memory: bool = False) -> list[tuple[str, object]]:
+    """Build the PRAGMA statements applied to each new SQLite connection."""
+    pragmas: list[tuple[str, object]] = [
+        ("busy_timeout", config.sqlite_busy_timeout_ms),
+        ("synchronous", config.sqlite_synchronous),
+        ("cache_size", config.sqlite_cache_size),
+        ("temp_store", config.sqlite_temp_store),
+    ]
+    # WAL and mmap only make sense for databases backed by a file
+    if not memory:
+        pragmas.insert(0, ("journal_mode", config.sqlite_journal_mode))
+        pragmas.append(("mmap_size", config.sqlite_mmap_size))
+    return pragmas
+
+
+def _install_pragma_hook(engine: Engine, pragmas: list[tuple[str, object]]) -> None:
+    """Apply the given PRAGMAs whenever the pool opens a new DBAPI connection."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def to_async_url(url: str) -> str:
+    """Swap a synchronous SQLite URL to the aiosqlite driver."""
+    parsed = make_url(url)
+    if parsed.drivername in ("sqlite", "sqlite+pysqlite"):
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def create_db_engine(url: Optional[str] = None, config: Optional[Settings] = None) -> Engine:
+    """
+    Create an engine for the configured database.
+
+    Args:
+        url: Database URL (defaults to ``settings.database_url``)
+        config: Settings to read tuning options from (defaults to global settings)
+
+    Returns:
+        Engine with SQLite PRAGMAs applied on connect
+    """
+    config = config or settings
+    url = url or config.resolved_database_url
+
+    if not make_url(url).drivername.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_pre_ping=True,
+            echo=config.debug,
+        )
+
+    memory = is_memory_url(url)
+    if memory:
+        # Every connection to ":memory:" is a new, empty database, so share one
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=config.debug,
+        )
+    else:
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},  # Needed for SQLite with threads
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            echo=config.debug,
+        )
+
+    _install_pragma_hook(engine, sqlite_pragmas(config, memory=memory))
+    return engine
+
+
+def create_async_db_engine(url: Optional[str] = None, config: Optional[Settings] = None) -> "AsyncEngine":
+    """
+    Create an asyncio engine for the configured database.
+
+    Takes the same URL and settings as ``create_db_engine``; SQLite URLs are
+    switched to the aiosqlite driver and get the same PRAGMA hook.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    config = config or settings
+    url = to_async_url(url or config.resolved_database_url)
+
+    if not make_url(url).drivername.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_pre_ping=True,
+            echo=config.debug,
+        )
+
+    memory = is_memory_url(url)
+    if memory:
+        async_engine = create_async_engine(url, poolclass=StaticPool, echo=config.debug)
+    else:
+        async_engine = create_async_engine(
+            url,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            echo=config.debug,
+        )
+
+    _install_pragma_hook(async_engine.sync_engine, sqlite_pragmas(config, memory=memory))
+    return async_engine
+
+
+# Create engine from settings
+engine = create_db_engine()
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -43,7 +177,41 @@ def get_db_context() -> Generator[Session, None, None]:
         db.close()
 
 
-def init_db() -> None:
-    """Initialize the database by creating all tables."""
+@lru_cache
+def get_async_sessionmaker() -> "async_sessionmaker[AsyncSession]":
+    """Get the async session factory, creating the async engine on first use."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(create_async_db_engine(), expire_on_commit=False, autoflush=False)
+
+
+async def async_get_db() -> AsyncGenerator["AsyncSession", None]:
+    """Get an async database session."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def init_db(bind: Optional[Union[Engine, Connection]] = None) -> None:
+    """
+    Initialize the database by creating missing tables and applying migrations.
+
+    A database already at the newest schema version is left alone after a
+    single version lookup, so calling this on every start is cheap.
+    """
+    from .migrations import current_version, head_version, migrate
+
+    bind = bind or engine
+    if current_version(bind) == head_version():
+        return
+
     from .tables import Base
-    Base.metadata.create_all(bind=engine)
+
+    Base.metadata.create_all(bind=bind)
+    migrate(bind)
+
+
+async def async_init_db(bind: "AsyncEngine") -> None:
+    """Initialize the database behind an async engine."""
+    async with bind.connect() as conn:
+        await conn.run_sync(init_db)
+        await conn.commit()
@@ -0,0 +1,181 @@
+"""Conversions between table rows and Pydantic models.
+
+Shared by the synchronous and asynchronous repositories so both produce
+identical rows and models.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from chefwise import codec
+from chefwise.models import (
+    IdempotencyRecord,
+    Ingredient,
+    Job,
+    JobStatus,
+    MealPlan,
+    MealPlanCreate,
+    MealSlot,
+    Recipe,
+    RecipeCreate,
+    UserPreferences,
+)
+from .dedup import recipe_fingerprint
+from .tables import IdempotencyKeyTable, JobTable, MealPlanTable, MealSlotTable, RecipeTable, UserPreferencesTable
+
+
+def recipe_values(recipe: RecipeCreate) -> dict:
+    """Column values for a new recipe row (also used by bulk inserts)."""
+    return {
+        "title": recipe.title,
+        "description": recipe.description,
+        "ingredients_json": codec.dumps([ing.model_dump() for ing in recipe.ingredients]),
+        "instructions_json": codec.dumps(recipe.instructions),
+        "prep_time_minutes": recipe.prep_time_minutes,
+        "cook_time_minutes": recipe.cook_time_minutes,
+        "servings": recipe.servings,
+        "dietary_tags_json": codec.dumps([t.value if hasattr(t, 'value') else t for t in recipe.dietary_tags]),
+        "cuisine": recipe.cuisine,
+        "difficulty": recipe.difficulty,
+        "content_hash": recipe_fingerprint(recipe),
+    }
+
+
+def recipe_to_model(db_recipe: RecipeTable) -> Recipe:
+    """Convert a recipe row to a Pydantic model."""
+    return Recipe(
+        id=db_recipe.id,
+        title=db_recipe.title,
+        description=db_recipe.description,
+        ingredients=codec.decode(db_recipe.ingredients_json, list[Ingredient]),
+        instructions=codec.loads(db_recipe.instructions_json),
+        prep_time_minutes=db_recipe.prep_time_minutes,
+        cook_time_minutes=db_recipe.cook_time_minutes,
+        servings=db_recipe.servings,
+        dietary_tags=codec.loads(db_recipe.dietary_tags_json),
+        cuisine=db_recipe.cuisine,
+        difficulty=db_recipe.difficulty,
+        created_at=db_recipe.created_at,
+        updated_at=db_recipe.updated_at,
+    )
+
+
+def meal_slot_values(meal: MealSlot) -> dict:
+    """Column values for a new meal slot row, without the plan id."""
+    return {
+        "date": meal.date,
+        "meal_type": meal.meal_type.value if hasattr(meal.meal_type, 'value') else meal.meal_type,
+        "recipe_id": meal.recipe_id,
+        "recipe_title": meal.recipe_title,
+        "notes": meal.notes,
+    }
+
+
+def meal_slot_to_row(meal: MealSlot) -> MealSlotTable:
+    """Build a new meal slot row (the plan is set by the caller)."""
+    return MealSlotTable(**meal_slot_values(meal))
+
+
+def meal_plan_to_row(meal_plan: MealPlanCreate) -> MealPlanTable:
+    """Build a new meal plan row together with its slots."""
+    return MealPlanTable(
+        name=meal_plan.name,
+        start_date=meal_plan.start_date,
+        end_date=meal_plan.end_date,
+        notes=meal_plan.notes,
+        meals=[meal_slot_to_row(meal) for meal in meal_plan.meals],
+    )
+
+
+def meal_slot_to_model(slot: MealSlotTable) -> MealSlot:
+    """Convert a meal slot row to a Pydantic model."""
+    return MealSlot(
+        id=slot.id,
+        date=slot.date,
+        meal_type=slot.meal_type,
+        recipe_id=slot.recipe_id,
+        recipe_title=slot.recipe_title,
+        notes=slot.notes,
+    )
+
+
+def meal_plan_to_model(db_plan: MealPlanTable) -> MealPlan:
+    """Convert a meal plan row (with its slots loaded) to a Pydantic model."""
+    return MealPlan(
+        id=db_plan.id,
+        name=db_plan.name,
+        start_date=db_plan.start_date,
+        end_date=db_plan.end_date,
+        meals=[meal_slot_to_model(slot) for slot in db_plan.meals],
+        notes=db_plan.notes,
+        created_at=db_plan.created_at,
+        updated_at=db_plan.updated_at,
+    )
+
+
+def apply_preferences(db_prefs: UserPreferencesTable, preferences: UserPreferences) -> None:
+    """Copy preferences onto the row."""
+    db_prefs.dietary_restrictions_json = codec.dumps(preferences.dietary_restrictions)
+    db_prefs.allergies_json = codec.dumps(preferences.allergies)
+    db_prefs.disliked_ingredients_json = codec.dumps(preferences.disliked_ingredients)
+    db_prefs.favorite_cuisines_json = codec.dumps(preferences.favorite_cuisines)
+    db_prefs.skill_level = preferences.skill_level
+    db_prefs.serving_size = preferences.serving_size
+    db_prefs.max_cook_time_minutes = preferences.max_cook_time_minutes
+    db_prefs.prefer_quick_meals = preferences.prefer_quick_meals
+    db_prefs.budget_conscious = preferences.budget_conscious
+
+
+def preferences_to_model(db_prefs: UserPreferencesTable) -> UserPreferences:
+    """Convert the preferences row to a Pydantic model."""
+    return UserPreferences(
+        dietary_restrictions=codec.loads(db_prefs.dietary_restrictions_json or "[]"),
+        allergies=codec.loads(db_prefs.allergies_json or "[]"),
+        disliked_ingredients=codec.loads(db_prefs.disliked_ingredients_json or "[]"),
+        favorite_cuisines=codec.loads(db_prefs.favorite_cuisines_json or "[]"),
+        skill_level=db_prefs.skill_level,
+        serving_size=db_prefs.serving_size,
+        max_cook_time_minutes=db_prefs.max_cook_time_minutes,
+        prefer_quick_meals=db_prefs.prefer_quick_meals,
+        budget_conscious=db_prefs.budget_conscious,
+    )
+
+
+def job_to_model(db_job: JobTable, now: Optional[datetime] = None) -> Job:
+    """
+    Convert a job row to a Pydantic model.
+
+    A queued or running job past its deadline is returned as expired even
+    before the runner marks its row, so reads never have to write.
+    """
+    job = Job(
+        id=db_job.id,
+        kind=db_job.kind,
+        owner=db_job.owner,
+        status=db_job.status,
+        params=codec.loads(db_job.params_json or "{}"),
+        result=codec.loads(db_job.result_json) if db_job.result_json is not None else None,
+        error=db_job.error,
+        progress=db_job.progress,
+        deadline=db_job.deadline,
+        created_at=db_job.created_at,
+        started_at=db_job.started_at,
+        finished_at=db_job.finished_at,
+    )
+    if not job.finished and job.deadline is not None and job.deadline < (now or datetime.utcnow()):
+        job.status, job.error, job.finished_at = JobStatus.EXPIRED, "Deadline exceeded", job.deadline
+    return job
+
+
+def idempotency_to_model(db_record: IdempotencyKeyTable) -> IdempotencyRecord:
+    """Convert an idempotency key row to a Pydantic model."""
+    return IdempotencyRecord(
+        scope=db_record.scope,
+        key=db_record.key,
+        fingerprint=db_record.fingerprint,
+        status_code=db_record.status_code,
+        headers=codec.loads(db_record.headers_json) if db_record.headers_json else {},
+        body=db_record.body,
+        created_at=db_record.created_at,
+        expires_at=db_record.expires_at,
+    )
@@ -0,0 +1,205 @@
+"""Content fingerprints and batch deduplication for saved recipes.
+
+A fingerprint is the SHA-256 of a canonical form of a recipe's title,
+ingredients and instructions: text is case-folded with whitespace collapsed,
+ingredients are sorted (their order does not change the dish) and quantities
+are normalized, while instruction order is kept. It is stored in the
+``recipes.content_hash`` column so saving the same recipe twice is a single
+index lookup.
+
+The index on that column is unique unless a database that predates
+fingerprints holds duplicates. Migration 3 only fingerprints such rows;
+merging them deletes recipes, so it is an explicit step
+(``chefwise dedupe``, which takes a backup first) that makes the index
+unique afterwards.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Sequence, Union
+
+from sqlalchemy import bindparam, exists, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.dml import Insert
+
+from chefwise import codec
+from chefwise.models import Ingredient, RecipeCreate
+from .tables import RecipeTable
+
+# Rows fetched and written per round trip by the batch job
+BATCH_SIZE = 1000
+
+CONTENT_HASH_INDEX = "ix_recipes_content_hash"
+
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def _canonical_ingredient(ingredient: dict[str, Any]) -> list:
+    quantity = float(ingredient.get("quantity") or 0)
+    return [
+        _normalize(ingredient.get("name")),
+        int(quantity) if quantity.is_integer() else round(quantity, 6),
+        _normalize(ingredient.get("unit")),
+    ]
+
+
+def fingerprint(title: str, ingredients: Iterable[dict[str, Any]], instructions: Iterable[str]) -> str:
+    """
+    Compute the content fingerprint of a recipe.
+
+    Args:
+        title: Recipe title
+        ingredients: Ingredient dicts with name, quantity and unit
+        instructions: Instruction steps, in order
+
+    Returns:
+        64 character hex digest
+    """
+    canonical = [
+        _normalize(title),
+        sorted(_canonical_ingredient(ing) for ing in ingredients),
+        [_normalize(step) for step in instructions],
+    ]
+    # stdlib json with fixed options so the hash does not depend on the codec backend
+    payload = json.dumps(canonical, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def recipe_fingerprint(recipe: RecipeCreate) -> str:
+    """Compute the fingerprint of a recipe about to be saved."""
+    return fingerprint(
+        recipe.title,
+        (ing.model_dump() if isinstance(ing, Ingredient) else ing for ing in recipe.ingredients),
+        recipe.instructions,
+    )
+
+
+def row_fingerprint(title: str, ingredients_json: Union[str, bytes], instructions_json: Union[str, bytes]) -> str:
+    """Compute the fingerprint from stored JSON columns."""
+    return fingerprint(title, codec.loads(ingredients_json or "[]"), codec.loads(instructions_json or "[]"))
+
+
+@dataclass
+class DedupResult:
+    """Outcome of a deduplication run."""
+
+    scanned: int = 0
+    fingerprinted: int = 0
+    merged: int = 0
+    merges: list[tuple[int, int]] = field(default_factory=list)  # (deleted duplicate id, kept id)
+
+
+def fingerprint_recipes(conn: Connection) -> int:
+    """
+    Store the fingerprint of every recipe that has none, without merging anything.
+
+    Args:
+        conn: Connection with an open transaction
+
+    Returns:
+        Number of recipes fingerprinted
+    """
+    updates = [
+        {"id": recipe_id, "hash": row_fingerprint(title, ingredients_json, instructions_json)}
+        for recipe_id, title, ingredients_json, instructions_json in conn.execute(
+            text("SELECT id, title, ingredients_json, instructions_json FROM recipes WHERE content_hash IS NULL")
+        )
+    ]
+    for start in range(0, len(updates), BATCH_SIZE):
+        conn.execute(text("UPDATE recipes SET content_hash = :hash WHERE id = :id"), updates[start:start + BATCH_SIZE])
+    return len(updates)
+
+
+def insert_unless_saved(columns: Sequence[str]) -> Insert:
+    """
+    INSERT of one recipe row that does nothing if its fingerprint is already saved.
+
+    The row's values are bound by column name (``columns`` must include
+    ``content_hash``); execute it with a list of rows to insert several.
+    The lookup and the insert are one statement, so it also holds on a
+    legacy database whose ``content_hash`` index is not unique yet, where
+    ``ON CONFLICT`` has no constraint to act on. The rowcount says how many
+    rows were inserted.
+    """
+    table = RecipeTable.__table__
+    values = {column: bindparam(column, type_=table.c[column].type) for column in columns}
+    saved = exists().where(table.c.content_hash == values["content_hash"])
+    return insert(table).from_select(list(columns), select(*values.values()).where(~saved))
+
+
+def count_duplicates(conn: Connection) -> int:
+    """Number of recipes whose fingerprint an older recipe already has."""
+    return conn.execute(
+        text(
+            "SELECT COALESCE(SUM(copies - 1), 0) FROM (SELECT COUNT(*) AS copies FROM recipes "
+            "WHERE content_hash IS NOT NULL GROUP BY content_hash HAVING COUNT(*) > 1)"
+        )
+    ).scalar()
+
+
+def index_content_hash(conn: Connection) -> bool:
+    """
+    Index ``recipes.content_hash``: unique if there are no duplicates, plain otherwise.
+
+    Returns:
+        Whether the index is unique
+    """
+    unique = count_duplicates(conn) == 0
+    current = {row[1]: bool(row[2]) for row in conn.execute(text("PRAGMA index_list(recipes)"))}
+    if current.get(CONTENT_HASH_INDEX) is not unique:
+        conn.execute(text(f"DROP INDEX IF EXISTS {CONTENT_HASH_INDEX}"))
+        conn.execute(
+            text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {CONTENT_HASH_INDEX} ON recipes (content_hash)")
+        )
+    return unique
+
+
+def deduplicate_recipes(conn: Connection) -> DedupResult:
+    """
+    Fingerprint unhashed recipes and merge duplicates into the oldest copy.
+
+    Meal slots pointing at a duplicate are moved to the recipe that is kept
+    before the duplicate is deleted, and the fingerprint index is made
+    unique. The merged ids are returned in ``DedupResult.merges``; deleted
+    recipes are not kept anywhere else, so take a backup first. Runs inside
+    the caller's transaction.
+
+    Args:
+        conn: Connection with an open transaction
+
+    Returns:
+        Counts of scanned, newly fingerprinted and merged recipes
+    """
+    result = DedupResult()
+    keepers: dict[str, int] = {}
+    merges: list[dict[str, int]] = []
+    updates: list[dict[str, Any]] = []
+
+    rows = conn.execute(
+        text("SELECT id, title, ingredients_json, instructions_json, content_hash FROM recipes ORDER BY id")
+    )
+    for recipe_id, title, ingredients_json, instructions_json, content_hash in rows:
+        result.scanned += 1
+        digest = content_hash or row_fingerprint(title, ingredients_json, instructions_json)
+        keeper = keepers.setdefault(digest, recipe_id)
+        if keeper != recipe_id:
+            merges.append({"duplicate": recipe_id, "keeper": keeper})
+        elif content_hash is None:
+            updates.append({"id": recipe_id, "hash": digest})
+
+    for start in range(0, len(merges), BATCH_SIZE):
+        batch = merges[start:start + BATCH_SIZE]
+        conn.execute(text("UPDATE meal_slots SET recipe_id = :keeper WHERE recipe_id = :duplicate"), batch)
+        conn.execute(text("DELETE FROM recipes WHERE id = :duplicate"), batch)
+    # Hashes are written after the deletes so the unique index never sees a clash
+    for start in range(0, len(updates), BATCH_SIZE):
+        conn.execute(text("UPDATE recipes SET content_hash = :hash WHERE id = :id"), updates[start:start + BATCH_SIZE])
+
+    index_content_hash(conn)
+    result.merged = len(merges)
+    result.merges = [(merge["duplicate"], merge["keeper"]) for merge in merges]
+    result.fingerprinted = len(updates)
+    return result
@@ -0,0 +1,470 @@
+"""Versioned schema migrations.
+
+``init_db`` creates any missing tables from the ORM metadata and then runs the
+migrations below. Each migration is reversible and written so that it is a
+no-op when ``create_all`` has already produced the same schema on a fresh
+database; on older databases it brings the schema up to date.
+
+Applied versions are recorded in the ``schema_version`` table.
+"""
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single reversible schema change."""
+
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    downgrade: Callable[[Connection], None]
+
+
+def _execute_all(conn: Connection, statements: list[str]) -> None:
+    """Run a list of DDL statements."""
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+# 0001: indexes for the columns every repository query filters or sorts on
+
+_PERFORMANCE_INDEXES = {
+    "ix_recipes_created_at": "recipes (created_at)",
+    "ix_recipes_title": "recipes (title)",
+    "ix_meal_plans_created_at": "meal_plans (created_at)",
+    "ix_meal_plans_dates": "meal_plans (start_date, end_date)",
+    "ix_meal_slots_meal_plan_id": "meal_slots (meal_plan_id)",
+    "ix_meal_slots_date": "meal_slots (date)",
+    "ix_meal_slots_recipe_id": "meal_slots (recipe_id)",
+}
+
+
+def _add_performance_indexes(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [f"CREATE INDEX IF NOT EXISTS {name} ON {target}" for name, target in _PERFORMANCE_INDEXES.items()],
+    )
+
+
+def _drop_performance_indexes(conn: Connection) -> None:
+    _execute_all(conn, [f"DROP INDEX IF EXISTS {name}" for name in _PERFORMANCE_INDEXES])
+
+
+# 0002: generated total time column and trigger-maintained recipe tag index
+
+_TAG_JSON = "CASE WHEN json_valid({col}) THEN {col} ELSE '[]' END"
+
+_RECIPE_TAG_TRIGGERS = {
+    "trg_recipe_tags_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_recipe_tags_insert AFTER INSERT ON recipes
+        BEGIN
+            INSERT OR IGNORE INTO recipe_tags (tag, recipe_id)
+            SELECT value, NEW.id FROM json_each({_TAG_JSON.format(col="NEW.dietary_tags_json")});
+        END""",
+    "trg_recipe_tags_update": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_recipe_tags_update AFTER UPDATE OF dietary_tags_json ON recipes
+        BEGIN
+            DELETE FROM recipe_tags WHERE recipe_id = OLD.id;
+            INSERT OR IGNORE INTO recipe_tags (tag, recipe_id)
+            SELECT value, NEW.id FROM json_each({_TAG_JSON.format(col="NEW.dietary_tags_json")});
+        END""",
+    "trg_recipe_tags_delete": """
+        CREATE TRIGGER IF NOT EXISTS trg_recipe_tags_delete AFTER DELETE ON recipes
+        BEGIN
+            DELETE FROM recipe_tags WHERE recipe_id = OLD.id;
+        END""",
+}
+
+
+def _column_exists(conn: Connection, table: str, column: str) -> bool:
+    """Check for a column, including generated ones (hidden from table_info)."""
+    rows = conn.execute(text(f"PRAGMA table_xinfo({table})")).all()
+    return any(row[1] == column for row in rows)
+
+
+def _add_recipe_filtering(conn: Connection) -> None:
+    from .tables import TOTAL_TIME_SQL
+
+    if not _column_exists(conn, "recipes", "total_time_minutes"):
+        # SQLite can only add VIRTUAL generated columns with ALTER TABLE;
+        # the index below stores the computed values.
+        conn.execute(
+            text(
+                "ALTER TABLE recipes ADD COLUMN total_time_minutes INTEGER "
+                f"GENERATED ALWAYS AS ({TOTAL_TIME_SQL}) VIRTUAL"
+            )
+        )
+    _execute_all(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS ix_recipes_total_time_minutes ON recipes (total_time_minutes)",
+            "CREATE INDEX IF NOT EXISTS ix_recipes_cuisine ON recipes (cuisine)",
+            "CREATE INDEX IF NOT EXISTS ix_recipes_difficulty ON recipes (difficulty)",
+            "CREATE TABLE IF NOT EXISTS recipe_tags ("
+            "tag VARCHAR(50) NOT NULL, "
+            "recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE, "
+            "PRIMARY KEY (tag, recipe_id))",
+            "CREATE INDEX IF NOT EXISTS ix_recipe_tags_recipe_id ON recipe_tags (recipe_id)",
+            *_RECIPE_TAG_TRIGGERS.values(),
+            "INSERT OR IGNORE INTO recipe_tags (tag, recipe_id) "
+            f"SELECT j.value, r.id FROM recipes r, json_each({_TAG_JSON.format(col='r.dietary_tags_json')}) j",
+        ],
+    )
+
+
+def _drop_recipe_filtering(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [
+            *(f"DROP TRIGGER IF EXISTS {name}" for name in _RECIPE_TAG_TRIGGERS),
+            "DROP TABLE IF EXISTS recipe_tags",
+            "DROP INDEX IF EXISTS ix_recipes_difficulty",
+            "DROP INDEX IF EXISTS ix_recipes_cuisine",
+            "DROP INDEX IF EXISTS ix_recipes_total_time_minutes",
+        ],
+    )
+    if _column_exists(conn, "recipes", "total_time_minutes"):
+        conn.execute(text("ALTER TABLE recipes DROP COLUMN total_time_minutes"))
+
+
+# 0003: content fingerprint, unique unless old rows hold duplicates (never deleted here, see dedup)
+
+
+def _add_content_hash(conn: Connection) -> None:
+    from .dedup import count_duplicates, fingerprint_recipes, index_content_hash
+
+    if not _column_exists(conn, "recipes", "content_hash"):
+        conn.execute(text("ALTER TABLE recipes ADD COLUMN content_hash VARCHAR(64)"))
+    fingerprint_recipes(conn)
+    if not index_content_hash(conn):
+        logger.warning(
+            "%d saved recipes duplicate an older one; run 'chefwise dedupe' to merge them",
+            count_duplicates(conn),
+        )
+
+
+def _drop_content_hash(conn: Connection) -> None:
+    conn.execute(text("DROP INDEX IF EXISTS ix_recipes_content_hash"))
+    if _column_exists(conn, "recipes", "content_hash"):
+        conn.execute(text("ALTER TABLE recipes DROP COLUMN content_hash"))
+
+
+# 0004: resumable imports
+
+
+def _add_import_checkpoints(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS import_checkpoints ("
+            "export_id VARCHAR(32) NOT NULL PRIMARY KEY, "
+            "line INTEGER NOT NULL, "
+            "completed BOOLEAN NOT NULL, "
+            "updated_at DATETIME)"
+        )
+    )
+
+
+def _drop_import_checkpoints(conn: Connection) -> None:
+    conn.execute(text("DROP TABLE IF EXISTS import_checkpoints"))
+
+
+# 0005: trigger-maintained change log for delta sync
+
+# (entity, table) pairs whose rows are tracked
+_CHANGE_TRACKED = {
+    "recipe": "recipes",
+    "meal_plan": "meal_plans",
+    "preferences": "user_preferences",
+}
+
+
+def _record_change(entity: str, row_id: str, op: str) -> str:
+    """Trigger body statements replacing the log entry of one row."""
+    return (
+        f"DELETE FROM changes WHERE entity = '{entity}' AND entity_id = {row_id}; "
+        f"INSERT INTO changes (entity, entity_id, op, changed_at) "
+        f"VALUES ('{entity}', {row_id}, '{op}', CURRENT_TIMESTAMP);"
+    )
+
+
+def _plan_touched(row_id: str) -> str:
+    """Trigger body marking a meal plan changed, unless it is already deleted."""
+    return (
+        f"DELETE FROM changes WHERE entity = 'meal_plan' AND entity_id = {row_id} "
+        f"AND EXISTS (SELECT 1 FROM meal_plans WHERE id = {row_id}); "
+        f"INSERT INTO changes (entity, entity_id, op, changed_at) "
+        f"SELECT 'meal_plan', {row_id}, 'upsert', CURRENT_TIMESTAMP "
+        f"WHERE EXISTS (SELECT 1 FROM meal_plans WHERE id = {row_id});"
+    )
+
+
+def _change_triggers() -> dict[str, str]:
+    triggers = {}
+    for entity, table in _CHANGE_TRACKED.items():
+        for event, row, op in (("INSERT", "NEW", "upsert"), ("UPDATE", "NEW", "upsert"), ("DELETE", "OLD", "delete")):
+            name = f"trg_changes_{table}_{event.lower()}"
+            triggers[name] = (
+                f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} "
+                f"BEGIN {_record_change(entity, f'{row}.id', op)} END"
+            )
+    # Slot edits change their plan
+    triggers["trg_changes_meal_slots_insert"] = (
+        "CREATE TRIGGER IF NOT EXISTS trg_changes_meal_slots_insert AFTER INSERT ON meal_slots "
+        f"BEGIN {_plan_touched('NEW.meal_plan_id')} END"
+    )
+    triggers["trg_changes_meal_slots_update"] = (
+        "CREATE TRIGGER IF NOT EXISTS trg_changes_meal_slots_update AFTER UPDATE ON meal_slots "
+        f"BEGIN {_plan_touched('OLD.meal_plan_id')} {_plan_touched('NEW.meal_plan_id')} END"
+    )
+    triggers["trg_changes_meal_slots_delete"] = (
+        "CREATE TRIGGER IF NOT EXISTS trg_changes_meal_slots_delete AFTER DELETE ON meal_slots "
+        f"BEGIN {_plan_touched('OLD.meal_plan_id')} END"
+    )
+    return triggers
+
+
+def _add_change_feed(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [
+            "CREATE TABLE IF NOT EXISTS changes ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "entity VARCHAR(20) NOT NULL, "
+            "entity_id INTEGER NOT NULL, "
+            "op VARCHAR(10) NOT NULL, "
+            "changed_at DATETIME NOT NULL)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_changes_entity ON changes (entity, entity_id)",
+            *_change_triggers().values(),
+            # Existing rows count as changed once, so a first sync from token 0 sees them
+            *(
+                f"INSERT OR IGNORE INTO changes (entity, entity_id, op, changed_at) "
+                f"SELECT '{entity}', id, 'upsert', CURRENT_TIMESTAMP FROM {table} ORDER BY id"
+                for entity, table in _CHANGE_TRACKED.items()
+            ),
+        ],
+    )
+
+
+def _drop_change_feed(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [
+            *(f"DROP TRIGGER IF EXISTS {name}" for name in _change_triggers()),
+            "DROP TABLE IF EXISTS changes",
+        ],
+    )
+
+
+# 0006: covering index for calendar range queries over meal slots
+
+_CALENDAR_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_meal_slots_calendar "
+    "ON meal_slots (date, meal_type, meal_plan_id, recipe_id, recipe_title)"
+)
+
+
+def _add_calendar_index(conn: Connection) -> None:
+    conn.execute(text(_CALENDAR_INDEX))
+
+
+def _drop_calendar_index(conn: Connection) -> None:
+    conn.execute(text("DROP INDEX IF EXISTS ix_meal_slots_calendar"))
+
+
+# 0007: background jobs
+
+
+def _add_jobs(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER NOT NULL PRIMARY KEY, "
+            "kind VARCHAR(50) NOT NULL, "
+            "status VARCHAR(20) NOT NULL, "
+            "params_json TEXT NOT NULL, "
+            "result_json TEXT, "
+            "error TEXT, "
+            "progress VARCHAR(200), "
+            "deadline DATETIME, "
+            "created_at DATETIME NOT NULL, "
+            "started_at DATETIME, "
+            "finished_at DATETIME)",
+            "CREATE INDEX IF NOT EXISTS ix_jobs_kind ON jobs (kind)",
+            "CREATE INDEX IF NOT EXISTS ix_jobs_status_deadline ON jobs (status, deadline)",
+        ],
+    )
+
+
+def _drop_jobs(conn: Connection) -> None:
+    conn.execute(text("DROP TABLE IF EXISTS jobs"))
+
+
+# 0008: stored responses for idempotency keys
+
+
+def _add_idempotency_keys(conn: Connection) -> None:
+    _execute_all(
+        conn,
+        [
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            "id INTEGER NOT NULL PRIMARY KEY, "
+            "scope VARCHAR(100) NOT NULL, "
+            "key VARCHAR(255) NOT NULL, "
+            "fingerprint VARCHAR(64) NOT NULL, "
+            "status_code INTEGER, "
+            "headers_json TEXT, "
+            "body BLOB, "
+            "created_at DATETIME NOT NULL, "
+            "expires_at DATETIME NOT NULL)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_idempotency_keys_scope_key ON idempotency_keys (scope, key)",
+            "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at)",
+        ],
+    )
+
+
+def _drop_idempotency_keys(conn: Connection) -> None:
+    conn.execute(text("DROP TABLE IF EXISTS idempotency_keys"))
+
+
+# 0009: jobs belong to the session that submitted them
+
+
+def _add_job_owner(conn: Connection) -> None:
+    if not _column_exists(conn, "jobs", "owner"):
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN owner VARCHAR(64)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_owner_kind ON jobs (owner, kind)"))
+
+
+def _drop_job_owner(conn: Connection) -> None:
+    conn.execute(text("DROP INDEX IF EXISTS ix_jobs_owner_kind"))
+    if _column_exists(conn, "jobs", "owner"):
+        conn.execute(text("ALTER TABLE jobs DROP COLUMN owner"))
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "performance_indexes", _add_performance_indexes, _drop_performance_indexes),
+    Migration(2, "recipe_filtering", _add_recipe_filtering, _drop_recipe_filtering),
+    Migration(3, "recipe_content_hash", _add_content_hash, _drop_content_hash),
+    Migration(4, "import_checkpoints", _add_import_checkpoints, _drop_import_checkpoints),
+    Migration(5, "change_feed", _add_change_feed, _drop_change_feed),
+    Migration(6, "meal_slot_calendar", _add_calendar_index, _drop_calendar_index),
+    Migration(7, "jobs", _add_jobs, _drop_jobs),
+    Migration(8, "idempotency_keys", _add_idempotency_keys, _drop_idempotency_keys),
+    Migration(9, "job_owner", _add_job_owner, _drop_job_owner),
+]
+
+
+@contextmanager
+def _transaction(bind: Union[Engine, Connection], immediate: bool = False) -> Iterator[Connection]:
+    """
+    Open a transaction on an engine, or a savepoint on a busy connection.
+
+    With ``immediate``, a transaction opened here on SQLite takes the write
+    lock up front, so concurrent migrators queue up instead of both reading
+    the old version; a savepoint runs under whatever lock its caller holds.
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            _begin(conn, immediate)
+            yield conn
+    elif bind.in_transaction():
+        with bind.begin_nested():
+            yield bind
+    else:
+        with bind.begin():
+            _begin(bind, immediate)
+            yield bind
+
+
+def _begin(conn: Connection, immediate: bool) -> None:
+    if immediate and conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, "
+            "applied_at DATETIME NOT NULL)"
+        )
+    )
+
+
+def current_version(engine: Union[Engine, Connection]) -> int:
+    """Get the highest applied migration version (0 for an unversioned database)."""
+    with _transaction(engine) as conn:
+        return _read_version(conn)
+
+
+def _read_version(conn: Connection) -> int:
+    _ensure_version_table(conn)
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def head_version() -> int:
+    """Get the version of the newest known migration."""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def migrate(engine: Union[Engine, Connection], target: Optional[int] = None) -> list[int]:
+    """
+    Apply pending migrations up to ``target`` (defaults to the newest).
+
+    Each migration runs in its own write-locked transaction together with
+    its ``schema_version`` row, so a failure leaves the database at the last
+    fully applied version. The version is re-read inside that transaction,
+    so a step another process applied meanwhile is skipped, not repeated.
+
+    Returns:
+        Versions that were applied, in order
+    """
+    target = head_version() if target is None else target
+    applied = []
+    start = current_version(engine)
+
+    for migration in MIGRATIONS:
+        if start < migration.version <= target:
+            with _transaction(engine, immediate=True) as conn:
+                if _read_version(conn) >= migration.version:
+                    continue
+                migration.upgrade(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {"v": migration.version, "n": migration.name, "t": datetime.utcnow()},
+                )
+            applied.append(migration.version)
+
+    return applied
+
+
+def downgrade(engine: Union[Engine, Connection], target: int) -> list[int]:
+    """
+    Revert applied migrations newer than ``target``, newest first.
+
+    Returns:
+        Versions that were reverted, in order
+    """
+    reverted = []
+    start = current_version(engine)
+
+    for migration in reversed(MIGRATIONS):
+        if target < migration.version <= start:
+            with _transaction(engine) as conn:
+                migration.downgrade(conn)
+                conn.execute(text("DELETE FROM schema_version WHERE version = :v"), {"v": migration.version})
+            reverted.append(migration.version)
+
+    return reverted
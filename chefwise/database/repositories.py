@@ -1,66 +1,320 @@
 """Database repositories for CRUD operations."""
 
-import json
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, delete, func, select, update
+from sqlalchemy.orm import Session, selectinload
 
+from chefwise import codec
+from chefwise.config import settings
 from chefwise.models import (
     Recipe,
     RecipeCreate,
+    RecipeFacets,
+    RecipeFilterResult,
     MealPlan,
     MealPlanCreate,
+    MealPlanWithRecipes,
     MealSlot,
+    MealType,
     UserPreferences,
-    Ingredient,
+    LazyRecipe,
+    ChangeSet,
+    Job,
+    JobStatus,
 )
-from .tables import RecipeTable, MealPlanTable, MealSlotTable, UserPreferencesTable
+from .cache import RecipeIdentityMap, preferences_cache
+from .calendar import Calendar, CalendarDay
+from .converters import (
+    apply_preferences,
+    job_to_model,
+    meal_plan_to_model,
+    meal_plan_to_row,
+    preferences_to_model,
+    recipe_to_model,
+    recipe_values,
+)
+from . import calendar, slots
+from .dedup import DedupResult, deduplicate_recipes, insert_unless_saved
+from .tables import ChangeTable, JobTable, RecipeTable, RecipeTagTable, MealPlanTable, UserPreferencesTable
+
+# Sort options for filtered recipe listings (id breaks ties for stable paging)
+RECIPE_SORTS = {
+    "newest": (RecipeTable.created_at.desc(), RecipeTable.id.desc()),
+    "oldest": (RecipeTable.created_at.asc(), RecipeTable.id.asc()),
+    "title": (RecipeTable.title.asc(), RecipeTable.id.asc()),
+    "title_desc": (RecipeTable.title.desc(), RecipeTable.id.desc()),
+    "total_time": (RecipeTable.total_time_minutes.asc(), RecipeTable.id.asc()),
+}
+
+# Job states a job can still leave
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+# Ids per IN (...) list; stays below SQLite's historical 999-parameter limit
+ID_BATCH_SIZE = 500
+
+# Session.info flag set by the write queue (see writer): the batch it runs in
+# is committed by the queue, so repositories only flush their changes
+GROUP_COMMIT = "chefwise.group_commit"
+
+
+def text_matches(query: str) -> ColumnElement[bool]:
+    """
+    Condition for recipes whose title or description contains ``query``.
+
+    The query is matched literally (``%``, ``_`` and ``\\`` are escaped), like
+    the catalog's substring match; case folding is SQLite's ASCII-only LIKE.
+    """
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    return RecipeTable.title.ilike(pattern, escape="\\") | RecipeTable.description.ilike(pattern, escape="\\")
+
+
+def _commit(db: Session) -> None:
+    """Commit the session, or just flush it when a write queue commits the batch."""
+    if db.info.get(GROUP_COMMIT):
+        db.flush()
+    else:
+        db.commit()
+
+
+def _rollback(db: Session) -> None:
+    """Roll back the session, or only this mutation's savepoint inside a queued batch."""
+    if db.info.get(GROUP_COMMIT):
+        nested = db.get_nested_transaction()
+        if nested is not None:
+            nested.rollback()
+        db.begin_nested()
+    else:
+        db.rollback()
+
+
+def _batches(ids: list[int]) -> Iterator[list[int]]:
+    """Split ids into IN-list sized batches."""
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        yield ids[start:start + ID_BATCH_SIZE]
+
+
+def _facet_counts(key, source):
+    """Scalar subquery returning a JSON object of value -> count for one facet."""
+    counts = (
+        select(key.label("key"), func.count().label("n"))
+        .select_from(source)
+        .where(key.isnot(None))
+        .group_by(key)
+        .subquery()
+    )
+    return func.json(select(func.json_group_object(counts.c.key, counts.c.n)).scalar_subquery())
 
 
 class RecipeRepository:
     """Repository for recipe CRUD operations."""
 
-    def __init__(self, db: Session):
+    # Column order matches the LazyRecipe constructor
+    _lazy_columns = (
+        RecipeTable.id,
+        RecipeTable.title,
+        RecipeTable.description,
+        RecipeTable.ingredients_json,
+        RecipeTable.instructions_json,
+        RecipeTable.prep_time_minutes,
+        RecipeTable.cook_time_minutes,
+        RecipeTable.servings,
+        RecipeTable.dietary_tags_json,
+        RecipeTable.cuisine,
+        RecipeTable.difficulty,
+        RecipeTable.created_at,
+        RecipeTable.updated_at,
+    )
+
+    def __init__(self, db: Session, identity_map: Optional[RecipeIdentityMap] = None):
         self.db = db
+        self.identity_map = identity_map
 
     def create(self, recipe: RecipeCreate) -> Recipe:
-        """Create a new recipe."""
-        db_recipe = RecipeTable(
-            title=recipe.title,
-            description=recipe.description,
-            ingredients_json=json.dumps([ing.model_dump() for ing in recipe.ingredients]),
-            instructions_json=json.dumps(recipe.instructions),
-            prep_time_minutes=recipe.prep_time_minutes,
-            cook_time_minutes=recipe.cook_time_minutes,
-            servings=recipe.servings,
-            dietary_tags_json=json.dumps([t.value if hasattr(t, 'value') else t for t in recipe.dietary_tags]),
-            cuisine=recipe.cuisine,
-            difficulty=recipe.difficulty,
-        )
-        self.db.add(db_recipe)
-        self.db.commit()
-        self.db.refresh(db_recipe)
-        return self._to_model(db_recipe)
+        """Create a new recipe, or return the saved copy of identical content."""
+        return self.create_or_get(recipe)[0]
+
+    def create_or_get(self, recipe: RecipeCreate) -> tuple[Recipe, bool]:
+        """
+        Save a recipe unless one with the same content fingerprint exists.
+
+        Returns:
+            The stored recipe and whether it was newly created
+        """
+        values = {**recipe_values(recipe), "created_at": datetime.utcnow()}
+        existing = self._get_by_hash(values["content_hash"])
+        if existing:
+            return self._to_model(existing), False
+
+        try:
+            inserted = self.db.execute(insert_unless_saved(list(values)), values)
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        if inserted.rowcount == 0:
+            # Another writer saved the same content since the lookup
+            return self._to_model(self._get_by_hash(values["content_hash"])), False
+        return self._to_model(self.db.get(RecipeTable, inserted.lastrowid)), True
+
+    def get_by_fingerprint(self, content_hash: str) -> Optional[Recipe]:
+        """Get a recipe by its content fingerprint (see ``dedup.fingerprint``)."""
+        db_recipe = self._get_by_hash(content_hash)
+        return self._to_model(db_recipe) if db_recipe else None
+
+    def _get_by_hash(self, content_hash: str) -> Optional[RecipeTable]:
+        return self.db.query(RecipeTable).filter(RecipeTable.content_hash == content_hash).first()
 
     def get(self, recipe_id: int) -> Optional[Recipe]:
         """Get a recipe by ID."""
+        if self.identity_map is not None and recipe_id in self.identity_map:
+            return self.identity_map.get(recipe_id)
         db_recipe = self.db.query(RecipeTable).filter(RecipeTable.id == recipe_id).first()
-        return self._to_model(db_recipe) if db_recipe else None
-
-    def get_all(self) -> list[Recipe]:
-        """Get all recipes."""
-        db_recipes = self.db.query(RecipeTable).order_by(RecipeTable.created_at.desc()).all()
+        return self._remember(self._to_model(db_recipe)) if db_recipe else None
+
+    def get_many(self, recipe_ids: Iterable[int]) -> list[Recipe]:
+        """
+        Get several recipes in one query per ``ID_BATCH_SIZE`` ids.
+
+        Args:
+            recipe_ids: Recipe ids, possibly repeated
+
+        Returns:
+            The recipes in the order of their first occurrence in
+            ``recipe_ids``, each once; unknown ids are skipped
+        """
+        ids = list(dict.fromkeys(recipe_ids))
+        found, missing = self.identity_map.split(ids) if self.identity_map is not None else ({}, ids)
+        for batch in _batches(missing):
+            for db_recipe in self.db.query(RecipeTable).filter(RecipeTable.id.in_(batch)):
+                found[db_recipe.id] = self._remember(self._to_model(db_recipe))
+        return [found[i] for i in ids if i in found]
+
+    def get_many_lazy(self, recipe_ids: Iterable[int]) -> list[LazyRecipe]:
+        """Like ``get_many``, without decoding the JSON columns up front."""
+        ids = list(dict.fromkeys(recipe_ids))
+        found = {}
+        for batch in _batches(ids):
+            for row in self.db.query(*self._lazy_columns).filter(RecipeTable.id.in_(batch)):
+                found[row.id] = LazyRecipe(*row)
+        return [found[i] for i in ids if i in found]
+
+    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> list[Recipe]:
+        """Get all recipes, newest first, optionally one page of them."""
+        query = self.db.query(RecipeTable).order_by(RecipeTable.created_at.desc())
+        db_recipes = query.limit(limit).offset(offset).all()
         return [self._to_model(r) for r in db_recipes]
 
+    def get_titles(self) -> list[tuple[int, str]]:
+        """Get the (id, title) of every recipe, newest first (for pickers)."""
+        query = self.db.query(RecipeTable.id, RecipeTable.title).order_by(*RECIPE_SORTS["newest"])
+        return [tuple(row) for row in query]
+
+    def get_all_lazy(self) -> list[LazyRecipe]:
+        """Get all recipes without decoding their JSON columns up front."""
+        rows = self.db.query(*self._lazy_columns).order_by(RecipeTable.created_at.desc()).all()
+        return [LazyRecipe(*row) for row in rows]
+
+    def filter(
+        self,
+        tags: Optional[list[str]] = None,
+        cuisine: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        max_total_time: Optional[int] = None,
+        query: Optional[str] = None,
+        sort: str = "newest",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> RecipeFilterResult:
+        """
+        Filter recipes in SQL and return one page with facet counts.
+
+        All predicates run in a single statement: tags go through the
+        ``recipe_tags`` index, total time through the generated
+        ``total_time_minutes`` column. Facet counts (cuisine, difficulty,
+        tags) and the total cover every match, not just the returned page,
+        and come back in the same round trip as the recipes.
+
+        Args:
+            tags: Dietary tags the recipe must all have
+            cuisine: Exact cuisine
+            difficulty: Exact difficulty
+            max_total_time: Maximum prep + cook time in minutes
+            query: Substring of the title or description
+            sort: One of ``RECIPE_SORTS``
+            limit: Page size
+            offset: Number of matches to skip
+
+        Returns:
+            RecipeFilterResult with the page, total and facets
+        """
+        if sort not in RECIPE_SORTS:
+            raise ValueError(f"Unknown sort '{sort}'. Choose from: {', '.join(RECIPE_SORTS)}")
+
+        conditions = []
+        tag_values = sorted({t.value if hasattr(t, "value") else t for t in tags or []})
+        if tag_values:
+            tagged = (
+                select(RecipeTagTable.recipe_id)
+                .where(RecipeTagTable.tag.in_(tag_values))
+                .group_by(RecipeTagTable.recipe_id)
+                .having(func.count() == len(tag_values))
+            )
+            conditions.append(RecipeTable.id.in_(tagged))
+        if cuisine:
+            conditions.append(RecipeTable.cuisine == cuisine)
+        if difficulty:
+            conditions.append(RecipeTable.difficulty == difficulty)
+        if max_total_time is not None:
+            conditions.append(RecipeTable.total_time_minutes <= max_total_time)
+        if query:
+            conditions.append(text_matches(query))
+
+        matched = (
+            select(RecipeTable.id, RecipeTable.cuisine, RecipeTable.difficulty)
+            .where(*conditions)
+            .cte("matched")
+        )
+        facets = func.json_object(
+            "total",
+            select(func.count()).select_from(matched).scalar_subquery(),
+            "cuisine",
+            _facet_counts(matched.c.cuisine, matched),
+            "difficulty",
+            _facet_counts(matched.c.difficulty, matched),
+            "tags",
+            _facet_counts(
+                RecipeTagTable.tag,
+                RecipeTagTable.__table__.join(matched, matched.c.id == RecipeTagTable.recipe_id),
+            ),
+        )
+
+        rows = self.db.execute(
+            select(RecipeTable, facets.label("facets"))
+            .where(RecipeTable.id.in_(select(matched.c.id)))
+            .order_by(*RECIPE_SORTS[sort])
+            .limit(limit)
+            .offset(offset)
+        ).all()
+
+        # Past the last page there is no row to carry the facets
+        facets_json = rows[0].facets if rows else self.db.execute(select(facets)).scalar()
+        facet_data = codec.loads(facets_json)
+        total = facet_data.pop("total")
+
+        return RecipeFilterResult(
+            recipes=[self._to_model(row.RecipeTable) for row in rows],
+            total=total,
+            facets=RecipeFacets(**facet_data),
+        )
+
     def search(self, query: str) -> list[Recipe]:
         """Search recipes by title or description."""
         db_recipes = (
             self.db.query(RecipeTable)
-            .filter(
-                RecipeTable.title.ilike(f"%{query}%")
-                | RecipeTable.description.ilike(f"%{query}%")
-            )
+            .filter(text_matches(query))
             .all()
         )
         return [self._to_model(r) for r in db_recipes]
@@ -68,32 +322,28 @@ class RecipeRepository:
     def delete(self, recipe_id: int) -> bool:
         """Delete a recipe by ID."""
         db_recipe = self.db.query(RecipeTable).filter(RecipeTable.id == recipe_id).first()
+        if self.identity_map is not None:
+            self.identity_map.discard(recipe_id)
         if db_recipe:
             self.db.delete(db_recipe)
-            self.db.commit()
+            _commit(self.db)
             return True
         return False
 
+    def deduplicate(self) -> DedupResult:
+        """Fingerprint unhashed recipes and merge duplicates into the oldest copy (see ``dedup``)."""
+        result = deduplicate_recipes(self.db.connection())
+        _commit(self.db)
+        return result
+
     def _to_model(self, db_recipe: RecipeTable) -> Recipe:
         """Convert database record to Pydantic model."""
-        ingredients_data = json.loads(db_recipe.ingredients_json)
-        ingredients = [Ingredient(**ing) for ing in ingredients_data]
-
-        return Recipe(
-            id=db_recipe.id,
-            title=db_recipe.title,
-            description=db_recipe.description,
-            ingredients=ingredients,
-            instructions=json.loads(db_recipe.instructions_json),
-            prep_time_minutes=db_recipe.prep_time_minutes,
-            cook_time_minutes=db_recipe.cook_time_minutes,
-            servings=db_recipe.servings,
-            dietary_tags=json.loads(db_recipe.dietary_tags_json),
-            cuisine=db_recipe.cuisine,
-            difficulty=db_recipe.difficulty,
-            created_at=db_recipe.created_at,
-            updated_at=db_recipe.updated_at,
-        )
+        return recipe_to_model(db_recipe)
+
+    def _remember(self, recipe: Recipe) -> Recipe:
+        if self.identity_map is not None:
+            self.identity_map.put(recipe)
+        return recipe
 
 
 class MealPlanRepository:
@@ -104,28 +354,9 @@ class MealPlanRepository:
 
     def create(self, meal_plan: MealPlanCreate) -> MealPlan:
         """Create a new meal plan with meals."""
-        db_plan = MealPlanTable(
-            name=meal_plan.name,
-            start_date=meal_plan.start_date,
-            end_date=meal_plan.end_date,
-            notes=meal_plan.notes,
-        )
+        db_plan = meal_plan_to_row(meal_plan)
         self.db.add(db_plan)
-        self.db.flush()  # Get the ID
-
-        # Add meal slots
-        for meal in meal_plan.meals:
-            db_slot = MealSlotTable(
-                meal_plan_id=db_plan.id,
-                date=meal.date,
-                meal_type=meal.meal_type.value if hasattr(meal.meal_type, 'value') else meal.meal_type,
-                recipe_id=meal.recipe_id,
-                recipe_title=meal.recipe_title,
-                notes=meal.notes,
-            )
-            self.db.add(db_slot)
-
-        self.db.commit()
+        _commit(self.db)
         self.db.refresh(db_plan)
         return self._to_model(db_plan)
 
@@ -134,6 +365,37 @@ class MealPlanRepository:
         db_plan = self.db.query(MealPlanTable).filter(MealPlanTable.id == plan_id).first()
         return self._to_model(db_plan) if db_plan else None
 
+    def get_with_recipes(
+        self, plan_id: int, identity_map: Optional[RecipeIdentityMap] = None
+    ) -> Optional[MealPlanWithRecipes]:
+        """
+        Get a meal plan with every recipe its slots refer to.
+
+        Runs three queries whatever the plan size: the plan, its slots and
+        the referenced recipes (one more per ``ID_BATCH_SIZE`` distinct
+        recipes). Recipes already in ``identity_map`` are not loaded again.
+
+        Args:
+            plan_id: Meal plan ID
+            identity_map: Request-scoped recipe cache to read from and fill
+
+        Returns:
+            The plan and its recipes keyed by id, or None if the plan does not exist
+        """
+        db_plan = (
+            self.db.query(MealPlanTable)
+            .options(selectinload(MealPlanTable.meals))
+            .filter(MealPlanTable.id == plan_id)
+            .first()
+        )
+        if not db_plan:
+            return None
+        plan = self._to_model(db_plan)
+        recipes = RecipeRepository(self.db, identity_map).get_many(
+            meal.recipe_id for meal in plan.meals if meal.recipe_id is not None
+        )
+        return MealPlanWithRecipes(**dict(plan), recipes={recipe.id: recipe for recipe in recipes})
+
     def get_all(self) -> list[MealPlan]:
         """Get all meal plans."""
         db_plans = self.db.query(MealPlanTable).order_by(MealPlanTable.created_at.desc()).all()
@@ -154,83 +416,429 @@ class MealPlanRepository:
         db_plan = self.db.query(MealPlanTable).filter(MealPlanTable.id == plan_id).first()
         if db_plan:
             self.db.delete(db_plan)
-            self.db.commit()
+            _commit(self.db)
             return True
         return False
 
+    # Slot-level edits: one targeted statement each, committed immediately
+
+    def add_slot(self, plan_id: int, meal: MealSlot) -> Optional[MealSlot]:
+        """Add a meal to a plan; returns it with its new id, or None if the plan does not exist."""
+        slot_id = self._write(slots.insert_slot(plan_id, meal), scalar=True)
+        return meal.model_copy(update={"id": slot_id}) if slot_id is not None else None
+
+    def update_slot(self, slot_id: int, meal: MealSlot) -> bool:
+        """Overwrite one slot with ``meal`` (its ``id`` is ignored)."""
+        return self._write(slots.update_slot(slot_id, meal)) == 1
+
+    def move_slot(self, slot_id: int, new_date: date, meal_type: Optional[MealType] = None) -> bool:
+        """Move a slot to another date and, optionally, another meal of the day."""
+        return self._write(slots.move_slot(slot_id, new_date, meal_type)) == 1
+
+    def swap_slots(self, first_id: int, second_id: int) -> bool:
+        """Exchange the meals of two slots, keeping their dates and meal types."""
+        return self._write(slots.swap_slots(first_id, second_id)) == 2
+
+    def delete_slot(self, slot_id: int) -> bool:
+        """Delete one slot."""
+        return self._write(slots.delete_slot(slot_id)) == 1
+
+    def reschedule(self, plan_id: int, days: int) -> int:
+        """
+        Shift a plan and all its slots by ``days`` (negative moves earlier).
+
+        Returns:
+            Number of slots moved
+        """
+        conn = self.db.connection()
+        try:
+            moved = conn.execute(slots.reschedule_slots(plan_id, days)).rowcount
+            conn.execute(slots.reschedule_plan(plan_id, days))
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        return moved
+
+    def save(self, meal_plan: MealPlan) -> slots.SlotChanges:
+        """
+        Write only what changed in an edited, previously saved plan.
+
+        The stored slots are read once and diffed against ``meal_plan.meals``:
+        new slots are inserted, removed ones deleted, and changed ones
+        updated in a single executemany; untouched slots are not written.
+
+        Returns:
+            Counts of the rows written and the ids of inserted slots
+
+        Raises:
+            ValueError: If the plan does not exist
+        """
+        conn = self.db.connection()
+        stored_plan = conn.execute(slots.stored_plan(meal_plan.id)).first()
+        if stored_plan is None:
+            _rollback(self.db)
+            raise ValueError(f"Meal plan {meal_plan.id} does not exist")
+        diff = slots.diff_slots(meal_plan, stored_plan, conn.execute(slots.stored_slots(meal_plan.id)))
+        changes = diff.changes()
+        try:
+            for statement, parameters in diff.statements(meal_plan.id):
+                result = conn.execute(statement, parameters)
+            if diff.inserts:
+                changes.new_slot_ids = list(result.scalars())
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        return changes
+
+    def _write(self, statement, scalar: bool = False):
+        """Run one statement in its own transaction; returns its rowcount (or scalar)."""
+        try:
+            result = self.db.connection().execute(statement)
+            value = result.scalar() if scalar else result.rowcount
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        return value
+
     def _to_model(self, db_plan: MealPlanTable) -> MealPlan:
         """Convert database record to Pydantic model."""
-        meals = [
-            MealSlot(
-                id=slot.id,
-                date=slot.date,
-                meal_type=slot.meal_type,
-                recipe_id=slot.recipe_id,
-                recipe_title=slot.recipe_title,
-                notes=slot.notes,
-            )
-            for slot in db_plan.meals
-        ]
-
-        return MealPlan(
-            id=db_plan.id,
-            name=db_plan.name,
-            start_date=db_plan.start_date,
-            end_date=db_plan.end_date,
-            meals=meals,
-            notes=db_plan.notes,
-            created_at=db_plan.created_at,
-            updated_at=db_plan.updated_at,
-        )
+        return meal_plan_to_model(db_plan)
 
 
 class PreferencesRepository:
-    """Repository for user preferences."""
+    """Repository for user preferences.
+
+    Reads go through a process-local cache: a fresh entry is returned without
+    a query, a stale one is revalidated with a cheap version probe, and
+    ``update`` writes the new value through to the cache.
+    """
 
     def __init__(self, db: Session):
         self.db = db
 
     def get(self) -> UserPreferences:
         """Get user preferences (creates default if none exists)."""
-        db_prefs = self.db.query(UserPreferencesTable).first()
+        bind = self.db.get_bind()
+        cached, stamp = preferences_cache.get(bind, settings.preferences_cache_ttl_seconds)
+        if cached is not None:
+            return cached
+        if stamp is not None and self._probe() == stamp:
+            revalidated = preferences_cache.revalidate(bind)
+            if revalidated is not None:
+                return revalidated
+
+        db_prefs = self.db.query(UserPreferencesTable).order_by(UserPreferencesTable.id).first()
         if not db_prefs:
             db_prefs = UserPreferencesTable()
             self.db.add(db_prefs)
-            self.db.commit()
+            _commit(self.db)
             self.db.refresh(db_prefs)
-        return self._to_model(db_prefs)
+        return self._cache(db_prefs)
 
     def update(self, preferences: UserPreferences) -> UserPreferences:
         """Update user preferences."""
-        db_prefs = self.db.query(UserPreferencesTable).first()
+        db_prefs = self.db.query(UserPreferencesTable).order_by(UserPreferencesTable.id).first()
         if not db_prefs:
             db_prefs = UserPreferencesTable()
             self.db.add(db_prefs)
 
-        db_prefs.dietary_restrictions_json = json.dumps(preferences.dietary_restrictions)
-        db_prefs.allergies_json = json.dumps(preferences.allergies)
-        db_prefs.disliked_ingredients_json = json.dumps(preferences.disliked_ingredients)
-        db_prefs.favorite_cuisines_json = json.dumps(preferences.favorite_cuisines)
-        db_prefs.skill_level = preferences.skill_level
-        db_prefs.serving_size = preferences.serving_size
-        db_prefs.max_cook_time_minutes = preferences.max_cook_time_minutes
-        db_prefs.prefer_quick_meals = preferences.prefer_quick_meals
-        db_prefs.budget_conscious = preferences.budget_conscious
-
-        self.db.commit()
+        apply_preferences(db_prefs, preferences)
+        db_prefs.updated_at = datetime.utcnow()
+
+        try:
+            _commit(self.db)
+        except Exception:
+            preferences_cache.invalidate(self.db.get_bind())
+            raise
         self.db.refresh(db_prefs)
-        return self._to_model(db_prefs)
+        return self._cache(db_prefs)
+
+    def _probe(self) -> Optional[tuple]:
+        """Read the version stamp of the preferences row."""
+        row = (
+            self.db.query(UserPreferencesTable.id, UserPreferencesTable.updated_at)
+            .order_by(UserPreferencesTable.id)
+            .first()
+        )
+        return tuple(row) if row else None
+
+    def _cache(self, db_prefs: UserPreferencesTable) -> UserPreferences:
+        """Convert a row and store it in the cache."""
+        preferences = self._to_model(db_prefs)
+        preferences_cache.put(self.db.get_bind(), preferences, (db_prefs.id, db_prefs.updated_at))
+        return preferences
 
     def _to_model(self, db_prefs: UserPreferencesTable) -> UserPreferences:
         """Convert database record to Pydantic model."""
-        return UserPreferences(
-            dietary_restrictions=json.loads(db_prefs.dietary_restrictions_json or "[]"),
-            allergies=json.loads(db_prefs.allergies_json or "[]"),
-            disliked_ingredients=json.loads(db_prefs.disliked_ingredients_json or "[]"),
-            favorite_cuisines=json.loads(db_prefs.favorite_cuisines_json or "[]"),
-            skill_level=db_prefs.skill_level,
-            serving_size=db_prefs.serving_size,
-            max_cook_time_minutes=db_prefs.max_cook_time_minutes,
-            prefer_quick_meals=db_prefs.prefer_quick_meals,
-            budget_conscious=db_prefs.budget_conscious,
+        return preferences_to_model(db_prefs)
+
+
+class ChangeFeedRepository:
+    """Repository for delta sync over the trigger-maintained change log."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def current_token(self) -> str:
+        """Get a token pointing after the newest change (to start syncing from now)."""
+        return str(self.db.query(func.coalesce(func.max(ChangeTable.seq), 0)).scalar())
+
+    def changes_since(self, token: Optional[str] = None, limit: int = 500) -> ChangeSet:
+        """
+        Get records changed after a token, each in its current state.
+
+        Args:
+            token: Token from the previous call; empty or None for a full sync
+            limit: Maximum number of changed records to return
+
+        Returns:
+            Changed and deleted records plus the token to continue from
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        try:
+            after = int(token) if token else 0
+        except ValueError:
+            raise ValueError(f"Invalid sync token '{token}'") from None
+
+        changes = (
+            self.db.query(ChangeTable.seq, ChangeTable.entity, ChangeTable.entity_id, ChangeTable.op)
+            .filter(ChangeTable.seq > after)
+            .order_by(ChangeTable.seq)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        upserts: dict[str, list[int]] = {"recipe": [], "meal_plan": [], "preferences": []}
+        deleted: dict[str, list[int]] = {"recipe": [], "meal_plan": [], "preferences": []}
+        for change in changes:
+            (upserts if change.op == "upsert" else deleted)[change.entity].append(change.entity_id)
+
+        recipes = (
+            self.db.query(RecipeTable).filter(RecipeTable.id.in_(upserts["recipe"])).order_by(RecipeTable.id).all()
+            if upserts["recipe"] else []
+        )
+        plans = (
+            self.db.query(MealPlanTable)
+            .options(selectinload(MealPlanTable.meals))
+            .filter(MealPlanTable.id.in_(upserts["meal_plan"]))
+            .order_by(MealPlanTable.id)
+            .all()
+            if upserts["meal_plan"] else []
+        )
+        preferences = (
+            self.db.query(UserPreferencesTable).filter(UserPreferencesTable.id.in_(upserts["preferences"])).first()
+            if upserts["preferences"] else None
+        )
+
+        # A row deleted after the log was read is reported as deleted
+        found_recipes = {r.id for r in recipes}
+        found_plans = {p.id for p in plans}
+        return ChangeSet(
+            token=str(changes[-1].seq if changes else after),
+            has_more=has_more,
+            recipes=[recipe_to_model(r) for r in recipes],
+            meal_plans=[meal_plan_to_model(p) for p in plans],
+            preferences=preferences_to_model(preferences) if preferences else None,
+            deleted_recipes=deleted["recipe"] + [i for i in upserts["recipe"] if i not in found_recipes],
+            deleted_meal_plans=deleted["meal_plan"] + [i for i in upserts["meal_plan"] if i not in found_plans],
+        )
+
+
+class CalendarRepository:
+    """Date-range queries over the meal slots of every plan."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def range(self, start: date, end: date, meal_types: Optional[Iterable[MealType]] = None) -> Calendar:
+        """
+        Get the meals planned between two dates, across overlapping plans.
+
+        Args:
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            meal_types: Only these meal types (default: all)
+
+        Returns:
+            The days with meals, each sorted breakfast to snack
+        """
+        rows = self.db.execute(calendar.entries_query(start, end, meal_types))
+        return Calendar(start, end, {day.date: day for day in calendar.group_days(rows)})
+
+    def iter_days(
+        self,
+        start: date,
+        end: date,
+        meal_types: Optional[Iterable[MealType]] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[CalendarDay]:
+        """
+        Stream the days with meals in date order.
+
+        Rows are fetched ``batch_size`` at a time, so memory stays flat over
+        long ranges (exports, multi-year views). Consume the iterator before
+        committing on the same session.
+        """
+        statement = calendar.entries_query(start, end, meal_types).execution_options(yield_per=batch_size)
+        yield from calendar.group_days(self.db.execute(statement))
+
+    def day_counts(
+        self, start: date, end: date, meal_types: Optional[Iterable[MealType]] = None
+    ) -> dict[date, dict[str, int]]:
+        """Number of planned meals per day and meal type, aggregated in SQL."""
+        counts: dict[date, dict[str, int]] = {}
+        for day, meal_type, count in self.db.execute(calendar.day_counts_query(start, end, meal_types)):
+            counts.setdefault(day, {})[meal_type] = count
+        return counts
+
+
+class JobRepository:
+    """Repository for background jobs.
+
+    Every state change is one UPDATE guarded by the states it may leave, so
+    a worker finishing a job that was cancelled or expired in the meantime
+    changes nothing.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(
+        self,
+        kind: str,
+        params: Optional[dict] = None,
+        deadline: Optional[datetime] = None,
+        owner: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue a new job.
+
+        Args:
+            kind: Name of the handler that runs the job
+            params: JSON-serializable handler arguments
+            deadline: UTC time after which the job expires unfinished
+            owner: Session that submits the job
+
+        Returns:
+            The queued job
+        """
+        db_job = JobTable(
+            kind=kind,
+            owner=owner,
+            status=JobStatus.QUEUED.value,
+            params_json=codec.dumps(params or {}),
+            deadline=deadline,
+            created_at=datetime.utcnow(),
+        )
+        self.db.add(db_job)
+        try:
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        self.db.refresh(db_job)
+        return job_to_model(db_job)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Get a job by ID."""
+        db_job = self.db.get(JobTable, job_id)
+        return job_to_model(db_job) if db_job else None
+
+    def status(self, job_id: int) -> Optional[JobStatus]:
+        """Get only the status of a job (a cheap probe for running handlers)."""
+        status = self.db.execute(select(JobTable.status).where(JobTable.id == job_id)).scalar()
+        return JobStatus(status) if status else None
+
+    def recent(self, kind: Optional[str] = None, limit: int = 20, owner: Optional[str] = None) -> list[Job]:
+        """Get the newest jobs, optionally of one kind and one owner."""
+        query = self.db.query(JobTable)
+        if owner is not None:
+            query = query.filter(JobTable.owner == owner)
+        if kind is not None:
+            query = query.filter(JobTable.kind == kind)
+        return [job_to_model(j) for j in query.order_by(JobTable.id.desc()).limit(limit).all()]
+
+    def active(self) -> list[Job]:
+        """Get the queued and running jobs, oldest first."""
+        query = self.db.query(JobTable).filter(JobTable.status.in_(ACTIVE_JOB_STATUSES)).order_by(JobTable.id)
+        return [job_to_model(j) for j in query.all()]
+
+    def start(self, job_id: int) -> bool:
+        """Mark a queued job running; False if it was cancelled or expired first."""
+        return self._transition(
+            job_id, (JobStatus.QUEUED,), JobStatus.RUNNING, started_at=datetime.utcnow()
+        )
+
+    def set_progress(self, job_id: int, message: str) -> bool:
+        """Record a progress message on a running job."""
+        return self._transition(job_id, (JobStatus.RUNNING,), JobStatus.RUNNING, progress=message[:200])
+
+    def finish(self, job_id: int, result=None) -> bool:
+        """Store the result of a running job and mark it succeeded."""
+        return self._transition(
+            job_id,
+            (JobStatus.RUNNING,),
+            JobStatus.SUCCEEDED,
+            result_json=codec.dumps(result),
+            finished_at=datetime.utcnow(),
+        )
+
+    def fail(self, job_id: int, error: str) -> bool:
+        """Mark a queued or running job failed."""
+        return self._transition(
+            job_id, (JobStatus.QUEUED, JobStatus.RUNNING), JobStatus.FAILED, error=error, finished_at=datetime.utcnow()
+        )
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued or running job; False if it had already finished."""
+        return self._transition(
+            job_id, (JobStatus.QUEUED, JobStatus.RUNNING), JobStatus.CANCELLED, finished_at=datetime.utcnow()
+        )
+
+    def expire_overdue(self, now: Optional[datetime] = None) -> int:
+        """Mark queued and running jobs past their deadline expired; returns how many."""
+        now = now or datetime.utcnow()
+        overdue = (
+            JobTable.status.in_(ACTIVE_JOB_STATUSES),
+            JobTable.deadline.is_not(None),
+            JobTable.deadline < now,
+        )
+        # Check with a read first: the UPDATE takes the write lock even when it matches nothing
+        if self.db.execute(select(JobTable.id).where(*overdue).limit(1)).first() is None:
+            return 0
+        return self._write(
+            update(JobTable)
+            .where(*overdue)
+            .values(status=JobStatus.EXPIRED.value, error="Deadline exceeded", finished_at=now)
+        )
+
+    def delete_finished(self, before: datetime) -> int:
+        """Delete finished jobs created before a time; returns how many."""
+        return self._write(
+            delete(JobTable).where(JobTable.status.not_in(ACTIVE_JOB_STATUSES), JobTable.created_at < before)
+        )
+
+    def _transition(self, job_id: int, from_statuses: tuple[JobStatus, ...], status: JobStatus, **values) -> bool:
+        statement = (
+            update(JobTable)
+            .where(JobTable.id == job_id, JobTable.status.in_([s.value for s in from_statuses]))
+            .values(status=status.value, **values)
         )
+        return self._write(statement) == 1
+
+    def _write(self, statement) -> int:
+        """Run one statement in its own transaction and return its rowcount."""
+        try:
+            rowcount = self.db.connection().execute(statement).rowcount
+            _commit(self.db)
+        except Exception:
+            _rollback(self.db)
+            raise
+        return rowcount
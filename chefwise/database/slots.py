@@ -0,0 +1,187 @@
+"""Slot-level meal plan statements.
+
+Editing one meal must not rewrite its plan: every operation here is a single
+UPDATE, INSERT or DELETE aimed at the affected ``meal_slots`` rows by
+primary key. The sync and async repositories execute the same statements,
+each in its own short transaction on the session's connection (bypassing
+the ORM identity map, which the commit expires). The change-feed triggers
+fire per row, so only the touched plan is reported as changed.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, func, insert, literal, select, update
+
+from chefwise.models import MealPlan, MealSlot, MealType
+from .converters import meal_slot_values
+from .tables import MealPlanTable, MealSlotTable
+
+# Columns compared when diffing an edited plan against the stored one
+SLOT_COLUMNS = ("date", "meal_type", "recipe_id", "recipe_title", "notes")
+PLAN_COLUMNS = ("name", "start_date", "end_date", "notes")
+
+
+@dataclass
+class SlotChanges:
+    """Rows written when saving an edited meal plan."""
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    plan_updated: bool = False
+    new_slot_ids: list[int] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything was written."""
+        return bool(self.inserted or self.updated or self.deleted or self.plan_updated)
+
+
+def _meal_type(meal_type) -> str:
+    return meal_type.value if isinstance(meal_type, MealType) else meal_type
+
+
+def update_slot(slot_id: int, meal: MealSlot):
+    """Overwrite every column of one slot."""
+    return update(MealSlotTable).where(MealSlotTable.id == slot_id).values(**meal_slot_values(meal))
+
+
+def move_slot(slot_id: int, new_date: date, meal_type: Optional[MealType] = None):
+    """Move one slot to another day and, optionally, another meal."""
+    values = {"date": new_date}
+    if meal_type is not None:
+        values["meal_type"] = _meal_type(meal_type)
+    return update(MealSlotTable).where(MealSlotTable.id == slot_id).values(**values)
+
+
+def swap_slots(first_id: int, second_id: int):
+    """
+    Exchange the meals (recipe, title, notes) of two slots; dates and meal types stay.
+
+    ``UPDATE ... FROM`` reads both rows before either is written, so the swap
+    is one statement. It updates zero rows unless both slots exist.
+    """
+    ids = (first_id, second_id)
+    other = (
+        select(MealSlotTable.id, MealSlotTable.recipe_id, MealSlotTable.recipe_title, MealSlotTable.notes)
+        .where(MealSlotTable.id.in_(ids))
+        .subquery("other")
+    )
+    return (
+        update(MealSlotTable)
+        .where(MealSlotTable.id.in_(ids), other.c.id != MealSlotTable.id)
+        .values(recipe_id=other.c.recipe_id, recipe_title=other.c.recipe_title, notes=other.c.notes)
+    )
+
+
+def _shift(column, days: int):
+    return func.date(column, f"{days:+d} days")
+
+
+def reschedule_slots(plan_id: int, days: int):
+    """Shift every slot of a plan by ``days`` (negative moves earlier)."""
+    shifted = _shift(MealSlotTable.date, days)
+    return update(MealSlotTable).where(MealSlotTable.meal_plan_id == plan_id).values(date=shifted)
+
+
+def reschedule_plan(plan_id: int, days: int):
+    """Shift a plan's start and end dates by ``days``."""
+    return (
+        update(MealPlanTable)
+        .where(MealPlanTable.id == plan_id)
+        .values(start_date=_shift(MealPlanTable.start_date, days), end_date=_shift(MealPlanTable.end_date, days))
+    )
+
+
+def delete_slot(slot_id: int):
+    """Delete one slot."""
+    return delete(MealSlotTable).where(MealSlotTable.id == slot_id)
+
+
+def insert_slot(plan_id: int, meal: MealSlot):
+    """Add one slot to a plan, returning its id (no row if the plan does not exist)."""
+    values = meal_slot_values(meal)
+    columns = MealSlotTable.__table__.c
+    source = select(
+        MealPlanTable.id, *(literal(values[name], columns[name].type) for name in SLOT_COLUMNS)
+    ).where(MealPlanTable.id == plan_id)
+    return insert(MealSlotTable).from_select(["meal_plan_id", *SLOT_COLUMNS], source).returning(MealSlotTable.id)
+
+
+def stored_slots(plan_id: int):
+    """Select a plan's slots as ``(id, *SLOT_COLUMNS)`` rows."""
+    return select(MealSlotTable.id, *(MealSlotTable.__table__.c[name] for name in SLOT_COLUMNS)).where(
+        MealSlotTable.meal_plan_id == plan_id
+    )
+
+
+def stored_plan(plan_id: int):
+    """Select a plan's own columns."""
+    return select(*(MealPlanTable.__table__.c[name] for name in PLAN_COLUMNS)).where(MealPlanTable.id == plan_id)
+
+
+@dataclass
+class SlotDiff:
+    """Statements that turn the stored slots into the edited ones."""
+
+    inserts: list[dict]
+    updates: list[dict]
+    deletes: list[int]
+    plan_values: Optional[dict]
+
+    def statements(self, plan_id: int) -> list[tuple]:
+        """
+        ``(statement, parameters)`` pairs, one per kind of change.
+
+        The slot insert, if any, comes last and returns the new ids in order.
+        """
+        statements = []
+        if self.plan_values:
+            statement = update(MealPlanTable).where(MealPlanTable.id == plan_id).values(**self.plan_values)
+            statements.append((statement, None))
+        if self.deletes:
+            statements.append((delete(MealSlotTable).where(MealSlotTable.id.in_(self.deletes)), None))
+        if self.updates:
+            # executemany: the remaining parameter keys become the SET clause
+            table = MealSlotTable.__table__
+            statements.append((table.update().where(table.c.id == bindparam("slot_id")), self.updates))
+        if self.inserts:
+            statement = insert(MealSlotTable).returning(MealSlotTable.id, sort_by_parameter_order=True)
+            statements.append((statement, [{"meal_plan_id": plan_id, **values} for values in self.inserts]))
+        return statements
+
+    def changes(self) -> SlotChanges:
+        """Counts of the rows these statements write."""
+        return SlotChanges(
+            inserted=len(self.inserts),
+            updated=len(self.updates),
+            deleted=len(self.deletes),
+            plan_updated=bool(self.plan_values),
+        )
+
+
+def diff_slots(plan: MealPlan, stored_plan_row, stored_rows) -> SlotDiff:
+    """
+    Compare an edited plan with its stored plan row and slot rows.
+
+    Slots without an id (or with an id the plan no longer has) are inserted,
+    stored slots missing from the edit are deleted, and the rest are updated
+    only if one of ``SLOT_COLUMNS`` differs.
+    """
+    stored = {row[0]: tuple(row[1:]) for row in stored_rows}
+    inserts, updates, seen = [], [], set()
+    for meal in plan.meals:
+        values = meal_slot_values(meal)
+        if meal.id is None or meal.id not in stored or meal.id in seen:
+            inserts.append(values)
+            continue
+        seen.add(meal.id)
+        if tuple(values[name] for name in SLOT_COLUMNS) != stored[meal.id]:
+            updates.append({"slot_id": meal.id, **values})
+
+    plan_values = {name: getattr(plan, name) for name in PLAN_COLUMNS}
+    if tuple(plan_values.values()) == tuple(stored_plan_row):
+        plan_values = None
+    return SlotDiff(inserts, updates, [i for i in stored if i not in seen], plan_values)
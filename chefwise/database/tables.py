@@ -1,6 +1,5 @@
 """SQLAlchemy table definitions."""
 
-import json
 from datetime import datetime, date
 from typing import Optional
 
@@ -13,9 +12,21 @@ from sqlalchemy import (
     Date,
     ForeignKey,
     Boolean,
+    Computed,
+    Index,
+    LargeBinary,
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
 
+from chefwise import codec
+
+
+# SQL expression behind the generated recipes.total_time_minutes column
+TOTAL_TIME_SQL = (
+    "CASE WHEN prep_time_minutes IS NULL AND cook_time_minutes IS NULL THEN NULL "
+    "ELSE COALESCE(prep_time_minutes, 0) + COALESCE(cook_time_minutes, 0) END"
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -28,7 +39,7 @@ class RecipeTable(Base):
     __tablename__ = "recipes"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    title = Column(String(255), nullable=False)
+    title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     ingredients_json = Column(Text, nullable=False)  # JSON string
     instructions_json = Column(Text, nullable=False)  # JSON string
@@ -36,10 +47,16 @@ class RecipeTable(Base):
     cook_time_minutes = Column(Integer, nullable=True)
     servings = Column(Integer, default=4)
     dietary_tags_json = Column(Text, default="[]")  # JSON string
-    cuisine = Column(String(100), nullable=True)
-    difficulty = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    cuisine = Column(String(100), nullable=True, index=True)
+    difficulty = Column(String(50), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
+    total_time_minutes = Column(
+        Integer,
+        Computed(TOTAL_TIME_SQL, persisted=False),
+        index=True,
+    )  # Generated from prep + cook time
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)  # See dedup.fingerprint
 
     # Relationships
     meal_slots = relationship("MealSlotTable", back_populates="recipe")
@@ -47,45 +64,59 @@ class RecipeTable(Base):
     @property
     def ingredients(self) -> list:
         """Parse ingredients from JSON."""
-        return json.loads(self.ingredients_json) if self.ingredients_json else []
+        return codec.loads(self.ingredients_json) if self.ingredients_json else []
 
     @ingredients.setter
     def ingredients(self, value: list) -> None:
         """Store ingredients as JSON."""
-        self.ingredients_json = json.dumps(value)
+        self.ingredients_json = codec.dumps(value)
 
     @property
     def instructions(self) -> list:
         """Parse instructions from JSON."""
-        return json.loads(self.instructions_json) if self.instructions_json else []
+        return codec.loads(self.instructions_json) if self.instructions_json else []
 
     @instructions.setter
     def instructions(self, value: list) -> None:
         """Store instructions as JSON."""
-        self.instructions_json = json.dumps(value)
+        self.instructions_json = codec.dumps(value)
 
     @property
     def dietary_tags(self) -> list:
         """Parse dietary tags from JSON."""
-        return json.loads(self.dietary_tags_json) if self.dietary_tags_json else []
+        return codec.loads(self.dietary_tags_json) if self.dietary_tags_json else []
 
     @dietary_tags.setter
     def dietary_tags(self, value: list) -> None:
         """Store dietary tags as JSON."""
-        self.dietary_tags_json = json.dumps(value)
+        self.dietary_tags_json = codec.dumps(value)
+
+
+class RecipeTagTable(Base):
+    """Dietary tags of each recipe, one row per tag.
+
+    Kept in sync with ``recipes.dietary_tags_json`` by SQLite triggers (see
+    migrations), so tag filters are index lookups instead of JSON scans.
+    """
+
+    __tablename__ = "recipe_tags"
+
+    tag = Column(String(50), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True, index=True)
 
 
 class MealPlanTable(Base):
     """Meal plans table."""
 
     __tablename__ = "meal_plans"
+    __table_args__ = (Index("ix_meal_plans_dates", "start_date", "end_date"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
 
     # Relationships
@@ -96,12 +127,16 @@ class MealSlotTable(Base):
     """Individual meals in a meal plan."""
 
     __tablename__ = "meal_slots"
+    # Covers calendar range queries: date range, meal type filter and the projected columns
+    __table_args__ = (
+        Index("ix_meal_slots_calendar", "date", "meal_type", "meal_plan_id", "recipe_id", "recipe_title"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id"), nullable=False, index=True)
+    date = Column(Date, nullable=False, index=True)
     meal_type = Column(String(50), nullable=False)  # breakfast, lunch, dinner, snack
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True, index=True)
     recipe_title = Column(String(255), nullable=False)  # Store title even without saved recipe
     notes = Column(Text, nullable=True)
 
@@ -129,32 +164,114 @@ class UserPreferencesTable(Base):
 
     @property
     def dietary_restrictions(self) -> list:
-        return json.loads(self.dietary_restrictions_json) if self.dietary_restrictions_json else []
+        return codec.loads(self.dietary_restrictions_json) if self.dietary_restrictions_json else []
 
     @dietary_restrictions.setter
     def dietary_restrictions(self, value: list) -> None:
-        self.dietary_restrictions_json = json.dumps(value)
+        self.dietary_restrictions_json = codec.dumps(value)
 
     @property
     def allergies(self) -> list:
-        return json.loads(self.allergies_json) if self.allergies_json else []
+        return codec.loads(self.allergies_json) if self.allergies_json else []
 
     @allergies.setter
     def allergies(self, value: list) -> None:
-        self.allergies_json = json.dumps(value)
+        self.allergies_json = codec.dumps(value)
 
     @property
     def disliked_ingredients(self) -> list:
-        return json.loads(self.disliked_ingredients_json) if self.disliked_ingredients_json else []
+        return codec.loads(self.disliked_ingredients_json) if self.disliked_ingredients_json else []
 
     @disliked_ingredients.setter
     def disliked_ingredients(self, value: list) -> None:
-        self.disliked_ingredients_json = json.dumps(value)
+        self.disliked_ingredients_json = codec.dumps(value)
 
     @property
     def favorite_cuisines(self) -> list:
-        return json.loads(self.favorite_cuisines_json) if self.favorite_cuisines_json else []
+        return codec.loads(self.favorite_cuisines_json) if self.favorite_cuisines_json else []
 
     @favorite_cuisines.setter
     def favorite_cuisines(self, value: list) -> None:
-        self.favorite_cuisines_json = json.dumps(value)
+        self.favorite_cuisines_json = codec.dumps(value)
+
+
+class ImportCheckpointTable(Base):
+    """Progress of library imports, committed together with each imported batch."""
+
+    __tablename__ = "import_checkpoints"
+
+    export_id = Column(String(32), primary_key=True)  # From the export file header
+    line = Column(Integer, nullable=False, default=0)  # Last imported line number
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class JobTable(Base):
+    """Background jobs (see chefwise.jobs): parameters, status and JSON result."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_kind", "kind"),
+        Index("ix_jobs_status_deadline", "status", "deadline"),
+        Index("ix_jobs_owner_kind", "owner", "kind"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)
+    owner = Column(String(64))  # Session that submitted the job
+    status = Column(String(20), nullable=False, default="queued")
+    params_json = Column(Text, nullable=False, default="{}")
+    result_json = Column(Text)
+    error = Column(Text)
+    progress = Column(String(200))
+    deadline = Column(DateTime)  # UTC
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class ChangeTable(Base):
+    """Change log for delta sync: the latest change of every row.
+
+    Written by SQLite triggers (see migrations). Each change replaces the
+    previous entry of the same row with a new, higher ``seq`` (AUTOINCREMENT
+    never reuses values), so the table stays one row per record and deletes
+    leave a tombstone.
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_entity", "entity", "entity_id", unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)  # recipe, meal_plan, preferences
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, nullable=False)
+
+
+class IdempotencyKeyTable(Base):
+    """Responses stored under client idempotency keys (see chefwise.api.idempotency).
+
+    A row is inserted when the first request with a key starts; its
+    response is filled in when it finishes, and replayed to retries until
+    ``expires_at``.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_scope_key", "scope", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    scope = Column(String(100), nullable=False)  # Method and path, e.g. "POST /recipes"
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of the request body
+    status_code = Column(Integer)  # NULL while the first request is in flight
+    headers_json = Column(Text)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)  # UTC
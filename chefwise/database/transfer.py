@@ -0,0 +1,493 @@
+"""Streaming NDJSON export and import of the whole library.
+
+An export file holds one JSON document per line::
+
+    {"type": "header", "format": "chefwise-library", "version": 1, "export_id": "...", ...}
+    {"type": "preferences", "data": {...}}
+    {"type": "recipe", "data": {...}}        (ordered by id)
+    {"type": "meal_plan", "data": {...}}     (ordered by id, slots inline)
+
+Meal slots point at recipes by content fingerprint rather than id, so ids do
+not have to be remapped on import and recipes already in the library are
+skipped by fingerprint (see ``dedup.insert_unless_saved``).
+
+Exports stream rows with ``yield_per`` inside one read transaction (a
+consistent snapshot under WAL) and write them in batches. Every batch is a
+complete gzip member or zstd frame, and its end offset is recorded in a
+``<file>.progress`` sidecar, so an interrupted export can be resumed by
+truncating to the last batch. Imports commit batch by batch together with an
+``import_checkpoints`` row, so an interrupted import resumes after the last
+committed line and a finished one is not applied twice.
+
+Memory use depends on the batch size, not on the size of the library.
+"""
+
+import gzip
+import io
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, Optional, Union
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from chefwise import codec
+from chefwise.models import MealPlanCreate, RecipeCreate, UserPreferences
+from .cache import preferences_cache
+from .connection import engine as default_engine
+from .converters import apply_preferences, meal_slot_values, preferences_to_model, recipe_values
+from .dedup import insert_unless_saved, row_fingerprint
+from .migrations import current_version
+from .tables import (
+    ImportCheckpointTable,
+    MealPlanTable,
+    MealSlotTable,
+    RecipeTable,
+    UserPreferencesTable,
+)
+
+FORMAT = "chefwise-library"
+FORMAT_VERSION = 1
+COMPRESSIONS = ("none", "gzip", "zstd")
+DEFAULT_BATCH_SIZE = 500
+
+# Export order; imports rely on recipes preceding the meal plans that use them
+SECTIONS = ("preferences", "recipes", "meal_plans")
+
+_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+
+def detect_compression(path: Union[str, Path]) -> str:
+    """Pick the compression from the file suffix (``.gz``, ``.zst``, else none)."""
+    return _SUFFIXES.get(Path(path).suffix.lower(), "none")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression needs the 'zstandard' package: pip install zstandard") from e
+    return zstandard
+
+
+def _compressor(compression: str) -> Callable[[bytes], bytes]:
+    """Return a function turning one batch into a self-contained compressed block."""
+    if compression == "none":
+        return bytes
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=3).compress
+    raise ValueError(f"Unknown compression '{compression}'. Choose from: {', '.join(COMPRESSIONS)}")
+
+
+@contextmanager
+def _open_lines(path: Path, compression: str) -> Iterator[IO[bytes]]:
+    """Open an export file for line-by-line reading, across all batches."""
+    if compression == "gzip":
+        with gzip.open(path, "rb") as f:
+            yield f
+    elif compression == "zstd":
+        with open(path, "rb") as raw:
+            reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            with io.BufferedReader(reader) as f:
+                yield f
+    elif compression == "none":
+        with open(path, "rb") as f:
+            yield f
+    else:
+        raise ValueError(f"Unknown compression '{compression}'. Choose from: {', '.join(COMPRESSIONS)}")
+
+
+def _line(kind: str, data: dict[str, Any]) -> bytes:
+    return codec.dumpb({"type": kind, "data": data}) + b"\n"
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+# Export
+
+
+@dataclass
+class ExportResult:
+    """Outcome of an export."""
+
+    path: Path
+    export_id: str
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(SECTIONS, 0))
+    resumed: bool = False
+
+
+def _export_preferences(conn: Connection, after: int, batch_size: int) -> Iterator[tuple[int, bytes]]:
+    row = conn.execute(
+        select(UserPreferencesTable).where(UserPreferencesTable.id > after).order_by(UserPreferencesTable.id).limit(1)
+    ).first()
+    if row:
+        yield row.id, _line("preferences", preferences_to_model(row).model_dump(mode="json"))
+
+
+def _export_recipes(conn: Connection, after: int, batch_size: int) -> Iterator[tuple[int, bytes]]:
+    rows = conn.execute(
+        select(RecipeTable.__table__)
+        .where(RecipeTable.id > after)
+        .order_by(RecipeTable.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        yield row.id, _line(
+            "recipe",
+            {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "ingredients": codec.loads(row.ingredients_json or "[]"),
+                "instructions": codec.loads(row.instructions_json or "[]"),
+                "prep_time_minutes": row.prep_time_minutes,
+                "cook_time_minutes": row.cook_time_minutes,
+                "servings": row.servings,
+                "dietary_tags": codec.loads(row.dietary_tags_json or "[]"),
+                "cuisine": row.cuisine,
+                "difficulty": row.difficulty,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "content_hash": row.content_hash
+                or row_fingerprint(row.title, row.ingredients_json, row.instructions_json),
+            },
+        )
+
+
+def _export_meal_plans(conn: Connection, after: int, batch_size: int) -> Iterator[tuple[int, bytes]]:
+    plan, slot, recipe = MealPlanTable.__table__, MealSlotTable.__table__, RecipeTable.__table__
+    # One ordered pass over plans joined to their slots, grouped per plan
+    rows = conn.execute(
+        select(
+            plan,
+            slot.c.id.label("slot_id"),
+            slot.c.date.label("slot_date"),
+            slot.c.meal_type,
+            slot.c.recipe_title,
+            slot.c.notes.label("slot_notes"),
+            recipe.c.content_hash,
+            recipe.c.title.label("recipe_name"),
+            recipe.c.ingredients_json,
+            recipe.c.instructions_json,
+        )
+        .select_from(
+            plan.outerjoin(slot, slot.c.meal_plan_id == plan.c.id).outerjoin(recipe, recipe.c.id == slot.c.recipe_id)
+        )
+        .where(plan.c.id > after)
+        .order_by(plan.c.id, slot.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for plan_id, group in groupby(rows, key=lambda row: row.id):
+        group = list(group)
+        first = group[0]
+        meals = [
+            {
+                "date": row.slot_date,
+                "meal_type": row.meal_type,
+                "recipe_title": row.recipe_title,
+                "notes": row.slot_notes,
+                "recipe_hash": row.content_hash
+                or (row_fingerprint(row.recipe_name, row.ingredients_json, row.instructions_json)
+                    if row.recipe_name is not None else None),
+            }
+            for row in group
+            if row.slot_id is not None
+        ]
+        yield plan_id, _line(
+            "meal_plan",
+            {
+                "id": plan_id,
+                "name": first.name,
+                "start_date": first.start_date,
+                "end_date": first.end_date,
+                "notes": first.notes,
+                "created_at": first.created_at,
+                "updated_at": first.updated_at,
+                "meals": meals,
+            },
+        )
+
+
+_EXPORTERS = {
+    "preferences": _export_preferences,
+    "recipes": _export_recipes,
+    "meal_plans": _export_meal_plans,
+}
+
+
+def _progress_path(path: Path) -> Path:
+    return path.with_name(path.name + ".progress")
+
+
+def _save_progress(path: Path, state: dict[str, Any]) -> None:
+    """Write the sidecar atomically."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(codec.dumpb(state))
+    os.replace(tmp, path)
+
+
+def export_library(
+    path: Union[str, Path],
+    bind: Optional[Engine] = None,
+    compression: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = False,
+) -> ExportResult:
+    """
+    Export preferences, recipes and meal plans to an NDJSON file.
+
+    Args:
+        path: Output file; ``.gz`` and ``.zst`` suffixes pick the compression
+        bind: Engine to read from (defaults to the app database)
+        compression: ``none``, ``gzip`` or ``zstd`` (overrides the suffix)
+        batch_size: Records per streamed chunk and per written block
+        resume: Continue an interrupted export of ``path`` if its progress
+            sidecar exists; otherwise start over
+
+    Returns:
+        Export id and record counts per section
+    """
+    path = Path(path)
+    bind = bind or default_engine
+    compression = compression or detect_compression(path)
+    compress = _compressor(compression)
+    progress_path = _progress_path(path)
+
+    state = codec.loads(progress_path.read_bytes()) if resume and progress_path.exists() and path.exists() else None
+    if state and state["compression"] != compression:
+        raise ValueError(f"{path} was started with {state['compression']} compression, not {compression}")
+    resumed = state is not None
+    if state is None:
+        state = {
+            "export_id": uuid.uuid4().hex,
+            "compression": compression,
+            "offset": 0,
+            "section": None,
+            "last_id": 0,
+            "counts": dict.fromkeys(SECTIONS, 0),
+        }
+
+    with open(path, "r+b" if resumed else "wb") as out, bind.connect() as conn, conn.begin():
+        # Drop anything written after the last recorded batch
+        out.truncate(state["offset"])
+        out.seek(state["offset"])
+
+        def flush(lines: list[bytes], section: str, last_id: int) -> None:
+            out.write(compress(b"".join(lines)))
+            out.flush()
+            os.fsync(out.fileno())
+            state.update(offset=out.tell(), section=section, last_id=last_id)
+            if section in state["counts"]:
+                state["counts"][section] += len(lines)
+            _save_progress(progress_path, state)
+
+        if state["section"] is None:
+            header = {
+                "type": "header",
+                "format": FORMAT,
+                "version": FORMAT_VERSION,
+                "export_id": state["export_id"],
+                "exported_at": datetime.utcnow(),
+                "schema_version": current_version(conn),
+            }
+            flush([codec.dumpb(header) + b"\n"], "header", 0)
+
+        for index, section in enumerate(SECTIONS):
+            if state["section"] in SECTIONS and index < SECTIONS.index(state["section"]):
+                continue
+            last_id = state["last_id"] if state["section"] == section else 0
+            batch: list[bytes] = []
+            for record_id, line in _EXPORTERS[section](conn, last_id, batch_size):
+                batch.append(line)
+                last_id = record_id
+                if len(batch) >= batch_size:
+                    flush(batch, section, last_id)
+                    batch = []
+            flush(batch, section, last_id)
+
+    progress_path.unlink()
+    return ExportResult(path=path, export_id=state["export_id"], counts=state["counts"], resumed=resumed)
+
+
+# Import
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an import."""
+
+    export_id: str
+    preferences: int = 0
+    recipes: int = 0
+    duplicate_recipes: int = 0
+    meal_plans: int = 0
+    resumed_after_line: int = 0
+    already_completed: bool = False
+
+
+def _read_header(line: bytes) -> dict[str, Any]:
+    try:
+        header = codec.loads(line)
+    except Exception:
+        header = None
+    if not isinstance(header, dict) or header.get("type") != "header" or header.get("format") != FORMAT:
+        raise ValueError("Not a ChefWise library export (missing header line)")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported export format version {header.get('version')}")
+    return header
+
+
+def _import_preferences(db: Session, data: dict[str, Any], result: ImportResult) -> None:
+    db_prefs = db.query(UserPreferencesTable).order_by(UserPreferencesTable.id).first()
+    if not db_prefs:
+        db_prefs = UserPreferencesTable()
+        db.add(db_prefs)
+    apply_preferences(db_prefs, UserPreferences.model_validate(data))
+    db_prefs.updated_at = datetime.utcnow()
+    result.preferences += 1
+
+
+def _import_recipes(db: Session, records: list[dict[str, Any]], result: ImportResult) -> None:
+    now = datetime.utcnow()
+    rows = []
+    for data in records:
+        values = recipe_values(RecipeCreate.model_validate(data))
+        values["created_at"] = _timestamp(data.get("created_at")) or now
+        values["updated_at"] = _timestamp(data.get("updated_at"))
+        rows.append(values)
+    inserted = db.connection().execute(insert_unless_saved(list(rows[0])), rows).rowcount
+    result.recipes += inserted
+    result.duplicate_recipes += len(rows) - inserted
+
+
+def _import_meal_plans(db: Session, records: list[dict[str, Any]], result: ImportResult) -> None:
+    hashes = {meal["recipe_hash"] for data in records for meal in data.get("meals", []) if meal.get("recipe_hash")}
+    recipe_ids = dict(
+        db.execute(
+            select(RecipeTable.content_hash, RecipeTable.id).where(RecipeTable.content_hash.in_(hashes))
+        ).all()
+    ) if hashes else {}
+
+    now = datetime.utcnow()
+    slots = []
+    for data in records:
+        plan = MealPlanCreate.model_validate(data)
+        plan_id = db.connection().execute(
+            insert(MealPlanTable).values(
+                name=plan.name,
+                start_date=plan.start_date,
+                end_date=plan.end_date,
+                notes=plan.notes,
+                created_at=_timestamp(data.get("created_at")) or now,
+                updated_at=_timestamp(data.get("updated_at")),
+            )
+        ).inserted_primary_key[0]
+        for meal, raw in zip(plan.meals, data.get("meals", [])):
+            values = meal_slot_values(meal)
+            values["meal_plan_id"] = plan_id
+            values["recipe_id"] = recipe_ids.get(raw.get("recipe_hash"))
+            slots.append(values)
+    if slots:
+        db.connection().execute(insert(MealSlotTable), slots)
+    result.meal_plans += len(records)
+
+
+def _apply_batch(db: Session, records: list[dict[str, Any]], result: ImportResult) -> None:
+    recipes, plans = [], []
+    for record in records:
+        kind, data = record.get("type"), record.get("data") or {}
+        if kind == "preferences":
+            _import_preferences(db, data, result)
+        elif kind == "recipe":
+            recipes.append(data)
+        elif kind == "meal_plan":
+            plans.append(data)
+        else:
+            raise ValueError(f"Unknown record type '{kind}'")
+    if recipes:
+        _import_recipes(db, recipes, result)
+    if plans:
+        _import_meal_plans(db, plans, result)
+
+
+def _commit_checkpoint(db: Session, export_id: str, line: int, completed: bool) -> None:
+    """Record progress in the same transaction as the batch, then commit."""
+    checkpoint = db.get(ImportCheckpointTable, export_id)
+    if checkpoint is None:
+        checkpoint = ImportCheckpointTable(export_id=export_id)
+        db.add(checkpoint)
+    checkpoint.line = line
+    checkpoint.completed = completed
+    db.commit()
+
+
+def import_library(
+    path: Union[str, Path],
+    bind: Optional[Engine] = None,
+    compression: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = True,
+) -> ImportResult:
+    """
+    Import an export file written by ``export_library``.
+
+    Args:
+        path: Export file; ``.gz`` and ``.zst`` suffixes pick the compression
+        bind: Engine to write to (defaults to the app database)
+        compression: ``none``, ``gzip`` or ``zstd`` (overrides the suffix)
+        batch_size: Records per transaction
+        resume: Continue after the last committed line of an earlier run of
+            the same export (and skip it entirely if it completed);
+            ``False`` imports the whole file again
+
+    Returns:
+        Counts of imported records
+
+    Raises:
+        ValueError: If the file is not a ChefWise export or a line is invalid
+    """
+    path = Path(path)
+    bind = bind or default_engine
+    compression = compression or detect_compression(path)
+
+    with _open_lines(path, compression) as lines, Session(bind=bind, autoflush=False) as db:
+        header = _read_header(next(lines, b""))
+        result = ImportResult(export_id=header["export_id"])
+
+        checkpoint = db.get(ImportCheckpointTable, result.export_id)
+        if resume and checkpoint is not None:
+            if checkpoint.completed:
+                result.already_completed = True
+                return result
+            result.resumed_after_line = checkpoint.line
+
+        batch: list[dict[str, Any]] = []
+        number = 1
+        for number, raw in enumerate(lines, start=2):
+            if number <= result.resumed_after_line or not raw.strip():
+                continue
+            try:
+                batch.append(codec.loads(raw))
+            except Exception as e:
+                raise ValueError(f"{path}:{number}: invalid JSON ({e})") from e
+            if len(batch) >= batch_size:
+                _apply_batch(db, batch, result)
+                _commit_checkpoint(db, result.export_id, number, completed=False)
+                batch = []
+
+        _apply_batch(db, batch, result)
+        _commit_checkpoint(db, result.export_id, number, completed=True)
+
+    if result.preferences:
+        preferences_cache.invalidate(bind)
+    return result
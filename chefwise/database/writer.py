@@ -0,0 +1,175 @@
+"""Single-writer queue with group commit.
+
+SQLite allows one write transaction at a time. When many threads commit
+small transactions, they queue on the write lock inside ``busy_timeout``
+and each pays for its own BEGIN/COMMIT (and WAL frame sync). A
+``WriteQueue`` instead funnels mutations to one writer thread. The thread
+runs everything that is queued in a single transaction and commits once:
+
+    queue = WriteQueue(engine)
+    future = queue.submit(lambda db: RecipeRepository(db).create_or_get(recipe))
+    recipe, created = future.result()
+
+A mutation is a callable taking a ``Session``. It runs inside a SAVEPOINT,
+so one that raises is rolled back alone and its future gets the exception
+while the rest of the batch commits. Futures resolve only after the batch
+has committed. If the commit itself fails, every future of the batch gets
+that error. Repositories see the ``GROUP_COMMIT`` flag in ``Session.info``
+and flush instead of committing; a mutation must not commit itself.
+
+Reads do not go through the queue. Under WAL they run concurrently with
+the writer and see each batch once it has committed. The queue serializes
+writers within one process; other processes still take turns on the lock
+through ``busy_timeout``, but each one holds it for a whole batch.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+
+from .cache import preferences_cache
+from .repositories import GROUP_COMMIT
+
+T = TypeVar("T")
+
+Mutation = Callable[[Session], T]
+
+# Tells the writer thread to stop
+_STOP = object()
+
+
+class WriteQueue:
+    """One writer thread committing queued mutations in batched transactions."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        config: Optional[Settings] = None,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        config = config or settings
+        self.bind = bind
+        self.max_batch = max_batch or config.db_write_batch_max
+        # Extra time to wait for more mutations once one arrives (0: take what is queued)
+        self.max_wait = (config.db_write_batch_wait_ms if max_wait_ms is None else max_wait_ms) / 1000
+        self._sessions = sessionmaker(bind=bind, autoflush=False, info={GROUP_COMMIT: True})
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._counts = {"batches": 0, "writes": 0, "failed": 0, "largest_batch": 0}
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="chefwise-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, mutation: Mutation) -> "Future[T]":
+        """
+        Queue a mutation for the writer thread.
+
+        Args:
+            mutation: Callable doing the writes with the session it is given
+
+        Returns:
+            A future for the mutation's return value, set once its batch committed
+
+        Raises:
+            RuntimeError: If the queue has been closed
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            self._queue.put((mutation, future))
+        return future
+
+    def write(self, mutation: Mutation) -> T:
+        """Run a mutation through the queue and wait for its result."""
+        return self.submit(mutation).result()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting mutations; the ones already queued are still written."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def __enter__(self) -> "WriteQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Batches committed, mutations written or failed, and the largest batch."""
+        counts = dict(self._counts)
+        counts["mean_batch"] = counts["writes"] / counts["batches"] if counts["batches"] else 0.0
+        return counts
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[tuple[Mutation, Future]]) -> None:
+        done: list[tuple[Future, Any]] = []
+        try:
+            with self._sessions() as db:
+                if self.bind.dialect.name == "sqlite":
+                    # Take the write lock up front: a deferred transaction that
+                    # reads first could not upgrade once another process wrote
+                    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                for mutation, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    db.begin_nested()
+                    try:
+                        result = mutation(db)
+                        db.get_nested_transaction().commit()
+                    except Exception as e:
+                        nested = db.get_nested_transaction()
+                        if nested is not None:
+                            nested.rollback()
+                        self._counts["failed"] += 1
+                        future.set_exception(e)
+                        continue
+                    done.append((future, result))
+                db.commit()
+        except Exception as e:
+            # Cached preferences may hold a version that was never committed
+            preferences_cache.invalidate(self.bind)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    self._counts["failed"] += 1
+            return
+
+        self._counts["batches"] += 1
+        self._counts["writes"] += len(done)
+        self._counts["largest_batch"] = max(self._counts["largest_batch"], len(done))
+        for future, result in done:
+            future.set_result(result)
@@ -0,0 +1,361 @@
+"""Background jobs for long AI generations.
+
+A ``JobRunner`` runs registered handlers on a thread pool and keeps every
+job's parameters, status, progress and result in the ``jobs`` table, so a
+page can submit a generation, let the user navigate away and show the
+result whenever they come back. Threads rather than processes: the work is
+waiting on the OpenAI API, and the services and their HTTP clients are
+shared, not pickled.
+
+Cancellation and deadlines are cooperative. Cancelling a job changes its
+row immediately; a job past its deadline reads as expired right away and
+its row is marked by the worker (or ``recover()``), so polling a job never
+writes. A handler notices at its next ``JobContext.check()``, and a result
+that arrives after the job was cancelled or expired is discarded (the
+guarded UPDATE in ``JobRepository.finish`` matches nothing). A request
+already sent to the API is not interrupted.
+
+Jobs carry an optional owner (the pages pass their session id), so each
+session lists only the jobs it submitted.
+
+Typical use::
+
+    runner = JobRunner()
+    runner.register(SUGGEST_RECIPES, suggest_recipes_job(RecipeSuggestionService))
+    job = runner.submit(SUGGEST_RECIPES, suggest_recipes_params(["eggs", "rice"]))
+    ...
+    job = runner.get(job.id)
+    if job.status is JobStatus.SUCCEEDED:
+        suggestions = suggestions_from_result(job.result)
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config import settings
+from chefwise.config.settings import Settings
+from chefwise.database import JobRepository, engine as default_engine
+from chefwise.models import (
+    Job,
+    JobStatus,
+    MealPlanCreate,
+    MealType,
+    RecipeSuggestion,
+    ShoppingListItem,
+    UserPreferences,
+)
+
+if TYPE_CHECKING:
+    from chefwise.ai import MealPlanService, RecipeSuggestionService
+
+SUGGEST_RECIPES = "suggest_recipes"
+GENERATE_MEAL_PLAN = "generate_meal_plan"
+
+
+class JobCancelled(Exception):
+    """Raised by ``JobContext.check()`` when the job should stop."""
+
+
+class JobContext:
+    """What a running handler sees of its job: progress and cancellation."""
+
+    def __init__(self, runner: "JobRunner", job: Job):
+        self.runner = runner
+        self.job_id = job.id
+        self.deadline = job.deadline
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline (None without one)."""
+        if self.deadline is None:
+            return None
+        return (self.deadline - datetime.utcnow()).total_seconds()
+
+    def check(self) -> None:
+        """
+        Stop the handler if its job is over.
+
+        Raises:
+            JobCancelled: If the deadline passed or the job was cancelled or expired
+        """
+        remaining = self.remaining
+        if remaining is not None and remaining <= 0:
+            raise JobCancelled("Deadline exceeded")
+        with self.runner._jobs() as jobs:
+            status = jobs.status(self.job_id)
+        if status is not JobStatus.RUNNING:
+            raise JobCancelled(f"Job is {status.value if status else 'deleted'}")
+
+    def progress(self, message: str) -> None:
+        """Record a progress message for pages polling the job."""
+        with self.runner._jobs() as jobs:
+            jobs.set_progress(self.job_id, message)
+
+
+# A handler takes the job's params and its context and returns a JSON value
+JobHandler = Callable[[dict[str, Any], JobContext], Any]
+
+
+class JobRunner:
+    """Run background jobs on a thread pool, with their state kept in the database."""
+
+    def __init__(
+        self,
+        bind: Optional[Engine] = None,
+        config: Optional[Settings] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.bind = bind or default_engine
+        self.config = config or settings
+        self._sessions = sessionmaker(bind=self.bind, autoflush=False)
+        self._handlers: dict[str, JobHandler] = {}
+        self._futures: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.config.job_workers, thread_name_prefix="chefwise-job"
+        )
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the handler that runs jobs of one kind."""
+        self._handlers[kind] = handler
+
+    def submit(
+        self,
+        kind: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        owner: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue a job and schedule it on the pool.
+
+        Args:
+            kind: Registered handler name
+            params: JSON-serializable handler arguments
+            timeout: Seconds until the deadline (defaults to ``job_timeout_seconds``; 0 for none)
+            owner: Session submitting the job, to list it with ``recent(owner=...)``
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If no handler is registered for ``kind``
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        timeout = self.config.job_timeout_seconds if timeout is None else timeout
+        deadline = datetime.utcnow() + timedelta(seconds=timeout) if timeout else None
+        with self._jobs() as jobs:
+            job = jobs.create(kind, params, deadline=deadline, owner=owner)
+        self._schedule(job.id)
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Get the current state of a job."""
+        with self._jobs() as jobs:
+            return jobs.get(job_id)
+
+    def recent(self, kind: Optional[str] = None, limit: int = 20, owner: Optional[str] = None) -> list[Job]:
+        """Get the newest jobs, optionally of one kind and one owner."""
+        with self._jobs() as jobs:
+            return jobs.recent(kind, limit, owner)
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a queued or running job.
+
+        A queued job never starts. A running handler stops at its next
+        ``check()``, and its result is discarded either way.
+
+        Returns:
+            False if the job had already finished
+        """
+        with self._jobs() as jobs:
+            cancelled = jobs.cancel(job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        return cancelled
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until this runner is done with a job (or ``timeout`` seconds), then return it."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            wait([future], timeout)
+        return self.get(job_id)
+
+    def recover(self) -> int:
+        """
+        Pick up the jobs a previous process left behind.
+
+        Queued jobs of registered kinds are scheduled again. Jobs that were
+        running are marked failed: the API call they were waiting on is gone.
+        Finished jobs older than ``job_retention_hours`` are deleted. Call it
+        once, after registering the handlers, with one runner per database.
+
+        Returns:
+            Number of jobs scheduled again
+        """
+        with self._lock:
+            scheduled = set(self._futures)
+        with self._jobs() as jobs:
+            jobs.delete_finished(datetime.utcnow() - timedelta(hours=self.config.job_retention_hours))
+            jobs.expire_overdue()
+            leftover = [job for job in jobs.active() if job.id not in scheduled]
+            for job in leftover:
+                if job.status is JobStatus.RUNNING:
+                    jobs.fail(job.id, "Interrupted by a restart")
+                elif job.kind not in self._handlers:
+                    jobs.fail(job.id, f"No handler registered for job kind '{job.kind}'")
+        queued = [job for job in leftover if job.status is JobStatus.QUEUED and job.kind in self._handlers]
+        for job in queued:
+            self._schedule(job.id)
+        return len(queued)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool; jobs still waiting for a thread stay queued for ``recover()``."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @contextmanager
+    def _jobs(self) -> Iterator[JobRepository]:
+        with self._sessions() as db:
+            yield JobRepository(db)
+
+    def _schedule(self, job_id: int) -> None:
+        with self._lock:
+            future = self._executor.submit(self._run, job_id)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+
+    def _forget(self, job_id: int) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id: int) -> None:
+        with self._jobs() as jobs:
+            # Cancelled or expired while it waited for a thread
+            if not jobs.start(job_id):
+                return
+            job = jobs.get(job_id)
+
+        context = JobContext(self, job)
+        try:
+            context.check()
+            result = self._handlers[job.kind](job.params, context)
+        except JobCancelled:
+            with self._jobs() as jobs:
+                jobs.expire_overdue()
+            return
+        except Exception as e:
+            with self._jobs() as jobs:
+                jobs.fail(job_id, str(e) or type(e).__name__)
+            return
+
+        with self._jobs() as jobs:
+            # A late result never overwrites cancelled or expired
+            jobs.expire_overdue()
+            try:
+                jobs.finish(job_id, result)
+            except TypeError as e:
+                jobs.fail(job_id, f"Result is not JSON serializable: {e}")
+
+
+# AI generation jobs
+
+
+def suggest_recipes_params(
+    ingredients: list[str],
+    num_recipes: int = 3,
+    dietary_restrictions: Optional[list[str]] = None,
+    max_cook_time: Optional[int] = None,
+    preferences: Optional[UserPreferences] = None,
+) -> dict[str, Any]:
+    """Job params for ``RecipeSuggestionService.suggest_recipes``."""
+    return {
+        "ingredients": ingredients,
+        "num_recipes": num_recipes,
+        "dietary_restrictions": dietary_restrictions or [],
+        "max_cook_time": max_cook_time,
+        "preferences": preferences.model_dump(mode="json") if preferences else None,
+    }
+
+
+def suggest_recipes_job(get_service: Callable[[], "RecipeSuggestionService"]) -> JobHandler:
+    """Handler for recipe suggestion jobs; ``get_service`` is called in the worker thread."""
+
+    def handler(params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+        service = get_service()
+        context.progress("Finding recipes")
+        suggestions = service.suggest_recipes(
+            ingredients=params["ingredients"],
+            num_recipes=params["num_recipes"],
+            dietary_restrictions=params["dietary_restrictions"],
+            max_cook_time=params["max_cook_time"],
+            preferences=_preferences(params),
+        )
+        return {"recipes": [s.model_dump(mode="json") for s in suggestions]}
+
+    return handler
+
+
+def suggestions_from_result(result: dict[str, Any]) -> list[RecipeSuggestion]:
+    """Rebuild the suggestions stored by a recipe suggestion job."""
+    return [RecipeSuggestion.model_validate(r) for r in result["recipes"]]
+
+
+def meal_plan_params(
+    num_days: int = 7,
+    start_date: Optional[date] = None,
+    meal_types: Optional[list[MealType]] = None,
+    preferences: Optional[UserPreferences] = None,
+    favorite_cuisines: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """Job params for ``MealPlanService.generate_meal_plan``."""
+    return {
+        "num_days": num_days,
+        "start_date": start_date.isoformat() if start_date else None,
+        "meal_types": [MealType(m).value for m in meal_types] if meal_types else None,
+        "preferences": preferences.model_dump(mode="json") if preferences else None,
+        "favorite_cuisines": favorite_cuisines or [],
+    }
+
+
+def meal_plan_job(get_service: Callable[[], "MealPlanService"]) -> JobHandler:
+    """Handler for meal plan jobs; ``get_service`` is called in the worker thread."""
+
+    def handler(params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+        service = get_service()
+        context.progress("Planning meals")
+        meal_plan, shopping_list = service.generate_meal_plan(
+            num_days=params["num_days"],
+            start_date=date.fromisoformat(params["start_date"]) if params["start_date"] else None,
+            meal_types=[MealType(m) for m in params["meal_types"]] if params["meal_types"] else None,
+            preferences=_preferences(params),
+            favorite_cuisines=params["favorite_cuisines"],
+        )
+        return {
+            "meal_plan": meal_plan.model_dump(mode="json"),
+            "shopping_list": [item.model_dump(mode="json") for item in shopping_list],
+        }
+
+    return handler
+
+
+def meal_plan_from_result(result: dict[str, Any]) -> tuple[MealPlanCreate, list[ShoppingListItem]]:
+    """Rebuild the plan and shopping list stored by a meal plan job."""
+    return (
+        MealPlanCreate.model_validate(result["meal_plan"]),
+        [ShoppingListItem.model_validate(item) for item in result["shopping_list"]],
+    )
+
+
+def _preferences(params: dict[str, Any]) -> Optional[UserPreferences]:
+    return UserPreferences.model_validate(params["preferences"]) if params.get("preferences") else None
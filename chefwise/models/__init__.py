@@ -3,29 +3,46 @@
 from .recipe import (
     DietaryRestriction,
     Ingredient,
+    LazyRecipe,
     Recipe,
     RecipeCreate,
+    RecipeFacets,
+    RecipeFilterResult,
     RecipeSuggestion,
 )
 from .meal_plan import (
     MealPlan,
     MealPlanCreate,
+    MealPlanDay,
+    MealPlanWithRecipes,
     MealSlot,
     MealType,
     ShoppingListItem,
 )
 from .preferences import UserPreferences
+from .job import Job, JobStatus
+from .idempotency import IdempotencyRecord
+from .sync import ChangeSet
 
 __all__ = [
     "DietaryRestriction",
     "Ingredient",
+    "LazyRecipe",
     "Recipe",
     "RecipeCreate",
+    "RecipeFacets",
+    "RecipeFilterResult",
     "RecipeSuggestion",
     "MealPlan",
     "MealPlanCreate",
+    "MealPlanDay",
+    "MealPlanWithRecipes",
     "MealSlot",
     "MealType",
     "ShoppingListItem",
     "UserPreferences",
+    "Job",
+    "JobStatus",
+    "IdempotencyRecord",
+    "ChangeSet",
 ]
@@ -0,0 +1,24 @@
+"""Idempotency key Pydantic models."""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class IdempotencyRecord(BaseModel):
+    """A request stored under an idempotency key, with its response once it finished."""
+
+    scope: str  # Method and path the key was used on
+    key: str
+    fingerprint: str  # SHA-256 of the request body
+    status_code: Optional[int] = None  # None while the first request is in flight
+    headers: dict[str, str] = Field(default_factory=dict)
+    body: Optional[bytes] = None
+    created_at: datetime
+    expires_at: datetime
+
+    @property
+    def completed(self) -> bool:
+        """Whether the response has been stored."""
+        return self.status_code is not None
@@ -0,0 +1,45 @@
+"""Background job Pydantic models."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a background job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"  # Missed its deadline
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self not in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+class Job(BaseModel):
+    """A queued, running or finished background job and its result."""
+
+    id: int
+    kind: str  # Handler name, e.g. suggest_recipes
+    owner: Optional[str] = None  # Session that submitted the job
+    status: JobStatus = JobStatus.QUEUED
+    params: dict[str, Any] = Field(default_factory=dict)
+    result: Optional[Any] = None  # JSON value returned by the handler
+    error: Optional[str] = None
+    progress: Optional[str] = None  # Latest progress message from the handler
+    deadline: Optional[datetime] = None  # UTC; the job expires if not finished by then
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self.status.finished
@@ -6,6 +6,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from .recipe import Recipe
+
 
 class MealType(str, Enum):
     """Type of meal."""
@@ -45,6 +47,23 @@ class MealPlan(MealPlanCreate):
     updated_at: Optional[datetime] = None
 
 
+class MealPlanWithRecipes(MealPlan):
+    """A meal plan together with the saved recipes its slots refer to."""
+
+    recipes: dict[int, Recipe] = Field(default_factory=dict)
+
+    def recipe_for(self, slot: MealSlot) -> Optional[Recipe]:
+        """The full recipe behind a slot (None for free-text slots or deleted recipes)."""
+        return self.recipes.get(slot.recipe_id) if slot.recipe_id is not None else None
+
+
+class MealPlanDay(BaseModel):
+    """The meals of one day of a plan."""
+
+    date: date
+    meals: list[MealSlot] = Field(default_factory=list)
+
+
 class ShoppingListItem(BaseModel):
     """An item on a shopping list."""
 
@@ -6,6 +6,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from chefwise import codec
+
 
 class DietaryRestriction(str, Enum):
     """Dietary restrictions."""
@@ -74,3 +76,148 @@ class RecipeSuggestion(BaseModel):
     difficulty: Optional[str] = None
     tips: Optional[str] = None
     why_this_recipe: Optional[str] = None  # AI explanation of why it suggested this
+
+
+class RecipeFacets(BaseModel):
+    """Counts of matching recipes per facet value."""
+
+    cuisine: dict[str, int] = Field(default_factory=dict)
+    difficulty: dict[str, int] = Field(default_factory=dict)
+    tags: dict[str, int] = Field(default_factory=dict)
+
+
+class RecipeFilterResult(BaseModel):
+    """One page of filtered recipes with the total count and facets."""
+
+    recipes: list[Recipe]
+    total: int
+    facets: RecipeFacets = Field(default_factory=RecipeFacets)
+
+
+_UNSET = object()
+
+
+class LazyRecipe:
+    """
+    A saved recipe whose JSON-backed fields are decoded on first access.
+
+    Scalar columns are plain attributes. ``ingredients``, ``instructions`` and
+    ``dietary_tags`` keep the raw JSON from the database until they are first
+    read, then cache the decoded value. Use ``to_recipe()`` to get the full
+    ``Recipe`` model.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "prep_time_minutes",
+        "cook_time_minutes",
+        "servings",
+        "cuisine",
+        "difficulty",
+        "created_at",
+        "updated_at",
+        "_ingredients_json",
+        "_instructions_json",
+        "_dietary_tags_json",
+        "_ingredients",
+        "_instructions",
+        "_dietary_tags",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: Optional[str],
+        ingredients_json: Optional[str],
+        instructions_json: Optional[str],
+        prep_time_minutes: Optional[int],
+        cook_time_minutes: Optional[int],
+        servings: int,
+        dietary_tags_json: Optional[str],
+        cuisine: Optional[str],
+        difficulty: Optional[str],
+        created_at: datetime,
+        updated_at: Optional[datetime],
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.prep_time_minutes = prep_time_minutes
+        self.cook_time_minutes = cook_time_minutes
+        self.servings = servings
+        self.cuisine = cuisine
+        self.difficulty = difficulty
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self._ingredients_json = ingredients_json
+        self._instructions_json = instructions_json
+        self._dietary_tags_json = dietary_tags_json
+        self._ingredients = _UNSET
+        self._instructions = _UNSET
+        self._dietary_tags = _UNSET
+
+    @property
+    def ingredients(self) -> list[Ingredient]:
+        """Decode ingredients on first access."""
+        if self._ingredients is _UNSET:
+            self._ingredients = (
+                codec.decode(self._ingredients_json, list[Ingredient]) if self._ingredients_json else []
+            )
+            self._ingredients_json = None
+        return self._ingredients
+
+    @property
+    def instructions(self) -> list[str]:
+        """Decode instructions on first access."""
+        if self._instructions is _UNSET:
+            self._instructions = codec.loads(self._instructions_json) if self._instructions_json else []
+            self._instructions_json = None
+        return self._instructions
+
+    @property
+    def dietary_tags(self) -> list[DietaryRestriction]:
+        """Decode dietary tags on first access."""
+        if self._dietary_tags is _UNSET:
+            data = codec.loads(self._dietary_tags_json) if self._dietary_tags_json else []
+            self._dietary_tags = [DietaryRestriction(tag) for tag in data]
+            self._dietary_tags_json = None
+        return self._dietary_tags
+
+    @property
+    def total_time_minutes(self) -> Optional[int]:
+        """Calculate total time from prep and cook times."""
+        if self.prep_time_minutes is None and self.cook_time_minutes is None:
+            return None
+        return (self.prep_time_minutes or 0) + (self.cook_time_minutes or 0)
+
+    def to_recipe(self) -> Recipe:
+        """Decode every field and return the full Recipe model."""
+        return Recipe(
+            id=self.id,
+            title=self.title,
+            description=self.description,
+            ingredients=self.ingredients,
+            instructions=self.instructions,
+            prep_time_minutes=self.prep_time_minutes,
+            cook_time_minutes=self.cook_time_minutes,
+            servings=self.servings,
+            dietary_tags=self.dietary_tags,
+            cuisine=self.cuisine,
+            difficulty=self.difficulty,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+    def __getstate__(self) -> dict:
+        # The _UNSET sentinel does not survive pickling (e.g. st.cache_data); leave undecoded fields out
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not _UNSET}
+
+    def __setstate__(self, state: dict) -> None:
+        for name in self.__slots__:
+            setattr(self, name, state.get(name, _UNSET))
+
+    def __repr__(self) -> str:
+        return f"LazyRecipe(id={self.id!r}, title={self.title!r})"
@@ -0,0 +1,25 @@
+"""Delta sync Pydantic models."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from .meal_plan import MealPlan
+from .preferences import UserPreferences
+from .recipe import Recipe
+
+
+class ChangeSet(BaseModel):
+    """Everything that changed after a sync token, in its current state.
+
+    Each record appears at most once, however often it changed; deleted
+    records are reported by id only.
+    """
+
+    token: str  # Pass to the next changes_since() call
+    has_more: bool = False  # More changes are waiting after ``token``
+    recipes: list[Recipe] = Field(default_factory=list)
+    meal_plans: list[MealPlan] = Field(default_factory=list)
+    preferences: Optional[UserPreferences] = None
+    deleted_recipes: list[int] = Field(default_factory=list)
+    deleted_meal_plans: list[int] = Field(default_factory=list)
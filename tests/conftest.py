@@ -0,0 +1,26 @@
+"""Shared pytest configuration."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Point the app at a throwaway database before chefwise.config is imported
+_test_db_dir = tempfile.mkdtemp(prefix="chefwise-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_test_db_dir}/chefwise.db")
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from chefwise.database import create_db_engine, init_db
+
+
+@pytest.fixture
+def memory_engine():
+    """A fresh, initialized in-memory database engine."""
+    engine = create_db_engine("sqlite://")
+    init_db(engine)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,179 @@
+"""Tests for admission control of AI calls."""
+
+import asyncio
+
+import pytest
+
+from starlette.requests import Request
+
+from chefwise.api.admission import AdmissionScheduler, Busy, DeadlineExceeded, Priority, client_identity
+
+
+def _start_all(tickets: list, started: list) -> list:
+    async def run(name, ticket):
+        async with ticket:
+            started.append(name)
+
+    return [asyncio.create_task(run(name, ticket)) for name, ticket in tickets]
+
+
+def test_waiting_calls_start_by_priority_then_round_robin_per_user():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        blocker = scheduler.submit(Priority.BULK, "x")
+        await blocker.__aenter__()
+        started = []
+        tasks = _start_all(
+            [
+                ("bulk", scheduler.submit(Priority.BULK, "a")),
+                ("a1", scheduler.submit(Priority.STANDARD, "a")),
+                ("a2", scheduler.submit(Priority.STANDARD, "a")),
+                ("a3", scheduler.submit(Priority.STANDARD, "a")),
+                ("b1", scheduler.submit(Priority.STANDARD, "b")),
+                ("interactive", scheduler.submit(Priority.INTERACTIVE, "c")),
+            ],
+            started,
+        )
+        await asyncio.sleep(0)
+        assert started == []  # The only slot is taken
+        await blocker.__aexit__(None, None, None)
+        await asyncio.gather(*tasks)
+        return started, scheduler
+
+    started, scheduler = asyncio.run(scenario())
+
+    assert started == ["interactive", "a1", "b1", "a2", "a3", "bulk"]
+    assert scheduler.running == 0 and scheduler.queued == 0
+
+
+def test_reserved_slots_keep_room_for_interactive_calls():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=2, reserved_interactive=1)
+        bulk = scheduler.submit(Priority.BULK, "a")
+        await bulk.__aenter__()
+        second_bulk = scheduler.submit(Priority.BULK, "a")
+        interactive = scheduler.submit(Priority.INTERACTIVE, "b")
+        return second_bulk.started_at, interactive.started_at, scheduler.running
+
+    second_bulk_started, interactive_started, running = asyncio.run(scenario())
+
+    assert second_bulk_started is None
+    assert interactive_started is not None
+    assert running == 2
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1, max_queue=2, max_queue_per_user=1)
+        scheduler.submit(Priority.STANDARD, "a")  # Runs
+        scheduler.submit(Priority.STANDARD, "a")  # Waits
+        with pytest.raises(Busy, match="for this user"):
+            scheduler.submit(Priority.STANDARD, "a")
+        scheduler.submit(Priority.STANDARD, "b")
+        with pytest.raises(Busy) as rejected:
+            scheduler.submit(Priority.INTERACTIVE, "c")
+        return rejected.value, scheduler.stats()
+
+    rejected, stats = asyncio.run(scenario())
+
+    assert rejected.retry_after >= 1
+    assert stats["rejected"] == 2 and stats["queued"] == 2 and stats["running"] == 1
+
+
+def test_calls_whose_deadline_passes_in_the_queue_are_dropped():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        scheduler.submit(Priority.STANDARD, "a")  # Holds the slot
+        late = scheduler.submit(Priority.STANDARD, "b", timeout=0.02)
+        with pytest.raises(DeadlineExceeded):
+            async with late:
+                pass
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["dropped"] == 1 and stats["queued"] == 0 and stats["running"] == 1
+
+
+def test_calls_that_cannot_finish_in_time_are_dropped_before_starting():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        async with scheduler.submit(Priority.BULK, "a"):
+            await asyncio.sleep(0.05)  # Bulk calls now take about 50 ms
+        with pytest.raises(DeadlineExceeded):
+            scheduler.submit(Priority.BULK, "a", timeout=0.01)
+
+        blocker = scheduler.submit(Priority.INTERACTIVE, "x")
+        queued = scheduler.submit(Priority.BULK, "b", timeout=0.08)
+        await asyncio.sleep(0.04)
+        await blocker.__aexit__(None, None, None)  # 40 ms left, not enough
+        with pytest.raises(DeadlineExceeded):
+            await queued.__aenter__()
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["dropped"] == 2
+    assert stats["classes"]["bulk"]["estimated_run_ms"] >= 40
+
+
+def test_cancelled_waiters_leave_the_queue_and_waits_are_measured():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        blocker = scheduler.submit(Priority.STANDARD, "a")
+        waiter = asyncio.create_task(scheduler.submit(Priority.STANDARD, "b").__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queued == 0
+
+        second = scheduler.submit(Priority.STANDARD, "c")
+        await asyncio.sleep(0.02)
+        await blocker.__aexit__(None, None, None)
+        async with second:
+            pass
+        return second.wait, scheduler.stats()
+
+    wait, stats = asyncio.run(scenario())
+
+    assert wait >= 0.02
+    assert stats["classes"]["standard"]["wait_ms"]["count"] == 2
+    assert stats["classes"]["standard"]["wait_ms"]["max"] >= 20
+    assert stats["running"] == 0
+
+
+def test_api_answers_busy_with_429(tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from chefwise.api import AIServices, create_app
+
+    class _Substitutions:
+        def suggest_substitution(self, **kwargs):
+            return {"original_ingredient": kwargs["ingredient"], "substitutions": []}
+
+    app = create_app(f"sqlite:///{tmp_path / 'busy.db'}", services=AIServices(modifications=_Substitutions()))
+    body = {"ingredient": "butter", "recipe_context": "cake"}
+    with TestClient(app) as client:
+        assert client.post("/ai/substitute", json=body).status_code == 200
+
+        app.state.scheduler = AdmissionScheduler(max_concurrent=0, max_queue=0)
+        busy = client.post("/ai/substitute", json=body)
+        assert busy.status_code == 429
+        assert int(busy.headers["retry-after"]) >= 1
+
+        assert client.post("/ai/substitute", json=body, headers={"X-Request-Timeout": "soon"}).status_code == 400
+        assert client.get("/ai/scheduler").json()["rejected"] == 1
+
+
+def test_user_header_is_only_believed_from_trusted_proxies():
+    def request(host: str, user: str) -> Request:
+        return Request({"type": "http", "headers": [(b"x-user-id", user.encode())], "client": (host, 5000)})
+
+    # A client rotating X-User-ID still shares one queue
+    assert client_identity(request("203.0.113.7", "alice")) == client_identity(request("203.0.113.7", "bob"))
+    assert client_identity(request("203.0.113.7", "alice")) == "203.0.113.7"
+
+    proxy = ["10.0.0.2"]
+    assert client_identity(request("10.0.0.2", "alice"), proxy) == "user:alice"
+    assert client_identity(request("10.0.0.2", ""), proxy) == "10.0.0.2"
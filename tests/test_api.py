@@ -0,0 +1,232 @@
+"""Tests for the HTTP API."""
+
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from chefwise.api import AIServices, create_app
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeSuggestion, ShoppingListItem
+
+
+class _FakeSuggestions:
+    def __init__(self):
+        self.calls = []
+
+    def suggest_recipes(self, **kwargs):
+        self.calls.append(kwargs)
+        return [
+            RecipeSuggestion(
+                title=f"Dish with {kwargs['ingredients'][0]}",
+                description="Quick",
+                ingredients=[Ingredient(name=kwargs["ingredients"][0], quantity=1, unit="cup")],
+                instructions=["Cook"],
+            )
+        ]
+
+
+class _FakeMealPlans:
+    def generate_meal_plan(self, **kwargs):
+        start = kwargs["start_date"]
+        plan = MealPlanCreate(
+            name="Week",
+            start_date=start,
+            end_date=start + timedelta(days=kwargs["num_days"] - 1),
+            meals=[MealSlot(date=start, meal_type="dinner", recipe_title="Soup")],
+        )
+        return plan, [ShoppingListItem(name="leeks", quantity=2, unit="")]
+
+
+class _FailingModifications:
+    def modify_recipe(self, **kwargs):
+        raise RuntimeError("rate limited")
+
+    def suggest_substitution(self, **kwargs):
+        return {"original_ingredient": kwargs["ingredient"], "substitutions": [{"name": "margarine"}]}
+
+
+@pytest.fixture
+def suggestions():
+    return _FakeSuggestions()
+
+
+@pytest.fixture
+def client(tmp_path, suggestions):
+    services = AIServices(suggestions=suggestions, meal_plans=_FakeMealPlans(), modifications=_FailingModifications())
+    app = create_app(f"sqlite:///{tmp_path / 'api.db'}", services=services)
+    with TestClient(app) as client:
+        yield client
+
+
+def _recipe(title="Lentil Soup", steps=1):
+    return {
+        "title": title,
+        "description": "Warming",
+        "ingredients": [{"name": "lentils", "quantity": 1, "unit": "cup"}],
+        "instructions": [f"Step {i}" for i in range(steps)],
+        "dietary_tags": ["vegan"],
+    }
+
+
+def test_recipe_crud(client):
+    created = client.post("/recipes", json=_recipe())
+    assert created.status_code == 201
+    recipe = created.json()
+    assert created.headers["location"] == f"/recipes/{recipe['id']}"
+    assert created.headers["content-type"] == "application/json"
+
+    # Identical content is not saved twice
+    again = client.post("/recipes", json=_recipe())
+    assert again.status_code == 200 and again.json()["id"] == recipe["id"]
+
+    client.post("/recipes", json=_recipe("Tomato Salad"))
+    assert client.get(f"/recipes/{recipe['id']}").json()["dietary_tags"] == ["vegan"]
+    assert [r["title"] for r in client.get("/recipes", params={"q": "lentil"}).json()] == ["Lentil Soup"]
+    assert len(client.get("/recipes", params={"limit": 1}).json()) == 1
+
+    assert client.delete(f"/recipes/{recipe['id']}").status_code == 204
+    assert client.get(f"/recipes/{recipe['id']}").status_code == 404
+    assert client.delete(f"/recipes/{recipe['id']}").status_code == 404
+    assert client.post("/recipes", json={"title": "No ingredients"}).status_code == 422
+
+
+def test_recipe_search_pages_in_sql(client):
+    for n in range(5):
+        client.post("/recipes", json=_recipe(f"Soup {n}", steps=n + 1))
+    client.post("/recipes", json={**_recipe("Salad"), "description": "Fresh"})
+
+    pages = [
+        [r["title"] for r in client.get("/recipes", params={"q": "soup", "limit": 2, "offset": offset}).json()]
+        for offset in (0, 2, 4)
+    ]
+
+    # Same order as the unfiltered listing: newest first, ids breaking ties
+    assert pages == [["Soup 4", "Soup 3"], ["Soup 2", "Soup 1"], ["Soup 0"]]
+    assert [r["title"] for r in client.get("/recipes", params={"limit": 2}).json()] == ["Salad", "Soup 4"]
+
+
+def test_meal_plan_crud(client):
+    recipe = client.post("/recipes", json=_recipe()).json()
+    start = date(2024, 5, 6)
+    body = {
+        "name": "Week",
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=6)).isoformat(),
+        "meals": [
+            {"date": start.isoformat(), "meal_type": "dinner", "recipe_id": recipe["id"], "recipe_title": "Soup"},
+            {"date": start.isoformat(), "meal_type": "lunch", "recipe_title": "Salad"},
+        ],
+    }
+    plan = client.post("/meal-plans", json=body).json()
+
+    full = client.get(f"/meal-plans/{plan['id']}", params={"with_recipes": True}).json()
+    assert full["recipes"][str(recipe["id"])]["title"] == "Lentil Soup"
+
+    # Keep the dinner slot, drop lunch, add breakfast
+    dinner = next(m for m in plan["meals"] if m["meal_type"] == "dinner")
+    body["name"] = "Renamed"
+    body["meals"] = [dinner, {"date": start.isoformat(), "meal_type": "breakfast", "recipe_title": "Oats"}]
+    updated = client.put(f"/meal-plans/{plan['id']}", json=body).json()
+    assert updated["name"] == "Renamed"
+    assert sorted(m["meal_type"] for m in updated["meals"]) == ["breakfast", "dinner"]
+    assert dinner["id"] in [m["id"] for m in updated["meals"]]
+
+    assert [p["id"] for p in client.get("/meal-plans").json()] == [plan["id"]]
+    assert client.put("/meal-plans/999", json=body).status_code == 404
+    assert client.delete(f"/meal-plans/{plan['id']}").status_code == 204
+    assert client.get(f"/meal-plans/{plan['id']}").status_code == 404
+
+
+def test_preferences_round_trip(client):
+    assert client.get("/preferences").json()["skill_level"] == "intermediate"
+
+    client.put("/preferences", json={"allergies": ["peanuts"], "skill_level": "advanced"})
+
+    preferences = client.get("/preferences").json()
+    assert preferences["allergies"] == ["peanuts"]
+    assert preferences["skill_level"] == "advanced"
+
+
+def test_reads_answer_if_none_match_until_data_changes(client):
+    client.post("/recipes", json=_recipe())
+    first = client.get("/recipes")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/recipes", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    # Weak comparison and lists of tags
+    assert client.get("/recipes", headers={"If-None-Match": f'"x", {etag[2:]}'}).status_code == 304
+
+    client.post("/recipes", json=_recipe("Tomato Salad"))
+    fresh = client.get("/recipes", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(fresh.json()) == 2
+
+
+def test_if_none_match_star_needs_a_representation(client):
+    star = {"If-None-Match": "*"}
+    assert client.get("/recipes", headers=star).json() == []
+    assert client.get("/recipes/1", headers=star).status_code == 404
+
+    client.post("/recipes", json=_recipe())
+
+    assert client.get("/recipes", headers=star).status_code == 304
+    assert client.get("/recipes/1", headers=star).status_code == 304
+    assert client.get("/recipes/2", headers=star).status_code == 404
+
+
+def test_large_responses_are_gzipped(client):
+    for n in range(5):
+        client.post("/recipes", json=_recipe(f"Recipe {n}", steps=20))
+
+    response = client.get("/recipes", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 5
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_ai_endpoints_use_services_and_preferences(client, suggestions):
+    client.put("/preferences", json={"allergies": ["peanuts"]})
+
+    recipes = client.post("/ai/suggest", json={"ingredients": ["rice", "eggs"], "num_recipes": 1}).json()
+    assert recipes[0]["title"] == "Dish with rice"
+    assert suggestions.calls[0]["preferences"].allergies == ["peanuts"]
+
+    client.post("/ai/suggest", json={"ingredients": ["rice"], "use_preferences": False})
+    assert suggestions.calls[1]["preferences"] is None
+
+    plan = client.post("/ai/meal-plan", json={"num_days": 3, "start_date": "2024-05-06"}).json()
+    assert plan["meal_plan"]["end_date"] == "2024-05-08"
+    assert plan["shopping_list"][0]["name"] == "leeks"
+
+    substitution = client.post("/ai/substitute", json={"ingredient": "butter", "recipe_context": "cookies"})
+    assert substitution.json()["substitutions"] == [{"name": "margarine"}]
+
+    assert client.post("/ai/suggest", json={"ingredients": []}).status_code == 422
+
+
+def test_ai_errors_map_to_status_codes(client, tmp_path, monkeypatch):
+    modify = {
+        "title": "Soup",
+        "ingredients": [{"name": "leek", "quantity": 1, "unit": ""}],
+        "instructions": ["Boil"],
+        "modification_type": "dietary",
+        "modification_details": "vegan",
+    }
+    failed = client.post("/ai/modify", json=modify)
+    assert failed.status_code == 502
+    assert "rate limited" in failed.json()["detail"]
+
+    # Without an API key only the AI endpoints are unavailable
+    monkeypatch.setattr("chefwise.ai.openai_client.settings.openai_api_key", "")
+    with TestClient(create_app(f"sqlite:///{tmp_path / 'nokey.db'}")) as unconfigured:
+        assert unconfigured.post("/ai/modify", json=modify).status_code == 503
+        assert unconfigured.get("/recipes").status_code == 200
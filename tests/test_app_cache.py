@@ -0,0 +1,91 @@
+"""Tests for the Streamlit caching layer."""
+
+import pytest
+from sqlalchemy import event
+
+pytest.importorskip("streamlit")
+
+from chefwise.app import cache
+from chefwise.database import PreferencesRepository, RecipeRepository, engine, get_db_context, init_db
+from chefwise.models import Ingredient, RecipeCreate, UserPreferences
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    init_db()
+    cache.st.cache_data.clear()
+    yield
+    cache.st.cache_data.clear()
+
+
+def test_writes_advance_the_generation():
+    before = cache.data_generation()
+    with get_db_context() as db:
+        RecipeRepository(db).create(
+            RecipeCreate(
+                title="Generation Stew",
+                ingredients=[Ingredient(name="barley", quantity=1, unit="cup")],
+                instructions=["Simmer"],
+            )
+        )
+
+    assert cache.data_generation() > before
+
+
+def _statements(load):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        return load(), statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_cached_reads_are_reused_until_a_write():
+    first = cache.load_recipe_titles()
+    # Within the generation TTL neither the rows nor the generation are read again
+    assert _statements(cache.load_recipe_titles) == (first, [])
+
+    cache.write(
+        lambda db: RecipeRepository(db).create(
+            RecipeCreate(
+                title="Fresh Focaccia",
+                ingredients=[Ingredient(name="flour", quantity=500, unit="g")],
+                instructions=["Knead", "Bake"],
+            )
+        )
+    )
+
+    titles = cache.load_recipe_titles()
+    assert titles[0][1] == "Fresh Focaccia"
+    assert len(titles) == len(first) + 1
+    assert cache.load_recipes_by_id([titles[0][0]])[0].instructions == ["Knead", "Bake"]
+
+
+def test_generation_is_rechecked_after_its_ttl():
+    first = cache.load_recipe_titles()
+    with get_db_context() as db:  # Another process writing
+        RecipeRepository(db).create(
+            RecipeCreate(
+                title="Outside Write",
+                ingredients=[Ingredient(name="oats", quantity=1, unit="cup")],
+                instructions=["Soak"],
+            )
+        )
+    assert cache.load_recipe_titles() == first
+
+    cache._generation.clear()  # What the TTL expiring does
+    assert cache.load_recipe_titles()[0][1] == "Outside Write"
+
+
+def test_preferences_reload_after_update():
+    cache.load_preferences()
+    assert _statements(cache.load_preferences)[1] == []  # Served from the preferences cache
+
+    cache.write(lambda db: PreferencesRepository(db).update(UserPreferences(allergies=["sesame"], serving_size=3)))
+
+    assert cache.load_preferences().allergies == ["sesame"]
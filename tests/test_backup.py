@@ -0,0 +1,111 @@
+"""Tests for online backups, compaction and restore."""
+
+import sqlite3
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config.settings import Settings
+from chefwise.database import RecipeRepository, create_db_engine, init_db
+from chefwise.database.backup import (
+    METRICS_FILE,
+    BackupError,
+    BackupScheduler,
+    backup_database,
+    compact_database,
+    list_snapshots,
+    quick_check,
+    restore_database,
+)
+from chefwise import codec
+from chefwise.models import Ingredient, RecipeCreate
+
+
+def _recipe(n: int) -> RecipeCreate:
+    return RecipeCreate(
+        title=f"Bread {n}",
+        description="x" * 2000,
+        ingredients=[Ingredient(name="flour", quantity=n + 1, unit="g")],
+        instructions=["Knead", "Bake"],
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'live.db'}")
+    init_db(engine)
+    with sessionmaker(bind=engine)() as db:
+        for n in range(40):
+            RecipeRepository(db).create(_recipe(n))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def config():
+    return Settings(backup_pages_per_step=4, backup_step_pause_ms=0, backup_keep=2)
+
+
+def _titles(engine):
+    with sessionmaker(bind=engine)() as db:
+        return sorted(r.title for r in RecipeRepository(db).get_all())
+
+
+def test_backup_is_stepped_checked_and_measured(engine, config, tmp_path):
+    result = backup_database(engine, directory=tmp_path / "backups", config=config)
+
+    assert result.integrity == "ok"
+    assert result.steps > 1
+    assert result.pages >= result.steps
+    assert result.max_lock_hold_ms >= result.mean_lock_hold_ms > 0
+    assert result.path.exists() and not list(result.path.parent.glob("*.partial"))
+    assert quick_check(result.path) == "ok"
+
+    metrics = [codec.loads(line) for line in (tmp_path / "backups" / METRICS_FILE).read_bytes().splitlines()]
+    assert metrics[-1]["path"] == result.path.name
+    assert metrics[-1]["throughput_mib_s"] > 0
+
+
+def test_retention_keeps_newest(engine, config, tmp_path):
+    directory = tmp_path / "backups"
+    results = [backup_database(engine, directory=directory, config=config) for _ in range(3)]
+    results.append(compact_database(engine, directory=directory, config=config))
+
+    assert list_snapshots(directory) == [results[2].path, results[3].path]
+    assert results[3].pruned == [results[1].path]
+
+
+def test_restore_from_snapshot(engine, config, tmp_path):
+    before = _titles(engine)
+    snapshot = compact_database(engine, directory=tmp_path / "backups", config=config).path
+    with sessionmaker(bind=engine)() as db:
+        RecipeRepository(db).delete(RecipeRepository(db).get_all()[0].id)
+    assert _titles(engine) != before
+
+    restore_database(snapshot, engine)
+
+    assert _titles(engine) == before
+
+
+def test_restore_refuses_corrupt_snapshot(engine, tmp_path):
+    corrupt = tmp_path / "corrupt.db"
+    conn = sqlite3.connect(corrupt)
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.close()
+    data = bytearray(corrupt.read_bytes())
+    data[4096:4200] = b"\xff" * 104
+    corrupt.write_bytes(bytes(data))
+
+    with pytest.raises((BackupError, sqlite3.DatabaseError)):
+        restore_database(corrupt, engine)
+    assert len(_titles(engine)) == 40
+
+
+def test_scheduler_runs_due_jobs(engine, config, tmp_path):
+    config = config.model_copy(update={"backup_dir": str(tmp_path / "backups")})
+    scheduler = BackupScheduler(engine, config)
+
+    assert {r.kind for r in scheduler.run_pending(now=0)} == {"backup", "vacuum"}
+    assert scheduler.run_pending(now=60) == []
+    assert [r.kind for r in scheduler.run_pending(now=config.backup_interval_hours * 3600)] == ["backup"]
@@ -0,0 +1,122 @@
+"""Tests for batched recipe lookup and slot-to-recipe resolution."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import MealPlanRepository, RecipeIdentityMap, RecipeRepository
+from chefwise.database import repositories
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeCreate
+
+
+@pytest.fixture
+def db(memory_engine):
+    session = sessionmaker(bind=memory_engine)()
+    yield session
+    session.close()
+
+
+def _statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def _create_recipes(db, count):
+    repo = RecipeRepository(db)
+    return [
+        repo.create(
+            RecipeCreate(
+                title=f"Dish {n}",
+                ingredients=[Ingredient(name="beans", quantity=n, unit="g")],
+                instructions=["Cook"],
+            )
+        )
+        for n in range(count)
+    ]
+
+
+def _create_plan(db, recipes, days):
+    start = date(2024, 3, 4)
+    meals = [
+        MealSlot(
+            date=start + timedelta(days=day),
+            meal_type=meal_type,
+            recipe_id=recipes[(day * 3 + n) % len(recipes)].id,
+            recipe_title="planned",
+        )
+        for day in range(days)
+        for n, meal_type in enumerate(("breakfast", "lunch", "dinner"))
+    ]
+    return MealPlanRepository(db).create(
+        MealPlanCreate(name="Month", start_date=start, end_date=start + timedelta(days=days - 1), meals=meals)
+    )
+
+
+def test_get_with_recipes_query_count_is_independent_of_plan_size(db):
+    recipes = _create_recipes(db, 40)
+    small = _create_plan(db, recipes[:3], days=1)
+    large = _create_plan(db, recipes, days=28)
+    db.expunge_all()
+
+    statements = _statements(db)
+    counts = []
+    for plan in (small, large):
+        statements.clear()
+        loaded = MealPlanRepository(db).get_with_recipes(plan.id)
+        counts.append(len(statements))
+        assert all(loaded.recipe_for(meal) is not None for meal in loaded.meals)
+        db.expunge_all()
+
+    assert counts[0] == counts[1] == 3
+    assert len(large.meals) == 84
+
+
+def test_get_many_batches_large_id_lists(db, monkeypatch):
+    monkeypatch.setattr(repositories, "ID_BATCH_SIZE", 4)
+    recipes = _create_recipes(db, 10)
+    statements = _statements(db)
+
+    fetched = RecipeRepository(db).get_many(reversed([r.id for r in recipes]))
+
+    assert [r.id for r in fetched] == [r.id for r in reversed(recipes)]
+    assert len(statements) == 3
+
+
+def test_get_many_lazy_loads_one_page_in_order(db, monkeypatch):
+    monkeypatch.setattr(repositories, "ID_BATCH_SIZE", 4)
+    recipes = _create_recipes(db, 10)
+    statements = _statements(db)
+    page = [recipes[7].id, recipes[2].id, recipes[7].id, 999, recipes[5].id]
+
+    fetched = RecipeRepository(db).get_many_lazy(page)
+
+    assert [r.id for r in fetched] == [recipes[7].id, recipes[2].id, recipes[5].id]
+    assert len(statements) == 1
+    assert fetched[0]._ingredients_json is not None
+    assert fetched[0].ingredients[0].quantity == 7
+
+
+def test_identity_map_loads_each_recipe_once(db):
+    recipes = _create_recipes(db, 5)
+    first = _create_plan(db, recipes, days=2)
+    second = _create_plan(db, recipes, days=2)
+    identity_map = RecipeIdentityMap()
+    plans = MealPlanRepository(db)
+
+    plans.get_with_recipes(first.id, identity_map)
+    assert len(identity_map) == 5
+
+    statements = _statements(db)
+    plan = plans.get_with_recipes(second.id, identity_map)
+    repo = RecipeRepository(db, identity_map)
+    again = repo.get(recipes[0].id)
+
+    assert not any("FROM recipes" in s for s in statements)
+    assert again is plan.recipes[recipes[0].id]
+
+    repo.delete(recipes[0].id)
+    assert recipes[0].id not in identity_map
+    assert repo.get(recipes[0].id) is None
@@ -0,0 +1,97 @@
+"""Tests for calendar range queries over meal slots."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import CalendarRepository, MealPlanRepository
+from chefwise.models import MealPlanCreate, MealSlot, MealType
+
+START = date(2024, 4, 1)
+
+
+@pytest.fixture
+def db(memory_engine):
+    session = sessionmaker(bind=memory_engine)()
+    yield session
+    session.close()
+
+
+def _plan(db, name, start, days, meal_types=("dinner", "breakfast", "lunch")):
+    return MealPlanRepository(db).create(
+        MealPlanCreate(
+            name=name,
+            start_date=start,
+            end_date=start + timedelta(days=days - 1),
+            meals=[
+                MealSlot(
+                    date=start + timedelta(days=day),
+                    meal_type=meal_type,
+                    recipe_title=f"{name} {meal_type} {day}",
+                )
+                for day in range(days)
+                for meal_type in meal_types
+            ],
+        )
+    )
+
+
+def test_range_spans_overlapping_plans(db):
+    first = _plan(db, "A", START, 7)
+    second = _plan(db, "B", START + timedelta(days=5), 7, meal_types=("snack",))
+
+    calendar = CalendarRepository(db).range(START + timedelta(days=4), START + timedelta(days=8))
+
+    assert len(calendar) == 3 * 3 + 4
+    overlap = calendar.day(START + timedelta(days=5))
+    assert [m.meal_type for m in overlap.meals] == ["breakfast", "lunch", "dinner", "snack"]
+    assert {m.plan_id for m in overlap.meals} == {first.id, second.id}
+    assert overlap.by_meal_type()["snack"][0].recipe_title == "B snack 0"
+
+
+def test_range_filters_meal_types_and_fills_empty_days(db):
+    _plan(db, "A", START, 3)
+    _plan(db, "C", START + timedelta(days=6), 1)
+
+    calendar = CalendarRepository(db).range(START, START + timedelta(days=9), meal_types=[MealType.DINNER])
+
+    days = list(calendar.each_day())
+    assert len(days) == 10
+    assert [len(day.meals) for day in days] == [1, 1, 1, 0, 0, 0, 1, 0, 0, 0]
+    assert all(m.meal_type == "dinner" for day in days for m in day.meals)
+
+
+def test_iter_days_streams_the_same_days(db):
+    for n in range(4):
+        _plan(db, f"P{n}", START + timedelta(days=n * 10), 14)
+    repo = CalendarRepository(db)
+    end = START + timedelta(days=60)
+
+    streamed = list(repo.iter_days(START, end, batch_size=5))
+
+    assert streamed == list(repo.range(START, end).days.values())
+    assert [day.date for day in streamed] == sorted(day.date for day in streamed)
+
+
+def test_day_counts(db):
+    _plan(db, "A", START, 2)
+    _plan(db, "B", START + timedelta(days=1), 2, meal_types=("dinner",))
+
+    counts = CalendarRepository(db).day_counts(START, START + timedelta(days=5))
+
+    assert counts == {
+        START: {"breakfast": 1, "dinner": 1, "lunch": 1},
+        START + timedelta(days=1): {"breakfast": 1, "dinner": 2, "lunch": 1},
+        START + timedelta(days=2): {"dinner": 1},
+    }
+    assert CalendarRepository(db).day_counts(START, START, meal_types=["snack"]) == {}
+
+
+def test_rescheduled_slots_move_in_the_calendar(db):
+    plan = _plan(db, "A", START, 1)
+    MealPlanRepository(db).reschedule(plan.id, 3)
+    repo = CalendarRepository(db)
+
+    assert repo.day_counts(START, START) == {}
+    assert len(repo.range(START + timedelta(days=3), START + timedelta(days=3))) == 3
@@ -0,0 +1,108 @@
+"""Tests for the delta sync change feed."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import ChangeFeedRepository, MealPlanRepository, PreferencesRepository, RecipeRepository
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeCreate, UserPreferences
+
+
+def _recipe(title: str) -> RecipeCreate:
+    return RecipeCreate(
+        title=title,
+        ingredients=[Ingredient(name="egg", quantity=2, unit="whole")],
+        instructions=["Whisk", "Cook"],
+    )
+
+
+@pytest.fixture
+def db(memory_engine):
+    session = sessionmaker(bind=memory_engine)()
+    yield session
+    session.close()
+
+
+def test_full_sync_then_deltas(db):
+    feed = ChangeFeedRepository(db)
+    recipes = RecipeRepository(db)
+    omelette = recipes.create(_recipe("Omelette"))
+    frittata = recipes.create(_recipe("Frittata"))
+
+    full = feed.changes_since(None)
+    assert [r.title for r in full.recipes] == ["Omelette", "Frittata"]
+    assert not full.has_more
+
+    assert feed.changes_since(full.token).recipes == []
+
+    db.execute(text("UPDATE recipes SET description = 'Fluffy' WHERE id = :id"), {"id": omelette.id})
+    db.commit()
+    recipes.delete(frittata.id)
+
+    delta = feed.changes_since(full.token)
+    assert [(r.id, r.description) for r in delta.recipes] == [(omelette.id, "Fluffy")]
+    assert delta.deleted_recipes == [frittata.id]
+    assert int(delta.token) > int(full.token)
+
+
+def test_each_record_reported_once_with_latest_state(db):
+    feed = ChangeFeedRepository(db)
+    start = feed.current_token()
+    preferences = PreferencesRepository(db)
+    for size in (2, 3, 5):
+        preferences.update(UserPreferences(serving_size=size))
+
+    delta = feed.changes_since(start)
+
+    assert delta.preferences.serving_size == 5
+    assert delta.recipes == [] and delta.deleted_recipes == []
+
+
+def test_slot_changes_mark_plan_and_plan_delete_leaves_tombstone(db):
+    feed = ChangeFeedRepository(db)
+    plans = MealPlanRepository(db)
+    today = date.today()
+    plan = plans.create(
+        MealPlanCreate(
+            name="Week",
+            start_date=today,
+            end_date=today,
+            meals=[MealSlot(date=today, meal_type="lunch", recipe_title="Soup")],
+        )
+    )
+    token = feed.current_token()
+
+    db.execute(text("UPDATE meal_slots SET recipe_title = 'Stew'"))
+    db.commit()
+    delta = feed.changes_since(token)
+    assert [m.recipe_title for m in delta.meal_plans[0].meals] == ["Stew"]
+
+    plans.delete(plan.id)
+    delta = feed.changes_since(delta.token)
+    assert delta.meal_plans == []
+    assert delta.deleted_meal_plans == [plan.id]
+
+
+def test_paging_with_limit(db):
+    recipes = RecipeRepository(db)
+    for n in range(5):
+        recipes.create(_recipe(f"Dish {n}"))
+    feed = ChangeFeedRepository(db)
+
+    titles, token, pages = [], None, 0
+    while True:
+        page = feed.changes_since(token, limit=2)
+        titles += [r.title for r in page.recipes]
+        token, pages = page.token, pages + 1
+        if not page.has_more:
+            break
+
+    assert titles == [f"Dish {n}" for n in range(5)]
+    assert pages == 3
+
+
+def test_invalid_token(db):
+    with pytest.raises(ValueError, match="Invalid sync token"):
+        ChangeFeedRepository(db).changes_since("abc")
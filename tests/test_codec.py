@@ -0,0 +1,64 @@
+"""Tests for the JSON codec."""
+
+import importlib.util
+from datetime import date, datetime
+
+import pytest
+
+from chefwise import codec
+from chefwise.models import DietaryRestriction, Ingredient, RecipeSuggestion
+
+AVAILABLE = [name for name in codec.BACKENDS if name == "stdlib" or importlib.util.find_spec(name)]
+
+
+@pytest.fixture(params=AVAILABLE)
+def backend(request):
+    previous = codec.get_backend().name
+    yield codec.set_backend(request.param)
+    codec.set_backend(previous)
+
+
+def test_round_trip(backend):
+    """Test that every backend round-trips plain JSON data."""
+    data = {"title": "Crème brûlée", "steps": ["Whisk", "Bake"], "servings": 4, "rating": 4.5, "tips": None}
+    encoded = codec.dumps(data)
+
+    assert isinstance(encoded, str)
+    assert codec.loads(encoded) == data
+    assert codec.loads(codec.dumpb(data)) == data
+
+
+def test_extended_types(backend):
+    """Test encoding of enums, dates and pydantic models."""
+    encoded = codec.dumps(
+        {
+            "tag": DietaryRestriction.VEGAN,
+            "day": date(2024, 3, 1),
+            "at": datetime(2024, 3, 1, 12, 30),
+            "ingredient": Ingredient(name="salt", quantity=1, unit="tsp"),
+        }
+    )
+    decoded = codec.loads(encoded)
+
+    assert decoded["tag"] == "vegan"
+    assert decoded["day"] == "2024-03-01"
+    assert decoded["at"].startswith("2024-03-01T12:30")
+    assert decoded["ingredient"] == {"name": "salt", "quantity": 1.0, "unit": "tsp", "notes": None}
+
+
+def test_typed_decode():
+    """Test decoding bytes straight into typed structures."""
+    ingredients = codec.decode(b'[{"name": "rice", "quantity": 2, "unit": "cups"}]', list[Ingredient])
+    assert ingredients == [Ingredient(name="rice", quantity=2.0, unit="cups")]
+
+    suggestion = codec.decode(
+        '{"title": "Fried Rice", "description": "Quick", "ingredients": [], "instructions": ["Fry"]}',
+        RecipeSuggestion,
+    )
+    assert suggestion.title == "Fried Rice"
+
+
+def test_unknown_backend():
+    """Test that unknown backend names are rejected."""
+    with pytest.raises(ValueError):
+        codec.load_backend("yaml")
@@ -0,0 +1,70 @@
+"""Tests for engine configuration."""
+
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config.settings import Settings
+from chefwise.database import create_db_engine, init_db, RecipeRepository
+from chefwise.models import RecipeCreate, Ingredient
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_file_database_pragmas(tmp_path):
+    """Test that tuning PRAGMAs are applied to file databases."""
+    config = Settings(sqlite_busy_timeout_ms=1234, sqlite_synchronous="normal")
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}", config=config)
+
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "busy_timeout") == 1234
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "cache_size") == config.sqlite_cache_size
+    assert _pragma(engine, "temp_store") == 2  # MEMORY
+    engine.dispose()
+
+
+def test_memory_database_is_shared_across_sessions():
+    """Test that an in-memory URL keeps its data between sessions."""
+    engine = create_db_engine("sqlite://")
+    init_db(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        RecipeRepository(db).create(
+            RecipeCreate(
+                title="Memory Soup",
+                ingredients=[Ingredient(name="water", quantity=1, unit="l")],
+                instructions=["Boil"],
+            )
+        )
+
+    with Session() as db:
+        assert [r.title for r in RecipeRepository(db).get_all()] == ["Memory Soup"]
+    engine.dispose()
+
+
+def test_resolved_database_url():
+    """Test that relative SQLite paths are anchored at the project root."""
+    config = Settings(database_url="sqlite:///./data/chefwise.db")
+    resolved = config.resolved_database_url
+    assert resolved == f"sqlite:///{(config.project_root / 'data' / 'chefwise.db').resolve()}"
+
+    assert Settings(database_url="sqlite://").resolved_database_url == "sqlite://"
+    assert Settings(database_url="sqlite:///:memory:").resolved_database_url == "sqlite:///:memory:"
+
+
+def test_alternate_file_path(tmp_path):
+    """Test that an absolute database_url is honored."""
+    db_file = tmp_path / "nested" / "alt.db"
+    config = Settings(database_url=f"sqlite:///{db_file}")
+    engine = create_db_engine(config=config)
+    init_db(engine)
+
+    assert Path(engine.url.database) == db_file
+    assert db_file.exists()
+    engine.dispose()
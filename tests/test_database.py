@@ -110,3 +110,53 @@ def test_meal_plan():
         assert created.id is not None
         assert created.name == "Test Week"
         assert len(created.meals) == 1
+
+
+def test_recipe_lazy_listing():
+    """Test that lazily decoded recipes match the eager models."""
+    recipe = RecipeCreate(
+        title="Lazy Lentil Soup",
+        ingredients=[Ingredient(name="lentils", quantity=1, unit="cup")],
+        instructions=["Rinse lentils", "Simmer"],
+        dietary_tags=["vegan"],
+        prep_time_minutes=5,
+        cook_time_minutes=30,
+    )
+
+    with get_db_context() as db:
+        repo = RecipeRepository(db)
+        created = repo.create(recipe)
+
+        lazy = next(r for r in repo.get_all_lazy() if r.id == created.id)
+        assert lazy.title == "Lazy Lentil Soup"
+        assert lazy.total_time_minutes == 35
+
+        ingredients = lazy.ingredients
+        assert ingredients[0].name == "lentils"
+        assert lazy.ingredients is ingredients  # decoded once, then cached
+
+        assert lazy.to_recipe() == created
+
+
+def test_lazy_recipe_survives_pickling():
+    """Test that a pickled lazy recipe (as st.cache_data stores it) still decodes."""
+    import pickle
+
+    recipe = RecipeCreate(
+        title="Pickled Beets",
+        ingredients=[Ingredient(name="beets", quantity=3, unit="whole")],
+        instructions=["Slice", "Brine"],
+        dietary_tags=["vegan"],
+    )
+
+    with get_db_context() as db:
+        repo = RecipeRepository(db)
+        created = repo.create(recipe)
+        lazy = next(r for r in repo.get_all_lazy() if r.id == created.id)
+
+    lazy.instructions  # one field decoded before pickling, the others still raw
+    copy = pickle.loads(pickle.dumps(lazy))
+
+    assert copy.ingredients[0].name == "beets"
+    assert copy.instructions == ["Slice", "Brine"]
+    assert copy.to_recipe() == created
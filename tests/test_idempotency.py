@@ -0,0 +1,200 @@
+"""Tests for idempotency keys on the create and generation endpoints."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from chefwise.database import (
+    AsyncIdempotencyRepository,
+    IdempotencyKeyTable,
+    async_init_db,
+    create_async_db_engine,
+)
+from chefwise.models import Ingredient, RecipeSuggestion
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from chefwise.api import AIServices, create_app
+
+
+def _suggestion(title: str) -> RecipeSuggestion:
+    return RecipeSuggestion(
+        title=title,
+        description="",
+        ingredients=[Ingredient(name="rice", quantity=1, unit="cup")],
+        instructions=["Cook"],
+    )
+
+
+class _CountingSuggestions:
+    def __init__(self, failures: int = 0):
+        self.calls = 0
+        self.failures = failures
+        self.release = threading.Event()
+        self.release.set()
+
+    def suggest_recipes(self, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream timeout")
+        return [_suggestion(f"Dish {self.calls}")]
+
+    async def stream_recipes(self, **kwargs):
+        self.calls += 1
+        yield _suggestion(f"Streamed {self.calls}")
+
+
+@pytest.fixture
+def suggestions():
+    return _CountingSuggestions()
+
+
+@pytest.fixture
+def client(tmp_path, suggestions):
+    app = create_app(f"sqlite:///{tmp_path / 'idempotency.db'}", services=AIServices(suggestions=suggestions))
+    with TestClient(app) as client:
+        yield client
+
+
+RECIPE = {
+    "title": "Keyed soup",
+    "ingredients": [{"name": "leek", "quantity": 2, "unit": ""}],
+    "instructions": ["Simmer"],
+}
+
+
+def test_retried_create_replays_the_stored_response(client):
+    headers = {"Idempotency-Key": "create-1"}
+    first = client.post("/recipes", json=RECIPE, headers=headers)
+    retry = client.post("/recipes", json=RECIPE, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["location"] == first.headers["location"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert len(client.get("/recipes").json()) == 1
+
+    # Without a key, saving the same content is answered by deduplication
+    assert client.post("/recipes", json=RECIPE).status_code == 200
+
+
+def test_retried_generation_does_not_call_the_model_again(client, suggestions):
+    headers = {"Idempotency-Key": "suggest-1"}
+    body = {"ingredients": ["rice"], "use_preferences": False}
+    first = client.post("/ai/suggest", json=body, headers=headers)
+    retry = client.post("/ai/suggest", json=body, headers=headers)
+
+    assert retry.content == first.content
+    assert suggestions.calls == 1
+
+    # Keys are per endpoint and per key
+    client.post("/ai/suggest", json=body, headers={"Idempotency-Key": "suggest-2"})
+    assert suggestions.calls == 2
+
+
+def test_key_reused_with_another_body_is_rejected(client):
+    headers = {"Idempotency-Key": "create-2"}
+    client.post("/recipes", json=RECIPE, headers=headers)
+
+    reused = client.post("/recipes", json={**RECIPE, "title": "Other soup"}, headers=headers)
+
+    assert reused.status_code == 422
+    assert client.post("/recipes", json=RECIPE, headers={"Idempotency-Key": ""}).status_code == 400
+
+
+def test_stale_claim_is_not_taken_over_by_another_body(client):
+    async def abandon_claim():
+        # A first request whose worker died long ago
+        async with client.app.state.sessionmaker() as db:
+            await AsyncIdempotencyRepository(db).claim("POST /recipes", "create-3", "other body", ttl_seconds=3600)
+            await db.execute(update(IdempotencyKeyTable).values(created_at=datetime.utcnow() - timedelta(hours=1)))
+            await db.commit()
+
+    client.portal.call(abandon_claim)
+    headers = {"Idempotency-Key": "create-3"}
+
+    assert client.post("/recipes", json=RECIPE, headers=headers).status_code == 422
+    assert client.get("/recipes").json() == []
+
+
+def test_failed_request_releases_the_key(tmp_path):
+    suggestions = _CountingSuggestions(failures=1)
+    app = create_app(f"sqlite:///{tmp_path / 'failing.db'}", services=AIServices(suggestions=suggestions))
+    headers = {"Idempotency-Key": "suggest-3"}
+    body = {"ingredients": ["rice"], "use_preferences": False}
+    with TestClient(app) as client:
+        assert client.post("/ai/suggest", json=body, headers=headers).status_code == 502
+        retry = client.post("/ai/suggest", json=body, headers=headers)
+
+    assert retry.status_code == 200
+    assert "idempotent-replayed" not in retry.headers
+    assert suggestions.calls == 2
+
+
+def test_concurrent_duplicates_wait_for_the_first_request(client, suggestions):
+    suggestions.release.clear()
+    headers = {"Idempotency-Key": "suggest-4"}
+    body = {"ingredients": ["rice"], "use_preferences": False}
+
+    with ThreadPoolExecutor(3) as pool:
+        responses = [pool.submit(client.post, "/ai/suggest", json=body, headers=headers) for _ in range(3)]
+        threading.Timer(0.3, suggestions.release.set).start()
+        responses = [r.result(10) for r in responses]
+
+    assert suggestions.calls == 1
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 2
+
+
+def test_retried_stream_reattaches_to_the_generation(client, suggestions):
+    headers = {"Idempotency-Key": "stream-1"}
+    body = {"ingredients": ["rice"], "use_preferences": False}
+    first = client.post("/ai/suggest/stream", json=body, headers=headers)
+    retry = client.post("/ai/suggest/stream", json=body, headers=headers)
+
+    assert retry.text == first.text
+    assert "Streamed 1" in retry.text
+    assert suggestions.calls == 1
+
+
+def test_repository_claims_and_expires_keys(tmp_path):
+    async def scenario():
+        engine = create_async_db_engine(f"sqlite:///{tmp_path / 'repo.db'}")
+        await async_init_db(engine)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as db:
+                repo = AsyncIdempotencyRepository(db)
+                record, claimed = await repo.claim("POST /x", "k", "f1", ttl_seconds=60)
+                assert claimed and not record.completed
+                assert (await repo.claim("POST /x", "k", "f1", ttl_seconds=60))[1] is False
+
+                # A claim whose worker vanished can be taken over once it is old enough
+                # (by a retry of the same request only)
+                long_ago, now = datetime.utcnow() - timedelta(hours=1), datetime.utcnow() + timedelta(seconds=1)
+                assert not await repo.take_over("POST /x", "k", "f1", started_before=long_ago)
+                assert not await repo.take_over("POST /x", "k", "f2", started_before=now)
+                assert await repo.take_over("POST /x", "k", "f1", started_before=now)
+
+                assert await repo.complete("POST /x", "k", 201, {"content-type": "application/json"}, b'{"id":1}')
+                assert not await repo.release("POST /x", "k")  # Completed records stay
+                stored = await repo.get("POST /x", "k")
+                assert stored.completed and stored.body == b'{"id":1}' and stored.status_code == 201
+
+                later = datetime.utcnow() + timedelta(minutes=2)
+                record, claimed = await repo.claim("POST /x", "k", "f2", ttl_seconds=60, now=later)
+                assert claimed and record.fingerprint == "f2"
+                assert await repo.delete_expired(now=later + timedelta(minutes=2)) == 1
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
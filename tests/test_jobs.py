@@ -0,0 +1,278 @@
+"""Tests for the background job runner."""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import JobRepository, JobTable, create_db_engine, init_db
+from chefwise.jobs import (
+    GENERATE_MEAL_PLAN,
+    SUGGEST_RECIPES,
+    JobRunner,
+    meal_plan_from_result,
+    meal_plan_job,
+    meal_plan_params,
+    suggest_recipes_job,
+    suggest_recipes_params,
+    suggestions_from_result,
+)
+from chefwise.models import (
+    Ingredient,
+    JobStatus,
+    MealPlanCreate,
+    MealSlot,
+    MealType,
+    RecipeSuggestion,
+    ShoppingListItem,
+    UserPreferences,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database: worker threads need their own connections
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def runner(engine):
+    runner = JobRunner(engine, max_workers=2)
+    yield runner
+    runner.shutdown(wait=True)
+
+
+def _jobs(engine):
+    return JobRepository(sessionmaker(bind=engine)())
+
+
+def _blocking(release: threading.Event, started: threading.Event = None):
+    def handler(params, context):
+        if started:
+            started.set()
+        release.wait(5)
+        context.check()
+        return {"done": True}
+
+    return handler
+
+
+def test_job_result_is_persisted(runner, engine):
+    runner.register("echo", lambda params, context: {"echo": params["value"]})
+
+    job = runner.submit("echo", {"value": [1, "two"]})
+    finished = runner.wait(job.id, timeout=5)
+
+    assert finished.status is JobStatus.SUCCEEDED
+    assert finished.result == {"echo": [1, "two"]}
+    assert finished.started_at and finished.finished_at
+    assert _jobs(engine).get(job.id).result == {"echo": [1, "two"]}
+
+
+def test_failing_handler_records_error(runner):
+    def handler(params, context):
+        raise RuntimeError("model unavailable")
+
+    runner.register("broken", handler)
+    job = runner.wait(runner.submit("broken").id, timeout=5)
+
+    assert job.status is JobStatus.FAILED
+    assert job.error == "model unavailable"
+    assert job.result is None
+
+
+def test_unknown_kind_is_rejected(runner):
+    with pytest.raises(ValueError):
+        runner.submit("nope")
+
+
+def test_cancel_queued_job_never_runs(engine):
+    runner = JobRunner(engine, max_workers=1)
+    release, ran = threading.Event(), []
+    runner.register("block", _blocking(release))
+    runner.register("record", lambda params, context: ran.append(params))
+    try:
+        blocker = runner.submit("block")
+        queued = runner.submit("record", {"n": 1})
+
+        assert runner.cancel(queued.id)
+        release.set()
+        runner.wait(blocker.id, timeout=5)
+        runner.wait(queued.id, timeout=5)
+    finally:
+        runner.shutdown(wait=True)
+
+    assert runner.get(queued.id).status is JobStatus.CANCELLED
+    assert ran == []
+    assert not runner.cancel(queued.id)
+
+
+def test_cancel_running_job_discards_result(runner):
+    release, started = threading.Event(), threading.Event()
+    runner.register("block", _blocking(release, started))
+    job = runner.submit("block")
+    assert started.wait(5)
+
+    assert runner.cancel(job.id)
+    release.set()
+    job = runner.wait(job.id, timeout=5)
+
+    assert job.status is JobStatus.CANCELLED
+    assert job.result is None
+
+
+def test_deadline_expires_running_job(runner):
+    release, started = threading.Event(), threading.Event()
+    runner.register("block", _blocking(release, started))
+    job = runner.submit("block", timeout=0.05)
+    assert started.wait(5)
+    time.sleep(0.1)
+
+    # Polling sees the expiry while the handler is still busy
+    assert runner.get(job.id).status is JobStatus.EXPIRED
+    release.set()
+    job = runner.wait(job.id, timeout=5)
+
+    assert job.status is JobStatus.EXPIRED
+    assert job.result is None
+
+
+def test_polling_never_writes(runner, engine):
+    release = threading.Event()
+    runner.register("block", _blocking(release))
+    job = runner.submit("block", timeout=0.05)
+    time.sleep(0.1)
+
+    writes = []
+
+    def record(conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        # Overdue jobs read as expired before the worker marks their rows
+        assert runner.get(job.id).status is JobStatus.EXPIRED
+        assert [j.status for j in runner.recent("block")] == [JobStatus.EXPIRED]
+        assert _jobs(engine).expire_overdue(now=datetime.utcnow() - timedelta(hours=1)) == 0
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    release.set()
+    assert runner.wait(job.id, timeout=5).status is JobStatus.EXPIRED
+
+    assert writes == []
+
+
+def test_sessions_only_list_their_own_jobs(runner):
+    runner.register("echo", lambda params, context: params)
+    mine = runner.submit("echo", owner="session-a")
+    runner.submit("echo", owner="session-b")
+
+    assert [j.id for j in runner.recent("echo", owner="session-a")] == [mine.id]
+    assert runner.get(mine.id).owner == "session-a"
+    assert len(runner.recent("echo")) == 2
+
+
+def test_progress_is_visible_while_running(runner):
+    release, reported = threading.Event(), threading.Event()
+
+    def handler(params, context):
+        context.progress("halfway")
+        reported.set()
+        release.wait(5)
+        return 1
+
+    runner.register("slow", handler)
+    job = runner.submit("slow")
+    assert reported.wait(5)
+
+    polled = runner.get(job.id)
+    release.set()
+
+    assert polled.status is JobStatus.RUNNING
+    assert polled.progress == "halfway"
+    assert [j.id for j in runner.recent("slow")] == [job.id]
+
+
+def test_recover_reschedules_queued_and_fails_interrupted(engine):
+    jobs = _jobs(engine)
+    queued = jobs.create("echo", {"value": 1})
+    interrupted = jobs.create("echo", {"value": 2})
+    jobs.start(interrupted.id)
+    old = jobs.create("echo", {"value": 3})
+    jobs.start(old.id)
+    jobs.finish(old.id, None)
+    jobs.db.execute(
+        update(JobTable).where(JobTable.id == old.id).values(created_at=datetime.utcnow() - timedelta(days=30))
+    )
+    jobs.db.commit()
+
+    runner = JobRunner(engine, max_workers=1)
+    runner.register("echo", lambda params, context: params["value"])
+    try:
+        assert runner.recover() == 1
+        assert runner.wait(queued.id, timeout=5).result == 1
+    finally:
+        runner.shutdown(wait=True)
+
+    assert runner.get(interrupted.id).status is JobStatus.FAILED
+    assert runner.get(old.id) is None
+
+
+class _FakeSuggestionService:
+    def __init__(self):
+        self.calls = []
+
+    def suggest_recipes(self, **kwargs):
+        self.calls.append(kwargs)
+        return [
+            RecipeSuggestion(
+                title="Fried rice",
+                description="Quick",
+                ingredients=[Ingredient(name="rice", quantity=1, unit="cup")],
+                instructions=["Fry"],
+            )
+        ]
+
+
+class _FakeMealPlanService:
+    def generate_meal_plan(self, **kwargs):
+        start = kwargs["start_date"]
+        plan = MealPlanCreate(
+            name="Week",
+            start_date=start,
+            end_date=start + timedelta(days=kwargs["num_days"] - 1),
+            meals=[MealSlot(date=start, meal_type=m, recipe_title="Soup") for m in kwargs["meal_types"]],
+        )
+        return plan, [ShoppingListItem(name="leeks", quantity=2, unit="")]
+
+
+def test_ai_jobs_round_trip_through_the_database(runner):
+    suggestions = _FakeSuggestionService()
+    runner.register(SUGGEST_RECIPES, suggest_recipes_job(lambda: suggestions))
+    runner.register(GENERATE_MEAL_PLAN, meal_plan_job(_FakeMealPlanService))
+    preferences = UserPreferences(allergies=["peanuts"])
+
+    suggest = runner.submit(
+        SUGGEST_RECIPES, suggest_recipes_params(["rice", "eggs"], num_recipes=1, preferences=preferences)
+    )
+    plan = runner.submit(
+        GENERATE_MEAL_PLAN,
+        meal_plan_params(num_days=3, start_date=date(2024, 5, 6), meal_types=[MealType.LUNCH, MealType.DINNER]),
+    )
+
+    recipes = suggestions_from_result(runner.wait(suggest.id, timeout=5).result)
+    meal_plan, shopping_list = meal_plan_from_result(runner.wait(plan.id, timeout=5).result)
+
+    assert [r.title for r in recipes] == ["Fried rice"]
+    assert suggestions.calls[0]["preferences"] == preferences
+    assert suggestions.calls[0]["ingredients"] == ["rice", "eggs"]
+    assert meal_plan.end_date == date(2024, 5, 8)
+    assert [m.meal_type for m in meal_plan.meals] == [MealType.LUNCH, MealType.DINNER]
+    assert shopping_list[0].name == "leeks"
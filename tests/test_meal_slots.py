@@ -0,0 +1,89 @@
+"""Tests for slot-level meal plan writes."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import ChangeFeedRepository, MealPlanRepository
+from chefwise.models import MealPlanCreate, MealSlot
+
+
+@pytest.fixture
+def db(memory_engine):
+    session = sessionmaker(bind=memory_engine)()
+    yield session
+    session.close()
+
+
+def _week(db):
+    start = date(2024, 9, 2)
+    return MealPlanRepository(db).create(
+        MealPlanCreate(
+            name="Week",
+            start_date=start,
+            end_date=start + timedelta(days=6),
+            meals=[
+                MealSlot(date=start + timedelta(days=day), meal_type=meal_type, recipe_title=f"{meal_type} {day}")
+                for day in range(7)
+                for meal_type in ("breakfast", "lunch", "dinner")
+            ],
+        )
+    )
+
+
+def _writes(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, executemany))
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    return statements
+
+
+def test_save_writes_only_changed_slots(db):
+    plan = _week(db)
+    edited = plan.model_copy(deep=True)
+    edited.meals[4].recipe_title = "Ramen"
+    edited.meals[10].notes = "use leftovers"
+    writes = _writes(db)
+
+    changes = MealPlanRepository(db).save(edited)
+
+    assert (changes.updated, changes.inserted, changes.deleted) == (2, 0, 0)
+    # One executemany UPDATE for both slots; the other 19 rows are untouched
+    assert [(s.split()[0], many) for s, many in writes] == [("UPDATE", True)]
+
+
+def test_slot_edit_is_one_statement(db):
+    plan = _week(db)
+    repo = MealPlanRepository(db)
+    writes = _writes(db)
+
+    repo.swap_slots(plan.meals[0].id, plan.meals[20].id)
+    repo.move_slot(plan.meals[1].id, date(2024, 9, 9))
+
+    assert [s.split()[0] for s, _ in writes] == ["UPDATE", "UPDATE"]
+
+
+def test_slot_edits_report_the_plan_as_changed(db):
+    plan = _week(db)
+    feed = ChangeFeedRepository(db)
+    token = feed.current_token()
+
+    MealPlanRepository(db).swap_slots(plan.meals[0].id, plan.meals[1].id)
+
+    changes = feed.changes_since(token)
+    assert [p.id for p in changes.meal_plans] == [plan.id]
+    assert changes.meal_plans[0].meals[0].recipe_title == "lunch 0"
+
+
+def test_save_rejects_unknown_plan(db):
+    plan = _week(db)
+    MealPlanRepository(db).delete(plan.id)
+
+    with pytest.raises(ValueError):
+        MealPlanRepository(db).save(plan)
@@ -0,0 +1,157 @@
+"""Tests for schema migrations."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import inspect, text
+
+from chefwise.database import create_db_engine, deduplicate_recipes, init_db
+from chefwise.database import migrations
+from chefwise.database.migrations import current_version, downgrade, head_version, migrate
+
+
+def _index_names(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def _legacy_engine():
+    """An engine holding the pre-migration schema (every migration reverted)."""
+    engine = create_db_engine("sqlite://")
+    init_db(engine)
+    downgrade(engine, 0)
+    return engine
+
+
+def test_fresh_database_is_at_head(memory_engine):
+    """Test that init_db leaves a new database at the newest version."""
+    assert current_version(memory_engine) == head_version()
+    assert migrate(memory_engine) == []
+
+
+def test_upgrade_legacy_database():
+    """Test that migrating an unversioned database adds the indexes."""
+    engine = _legacy_engine()
+    assert current_version(engine) == 0
+    assert "ix_recipes_created_at" not in _index_names(engine, "recipes")
+
+    applied = migrate(engine)
+
+    assert applied[0] == 1
+    assert current_version(engine) == head_version()
+    assert {"ix_recipes_created_at", "ix_recipes_title"} <= _index_names(engine, "recipes")
+    assert {"ix_meal_slots_meal_plan_id", "ix_meal_slots_date"} <= _index_names(engine, "meal_slots")
+    assert "ix_meal_plans_dates" in _index_names(engine, "meal_plans")
+    assert "ix_recipes_total_time_minutes" in _index_names(engine, "recipes")
+
+
+def test_concurrent_migrators_apply_each_step_once(tmp_path, monkeypatch):
+    """Test that a migrator that read an old version skips steps applied since."""
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    init_db(create_db_engine(url))
+    downgrade(create_db_engine(url), 0)
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(lambda _: migrate(create_db_engine(url)), range(2)))
+
+    assert sorted(results[0] + results[1]) == list(range(1, head_version() + 1))
+
+    # The version read before the step locks is stale by the time it runs
+    monkeypatch.setattr(migrations, "current_version", lambda bind: 0)
+    assert migrate(create_db_engine(url)) == []
+
+
+def test_recipe_tags_backfilled_and_maintained():
+    """Test that migration 2 indexes existing tags and triggers keep them in sync."""
+    engine = _legacy_engine()
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO recipes (title, ingredients_json, instructions_json, prep_time_minutes, "
+                "cook_time_minutes, dietary_tags_json) VALUES ('Old Salad', '[]', '[]', 10, NULL, '[\"vegan\"]')"
+            )
+        )
+
+    migrate(engine)
+
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT tag FROM recipe_tags")).scalars().all() == ["vegan"]
+        assert conn.execute(text("SELECT total_time_minutes FROM recipes")).scalar() == 10
+
+        conn.execute(text("UPDATE recipes SET dietary_tags_json = '[\"keto\", \"paleo\"]'"))
+        assert sorted(conn.execute(text("SELECT tag FROM recipe_tags")).scalars()) == ["keto", "paleo"]
+
+        conn.execute(text("DELETE FROM recipes"))
+        assert conn.execute(text("SELECT COUNT(*) FROM recipe_tags")).scalar() == 0
+
+
+def test_downgrade_and_reapply(memory_engine):
+    """Test that migrations are reversible."""
+    reverted = downgrade(memory_engine, 0)
+
+    assert reverted[-1] == 1
+    assert current_version(memory_engine) == 0
+    assert "ix_recipes_created_at" not in _index_names(memory_engine, "recipes")
+
+    migrate(memory_engine)
+    assert current_version(memory_engine) == head_version()
+    assert "ix_recipes_created_at" in _index_names(memory_engine, "recipes")
+
+
+def test_content_hash_keeps_legacy_duplicates_until_dedupe():
+    """Test that migration 3 fingerprints old rows without deleting any; dedupe merges them."""
+    engine = _legacy_engine()
+    insert_recipe = text(
+        "INSERT INTO recipes (title, ingredients_json, instructions_json) VALUES (:title, :ingredients, '[\"Boil\"]')"
+    )
+    with engine.begin() as conn:
+        for title in ("Plain Rice", "  plain   RICE ", "Fried Rice"):
+            conn.execute(insert_recipe, {"title": title, "ingredients": '[{"name": "rice", "quantity": 1, "unit": "cup"}]'})
+        conn.execute(
+            text(
+                "INSERT INTO meal_plans (name, start_date, end_date) VALUES ('Week', '2024-01-01', '2024-01-07')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO meal_slots (meal_plan_id, date, meal_type, recipe_id, recipe_title) "
+                "VALUES (1, '2024-01-01', 'dinner', 2, 'plain rice')"
+            )
+        )
+
+    migrate(engine)
+
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT id, content_hash FROM recipes ORDER BY id")).all()
+        assert [row[0] for row in rows] == [1, 2, 3]
+        assert all(len(row[1]) == 64 for row in rows) and rows[0][1] == rows[1][1]
+        assert conn.execute(text("SELECT recipe_id FROM meal_slots")).scalar() == 2
+    assert _unique_indexes(engine) == {"ix_recipes_content_hash": False}
+
+    with engine.begin() as conn:
+        result = deduplicate_recipes(conn)
+
+    assert result.merges == [(2, 1)]
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT id FROM recipes ORDER BY id")).scalars().all() == [1, 3]
+        assert conn.execute(text("SELECT recipe_id FROM meal_slots")).scalar() == 1
+    assert _unique_indexes(engine) == {"ix_recipes_content_hash": True}
+
+
+def test_content_hash_is_unique_without_legacy_duplicates():
+    """Test that migration 3 makes the fingerprint index unique when nothing would clash."""
+    engine = _legacy_engine()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO recipes (title, ingredients_json, instructions_json) VALUES ('Rice', '[]', '[]')")
+        )
+
+    migrate(engine)
+
+    assert _unique_indexes(engine) == {"ix_recipes_content_hash": True}
+
+
+def _unique_indexes(engine) -> dict[str, bool]:
+    return {
+        ix["name"]: bool(ix["unique"])
+        for ix in inspect(engine).get_indexes("recipes")
+        if ix["name"] == "ix_recipes_content_hash"
+    }
@@ -0,0 +1,87 @@
+"""Tests for the preferences read-through cache."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.config import settings
+from chefwise.database import PreferencesRepository, create_db_engine, init_db
+from chefwise.database.cache import preferences_cache
+from chefwise.models import UserPreferences
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Two engines on one database file, standing in for two processes."""
+    url = f"sqlite:///{tmp_path / 'prefs.db'}"
+    ours, theirs = create_db_engine(url), create_db_engine(url)
+    init_db(ours)
+    yield ours, theirs
+    preferences_cache.invalidate()
+    ours.dispose()
+    theirs.dispose()
+
+
+def _count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_cached_read_skips_database(engines):
+    """Test that a fresh cache entry is served without a query."""
+    engine, _ = engines
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        PreferencesRepository(db).get()
+
+    statements = _count_statements(engine)
+    with Session() as db:
+        prefs = PreferencesRepository(db).get()
+
+    assert statements == []
+    assert prefs.skill_level == "intermediate"
+
+
+def test_update_writes_through(engines):
+    """Test that an update is visible to the next read without a query."""
+    engine, _ = engines
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        PreferencesRepository(db).update(UserPreferences(allergies=["sesame"]))
+
+    statements = _count_statements(engine)
+    with Session() as db:
+        assert PreferencesRepository(db).get().allergies == ["sesame"]
+    assert statements == []
+
+
+def test_returned_copy_does_not_leak_into_cache(engines):
+    """Test that mutating a returned model leaves the cache untouched."""
+    engine, _ = engines
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        PreferencesRepository(db).get().allergies.append("oops")
+        assert PreferencesRepository(db).get().allergies == []
+
+
+def test_detects_change_from_other_process(engines, monkeypatch):
+    """Test that an expired entry is revalidated with the version probe."""
+    ours, theirs = engines
+    with sessionmaker(bind=ours)() as db:
+        PreferencesRepository(db).get()
+
+    with sessionmaker(bind=theirs)() as db:
+        PreferencesRepository(db).update(UserPreferences(favorite_cuisines=["Korean"]))
+
+    with sessionmaker(bind=ours)() as db:
+        # Still within the TTL: the cached copy is trusted
+        assert PreferencesRepository(db).get().favorite_cuisines == []
+
+        monkeypatch.setattr(settings, "preferences_cache_ttl_seconds", 0)
+        assert PreferencesRepository(db).get().favorite_cuisines == ["Korean"]
+
+        # Unchanged since the last check: only the probe runs
+        statements = _count_statements(ours)
+        assert PreferencesRepository(db).get().favorite_cuisines == ["Korean"]
+        assert len(statements) == 1
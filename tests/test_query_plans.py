@@ -0,0 +1,190 @@
+"""EXPLAIN QUERY PLAN checks for repository queries.
+
+Every statement a repository method sends to SQLite is captured and explained;
+a plain ``SCAN <table>`` (a full table scan) or a temporary B-tree for sorting
+fails the test unless it is explicitly allowed below. Filtered queries may
+sort their (small) result set instead of walking the sort index.
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import (
+    CalendarRepository,
+    ChangeFeedRepository,
+    JobRepository,
+    MealPlanRepository,
+    PreferencesRepository,
+    RecipeRepository,
+)
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeCreate, UserPreferences
+
+# Full scans that are expected by design: case -> (plan line, reason)
+ALLOWED_SCANS = {
+    "search": ("SCAN recipes", "substring LIKE '%q%' cannot use a B-tree index"),
+    "preferences": ("SCAN user_preferences", "user_preferences holds a single row"),
+    "jobs": ("USE TEMP B-TREE FOR ORDER BY", "active jobs span two statuses and are few; sorting them is cheap"),
+}
+
+
+@contextmanager
+def capture_statements(engine):
+    """Record every (statement, parameters) pair executed on the engine."""
+    captured = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def full_scans(engine, statements, allow_sort=False):
+    """Return the plan lines that indicate a full table scan or a sort without an index."""
+    tables = set(inspect(engine).get_table_names())
+    problems = []
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall():
+                detail = row[-1]
+                words = detail.split()
+                if words[0] == "SCAN" and len(words) == 2 and words[1] in tables:
+                    problems.append((statement, detail))
+                elif detail.startswith("USE TEMP B-TREE FOR ORDER BY") and not allow_sort:
+                    problems.append((statement, detail))
+    finally:
+        raw.close()
+    return problems
+
+
+@pytest.fixture
+def session(memory_engine):
+    db = sessionmaker(bind=memory_engine)()
+    recipe_repo = RecipeRepository(db)
+    recipe = recipe_repo.create(
+        RecipeCreate(
+            title="Plan Check Pie",
+            ingredients=[Ingredient(name="flour", quantity=2, unit="cups")],
+            instructions=["Mix", "Bake"],
+            dietary_tags=["vegetarian"],
+            cuisine="American",
+            difficulty="easy",
+            prep_time_minutes=20,
+            cook_time_minutes=40,
+        )
+    )
+    MealPlanRepository(db).create(
+        MealPlanCreate(
+            name="Plan Check Week",
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=6),
+            meals=[MealSlot(date=date.today(), meal_type="dinner", recipe_id=recipe.id, recipe_title=recipe.title)],
+        )
+    )
+    yield db
+    db.close()
+
+
+def _recipe_queries(db):
+    repo = RecipeRepository(db)
+    recipe = repo.get_all()[0]
+    repo.get(recipe.id)
+    repo.delete(recipe.id)
+
+
+def _meal_plan_queries(db):
+    repo = MealPlanRepository(db)
+    plan = repo.get_all()[0]
+    repo.get(plan.id)
+    repo.get_current()
+    repo.delete(plan.id)
+
+
+def _filter_queries(db):
+    repo = RecipeRepository(db)
+    repo.filter(tags=["vegan"])
+    repo.filter(cuisine="Italian", sort="title")
+    repo.filter(difficulty="easy", max_total_time=30, offset=100)
+    repo.filter(max_total_time=45, sort="total_time")
+
+
+def _fingerprint_queries(db):
+    repo = RecipeRepository(db)
+    recipe = repo.get_all()[0]
+    repo.create(RecipeCreate(**recipe.model_dump(include=set(RecipeCreate.model_fields))))
+    repo.get_by_fingerprint("0" * 64)
+
+
+def _change_feed_queries(db):
+    repo = ChangeFeedRepository(db)
+    repo.changes_since(None)
+    repo.changes_since(repo.current_token())
+
+
+def _calendar_queries(db):
+    repo = CalendarRepository(db)
+    start = date.today()
+    repo.range(start, start + timedelta(days=30))
+    repo.range(start, start + timedelta(days=30), meal_types=["dinner", "lunch"])
+    list(repo.iter_days(start, start + timedelta(days=365), batch_size=10))
+    repo.day_counts(start, start + timedelta(days=30), meal_types=["dinner"])
+
+
+def _job_queries(db):
+    repo = JobRepository(db)
+    job = repo.create("suggest_recipes", {"ingredients": ["rice"]}, deadline=datetime.utcnow())
+    repo.start(job.id)
+    repo.set_progress(job.id, "halfway")
+    repo.status(job.id)
+    repo.recent("suggest_recipes")
+    repo.active()
+    repo.expire_overdue()
+    repo.cancel(job.id)
+    repo.get(job.id)
+
+
+def _search_queries(db):
+    RecipeRepository(db).search("pie")
+
+
+def _preferences_queries(db):
+    repo = PreferencesRepository(db)
+    repo.update(UserPreferences(allergies=["peanuts"]))
+    repo.get()
+
+
+@pytest.mark.parametrize(
+    "name, exercise",
+    [
+        ("recipes", _recipe_queries),
+        ("meal_plans", _meal_plan_queries),
+        ("filter", _filter_queries),
+        ("fingerprint", _fingerprint_queries),
+        ("change_feed", _change_feed_queries),
+        ("calendar", _calendar_queries),
+        ("jobs", _job_queries),
+        ("search", _search_queries),
+        ("preferences", _preferences_queries),
+    ],
+)
+def test_repository_queries_use_indexes(memory_engine, session, name, exercise):
+    """Test that repository queries are answered from an index."""
+    with capture_statements(memory_engine) as statements:
+        exercise(session)
+
+    assert statements, "no statements captured"
+    problems = full_scans(memory_engine, statements, allow_sort=name == "filter")
+    if name in ALLOWED_SCANS:
+        allowed, _reason = ALLOWED_SCANS[name]
+        problems = [(sql, detail) for sql, detail in problems if detail != allowed]
+    assert not problems, "\n".join(f"{detail}: {sql}" for sql, detail in problems)
@@ -0,0 +1,159 @@
+"""Tests for the columnar recipe catalog."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import RecipeRepository, RecipeTable, create_db_engine, init_db
+from chefwise.database.catalog import RecipeCatalog, recipe_catalog
+from chefwise.models import Ingredient, RecipeCreate
+
+_START = datetime(2024, 1, 1)
+
+
+def _row(n: int, **overrides) -> dict:
+    row = {
+        "title": f"Dish {n:03d}",
+        "description": "tasty" if n % 2 else "plain",
+        "ingredients_json": "[]",
+        "instructions_json": "[]",
+        "prep_time_minutes": n % 4 * 10 or None,
+        "cook_time_minutes": n % 3 * 10 or None,
+        "servings": 2 + n % 3,
+        "dietary_tags_json": "[]",
+        "cuisine": ("Italian", "Mexican", None)[n % 3],
+        "difficulty": ("easy", "hard")[n % 2],
+        "created_at": _START + timedelta(hours=n % 7, minutes=n),
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def db(memory_engine):
+    with memory_engine.begin() as conn:
+        conn.execute(insert(RecipeTable), [_row(n) for n in range(60)])
+    session = sessionmaker(bind=memory_engine)()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"cuisine": "Italian"},
+        {"difficulty": "hard", "max_total_time": 40},
+        {"query": "TASTY"},
+        {"query": "dish 01", "cuisine": "Mexican"},
+        {"cuisine": "Thai"},
+    ],
+)
+@pytest.mark.parametrize("sort", ["newest", "oldest", "title", "title_desc", "total_time"])
+def test_matches_sql_filter(db, filters, sort):
+    catalog = RecipeCatalog.build(db)
+    sql = RecipeRepository(db).filter(sort=sort, limit=1000, **filters)
+
+    result = catalog.query(sort=sort, **filters)
+
+    assert result.total == sql.total
+    assert list(result.ids) == [r.id for r in sql.recipes]
+
+
+@pytest.mark.parametrize("query", [None, "apple", "APPLE", "éclair", "ÉCLAIR", "straße"])
+@pytest.mark.parametrize("sort", ["title", "title_desc"])
+def test_mixed_case_titles_match_sql_filter(memory_engine, query, sort):
+    titles = ["Zebra cake", "apple pie", "Apple tart", "éclair", "Éclair", "banana bread", "STRASSE soup", "straße"]
+    with memory_engine.begin() as conn:
+        conn.execute(insert(RecipeTable), [_row(n, title=title) for n, title in enumerate(titles)])
+    with sessionmaker(bind=memory_engine)() as db:
+        sql = RecipeRepository(db).filter(query=query, sort=sort, limit=1000)
+
+        result = RecipeCatalog.build(db).query(query=query, sort=sort)
+
+    assert list(result.ids) == [r.id for r in sql.recipes]
+    assert result.total == sql.total
+
+
+@pytest.mark.parametrize("query", ["%", "_", "0% r", "100_", "\\"])
+def test_wildcards_match_literally_like_sql_filter(memory_engine, query):
+    titles = ["100% Rye", "1000 Island", "Half_and_half", "Back\\slash", "Plain"]
+    with memory_engine.begin() as conn:
+        conn.execute(insert(RecipeTable), [_row(n, title=title) for n, title in enumerate(titles)])
+    with sessionmaker(bind=memory_engine)() as db:
+        sql = RecipeRepository(db).filter(query=query, limit=1000)
+
+        result = RecipeCatalog.build(db).query(query=query)
+
+    assert list(result.ids) == [r.id for r in sql.recipes]
+    assert result.total == sql.total == sum(query.lower() in title.lower() for title in titles)
+
+
+@pytest.mark.parametrize("sort", ["newest", "title", "total_time"])
+def test_top_k_and_paging(db, sort):
+    catalog = RecipeCatalog.build(db)
+    ordered = list(catalog.query(sort=sort).ids)
+
+    assert list(catalog.top_k(5, sort=sort)) == ordered[:5]
+    page = catalog.query(sort=sort, limit=7, offset=14)
+    assert list(page.ids) == ordered[14:21]
+    assert page.total == len(ordered)
+
+
+def test_counts(db):
+    catalog = RecipeCatalog.build(db)
+    assert catalog.counts("cuisine") == {"Italian": 20, "Mexican": 20}
+    assert catalog.counts("difficulty") == {"easy": 30, "hard": 30}
+
+
+def test_codes_widen_with_the_vocabulary(db):
+    catalog = RecipeCatalog.build(db)
+    assert catalog.cuisine.dtype == np.int8
+
+    # Arrive in batches, so the column widens on append
+    rows = [(1000 + n, _START, None, None, 2, f"Cuisine {n}", "easy", f"Extra {n}", "") for n in range(300)]
+    for start in range(0, len(rows), 50):
+        catalog.upsert(rows[start : start + 50])
+
+    assert catalog.cuisine.dtype == np.int16
+    assert list(catalog.query(cuisine="Cuisine 299").ids) == [1299]
+    italian = RecipeRepository(db).filter(cuisine="Italian", limit=1000).recipes
+    assert list(catalog.query(cuisine="Italian").ids) == [r.id for r in italian]
+    assert catalog.counts("cuisine")["Cuisine 200"] == 1
+
+
+def test_follows_creates_updates_and_deletes(db):
+    catalog = recipe_catalog(db)
+    assert recipe_catalog(db) is catalog
+    repo = RecipeRepository(db)
+
+    created = repo.create(
+        RecipeCreate(
+            title="Zucchini Fritters",
+            ingredients=[Ingredient(name="zucchini", quantity=2, unit="whole")],
+            instructions=["Grate", "Fry"],
+            cuisine="Greek",
+        )
+    )
+    db.execute(text("UPDATE recipes SET title = 'Renamed' WHERE title = 'Dish 000'"))
+    db.commit()
+    repo.delete(repo.filter(query="Dish 001").recipes[0].id)
+
+    catalog = recipe_catalog(db)
+    assert len(catalog) == 60
+    assert list(catalog.query(cuisine="Greek").ids) == [created.id]
+    assert catalog.query(query="renamed").total == 1
+    assert catalog.query(query="dish 001").total == 0
+    assert list(catalog.query(sort="title").ids) == [r.id for r in repo.filter(sort="title", limit=1000).recipes]
+
+
+def test_catalogs_are_per_engine(tmp_path, db):
+    other = create_db_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    init_db(other)
+    with sessionmaker(bind=other)() as other_db:
+        assert len(recipe_catalog(other_db)) == 0
+    assert len(recipe_catalog(db)) == 60
+    other.dispose()
@@ -0,0 +1,86 @@
+"""Tests for recipe content fingerprints and deduplication."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import RecipeRepository, recipe_fingerprint
+from chefwise.models import Ingredient, RecipeCreate
+
+
+def _recipe(**overrides) -> RecipeCreate:
+    fields = {
+        "title": "Garlic Bread",
+        "description": "Crispy",
+        "ingredients": [
+            Ingredient(name="bread", quantity=1, unit="loaf"),
+            Ingredient(name="garlic", quantity=3, unit="cloves"),
+        ],
+        "instructions": ["Spread garlic butter", "Bake"],
+        **overrides,
+    }
+    return RecipeCreate(**fields)
+
+
+@pytest.fixture
+def repo(memory_engine):
+    db = sessionmaker(bind=memory_engine)()
+    yield RecipeRepository(db)
+    db.close()
+
+
+def test_fingerprint_ignores_formatting_and_ingredient_order():
+    base = recipe_fingerprint(_recipe())
+    reformatted = _recipe(
+        title="  garlic   BREAD",
+        ingredients=[
+            Ingredient(name="Garlic ", quantity=3.0, unit="Cloves"),
+            Ingredient(name="bread", quantity=1, unit="loaf", notes="day old"),
+        ],
+        instructions=["spread garlic  butter", "bake"],
+        description="Different description",
+    )
+    assert recipe_fingerprint(reformatted) == base
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"title": "Cheesy Garlic Bread"},
+        {"instructions": ["Bake", "Spread garlic butter"]},
+        {"ingredients": [Ingredient(name="bread", quantity=2, unit="loaf")]},
+    ],
+)
+def test_fingerprint_changes_with_content(overrides):
+    assert recipe_fingerprint(_recipe(**overrides)) != recipe_fingerprint(_recipe())
+
+
+def test_create_returns_existing_recipe(repo):
+    first, created = repo.create_or_get(_recipe())
+    again, created_again = repo.create_or_get(_recipe(title="garlic bread"))
+
+    assert created is True
+    assert created_again is False
+    assert again.id == first.id
+    assert repo.create(_recipe()).id == first.id
+    assert len(repo.get_all()) == 1
+    assert repo.get_by_fingerprint(recipe_fingerprint(_recipe())).id == first.id
+
+
+def test_deduplicate_fills_missing_hashes(repo):
+    kept = repo.create(_recipe())
+    # Rows written without a fingerprint, e.g. by bulk imports
+    repo.db.execute(text("UPDATE recipes SET content_hash = NULL"))
+    repo.db.execute(
+        text(
+            "INSERT INTO recipes (title, ingredients_json, instructions_json) "
+            "SELECT title, ingredients_json, instructions_json FROM recipes"
+        )
+    )
+    repo.db.commit()
+
+    result = repo.deduplicate()
+
+    assert (result.scanned, result.fingerprinted, result.merged) == (2, 1, 1)
+    assert [r.id for r in repo.get_all()] == [kept.id]
+    assert repo.get_by_fingerprint(recipe_fingerprint(_recipe())).id == kept.id
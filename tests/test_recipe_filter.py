@@ -0,0 +1,77 @@
+"""Tests for SQL-side recipe filtering."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import RecipeRepository
+from chefwise.models import Ingredient, RecipeCreate
+
+
+@pytest.fixture
+def repo(memory_engine):
+    db = sessionmaker(bind=memory_engine)()
+    repo = RecipeRepository(db)
+    recipes = [
+        ("Pad Thai", "Thai", "medium", ["dairy_free"], 20, 15),
+        ("Green Curry", "Thai", "easy", ["vegan", "gluten_free"], 15, 25),
+        ("Margherita", "Italian", "easy", ["vegetarian"], 90, 10),
+        ("Risotto", "Italian", "hard", ["vegetarian", "gluten_free"], None, 40),
+        ("Toast", None, "easy", ["vegan"], None, None),
+    ]
+    for title, cuisine, difficulty, tags, prep, cook in recipes:
+        repo.create(
+            RecipeCreate(
+                title=title,
+                ingredients=[Ingredient(name="salt", quantity=1, unit="pinch")],
+                instructions=["Cook"],
+                cuisine=cuisine,
+                difficulty=difficulty,
+                dietary_tags=tags,
+                prep_time_minutes=prep,
+                cook_time_minutes=cook,
+            )
+        )
+    yield repo
+    db.close()
+
+
+def _titles(result):
+    return sorted(r.title for r in result.recipes)
+
+
+def test_filter_by_tags_requires_all(repo):
+    """Test that every requested tag must be present."""
+    assert _titles(repo.filter(tags=["vegan"])) == ["Green Curry", "Toast"]
+    assert _titles(repo.filter(tags=["vegan", "gluten_free"])) == ["Green Curry"]
+
+
+def test_filter_by_columns_and_total_time(repo):
+    """Test cuisine, difficulty and generated total time predicates."""
+    assert _titles(repo.filter(cuisine="Thai", difficulty="easy")) == ["Green Curry"]
+    # Toast has no times at all, so it never matches a time limit
+    assert _titles(repo.filter(max_total_time=40)) == ["Green Curry", "Pad Thai", "Risotto"]
+
+
+def test_filter_facets_cover_all_matches(repo):
+    """Test that facets and total describe every match, not just the page."""
+    result = repo.filter(tags=["gluten_free"], limit=1, sort="title")
+
+    assert result.total == 2
+    assert [r.title for r in result.recipes] == ["Green Curry"]
+    assert result.facets.cuisine == {"Italian": 1, "Thai": 1}
+    assert result.facets.difficulty == {"easy": 1, "hard": 1}
+    assert result.facets.tags == {"gluten_free": 2, "vegan": 1, "vegetarian": 1}
+
+
+def test_filter_past_last_page(repo):
+    """Test that an empty page still reports the total and facets."""
+    result = repo.filter(cuisine="Italian", offset=10)
+
+    assert result.recipes == []
+    assert result.total == 2
+    assert result.facets.cuisine == {"Italian": 2}
+
+
+def test_filter_rejects_unknown_sort(repo):
+    with pytest.raises(ValueError):
+        repo.filter(sort="random")
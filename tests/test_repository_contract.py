@@ -0,0 +1,291 @@
+"""Contract tests run against both the sync and the async repositories."""
+
+import asyncio
+import inspect
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import (
+    AsyncMealPlanRepository,
+    AsyncPreferencesRepository,
+    AsyncRecipeRepository,
+    MealPlanRepository,
+    PreferencesRepository,
+    RecipeRepository,
+    async_init_db,
+    create_async_db_engine,
+    create_db_engine,
+    init_db,
+)
+from chefwise.database.cache import preferences_cache
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeCreate, UserPreferences
+
+
+class _Blocking:
+    """Expose an async repository through the sync interface."""
+
+    def __init__(self, repo, runner: asyncio.Runner):
+        self._repo = repo
+        self._runner = runner
+
+    def __getattr__(self, name):
+        attr = getattr(self._repo, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+        return lambda *args, **kwargs: self._runner.run(attr(*args, **kwargs))
+
+
+@pytest.fixture(params=["sync", "async"])
+def repos(request, tmp_path):
+    """(recipes, meal plans, preferences) repositories over a fresh database file."""
+    url = f"sqlite:///{tmp_path / 'contract.db'}"
+
+    if request.param == "sync":
+        engine = create_db_engine(url)
+        init_db(engine)
+        db = sessionmaker(bind=engine)()
+        yield RecipeRepository(db), MealPlanRepository(db), PreferencesRepository(db)
+        db.close()
+        preferences_cache.invalidate(engine)
+        engine.dispose()
+        return
+
+    with asyncio.Runner() as runner:
+        engine = create_async_db_engine(url)
+        runner.run(async_init_db(engine))
+        db = async_sessionmaker(engine, expire_on_commit=False)()
+        yield tuple(
+            _Blocking(repo, runner)
+            for repo in (AsyncRecipeRepository(db), AsyncMealPlanRepository(db), AsyncPreferencesRepository(db))
+        )
+        runner.run(db.close())
+        preferences_cache.invalidate(engine.sync_engine)
+        runner.run(engine.dispose())
+
+
+def _recipe(title: str, **overrides) -> RecipeCreate:
+    fields = {
+        "title": title,
+        "description": "Contract test dish",
+        "ingredients": [Ingredient(name="rice", quantity=1, unit="cup")],
+        "instructions": ["Cook", "Serve"],
+        "prep_time_minutes": 5,
+        "cook_time_minutes": 10,
+        "dietary_tags": ["vegan"],
+        **overrides,
+    }
+    return RecipeCreate(**fields)
+
+
+def test_recipe_roundtrip(repos):
+    recipes, _, _ = repos
+    created = recipes.create(_recipe("Fried Rice"))
+
+    fetched = recipes.get(created.id)
+    assert fetched == created
+    assert fetched.ingredients[0].name == "rice"
+    assert fetched.dietary_tags == ["vegan"]
+    assert recipes.get(created.id + 1000) is None
+
+
+def test_recipe_listing_and_search(repos):
+    recipes, _, _ = repos
+    recipes.create(_recipe("Lentil Soup"))
+    recipes.create(_recipe("Tomato Salad", description="Fresh soup alternative"))
+    recipes.create(_recipe("Pancakes"))
+
+    assert len(recipes.get_all()) == 3
+    assert len(recipes.get_all(limit=2)) == 2
+    assert len(recipes.get_all(limit=2, offset=2)) == 1
+    assert sorted(r.title for r in recipes.search("soup")) == ["Lentil Soup", "Tomato Salad"]
+
+
+def test_recipe_search_matches_wildcards_literally(repos):
+    recipes, _, _ = repos
+    recipes.create(_recipe("100% Rye"))
+    recipes.create(_recipe("Half_and_half Tart"))
+    recipes.create(_recipe("Back\\slash Bread"))
+    recipes.create(_recipe("1000 Island Salad"))
+
+    assert [r.title for r in recipes.search("0% r")] == ["100% Rye"]
+    assert [r.title for r in recipes.search("_")] == ["Half_and_half Tart"]
+    assert [r.title for r in recipes.search("\\")] == ["Back\\slash Bread"]
+    assert recipes.search("100_") == []
+
+
+def test_recipe_delete(repos):
+    recipes, _, _ = repos
+    created = recipes.create(_recipe("Short Lived"))
+
+    assert recipes.delete(created.id) is True
+    assert recipes.get(created.id) is None
+    assert recipes.delete(created.id) is False
+
+
+def test_meal_plan_roundtrip(repos):
+    recipes, plans, _ = repos
+    recipe = recipes.create(_recipe("Porridge"))
+    today = date.today()
+
+    created = plans.create(
+        MealPlanCreate(
+            name="This Week",
+            start_date=today,
+            end_date=today,
+            meals=[
+                MealSlot(date=today, meal_type="breakfast", recipe_id=recipe.id, recipe_title=recipe.title),
+                MealSlot(date=today, meal_type="dinner", recipe_title="Leftovers"),
+            ],
+        )
+    )
+
+    assert len(created.meals) == 2
+    assert plans.get(created.id) == created
+    assert [p.id for p in plans.get_all()] == [created.id]
+    assert plans.get_current().id == created.id
+
+    assert plans.delete(created.id) is True
+    assert plans.get(created.id) is None
+    assert plans.get_current() is None
+
+
+def test_recipe_get_many_keeps_input_order(repos):
+    recipes, _, _ = repos
+    a, b, c = (recipes.create(_recipe(title)) for title in ("Aioli", "Borscht", "Chowder"))
+
+    fetched = recipes.get_many([c.id, a.id, c.id, 9999, b.id, a.id])
+
+    assert [r.id for r in fetched] == [c.id, a.id, b.id]
+    assert fetched[0] == c
+    assert recipes.get_many([]) == []
+
+
+def test_meal_plan_with_recipes(repos):
+    recipes, plans, _ = repos
+    soup = recipes.create(_recipe("Miso Soup"))
+    rice = recipes.create(_recipe("Steamed Rice"))
+    today = date.today()
+    created = plans.create(
+        MealPlanCreate(
+            name="Resolved",
+            start_date=today,
+            end_date=today,
+            meals=[
+                MealSlot(date=today, meal_type="lunch", recipe_id=soup.id, recipe_title=soup.title),
+                MealSlot(date=today, meal_type="dinner", recipe_id=rice.id, recipe_title=rice.title),
+                MealSlot(date=today, meal_type="snack", recipe_id=soup.id, recipe_title=soup.title),
+                MealSlot(date=today, meal_type="breakfast", recipe_title="Toast"),
+            ],
+        )
+    )
+
+    plan = plans.get_with_recipes(created.id)
+
+    assert plan.meals == created.meals
+    assert plan.recipes == {soup.id: soup, rice.id: rice}
+    assert [plan.recipe_for(meal) for meal in plan.meals] == [soup, rice, soup, None]
+    assert plans.get_with_recipes(created.id + 1000) is None
+
+
+def _two_day_plan(plans):
+    start = date(2024, 5, 6)
+    return plans.create(
+        MealPlanCreate(
+            name="Slots",
+            start_date=start,
+            end_date=start + timedelta(days=1),
+            meals=[
+                MealSlot(date=start, meal_type="lunch", recipe_title="Falafel"),
+                MealSlot(date=start, meal_type="dinner", recipe_title="Dal", notes="double batch"),
+                MealSlot(date=start + timedelta(days=1), meal_type="dinner", recipe_title="Tacos"),
+            ],
+        )
+    )
+
+
+def test_meal_slot_edits(repos):
+    _, plans, _ = repos
+    plan = _two_day_plan(plans)
+    lunch, dinner, tacos = plan.meals
+
+    assert plans.swap_slots(lunch.id, dinner.id) is True
+    assert plans.move_slot(tacos.id, date(2024, 5, 6), "breakfast") is True
+    assert plans.update_slot(lunch.id, lunch.model_copy(update={"recipe_title": "Shakshuka"})) is True
+    added = plans.add_slot(plan.id, MealSlot(date=date(2024, 5, 7), meal_type="snack", recipe_title="Dates"))
+
+    meals = {meal.id: meal for meal in plans.get(plan.id).meals}
+    assert (meals[lunch.id].recipe_title, meals[lunch.id].notes) == ("Shakshuka", None)
+    assert (meals[dinner.id].recipe_title, meals[dinner.id].notes) == ("Falafel", None)
+    assert (meals[tacos.id].date, meals[tacos.id].meal_type) == (date(2024, 5, 6), "breakfast")
+    assert meals[added.id].recipe_title == "Dates"
+
+    assert plans.delete_slot(added.id) is True
+    assert plans.delete_slot(added.id) is False
+    assert plans.swap_slots(lunch.id, added.id) is False
+    assert plans.add_slot(plan.id + 1000, added) is None
+    assert len(plans.get(plan.id).meals) == 3
+
+
+def test_meal_plan_reschedule(repos):
+    _, plans, _ = repos
+    plan = _two_day_plan(plans)
+
+    assert plans.reschedule(plan.id, 30) == 3
+
+    moved = plans.get(plan.id)
+    assert (moved.start_date, moved.end_date) == (date(2024, 6, 5), date(2024, 6, 6))
+    assert [meal.date for meal in moved.meals] == [meal.date + timedelta(days=30) for meal in plan.meals]
+    assert plans.reschedule(plan.id, -30) == 3
+    assert plans.get(plan.id).meals == plan.meals
+
+
+def test_meal_plan_save_applies_diff(repos):
+    _, plans, _ = repos
+    plan = _two_day_plan(plans)
+    edited = plans.get(plan.id)
+    edited.name = "Edited"
+    edited.meals[0].recipe_title = "Hummus"
+    del edited.meals[1]
+    edited.meals.append(MealSlot(date=date(2024, 5, 7), meal_type="lunch", recipe_title="Soup"))
+
+    changes = plans.save(edited)
+
+    assert (changes.inserted, changes.updated, changes.deleted, changes.plan_updated) == (1, 1, 1, True)
+    stored = plans.get(plan.id)
+    assert stored.name == "Edited"
+    assert [m.recipe_title for m in stored.meals] == ["Hummus", "Tacos", "Soup"]
+    assert stored.meals[2].id == changes.new_slot_ids[0]
+    assert plans.save(stored).changed is False
+
+
+def test_preferences_default_and_update(repos):
+    _, _, preferences = repos
+    assert preferences.get().serving_size == 4
+
+    preferences.update(UserPreferences(allergies=["peanuts"], serving_size=6))
+
+    stored = preferences.get()
+    assert stored.allergies == ["peanuts"]
+    assert stored.serving_size == 6
+
+
+def test_sync_and_async_share_storage(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    sync_engine = create_db_engine(url)
+    init_db(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        created = RecipeRepository(db).create(_recipe("Shared Curry"))
+
+    async def read():
+        async_engine = create_async_db_engine(url)
+        try:
+            async with async_sessionmaker(async_engine)() as db:
+                return await AsyncRecipeRepository(db).get(created.id)
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(read()) == created
+    sync_engine.dispose()
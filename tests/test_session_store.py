@@ -0,0 +1,175 @@
+"""Tests for the server-side session store."""
+
+import pytest
+
+from chefwise.app.session_store import (
+    MemorySessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+    deserialize,
+    serialize,
+)
+from chefwise.config.settings import Settings
+from chefwise.models import Ingredient, RecipeSuggestion
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path, clock):
+    stores = []
+
+    def make(max_bytes=1 << 20, max_value_bytes=1 << 16, idle_ttl=60.0):
+        limits = dict(max_bytes=max_bytes, max_value_bytes=max_value_bytes, idle_ttl=idle_ttl, clock=clock)
+        if request.param == "memory":
+            store = MemorySessionStore(**limits)
+        else:
+            store = SQLiteSessionStore(tmp_path / f"sessions{len(stores)}.db", touch_interval=0, **limits)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if isinstance(store, SQLiteSessionStore):
+            store.close()
+
+
+def _suggestions(n):
+    return [
+        RecipeSuggestion(
+            title=f"Recipe {i}",
+            description="A weeknight dinner with plenty of vegetables",
+            ingredients=[Ingredient(name="onion", quantity=1, unit="whole")] * 8,
+            instructions=["Chop the onion", "Fry until golden", "Serve"],
+        )
+        for i in range(n)
+    ]
+
+
+def test_values_round_trip_per_session(make_store):
+    store = make_store()
+    suggestions = _suggestions(3)
+
+    store.set("a", "current_suggestions", suggestions)
+    store.set("b", "current_suggestions", [])
+
+    assert store.get("a", "current_suggestions") == suggestions
+    assert store.get("b", "current_suggestions") == []
+    assert store.get("a", "missing", "default") == "default"
+    assert len(store) == 2
+
+
+def test_set_none_and_delete_remove_values(make_store):
+    store = make_store()
+    store.set("a", "plan", {"days": 7})
+    store.set("a", "confirm_delete", 4)
+
+    store.set("a", "plan", None)
+    store.delete("a", "confirm_delete")
+    store.delete("a", "never_set")
+
+    assert store.get("a", "plan") is None
+    assert store.get("a", "confirm_delete") is None
+    assert store.size == 0
+
+
+def test_size_tracks_overwrites(make_store):
+    store = make_store()
+    store.set("a", "list", list(range(100)))
+    store.set("a", "list", [1])
+
+    assert store.size == len(serialize([1]))
+    store.clear("a")
+    assert store.size == 0 and len(store) == 0
+
+
+def test_idle_sessions_expire(make_store, clock):
+    store = make_store(idle_ttl=60)
+    store.set("idle", "x", 1)
+    store.set("active", "x", 2)
+
+    clock.now += 45
+    assert store.get("active", "x") == 2
+    clock.now += 30
+
+    assert store.get("idle", "x") is None
+    assert store.get("active", "x") == 2
+    assert store.evict() == 0
+    clock.now += 61
+    assert store.evict() == 1
+    assert len(store) == 0
+
+
+def test_least_recently_used_sessions_are_evicted_over_budget(make_store, clock):
+    value = "x" * 400
+    size = len(serialize(value))
+    store = make_store(max_bytes=size * 3)
+    for session in ("a", "b", "c"):
+        store.set(session, "value", value)
+        clock.now += 1
+    store.get("a", "value")  # a is now more recent than b
+    clock.now += 1
+
+    store.set("d", "value", value)
+
+    assert store.get("b", "value") is None
+    assert [store.get(s, "value") is not None for s in ("a", "c", "d")] == [True, True, True]
+    assert store.size <= store.max_bytes
+
+
+def test_oversized_values_are_rejected(make_store):
+    store = make_store(max_value_bytes=256)
+    store.set("a", "small", "ok")
+
+    with pytest.raises(ValueError):
+        store.set("a", "big", bytes(range(256)) * 2)
+
+    assert store.get("a", "big") is None
+    assert store.get("a", "small") == "ok"
+
+
+def test_large_values_are_compressed():
+    suggestions = _suggestions(5)
+    data = serialize(suggestions)
+
+    assert data[:1] == b"z"
+    assert len(data) < len(serialize(suggestions[0])) * 2
+    assert deserialize(data) == suggestions
+    assert serialize(3)[:1] == b"p"
+
+
+def test_sqlite_store_survives_reopen(tmp_path, clock):
+    path = tmp_path / "sessions.db"
+    store = SQLiteSessionStore(path, max_bytes=1 << 20, max_value_bytes=1 << 16, idle_ttl=60, clock=clock)
+    store.set("a", "shopping_list", ["leeks"])
+    store.close()
+
+    store = SQLiteSessionStore(path, max_bytes=1 << 20, max_value_bytes=1 << 16, idle_ttl=60, clock=clock)
+    try:
+        assert store.get("a", "shopping_list") == ["leeks"]
+    finally:
+        store.close()
+
+
+def test_create_session_store_from_settings(tmp_path):
+    memory = create_session_store(Settings(session_store="memory", session_value_max_kb=2))
+    assert isinstance(memory, MemorySessionStore)
+    assert memory.max_value_bytes == 2048
+
+    sqlite = create_session_store(Settings(session_store="sqlite", session_store_path=str(tmp_path / "s.db")))
+    assert isinstance(sqlite, SQLiteSessionStore)
+    sqlite.close()
+
+    with pytest.raises(ValueError):
+        create_session_store(Settings(session_store="redis"))
@@ -0,0 +1,78 @@
+"""Tests for deferred imports and the one-time startup work."""
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from sqlalchemy import event
+
+import chefwise.ai
+import chefwise.database
+from chefwise.config.settings import Settings
+from chefwise.database import init_db
+
+ROOT = Path(__file__).parent.parent
+
+# Loaded on first use only (see benchmarks/bench_startup.py)
+DEFERRED = ("openai", "httpx", "numpy", "sqlalchemy.ext.asyncio", "aiosqlite")
+
+
+def _loaded_after(statement: str, tmp_path) -> set[str]:
+    """Modules present in a fresh interpreter after running one statement."""
+    code = f"import sys\n{statement}\nprint('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={"DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}", "PATH": ""},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_database_package_imports_lazily(tmp_path):
+    assert "sqlalchemy" not in _loaded_after("import chefwise.database, chefwise.ai", tmp_path)
+
+    loaded = _loaded_after("from chefwise.database import RecipeRepository, engine", tmp_path)
+    assert "chefwise.database.repositories" in loaded
+    assert not loaded & {"chefwise.database.async_repositories", "chefwise.database.transfer", *DEFERRED}
+
+
+def test_app_start_defers_heavy_dependencies(tmp_path):
+    pytest.importorskip("streamlit")
+    loaded = _loaded_after("import chefwise.app.cache", tmp_path)
+
+    assert "chefwise.database.connection" in loaded
+    assert not loaded & set(DEFERRED)
+
+
+def test_lazy_exports_resolve():
+    assert chefwise.database.RecipeRepository.__name__ == "RecipeRepository"
+    assert chefwise.ai.OpenAIClient.__module__ == "chefwise.ai.openai_client"
+    assert "AsyncRecipeRepository" in dir(chefwise.database)
+    with pytest.raises(AttributeError):
+        chefwise.database.NoSuchRepository
+
+
+def test_init_db_checks_schema_version_once(memory_engine):
+    statements = []
+    event.listen(memory_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    init_db(memory_engine)
+
+    # Only the version lookup: no table reflection, DDL or migrations
+    assert all("schema_version" in s for s in statements)
+    assert len(statements) == 2
+
+
+def test_data_dir_is_created_once():
+    config = Settings()
+    with mock.patch.object(Path, "mkdir") as mkdir:
+        first = config.data_dir
+        assert config.data_dir is first
+        config.db_path
+
+    assert mkdir.call_count == 1
@@ -0,0 +1,272 @@
+"""Tests for streamed AI generations: incremental parsing, services and the SSE API."""
+
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from chefwise import codec
+from chefwise.ai.services import MealPlanService, RecipeSuggestionService
+from chefwise.ai.streaming import ArrayItemParser
+from chefwise.api.admission import AdmissionScheduler, Priority
+from chefwise.api.streaming import StreamHub
+from chefwise.config.settings import Settings
+from chefwise.models import Ingredient, MealPlanDay, RecipeSuggestion
+
+RECIPES = {
+    "recipes": [
+        {"title": 'Curly {braces} and "quotes"', "description": "a [tricky] one \\ ok", "ingredients": [
+            {"name": "rice", "quantity": 1, "unit": "cup"}], "instructions": ["Cook {it}"]},
+        {"title": "Second", "description": "", "ingredients": [], "instructions": []},
+    ],
+    "notes": [{"not": "wanted"}],
+}
+
+MEAL_PLAN = {
+    "plan_name": "Week",
+    "meals": [
+        {"date": "2024-05-06", "meal_type": "lunch", "recipe_title": "Soup"},
+        {"date": "2024-05-06", "meal_type": "dinner", "recipe_title": "Stew"},
+        {"date": "2024-05-07", "meal_type": "dinner", "recipe_title": "Curry"},
+    ],
+    "shopping_list": [{"name": "leeks", "quantity": 2, "unit": ""}],
+    "tips": "Batch cook",
+}
+
+
+def _chunks(document: dict, size: int = 7) -> list[str]:
+    text = json.dumps(document, indent=1)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_emits_each_element_when_it_closes():
+    parser = ArrayItemParser(["recipes"])
+    emitted = []
+    for n, chunk in enumerate(_chunks(RECIPES, size=1)):
+        emitted.extend((n, item) for item in parser.feed(chunk))
+
+    assert [item for _, item in emitted] == [("recipes", r) for r in RECIPES["recipes"]]
+    # The first recipe is available long before the document ends
+    assert emitted[0][0] < emitted[1][0] < len(parser.text) - 1
+    assert parser.result() == RECIPES
+
+
+class _StreamingClient:
+    """Fake OpenAIClient streaming a fixed document."""
+
+    def __init__(self, document: dict):
+        self.document = document
+        self.sent = 0
+        self.closed = False
+
+    async def stream_chat_completion(self, system_prompt, user_prompt, **kwargs):
+        try:
+            for chunk in _chunks(self.document):
+                self.sent += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def test_stream_recipes_yields_before_the_response_ends():
+    client = _StreamingClient(RECIPES)
+    service = RecipeSuggestionService(client)
+
+    async def collect():
+        seen = []
+        async for recipe in service.stream_recipes(["rice"]):
+            seen.append((client.sent, recipe))
+        return seen
+
+    seen = asyncio.run(collect())
+
+    assert [r.title for _, r in seen] == ['Curly {braces} and "quotes"', "Second"]
+    assert seen[0][0] < len(_chunks(RECIPES))
+    assert client.closed
+
+
+def test_stream_meal_plan_yields_days_then_the_plan():
+    service = MealPlanService(_StreamingClient(MEAL_PLAN))
+
+    async def collect():
+        return [item async for item in service.stream_meal_plan(num_days=2, start_date=date(2024, 5, 6))]
+
+    *days, (plan, shopping_list) = asyncio.run(collect())
+
+    assert [(d.date, [m.recipe_title for m in d.meals]) for d in days] == [
+        (date(2024, 5, 6), ["Soup", "Stew"]),
+        (date(2024, 5, 7), ["Curry"]),
+    ]
+    assert plan.name == "Week" and plan.notes == "Batch cook"
+    assert len(plan.meals) == 3
+    assert shopping_list[0].name == "leeks"
+
+
+def _hub(**overrides) -> StreamHub:
+    return StreamHub(Settings(**{"api_stream_heartbeat_seconds": 5.0, "api_stream_resume_seconds": 0, **overrides}))
+
+
+async def _slow_source(state: dict, first=("recipe", {"n": 1})):
+    try:
+        yield first
+        state["waiting"] = True
+        await asyncio.sleep(60)
+        yield "recipe", {"n": 2}
+    finally:
+        state["closed"] = True
+
+
+def test_last_listener_leaving_cancels_the_upstream_call():
+    async def scenario():
+        state = {}
+        stream = _hub().start(_slow_source(state))
+        listener = stream.listen()
+        assert (await listener.__anext__())[1] == "recipe"
+        await asyncio.sleep(0.01)
+        await listener.aclose()  # Client disconnected
+        await asyncio.sleep(0.01)
+        return state, stream
+
+    state, stream = asyncio.run(scenario())
+
+    assert state == {"waiting": True, "closed": True}
+    assert stream.finished
+    assert stream.events[-1][1] == "error"
+
+
+def test_reattaching_within_the_resume_window_keeps_the_generation():
+    async def scenario():
+        state = {}
+        stream = _hub(api_stream_resume_seconds=0.2).start(_slow_source(state))
+        first = stream.listen()
+        await first.__anext__()
+        await first.aclose()
+        await asyncio.sleep(0.05)
+        second = stream.listen(after=1)
+        alive = not stream.finished
+        await second.aclose()
+        await asyncio.sleep(0.3)
+        return alive, state
+
+    alive, state = asyncio.run(scenario())
+
+    assert alive
+    assert state["closed"]  # Cancelled once the second listener left too
+
+
+def test_stream_cancelled_before_its_first_step_frees_its_slot():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        hub = _hub()
+        running = hub.start(_slow_source({}), ticket=scheduler.submit(Priority.INTERACTIVE, "a"))
+        queued = hub.start(_slow_source({}), ticket=scheduler.submit(Priority.INTERACTIVE, "b"))
+        assert (scheduler.running, scheduler.queued) == (1, 1)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0.01)
+        return scheduler, running, queued
+
+    scheduler, *streams = asyncio.run(scenario())
+
+    assert (scheduler.running, scheduler.queued) == (0, 0)
+    assert all(stream.finished and stream.events[-1][1] == "error" for stream in streams)
+
+
+def test_idle_streams_send_heartbeats():
+    async def scenario():
+        stream = _hub(api_stream_heartbeat_seconds=0.01).start(_slow_source({}))
+        listener = stream.listen(heartbeat=0.01)
+        events = [await listener.__anext__() for _ in range(3)]
+        await listener.aclose()
+        return events
+
+    first, *beats = asyncio.run(scenario())
+
+    assert first[:2] == (1, "recipe")
+    assert beats == [None, None]
+
+
+# HTTP
+
+
+class _FakeStreamingSuggestions:
+    async def stream_recipes(self, **kwargs):
+        for n in range(3):
+            yield RecipeSuggestion(
+                title=f"{kwargs['ingredients'][0]} {n}",
+                description="",
+                ingredients=[Ingredient(name="rice", quantity=1, unit="cup")],
+                instructions=[],
+            )
+
+
+class _FakeStreamingMealPlans:
+    async def stream_meal_plan(self, **kwargs):
+        service = MealPlanService(_StreamingClient(MEAL_PLAN))
+        async for item in service.stream_meal_plan(**kwargs):
+            yield item
+
+
+def _events(text: str) -> list[dict]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith((":", "retry")))
+        if "data" in fields:
+            fields["data"] = codec.loads(fields["data"])
+        events.append(fields)
+    return events
+
+
+@pytest.fixture
+def client(tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from chefwise.api import AIServices, create_app
+
+    services = AIServices(suggestions=_FakeStreamingSuggestions(), meal_plans=_FakeStreamingMealPlans())
+    with TestClient(create_app(f"sqlite:///{tmp_path / 'stream.db'}", services=services)) as client:
+        yield client
+
+
+def test_sse_streams_recipes_and_resumes_after_last_event_id(client):
+    response = client.post("/ai/suggest/stream", json={"ingredients": ["rice"]})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+
+    stream, *events = _events(response.text)
+    assert stream["event"] == "stream"
+    assert [e["event"] for e in events] == ["recipe", "recipe", "recipe", "done"]
+    assert [e["id"] for e in events] == ["1", "2", "3", "4"]
+    assert events[0]["data"]["title"] == "rice 0"
+
+    stream_id = stream["data"]["stream_id"]
+    assert response.headers["content-location"] == f"/ai/streams/{stream_id}"
+    resumed = _events(client.get(f"/ai/streams/{stream_id}", headers={"Last-Event-ID": "2"}).text)[1:]
+    assert [(e["id"], e["event"]) for e in resumed] == [("3", "recipe"), ("4", "done")]
+
+    assert client.get("/ai/streams/unknown").status_code == 404
+
+
+def test_sse_meal_plan_sends_days_and_plan(client):
+    response = client.post("/ai/meal-plan/stream", json={"num_days": 2, "start_date": "2024-05-06"})
+
+    events = _events(response.text)[1:]
+    assert [e["event"] for e in events] == ["day", "day", "plan", "done"]
+    assert MealPlanDay.model_validate(events[0]["data"]).date == date(2024, 5, 6)
+    assert events[2]["data"]["shopping_list"][0]["name"] == "leeks"
+
+
+def test_websocket_streams_and_resumes(client):
+    with client.websocket_connect("/ai/ws") as ws:
+        ws.send_json({"action": "suggest", "params": {"ingredients": ["eggs"], "num_recipes": 3}})
+        stream_id = ws.receive_json()["data"]["stream_id"]
+        messages = [ws.receive_json() for _ in range(4)]
+    assert [m["event"] for m in messages] == ["recipe", "recipe", "recipe", "done"]
+    assert messages[0]["data"]["title"] == "eggs 0"
+
+    with client.websocket_connect("/ai/ws") as ws:
+        ws.send_json({"action": "resume", "stream_id": stream_id, "last_event_id": 3})
+        ws.receive_json()
+        assert ws.receive_json() == {"id": 4, "event": "done", "data": {}}
@@ -0,0 +1,195 @@
+"""Tests for streaming library export and import."""
+
+import gzip
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import (
+    MealPlanRepository,
+    PreferencesRepository,
+    RecipeRepository,
+    RecipeTable,
+    create_db_engine,
+    export_library,
+    import_library,
+    init_db,
+)
+from chefwise.database import transfer
+from chefwise.database.converters import recipe_values
+from chefwise.database.migrations import downgrade, migrate
+from chefwise.models import Ingredient, MealPlanCreate, MealSlot, RecipeCreate, UserPreferences
+
+
+def _engine(tmp_path, name):
+    engine = create_db_engine(f"sqlite:///{tmp_path / name}")
+    init_db(engine)
+    return engine
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A library with preferences, recipes and a meal plan referencing one of them."""
+    engine = _engine(tmp_path, "source.db")
+    with sessionmaker(bind=engine)() as db:
+        recipes = RecipeRepository(db)
+        saved = [
+            recipes.create(
+                RecipeCreate(
+                    title=f"Soup {n}",
+                    ingredients=[Ingredient(name="stock", quantity=n + 1, unit="cups")],
+                    instructions=["Simmer"],
+                    dietary_tags=["vegan"],
+                )
+            )
+            for n in range(7)
+        ]
+        start = date(2024, 3, 4)
+        MealPlanRepository(db).create(
+            MealPlanCreate(
+                name="Soup Week",
+                start_date=start,
+                end_date=start + timedelta(days=6),
+                meals=[
+                    MealSlot(date=start, meal_type="dinner", recipe_id=saved[2].id, recipe_title=saved[2].title),
+                    MealSlot(date=start, meal_type="lunch", recipe_title="Sandwich"),
+                ],
+            )
+        )
+        MealPlanRepository(db).create(MealPlanCreate(name="Empty", start_date=start, end_date=start))
+        PreferencesRepository(db).update(UserPreferences(allergies=["sesame"], serving_size=3))
+    yield engine
+    engine.dispose()
+
+
+def _library(engine):
+    with sessionmaker(bind=engine)() as db:
+        recipes = sorted((r.title, r.ingredients[0].quantity, r.dietary_tags) for r in RecipeRepository(db).get_all())
+        plans = sorted(
+            (p.name, [(m.meal_type, m.recipe_title, m.recipe_id is not None) for m in p.meals])
+            for p in MealPlanRepository(db).get_all()
+        )
+        prefs = PreferencesRepository(db).get()
+    return recipes, plans, (prefs.allergies, prefs.serving_size)
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".ndjson.gz"])
+def test_roundtrip(source, tmp_path, suffix):
+    path = tmp_path / f"library{suffix}"
+    exported = export_library(path, bind=source, batch_size=3)
+    assert exported.counts == {"preferences": 1, "recipes": 7, "meal_plans": 2}
+    assert not (tmp_path / f"library{suffix}.progress").exists()
+
+    target = _engine(tmp_path, "target.db")
+    result = import_library(path, bind=target, batch_size=3)
+
+    assert (result.recipes, result.meal_plans, result.preferences) == (7, 2, 1)
+    assert _library(target) == _library(source)
+
+
+def test_gzip_output_is_multi_member_ndjson(source, tmp_path):
+    path = tmp_path / "library.ndjson.gz"
+    export_library(path, bind=source, batch_size=2)
+
+    lines = gzip.decompress(path.read_bytes()).splitlines()
+    assert b'"type":"header"' in lines[0]
+    assert len(lines) == 1 + 1 + 7 + 2
+
+
+def test_import_is_resumable_and_not_repeated(source, tmp_path, monkeypatch):
+    path = tmp_path / "library.ndjson"
+    export_library(path, bind=source)
+    target = _engine(tmp_path, "target.db")
+
+    # Fail on the second batch: the first one stays committed
+    original = transfer._apply_batch
+    calls = []
+
+    def flaky(db, records, result):
+        calls.append(len(records))
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        original(db, records, result)
+
+    monkeypatch.setattr(transfer, "_apply_batch", flaky)
+    with pytest.raises(RuntimeError):
+        import_library(path, bind=target, batch_size=4)
+    monkeypatch.setattr(transfer, "_apply_batch", original)
+
+    resumed = import_library(path, bind=target, batch_size=4)
+    assert resumed.resumed_after_line == 5
+    assert resumed.duplicate_recipes == 0
+    assert _library(target) == _library(source)
+
+    again = import_library(path, bind=target)
+    assert again.already_completed
+    assert _library(target) == _library(source)
+
+
+def test_reimport_skips_existing_recipes(source, tmp_path):
+    path = tmp_path / "library.ndjson"
+    export_library(path, bind=source)
+
+    result = import_library(path, bind=source, resume=False)
+
+    assert (result.recipes, result.duplicate_recipes) == (0, 7)
+
+
+def test_import_into_legacy_library_with_duplicates(source, tmp_path):
+    path = tmp_path / "library.ndjson"
+    export_library(path, bind=source)
+    # A library from before fingerprints holding the same soup twice: migration 3 leaves its index plain
+    target = _engine(tmp_path, "legacy.db")
+    downgrade(target, 0)
+    soup = RecipeCreate(
+        title="Soup 2",
+        ingredients=[Ingredient(name="stock", quantity=3, unit="cups")],
+        instructions=["Simmer"],
+        dietary_tags=["vegan"],
+    )
+    legacy_row = {column: value for column, value in recipe_values(soup).items() if column != "content_hash"}
+    with target.begin() as conn:
+        conn.execute(insert(RecipeTable), [legacy_row, legacy_row])
+    migrate(target)
+
+    result = import_library(path, bind=target)
+
+    assert (result.recipes, result.duplicate_recipes) == (6, 1)
+    assert _library(target)[1] == _library(source)[1]
+    with sessionmaker(bind=target)() as db:
+        repo = RecipeRepository(db)
+        # Saving the soup again finds a stored copy instead of adding a third
+        assert repo.create_or_get(soup)[1] is False
+        assert len(repo.get_all()) == 8
+
+
+def test_export_resumes_after_interruption(source, tmp_path, monkeypatch):
+    path = tmp_path / "library.ndjson.gz"
+    original = transfer._export_meal_plans
+
+    def interrupted(conn, after, batch_size):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(transfer, "_EXPORTERS", {**transfer._EXPORTERS, "meal_plans": interrupted})
+    with pytest.raises(KeyboardInterrupt):
+        export_library(path, bind=source, batch_size=3)
+    assert (tmp_path / "library.ndjson.gz.progress").exists()
+
+    monkeypatch.setattr(transfer, "_EXPORTERS", {**transfer._EXPORTERS, "meal_plans": original})
+    result = export_library(path, bind=source, batch_size=3, resume=True)
+
+    assert result.resumed
+    assert result.counts == {"preferences": 1, "recipes": 7, "meal_plans": 2}
+    target = _engine(tmp_path, "target.db")
+    import_library(path, bind=target)
+    assert _library(target) == _library(source)
+
+
+def test_rejects_foreign_files(tmp_path, memory_engine):
+    path = tmp_path / "other.ndjson"
+    path.write_text('{"hello": "world"}\n')
+
+    with pytest.raises(ValueError, match="Not a ChefWise library export"):
+        import_library(path, bind=memory_engine)
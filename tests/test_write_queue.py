@@ -0,0 +1,138 @@
+"""Tests for the single-writer queue."""
+
+import threading
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from chefwise.database import (
+    MealPlanRepository,
+    PreferencesRepository,
+    RecipeRepository,
+    RecipeTable,
+    WriteQueue,
+    create_db_engine,
+    init_db,
+)
+from chefwise.models import Ingredient, MealPlan, RecipeCreate
+
+
+def _recipe(title: str) -> RecipeCreate:
+    return RecipeCreate(
+        title=title,
+        description="",
+        ingredients=[Ingredient(name="rice", quantity=1, unit="cup")],
+        instructions=["Cook"],
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def writes(engine):
+    with WriteQueue(engine, max_wait_ms=0) as writes:
+        yield writes
+
+
+def _count(engine) -> int:
+    with sessionmaker(bind=engine)() as db:
+        return db.execute(select(func.count(RecipeTable.id))).scalar()
+
+
+def _blocking(writes: WriteQueue) -> tuple[threading.Event, threading.Event]:
+    """Occupy the writer thread until the returned release event is set."""
+    entered, release = threading.Event(), threading.Event()
+
+    def wait(db):
+        RecipeRepository(db).create(_recipe("First"))
+        entered.set()
+        release.wait(5)
+
+    writes.submit(wait)
+    entered.wait(5)
+    return entered, release
+
+
+def test_queued_mutations_are_committed_in_one_batch(engine, writes):
+    _, release = _blocking(writes)
+    futures = [
+        writes.submit(lambda db, n=n: RecipeRepository(db).create_or_get(_recipe(f"Dish {n}"))) for n in range(20)
+    ]
+    release.set()
+
+    results = [future.result(5) for future in futures]
+
+    assert [recipe.title for recipe, created in results] == [f"Dish {n}" for n in range(20)]
+    assert all(created for _, created in results)
+    assert _count(engine) == 21
+    assert writes.stats()["batches"] == 2 and writes.stats()["largest_batch"] == 20
+
+
+def test_failing_mutation_is_rolled_back_alone(engine, writes):
+    _, release = _blocking(writes)
+
+    def create_then_fail(db):
+        RecipeRepository(db).create(_recipe("Rolled back"))
+        # Rolls back its savepoint, then raises
+        MealPlanRepository(db).save(MealPlan(id=999, name="Missing", start_date=date.today(), end_date=date.today()))
+
+    before = writes.submit(lambda db: RecipeRepository(db).create(_recipe("Before")))
+    failing = writes.submit(create_then_fail)
+    after = writes.submit(lambda db: RecipeRepository(db).create(_recipe("After")))
+    release.set()
+
+    assert before.result(5).title == "Before"
+    assert after.result(5).title == "After"
+    with pytest.raises(ValueError, match="does not exist"):
+        failing.result(5)
+    with sessionmaker(bind=engine)() as db:
+        titles = set(db.execute(select(RecipeTable.title)).scalars())
+    assert titles == {"First", "Before", "After"}
+    assert writes.stats()["failed"] == 1
+
+
+def test_reads_run_while_a_batch_is_open(engine, writes):
+    _, release = _blocking(writes)
+
+    # The writer holds an uncommitted insert; readers are neither blocked nor see it
+    assert _count(engine) == 0
+    release.set()
+    writes.write(lambda db: PreferencesRepository(db).get())
+    assert _count(engine) == 1
+
+
+def test_closed_queue_rejects_mutations(engine):
+    writes = WriteQueue(engine)
+    future = writes.submit(lambda db: RecipeRepository(db).create(_recipe("Queued")))
+    writes.close()
+
+    assert future.result(5).title == "Queued"
+    with pytest.raises(RuntimeError):
+        writes.submit(lambda db: None)
+
+
+def test_api_writes_through_the_queue(tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from chefwise.api import create_app
+    from chefwise.config.settings import Settings
+
+    app = create_app(f"sqlite:///{tmp_path / 'api.db'}", config=Settings(db_write_queue=True))
+    recipe = _recipe("Queued soup").model_dump(mode="json")
+    with TestClient(app) as client:
+        created = client.post("/recipes", json=recipe)
+        assert created.status_code == 201
+        assert client.post("/recipes", json=recipe).status_code == 200
+        assert client.get(f"/recipes/{created.json()['id']}").json()["title"] == "Queued soup"
+        assert client.delete(f"/recipes/{created.json()['id']}").status_code == 204
+        assert client.delete(f"/recipes/{created.json()['id']}").status_code == 404
+        assert app.state.writer.stats()["writes"] == 4